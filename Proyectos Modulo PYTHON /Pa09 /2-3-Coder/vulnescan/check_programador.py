@@ -0,0 +1,114 @@
+"""Comprueba el modo programado (programador.py) contra un servidor HTTP local de prueba.
+
+El servidor responde con ETag y devuelve 304 a las solicitudes condicionales; entre rondas
+se cambian sus cabeceras sin cambiar el ETag (el cuerpo es el mismo). Se verifica que:
+- una ronda sin cambios usa el 304 y no reporta nada nuevo ni resuelto
+- una cabecera agregada en el 200 y en el 304 (mismo ETag) da el hallazgo por RESUELTO
+- una cabecera que el 304 no reenvía se toma de la respuesta guardada
+- el resultado final coincide con un escaneo sin caché
+
+    python check_programador.py
+"""
+import argparse
+import tempfile
+import threading
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+from scanner import escanear_webs
+from programador import CacheEscaneo, ejecutar_ronda, NOMBRE_CACHE
+
+ETAG = '"v1"'
+
+
+class Estado:
+    cabeceras = {}            # cabeceras de la página (200 y 304)
+    reenviar_en_304 = None    # None = el 304 reenvía todas; si no, solo estas
+
+
+class Sitio(BaseHTTPRequestHandler):
+    def log_message(self, *args):
+        pass
+
+    def send_response(self, code, message=None):
+        # sin la cabecera Server automática: solo se envían las de Estado.cabeceras
+        self.send_response_only(code, message)
+
+    def _responder(self, con_cuerpo):
+        if self.path != "/":
+            self.send_response(404)
+            self.send_header("Content-Length", "0")
+            self.end_headers()
+            return
+        condicional = self.headers.get("If-None-Match") == ETAG
+        self.send_response(304 if condicional else 200)
+        self.send_header("ETag", ETAG)
+        for nombre, valor in Estado.cabeceras.items():
+            if not condicional or Estado.reenviar_en_304 is None or nombre in Estado.reenviar_en_304:
+                self.send_header(nombre, valor)
+        cuerpo = b"" if condicional else b"<html>hola</html>"
+        self.send_header("Content-Length", str(len(cuerpo)))
+        self.end_headers()
+        if con_cuerpo:
+            self.wfile.write(cuerpo)
+
+    def do_GET(self):
+        self._responder(True)
+
+    def do_HEAD(self):
+        self._responder(False)
+
+
+def _ids(hallazgos):
+    return sorted(h["ID_VULN"] for h in hallazgos)
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Rondas del programador contra un servidor local")
+    parser.parse_args(argv)
+
+    servidor = ThreadingHTTPServer(("127.0.0.1", 0), Sitio)
+    threading.Thread(target=servidor.serve_forever, daemon=True).start()
+    url = f"http://127.0.0.1:{servidor.server_address[1]}/"
+    base = {"X-Frame-Options": "DENY", "X-Content-Type-Options": "nosniff", "Server": "Apache/2.4.1"}
+
+    try:
+        with tempfile.TemporaryDirectory() as salida:
+            cache = CacheEscaneo(f"{salida}/{NOMBRE_CACHE}")
+
+            # 1) primera ronda: todo es nuevo
+            Estado.cabeceras = dict(base)
+            r = ejecutar_ronda([url], cache, salida)
+            assert "MISSING_HSTS" in _ids(r["delta"]["NUEVO"]) and not r["delta"]["RESUELTO"], r["delta"]
+
+            # 2) sin cambios: 304 y nada nuevo ni resuelto
+            r = ejecutar_ronda([url], cache, salida)
+            assert r["estadisticas"].get("paginas_sin_cambios") == 1, r["estadisticas"]
+            assert not r["delta"]["NUEVO"] and not r["delta"]["RESUELTO"], r["delta"]
+
+            # 3) se agrega HSTS en el 200 y en el 304, mismo ETag: queda resuelto
+            Estado.cabeceras = dict(base, **{"Strict-Transport-Security": "max-age=31536000"})
+            r = ejecutar_ronda([url], cache, salida)
+            assert r["estadisticas"].get("paginas_sin_cambios") == 1, r["estadisticas"]
+            assert _ids(r["delta"]["RESUELTO"]) == ["MISSING_HSTS"] and not r["delta"]["NUEVO"], r["delta"]
+
+            # 4) el 304 ya no reenvía las cabeceras de seguridad: se usan las guardadas
+            Estado.reenviar_en_304 = set()
+            r = ejecutar_ronda([url], cache, salida)
+            assert r["estadisticas"].get("paginas_sin_cambios") == 1, r["estadisticas"]
+            assert not r["delta"]["NUEVO"] and not r["delta"]["RESUELTO"], r["delta"]
+
+            # 5) el 304 reenvía un Server distinto: cambia el hallazgo de la cabecera
+            Estado.reenviar_en_304 = None
+            Estado.cabeceras["Server"] = "nginx"
+            r = ejecutar_ronda([url], cache, salida)
+            assert _ids(r["delta"]["RESUELTO"]) == ["SERVER_INFO_EXPOSED"] and not r["delta"]["NUEVO"], r["delta"]
+
+            # el estado final coincide con un escaneo completo sin caché
+            assert _ids(cache.ultimos[url]) == _ids(escanear_webs([url])[url])
+    finally:
+        servidor.shutdown()
+    print("OK: 5 rondas (cambios de cabeceras con el mismo ETag detectados)")
+
+
+if __name__ == "__main__":
+    main()
@@ -1,6 +1,9 @@
 import csv
 from datetime import datetime
 import os
+import sqlite3
+
+from historial import HistorialReportes
 
 def generar_csv_reporte(datos_hallazgos, directorio_salida="reportes"):
    
@@ -28,8 +31,43 @@ def generar_csv_reporte(datos_hallazgos, directorio_salida="reportes"):
             writer.writerows(datos_hallazgos)
 
         print(f"[ÉXITO] Reporte CSV generado correctamente en: {ruta_completa}")
-        return ruta_completa
 
     except Exception as e:
         print(f"[ERROR] No se pudo generar el archivo CSV: {e}")
+        return None
+
+    # El historial se actualiza con las filas en memoria (el dashboard no relee el CSV)
+    try:
+        HistorialReportes(directorio_salida).registrar(ruta_completa, datos_hallazgos)
+    except (sqlite3.Error, OSError) as e:
+        print(f"[AVISO] El reporte no se agregó al historial (se agregará al abrir el dashboard): {e}")
+    return ruta_completa
+
+
+def generar_csv_delta(delta, directorio_salida="reportes"):
+    # Cambios entre dos escaneos: una fila por hallazgo con su ESTADO (NUEVO, RESUELTO o SIN_CAMBIOS)
+    filas = [dict(h, ESTADO=estado) for estado, hallazgos in delta.items() for h in hallazgos]
+    if not filas:
+        print("[AVISO] No hay hallazgos en el delta. No se generará el CSV.")
+        return None
+
+    fieldnames = ["ESTADO", "ID_VULN", "URL_AFECTADA", "SEVERIDAD", "TIPO_FALLO"]
+
+    if not os.path.exists(directorio_salida):
+        os.makedirs(directorio_salida)
+
+    timestamp = datetime.now().strftime("%Y%m%d_%H%M%S")
+    ruta_completa = os.path.join(directorio_salida, f"delta_seguridad_{timestamp}.csv")
+
+    try:
+        with open(ruta_completa, 'w', newline='', encoding='utf-8') as csvfile:
+            writer = csv.DictWriter(csvfile, fieldnames=fieldnames)
+            writer.writeheader()
+            writer.writerows(filas)
+
+        print(f"[ÉXITO] Delta CSV generado correctamente en: {ruta_completa}")
+        return ruta_completa
+
+    except Exception as e:
+        print(f"[ERROR] No se pudo generar el archivo CSV del delta: {e}")
         return None
\ No newline at end of file
@@ -5,41 +5,32 @@ import altair as alt
 
 import pandas as pd
 import os
-import glob
 from datetime import datetime
 
 # Importar las funciones de los módulos .py creados
-from scanner import escanear_web
+from scanner import escanear_webs
 from csv_generador import generar_csv_reporte
 from diccionario import get_detalles_vulnerabilidad
+from historial import HistorialReportes
+
+# El historial vive en un índice SQLite (historial.py): en cada recarga solo se ingresan los
+# CSV nuevos y los datos se cachean por la versión del manifiesto (cambia si entra o sale un reporte)
+def version_historial(directorio="reportes"):
+    return HistorialReportes(directorio).sincronizar()
 
 # funcion para generar un único dataframe que contenga todos los demas dataframe
-def cargar_historial_reportes(directorio="reportes"):
-    search_path = os.path.join(directorio, "reporte_seguridad_*.csv")
-    archivos = glob.glob(search_path)
-    
-    if not archivos:
-        return pd.DataFrame()
-    
-    dfs = []    # lista de dataframes
-    for archivo in archivos:
-        try:
-            df = pd.read_csv(archivo)
-            
-            # Extraer fecha del nombre del archivo dividiendo el nombre en pedazos dentro de una lista
-            timestamp = os.path.basename(archivo).split("reporte_seguridad_")[-1].split(".")[0]
-            fecha = datetime.strptime(timestamp, "%Y%m%d_%H%M%S")   # combierte la fecha en un tipo datetime
-            
-            df["FECHA_REPORTE"] = fecha
-            dfs.append(df)
-        except Exception as e:
-            print(f"[AVISO] No se pudo cargar {archivo}: {e}")
-    
-    # unir los dataframes en uno solo
-    if dfs:
-        return pd.concat(dfs, ignore_index=True).sort_values(by="FECHA_REPORTE")
-    else:
-        return pd.DataFrame()
+@st.cache_data(show_spinner=False)
+def cargar_historial_reportes(directorio="reportes", version=0):
+    return HistorialReportes(directorio).hallazgos()
+
+# conteos ya agregados por día, severidad y vulnerabilidad
+@st.cache_data(show_spinner=False)
+def cargar_conteos_historial(directorio="reportes", version=0):
+    return HistorialReportes(directorio).conteos()
+
+@st.cache_data(show_spinner=False)
+def exportar_historial_csv(directorio="reportes", version=0):
+    return cargar_historial_reportes(directorio, version).to_csv(index=False).encode("utf-8")
     
 # =============================================
 # Configuración de la Aplicación Streamlit 
@@ -56,15 +47,8 @@ st.set_page_config(
 # =============================================
 
 def obtener_ultimo_reporte(directorio="reportes"):
-    # buscar el archivo csv mas reciente en la carpeta reportes
-    search_path = os.path.join(directorio, "reporte_seguridad_*.csv")
-    archivos = glob.glob(search_path)
-    
-    if not archivos:
-        return None
-        
-    archivos.sort(key=os.path.getmtime, reverse=True)
-    return archivos[0]
+    # el archivo csv mas reciente de la carpeta reportes (según el historial ya sincronizado)
+    return HistorialReportes(directorio).ultimo_reporte()
 
 def cargar_datos(ruta_csv):
     # Cargar los datos del csv en un DataFrame
@@ -108,19 +92,25 @@ st.caption("Herramienta para evaluar fallos comunes de configuración y cabecera
 with st.sidebar:
     st.header("Iniciar Nuevo Escaneo")
     
-    target_url = st.text_input(
-        "Ingresa la URL objetivo",
-        placeholder="https://tudominio.com"
+    target_url = st.text_area(
+        "Ingresa las URLs objetivo (una por línea)",
+        placeholder="https://tudominio.com\nhttps://intranet.tudominio.com"
     )
+    urls_objetivo = [u.strip() for u in target_url.splitlines() if u.strip()]
     
     if st.button("Iniciar Escaneo", type="primary"):
-        if target_url:
-            with st.spinner(f"Escaneando: {target_url}..."):
-                resultados_escaneo = escanear_web(target_url)
+        if urls_objetivo:
+            with st.spinner(f"Escaneando {len(urls_objetivo)} sitio(s)..."):
+                resultados_por_sitio = escanear_webs(urls_objetivo)
+                fallidos = [u for u, r in resultados_por_sitio.items() if r and r[0]['ID_VULN'] == 'CONEXION_FALLIDA']
                 
-                if resultados_escaneo and resultados_escaneo[0]['ID_VULN'] == 'CONEXION_FALLIDA':
-                    st.error(f"¡Fallo de Conexión! No se pudo acceder a {target_url}. Verifica la URL o la conexión.")
+                if len(fallidos) == len(resultados_por_sitio):
+                    st.error(f"¡Fallo de Conexión! No se pudo acceder a {', '.join(fallidos)}. Verifica la URL o la conexión.")
                     st.stop()
+                if fallidos:
+                    st.warning(f"No se pudo acceder a: {', '.join(fallidos)}")
+                
+                resultados_escaneo = [h for u, r in resultados_por_sitio.items() if u not in fallidos for h in r]
                 
                 if resultados_escaneo:
                     ruta_csv = generar_csv_reporte(resultados_escaneo)
@@ -138,6 +128,7 @@ with st.sidebar:
 # 2. CUERPO PRINCIPAL: VISUALIZACIÓN DE DATOS Y DESCARGA
 # =========================================================================
 
+version = version_historial()
 ruta_ultimo_csv = obtener_ultimo_reporte()
 
 if ruta_ultimo_csv:
@@ -195,10 +186,11 @@ if ruta_ultimo_csv:
         col2.metric(label="🚨 Severidad ALTA", value=alta_count, delta=f"Riesgo Crítico")
         col3.metric(label="⚠️ Severidad MEDIA", value=media_count, delta=f"Riesgo Moderado")
         
-        try:
-            url_escaneada = df_reporte['URL_AFECTADA'].iloc[0].split('/')[2]
-        except IndexError:
-            url_escaneada = "N/A"
+        dominios = df_reporte['URL_AFECTADA'].str.split('/').str[2].dropna().unique()
+        if len(dominios) == 1:
+            url_escaneada = dominios[0]
+        else:
+            url_escaneada = f"{len(dominios)} dominios" if len(dominios) else "N/A"
             
         st.metric(label="Dominio Escaneado", value=url_escaneada)
 
@@ -301,17 +293,17 @@ else:
 
 st.markdown("## Historial de Escaneos")
 
-df_historial = cargar_historial_reportes()
+df_conteos = cargar_conteos_historial(version=version)
 
-if not df_historial.empty:
+if not df_conteos.empty:
 
     st.subheader("Distribución de Vulnerabilidades")
 
     conteo_df = (
-        df_historial["SEVERIDAD"]
-        .value_counts()
+        df_conteos.groupby("SEVERIDAD")["CANTIDAD"]
+        .sum()
         .reset_index()
-        .rename(columns={"SEVERIDAD": "Severidad", "count": "Cantidad"})
+        .rename(columns={"SEVERIDAD": "Severidad", "CANTIDAD": "Cantidad"})
     )
     
     severidad_orden = ["Alta", "Media", "Baja", "Informativa"]
@@ -341,7 +333,7 @@ if not df_historial.empty:
     st.altair_chart(chart, use_container_width=True)
 
     # Botón para exportar todo el dataset
-    csv_export = df_historial.to_csv(index=False).encode("utf-8")
+    csv_export = exportar_historial_csv(version=version)
     st.download_button(
         label="Descargar historial (CSV)",
         data=csv_export,
@@ -0,0 +1,192 @@
+# historial.py
+
+import os
+import csv
+import sqlite3
+from collections import Counter
+from datetime import datetime
+
+import pandas as pd
+
+# Índice del historial de escaneos (SQLite, dentro de la carpeta de reportes).
+# Cada reporte_seguridad_*.csv se ingresa una sola vez: el manifiesto (tabla archivos)
+# recuerda cuáles ya están y la tabla conteos guarda los totales por día, severidad y
+# vulnerabilidad, así el dashboard no vuelve a leer todos los CSV en cada recarga.
+
+PREFIJO_REPORTE = "reporte_seguridad_"
+FORMATO_FECHA = "%Y%m%d_%H%M%S"
+NOMBRE_BASE = "historial.sqlite3"
+COLUMNAS = ["ID_VULN", "URL_AFECTADA", "SEVERIDAD", "TIPO_FALLO"]
+
+ESQUEMA = """
+CREATE TABLE IF NOT EXISTS archivos (
+    nombre TEXT PRIMARY KEY,
+    fecha TEXT,                 -- fecha del reporte (del nombre); NULL si el archivo no se pudo leer
+    mtime REAL NOT NULL,
+    filas INTEGER NOT NULL
+);
+CREATE TABLE IF NOT EXISTS hallazgos (
+    archivo TEXT NOT NULL,
+    fecha TEXT NOT NULL,
+    id_vuln TEXT,
+    url TEXT,
+    severidad TEXT,
+    tipo_fallo TEXT
+);
+CREATE INDEX IF NOT EXISTS idx_hallazgos_archivo ON hallazgos(archivo);
+CREATE TABLE IF NOT EXISTS conteos (
+    dia TEXT NOT NULL,
+    severidad TEXT NOT NULL,
+    id_vuln TEXT NOT NULL,
+    cantidad INTEGER NOT NULL,
+    PRIMARY KEY (dia, severidad, id_vuln)
+);
+CREATE TABLE IF NOT EXISTS meta (
+    clave TEXT PRIMARY KEY,
+    valor INTEGER NOT NULL
+);
+INSERT OR IGNORE INTO meta VALUES ('version', 0);
+"""
+
+
+def fecha_de_nombre(nombre_archivo):
+    # reporte_seguridad_YYYYmmdd_HHMMSS.csv -> datetime (None si el nombre no tiene ese formato)
+    timestamp = os.path.basename(nombre_archivo).split(PREFIJO_REPORTE)[-1].split(".")[0]
+    try:
+        return datetime.strptime(timestamp, FORMATO_FECHA)
+    except ValueError:
+        return None
+
+
+def _es_reporte(nombre):
+    return nombre.startswith(PREFIJO_REPORTE) and nombre.endswith(".csv")
+
+
+def _texto(valor):
+    # Celdas vacías como NULL (igual que NaN en pd.read_csv)
+    return valor if valor not in (None, "") else None
+
+
+class HistorialReportes:
+    """
+    Historial de todos los reportes de una carpeta:
+    - sincronizar() ingresa solo los CSV nuevos (y quita los borrados)
+    - registrar() agrega un reporte recién generado sin volver a leerlo
+    - version() cambia cada vez que entra o sale un reporte (clave para cachés)
+    """
+
+    def __init__(self, directorio="reportes"):
+        self.directorio = directorio
+        self.ruta = os.path.join(directorio, NOMBRE_BASE)
+
+    def _conectar(self):
+        os.makedirs(self.directorio, exist_ok=True)
+        conexion = sqlite3.connect(self.ruta, timeout=30)
+        conexion.executescript(ESQUEMA)
+        return conexion
+
+    # ---------- Escritura ----------
+
+    def _ingresar(self, conexion, nombre, filas, mtime):
+        fecha = fecha_de_nombre(nombre)
+        if fecha is None:
+            print(f"[AVISO] No se pudo cargar {nombre}: el nombre no tiene fecha ({FORMATO_FECHA})")
+            filas = []
+        fecha_txt = fecha.strftime("%Y-%m-%d %H:%M:%S") if fecha else None
+
+        registros = [(nombre, fecha_txt) + tuple(_texto(f.get(c)) for c in COLUMNAS) for f in filas]
+        conexion.execute("INSERT INTO archivos VALUES (?, ?, ?, ?)", (nombre, fecha_txt, mtime, len(registros)))
+        conexion.executemany("INSERT INTO hallazgos VALUES (?, ?, ?, ?, ?, ?)", registros)
+
+        conteos = Counter((fecha_txt[:10], r[4] or "", r[2] or "") for r in registros)
+        conexion.executemany(
+            "INSERT INTO conteos VALUES (?, ?, ?, ?) "
+            "ON CONFLICT(dia, severidad, id_vuln) DO UPDATE SET cantidad = cantidad + excluded.cantidad",
+            [clave + (cantidad,) for clave, cantidad in conteos.items()])
+
+    def _quitar(self, conexion, nombre):
+        conteos = conexion.execute(
+            "SELECT substr(fecha, 1, 10), COALESCE(severidad, ''), COALESCE(id_vuln, ''), COUNT(*) "
+            "FROM hallazgos WHERE archivo = ? GROUP BY 1, 2, 3", (nombre,)).fetchall()
+        conexion.executemany(
+            "UPDATE conteos SET cantidad = cantidad - ? WHERE dia = ? AND severidad = ? AND id_vuln = ?",
+            [(cantidad, dia, severidad, id_vuln) for dia, severidad, id_vuln, cantidad in conteos])
+        conexion.execute("DELETE FROM conteos WHERE cantidad <= 0")
+        conexion.execute("DELETE FROM hallazgos WHERE archivo = ?", (nombre,))
+        conexion.execute("DELETE FROM archivos WHERE nombre = ?", (nombre,))
+
+    def _nueva_version(self, conexion):
+        conexion.execute("UPDATE meta SET valor = valor + 1 WHERE clave = 'version'")
+
+    def sincronizar(self):
+        # Compara los nombres de la carpeta con el manifiesto; solo se leen los CSV que faltan
+        if not os.path.isdir(self.directorio):
+            return 0
+        en_disco = {e.name for e in os.scandir(self.directorio) if e.is_file() and _es_reporte(e.name)}
+
+        conexion = self._conectar()
+        try:
+            manifiesto = {fila[0] for fila in conexion.execute("SELECT nombre FROM archivos")}
+            nuevos, borrados = sorted(en_disco - manifiesto), manifiesto - en_disco
+            if nuevos or borrados:
+                with conexion:
+                    for nombre in borrados:
+                        self._quitar(conexion, nombre)
+                    for nombre in nuevos:
+                        ruta = os.path.join(self.directorio, nombre)
+                        try:
+                            with open(ruta, 'r', newline='', encoding='utf-8') as f:
+                                filas = list(csv.DictReader(f))
+                        except (OSError, UnicodeDecodeError, csv.Error) as e:
+                            print(f"[AVISO] No se pudo cargar {ruta}: {e}")
+                            filas = []
+                        self._ingresar(conexion, nombre, filas, os.path.getmtime(ruta))
+                    self._nueva_version(conexion)
+            return conexion.execute("SELECT valor FROM meta WHERE clave = 'version'").fetchone()[0]
+        finally:
+            conexion.close()
+
+    def registrar(self, ruta_csv, hallazgos):
+        # Agrega un reporte recién escrito (los hallazgos ya están en memoria)
+        nombre = os.path.basename(ruta_csv)
+        conexion = self._conectar()
+        try:
+            with conexion:
+                if conexion.execute("SELECT 1 FROM archivos WHERE nombre = ?", (nombre,)).fetchone():
+                    return
+                self._ingresar(conexion, nombre, hallazgos, os.path.getmtime(ruta_csv))
+                self._nueva_version(conexion)
+        finally:
+            conexion.close()
+
+    # ---------- Lectura ----------
+
+    def _consultar(self, sql, parametros=()):
+        conexion = self._conectar()
+        try:
+            return conexion.execute(sql, parametros).fetchall()
+        finally:
+            conexion.close()
+
+    def version(self):
+        return self._consultar("SELECT valor FROM meta WHERE clave = 'version'")[0][0]
+
+    def ultimo_reporte(self):
+        # Ruta del CSV modificado más recientemente (None si no hay reportes)
+        fila = self._consultar("SELECT nombre FROM archivos ORDER BY mtime DESC LIMIT 1")
+        return os.path.join(self.directorio, fila[0][0]) if fila else None
+
+    def hallazgos(self):
+        # Todos los hallazgos con su FECHA_REPORTE, del más antiguo al más reciente
+        filas = self._consultar(
+            "SELECT id_vuln, url, severidad, tipo_fallo, fecha FROM hallazgos ORDER BY fecha, rowid")
+        df = pd.DataFrame(filas, columns=COLUMNAS + ["FECHA_REPORTE"])
+        df["FECHA_REPORTE"] = pd.to_datetime(df["FECHA_REPORTE"])
+        return df
+
+    def conteos(self):
+        # Totales ya agregados: una fila por día, severidad y vulnerabilidad
+        filas = self._consultar("SELECT dia, NULLIF(severidad, ''), NULLIF(id_vuln, ''), cantidad FROM conteos ORDER BY dia")
+        df = pd.DataFrame(filas, columns=["DIA", "SEVERIDAD", "ID_VULN", "CANTIDAD"])
+        df["DIA"] = pd.to_datetime(df["DIA"])
+        return df
@@ -0,0 +1,206 @@
+# programador.py
+
+import os
+import sys
+import json
+import time
+import argparse
+from collections import Counter
+
+from scanner import MotorEscaneo, MAX_CONCURRENCIA, MAX_POR_HOST, leer_objetivos
+from csv_generador import generar_csv_reporte, generar_csv_delta
+
+# Reescaneo periódico de una lista de objetivos:
+# - Las páginas se piden con If-None-Match / If-Modified-Since; en un 304 se vuelven a revisar las
+#   cabeceras (las reenviadas sobre las guardadas) y solo las reglas de cuerpo reutilizan el análisis anterior
+# - Los archivos sensibles consultados hace menos de 'vigencia' segundos no se vuelven a pedir
+# - Cada ronda se compara con la anterior y solo se escribe algo si hubo cambios
+
+INTERVALO = 3600                 # segundos entre el inicio de dos rondas
+VIGENCIA_ARCHIVOS = 24 * 3600    # segundos que vale el resultado de un archivo sensible
+NOMBRE_CACHE = "cache_escaneo.json"
+ESTADOS = ("NUEVO", "RESUELTO", "SIN_CAMBIOS")
+
+
+class CacheEscaneo:
+    """
+    Estado guardado entre rondas (un JSON en la carpeta de reportes):
+    - paginas: validadores (ETag / Last-Modified), cabeceras y hallazgos de cada página
+    - archivos: resultado y fecha de cada archivo sensible consultado
+    - ultimos: hallazgos de la última ronda por objetivo (base del delta)
+    """
+
+    def __init__(self, ruta, vigencia_archivos=VIGENCIA_ARCHIVOS):
+        self.ruta = ruta
+        self.vigencia_archivos = vigencia_archivos
+        datos = self._leer()
+        self.paginas = datos.get("paginas", {})
+        self.archivos = datos.get("archivos", {})
+        self.ultimos = datos.get("ultimos", {})
+        self.estadisticas = Counter()
+
+    def _leer(self):
+        try:
+            with open(self.ruta, 'r', encoding='utf-8') as f:
+                return json.load(f)
+        except (OSError, ValueError):
+            return {}
+
+    def guardar(self):
+        os.makedirs(os.path.dirname(self.ruta) or ".", exist_ok=True)
+        tmp = self.ruta + ".tmp"
+        with open(tmp, 'w', encoding='utf-8') as f:
+            json.dump({"paginas": self.paginas, "archivos": self.archivos, "ultimos": self.ultimos}, f,
+                      ensure_ascii=False)
+        os.replace(tmp, self.ruta)
+
+    # ---------- Páginas ----------
+
+    def cabeceras_condicionales(self, url):
+        entrada = self.paginas.get(url)
+        if not entrada or "cabeceras" not in entrada:
+            return None  # sin cabeceras guardadas (caché anterior) un 304 no se podría revisar
+        cabeceras = {}
+        if entrada.get("etag"):
+            cabeceras["If-None-Match"] = entrada["etag"]
+        if entrada.get("last_modified"):
+            cabeceras["If-Modified-Since"] = entrada["last_modified"]
+        return cabeceras or None
+
+    def pagina_sin_cambios(self, url):
+        # (cabeceras, hallazgos, url final) del último análisis de la página
+        entrada = self.paginas.get(url)
+        if not entrada or "cabeceras" not in entrada:
+            return None
+        self.estadisticas["paginas_sin_cambios"] += 1
+        return dict(entrada["cabeceras"]), [dict(h) for h in entrada["hallazgos"]], entrada["url_final"]
+
+    def guardar_pagina(self, url, response, hallazgos, cabeceras=None):
+        # Solo sirve guardar páginas que se puedan validar en la próxima ronda.
+        # 'cabeceras': las de la página ya combinadas (en un 304, las guardadas + las reenviadas)
+        if response.status_code != 304:
+            self.estadisticas["paginas_descargadas"] += 1
+        if cabeceras is None:
+            cabeceras = {k.lower(): v for k, v in response.headers.items()}
+        etag, modificada = cabeceras.get("etag"), cabeceras.get("last-modified")
+        if etag or modificada:
+            self.paginas[url] = {"etag": etag, "last_modified": modificada, "url_final": response.url,
+                                 "cabeceras": cabeceras, "hallazgos": [dict(h) for h in hallazgos],
+                                 "fecha": time.time()}
+        else:
+            self.paginas.pop(url, None)
+
+    # ---------- Archivos sensibles ----------
+
+    def archivo_vigente(self, target_url):
+        entrada = self.archivos.get(target_url)
+        return entrada is not None and time.time() - entrada["fecha"] < self.vigencia_archivos
+
+    def archivo(self, target_url):
+        self.estadisticas["archivos_omitidos"] += 1
+        hallazgo = self.archivos[target_url]["hallazgo"]
+        return dict(hallazgo) if hallazgo else None
+
+    def guardar_archivo(self, target_url, hallazgo):
+        self.estadisticas["archivos_consultados"] += 1
+        self.archivos[target_url] = {"hallazgo": hallazgo, "fecha": time.time()}
+
+
+def _clave(hallazgo):
+    return (hallazgo["ID_VULN"], hallazgo["URL_AFECTADA"], hallazgo["SEVERIDAD"], hallazgo["TIPO_FALLO"])
+
+
+def calcular_delta(anteriores, actuales):
+    # {NUEVO, RESUELTO, SIN_CAMBIOS: [hallazgos]}; los hallazgos repetidos se cuentan como multiconjunto
+    previos = Counter(_clave(h) for h in anteriores)
+    delta = {estado: [] for estado in ESTADOS}
+    for h in actuales:
+        clave = _clave(h)
+        if previos[clave] > 0:
+            previos[clave] -= 1
+            delta["SIN_CAMBIOS"].append(h)
+        else:
+            delta["NUEVO"].append(h)
+    for h in anteriores:
+        clave = _clave(h)
+        if previos[clave] > 0:
+            previos[clave] -= 1
+            delta["RESUELTO"].append(h)
+    return delta
+
+
+def ejecutar_ronda(urls, cache, directorio_salida="reportes", max_concurrencia=MAX_CONCURRENCIA, por_host=MAX_POR_HOST):
+    """
+    Escanea los objetivos usando la caché y compara con la ronda anterior.
+    Si hubo hallazgos nuevos o resueltos escribe el reporte completo y el CSV del delta.
+    """
+    cache.estadisticas.clear()
+    with MotorEscaneo(max_concurrencia, por_host, cache=cache) as motor:
+        resultados = motor.escanear(urls)
+
+    # Un objetivo sin conexión conserva sus hallazgos anteriores (no se dan por resueltos)
+    fallidos = [u for u, lista in resultados.items() if lista and lista[0]['ID_VULN'] == 'CONEXION_FALLIDA']
+    actuales = {u: lista for u, lista in resultados.items() if u not in fallidos}
+    anteriores = [h for u in actuales for h in cache.ultimos.get(u, [])]
+    delta = calcular_delta(anteriores, [h for lista in actuales.values() for h in lista])
+    cache.ultimos.update(actuales)
+
+    reporte = ruta_delta = None
+    if delta["NUEVO"] or delta["RESUELTO"]:
+        reporte = generar_csv_reporte([h for lista in actuales.values() for h in lista], directorio_salida)
+        ruta_delta = generar_csv_delta(delta, directorio_salida)
+    cache.guardar()
+    return {"delta": delta, "fallidos": fallidos, "reporte": reporte, "delta_csv": ruta_delta,
+            "estadisticas": dict(cache.estadisticas)}
+
+
+def programar(ruta_lista, intervalo=INTERVALO, rondas=None, directorio_salida="reportes",
+              vigencia_archivos=VIGENCIA_ARCHIVOS, max_concurrencia=MAX_CONCURRENCIA, por_host=MAX_POR_HOST):
+    # La lista se vuelve a leer en cada ronda: los cambios en el archivo se aplican sin reiniciar
+    cache = CacheEscaneo(os.path.join(directorio_salida, NOMBRE_CACHE), vigencia_archivos)
+    ronda = 0
+    while rondas is None or ronda < rondas:
+        inicio = time.monotonic()
+        ronda += 1
+        urls = leer_objetivos(ruta_lista)
+        print(f"[INFO] Ronda {ronda}: {len(urls)} objetivos ({time.strftime('%Y-%m-%d %H:%M:%S')})")
+        resumen = ejecutar_ronda(urls, cache, directorio_salida, max_concurrencia, por_host)
+
+        delta, est = resumen["delta"], resumen["estadisticas"]
+        print(f"[INFO] Nuevos: {len(delta['NUEVO'])}, resueltos: {len(delta['RESUELTO'])}, "
+              f"sin cambios: {len(delta['SIN_CAMBIOS'])}, sin conexión: {len(resumen['fallidos'])}")
+        print(f"[INFO] Páginas sin cambios (304): {est.get('paginas_sin_cambios', 0)}, "
+              f"archivos omitidos por vigentes: {est.get('archivos_omitidos', 0)}")
+        if not resumen["delta_csv"]:
+            print("[INFO] Sin cambios respecto de la ronda anterior; no se generan reportes.")
+
+        if rondas is not None and ronda >= rondas:
+            break
+        time.sleep(max(0.0, intervalo - (time.monotonic() - inicio)))
+    return cache
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Vulnescan - reescaneo periódico con reportes de cambios")
+    parser.add_argument('--lista', required=True, help="Archivo con una URL por línea (se relee en cada ronda)")
+    parser.add_argument('--intervalo', type=float, default=INTERVALO, help="Segundos entre rondas")
+    parser.add_argument('--rondas', type=int, default=None, help="Cantidad de rondas (por defecto, sin fin)")
+    parser.add_argument('--vigencia', type=float, default=VIGENCIA_ARCHIVOS,
+                        help="Segundos durante los que no se vuelve a consultar un archivo sensible")
+    parser.add_argument('--concurrencia', type=int, default=MAX_CONCURRENCIA, help="Solicitudes simultáneas en total")
+    parser.add_argument('--por-host', type=int, default=MAX_POR_HOST, help="Solicitudes simultáneas por host")
+    parser.add_argument('--salida', default="reportes", help="Carpeta de los reportes y de la caché")
+    args = parser.parse_args(argv)
+
+    try:
+        programar(args.lista, args.intervalo, args.rondas, args.salida, args.vigencia, args.concurrencia, args.por_host)
+    except KeyboardInterrupt:
+        print("\n[INFO] Programador detenido.")
+    except OSError as e:
+        print(f"[ERROR] {e}")
+        return 1
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
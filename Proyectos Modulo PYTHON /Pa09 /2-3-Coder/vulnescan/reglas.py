@@ -0,0 +1,162 @@
+import re
+
+from diccionario import VULNERABILIDADES
+
+# Bytes máximos del cuerpo que se leen para buscar errores verbosos
+LIMITE_CUERPO = 64 * 1024
+
+# =============================================
+# Tabla de reglas (un chequeo = una entrada)
+# =============================================
+# Tipos:
+#   falta        -> la cabecera no existe (salvo que 'excepto' = (cabecera, patrón) se cumpla)
+#   no_coincide  -> la cabecera falta o su valor no coincide completo con 'patron'
+#   coincide     -> la cabecera existe y su valor contiene 'patron'
+#   presente     -> la cabecera existe
+#   cuerpo       -> estado HTTP >= 'estado_min' y el inicio del cuerpo contiene 'patron'
+#   cookie_sin   -> una cabecera Set-Cookie no contiene 'patron' ('solo_https' para HTTPS)
+# 'texto' reemplaza el nombre de la vulnerabilidad en TIPO_FALLO ({valor} = valor de la cabecera).
+# Los patrones no distinguen mayúsculas de minúsculas.
+
+REGLAS = [
+    # Cabeceras faltantes
+    {"id": "MISSING_HSTS", "tipo": "falta", "cabecera": "strict-transport-security"},
+    {"id": "NO_XFO", "tipo": "falta", "cabecera": "x-frame-options",
+     "excepto": ("content-security-policy", r"frame-ancestors")},
+    {"id": "NO_XCTO", "tipo": "no_coincide", "cabecera": "x-content-type-options", "patron": r"nosniff"},
+    {"id": "MISSING_CSP", "tipo": "falta", "cabecera": "content-security-policy"},
+    {"id": "NO_REFERRER_POLICY", "tipo": "falta", "cabecera": "referrer-policy"},
+
+    # Fuga de información
+    {"id": "SERVER_INFO_EXPOSED", "tipo": "coincide", "cabecera": "server", "patron": r"\d+\.\d+",
+     "texto": "Expone la cabecera Server: {valor}"},
+    {"id": "SERVER_INFO_EXPOSED", "tipo": "presente", "cabecera": "x-powered-by",
+     "texto": "Expone la cabecera X-Powered-By: {valor}"},
+    {"id": "VERBOSE_ERRORS", "tipo": "cuerpo", "estado_min": 500,
+     "patron": r"stack trace|error at line|exception in|fatal error"},
+
+    # Cookies
+    {"id": "INSECURE_COOKIE_SECURE", "tipo": "cookie_sin", "patron": r"secure", "solo_https": True},
+    {"id": "INSECURE_COOKIE_HTTPONLY", "tipo": "cookie_sin", "patron": r"httponly"},
+]
+
+
+class ReglaCompilada:
+    # Regla lista para evaluar: patrones compilados y hallazgo base ya armado
+
+    __slots__ = ("id", "tipo", "cabecera", "patron", "excepto", "estado_min", "solo_https", "texto",
+                 "severidad", "nombre")
+
+    def __init__(self, regla, detalles):
+        self.id = regla["id"]
+        self.tipo = regla["tipo"]
+        self.cabecera = regla.get("cabecera")
+        self.patron = re.compile(regla["patron"], re.IGNORECASE) if "patron" in regla else None
+        excepto = regla.get("excepto")
+        self.excepto = (excepto[0], re.compile(excepto[1], re.IGNORECASE)) if excepto else None
+        self.estado_min = regla.get("estado_min", 0)
+        self.solo_https = regla.get("solo_https", False)
+        self.texto = regla.get("texto")
+        self.severidad = detalles["severidad"]
+        self.nombre = detalles["nombre"]
+
+    def hallazgo(self, url, valor=None):
+        # Mismo formato que scanner.format_hallazgo
+        return {
+            "ID_VULN": self.id,
+            "URL_AFECTADA": url,
+            "SEVERIDAD": self.severidad,
+            "TIPO_FALLO": self.texto.format(valor=valor) if self.texto else self.nombre,
+        }
+
+
+def compilar_reglas(reglas=REGLAS, vulnerabilidades=VULNERABILIDADES):
+    # Se compila una sola vez; las reglas con un ID que no está en el diccionario se descartan
+    compiladas = []
+    for regla in reglas:
+        detalles = vulnerabilidades.get(regla["id"])
+        if detalles is None:
+            print(f"[AVISO] Regla ignorada: {regla['id']} no existe en diccionario.VULNERABILIDADES")
+            continue
+        compiladas.append(ReglaCompilada(regla, detalles))
+    return compiladas
+
+
+def leer_prefijo(response, limite=LIMITE_CUERPO):
+    # Lee como máximo 'limite' bytes del cuerpo (la respuesta debe pedirse con stream=True)
+    partes, leidos = [], 0
+    for bloque in response.iter_content(chunk_size=8192):
+        partes.append(bloque)
+        leidos += len(bloque)
+        if leidos >= limite:
+            break
+    datos = b"".join(partes)[:limite]
+    return datos.decode(response.encoding or "utf-8", errors="replace")
+
+
+def liberar_respuesta(response, limite=LIMITE_CUERPO):
+    # Descarta el resto de un cuerpo corto para que la conexión vuelva al pool;
+    # si supera 'limite' bytes se corta la conexión en lugar de descargarlo entero
+    try:
+        leidos = 0
+        for bloque in response.iter_content(chunk_size=8192):
+            leidos += len(bloque)
+            if leidos >= limite:
+                break
+    except Exception:
+        pass
+    finally:
+        response.close()
+
+
+class AnalizadorCabeceras:
+    """Evalúa todas las reglas compiladas sobre una respuesta en una sola pasada."""
+
+    def __init__(self, reglas=REGLAS, limite_cuerpo=LIMITE_CUERPO):
+        self.reglas = compilar_reglas(reglas)
+        self.limite_cuerpo = limite_cuerpo
+        self._cookies = [r for r in self.reglas if r.tipo == "cookie_sin"]
+
+    def analizar(self, url, response, cabeceras=None, hallazgos_previos=None):
+        # 'cabeceras' reemplaza a las de la respuesta (p. ej. las guardadas + las de un 304);
+        # con 'hallazgos_previos' las reglas de cuerpo no leen la respuesta (un 304 no trae
+        # cuerpo) y se reutilizan los hallazgos que esas reglas dieron antes
+        headers = {k.lower(): v for k, v in (cabeceras if cabeceras is not None else response.headers).items()}
+        previos_cuerpo = list(hallazgos_previos) if hallazgos_previos is not None else None
+        cuerpo = None
+        hallazgos = []
+        for regla in self.reglas:
+            valor = headers.get(regla.cabecera) if regla.cabecera else None
+            tipo = regla.tipo
+            if tipo == "falta":
+                if valor is None and not (regla.excepto and regla.excepto[1].search(headers.get(regla.excepto[0], ""))):
+                    hallazgos.append(regla.hallazgo(url))
+            elif tipo == "no_coincide":
+                if valor is None or not regla.patron.fullmatch(valor):
+                    hallazgos.append(regla.hallazgo(url, valor))
+            elif tipo == "coincide":
+                if valor is not None and regla.patron.search(valor):
+                    hallazgos.append(regla.hallazgo(url, valor))
+            elif tipo == "presente":
+                if valor is not None:
+                    hallazgos.append(regla.hallazgo(url, valor))
+            elif tipo == "cuerpo":
+                if previos_cuerpo is not None:
+                    hallazgos.extend(h for h in previos_cuerpo if h["ID_VULN"] == regla.id)
+                    previos_cuerpo = [h for h in previos_cuerpo if h["ID_VULN"] != regla.id]
+                elif response.status_code >= regla.estado_min:
+                    if cuerpo is None:
+                        cuerpo = leer_prefijo(response, self.limite_cuerpo)
+                    if regla.patron.search(cuerpo):
+                        hallazgos.append(regla.hallazgo(url))
+
+        # Cookies: por cada Set-Cookie, todas sus reglas (mismo orden que antes)
+        if "set-cookie" in headers:
+            es_https = url.startswith("https")
+            for regla in self._cookies:
+                if (es_https or not regla.solo_https) and not regla.patron.search(headers["set-cookie"]):
+                    hallazgos.append(regla.hallazgo(url, headers["set-cookie"]))
+        return hallazgos
+
+
+ANALIZADOR = AnalizadorCabeceras()
@@ -1,13 +1,18 @@
 import requests
-import re
-from urllib.parse import urljoin
+from urllib.parse import urljoin, urlsplit
 import sys
+import argparse
+import threading
+from concurrent.futures import ThreadPoolExecutor, wait, FIRST_COMPLETED
+from http.cookiejar import DefaultCookiePolicy
+from requests.adapters import HTTPAdapter
 
 import urllib3
 # Deshabilitamos las advertencias de conexión insegura.
 urllib3.disable_warnings(urllib3.exceptions.InsecureRequestWarning)
 
 from diccionario import get_detalles_vulnerabilidad
+from reglas import ANALIZADOR, liberar_respuesta
 
 # Lista de archivos comunes que no deberían ser públicos
 ARCHIVOS_SENSIBLES = [
@@ -22,6 +27,13 @@ ARCHIVOS_SENSIBLES = [
 # Archivos que deben ser públicos 
 # ARCHIVOS_PUBLICOS_ESPERADOS = ["robots.txt", "sitemap.xml"]
 
+# Límites del motor de escaneo
+MAX_CONCURRENCIA = 32   # solicitudes simultáneas en total (hilos)
+MAX_POR_HOST = 4        # solicitudes simultáneas por host (= conexiones guardadas por host)
+MAX_HOSTS = 256         # hosts con conexiones guardadas a la vez
+TIMEOUT_PAGINA = 10
+TIMEOUT_ARCHIVO = 5
+
 
 def format_hallazgo(url, vuln_id, detalles, tipo_fallo_override=None):
  #Estandariza el formato del resultado para el CSV
@@ -35,117 +47,207 @@ def format_hallazgo(url, vuln_id, detalles, tipo_fallo_override=None):
 
 def revisar_cabeceras(url, response, resultados):
 #Revisa la respuesta HTTP en busca de cabeceras de seguridad faltantes o inseguras
-    
-    headers = {k.lower(): v for k, v in response.headers.items()}
-
-
-#  ========================================
-    # CABECERAS FALTANTES
-#  ========================================
-    
-    if 'strict-transport-security' not in headers:
-        detalles = get_detalles_vulnerabilidad("MISSING_HSTS")
-        if detalles: resultados.append(format_hallazgo(url, "MISSING_HSTS", detalles))
-            
-    has_csp_frame_ancestors = 'content-security-policy' in headers and 'frame-ancestors' in headers['content-security-policy'].lower()
-    if 'x-frame-options' not in headers and not has_csp_frame_ancestors:
-        detalles = get_detalles_vulnerabilidad("NO_XFO")
-        if detalles: resultados.append(format_hallazgo(url, "NO_XFO", detalles))
-
-    if 'x-content-type-options' not in headers or headers.get('x-content-type-options', '').lower() != 'nosniff':
-        detalles = get_detalles_vulnerabilidad("NO_XCTO")
-        if detalles: resultados.append(format_hallazgo(url, "NO_XCTO", detalles))
-
-    if 'content-security-policy' not in headers:
-        detalles = get_detalles_vulnerabilidad("MISSING_CSP")
-        if detalles: resultados.append(format_hallazgo(url, "MISSING_CSP", detalles))
-
-    if 'referrer-policy' not in headers:
-        detalles = get_detalles_vulnerabilidad("NO_REFERRER_POLICY")
-        if detalles: resultados.append(format_hallazgo(url, "NO_REFERRER_POLICY", detalles))
-
-#  ============================            
-    # FUGA DE INFORMACIÓN 
-#  ============================
-
-    # Exposición de versión en cabeceras   
-    if 'server' in headers and re.search(r'\d+\.\d+', headers['server']):
-        detalles = get_detalles_vulnerabilidad("SERVER_INFO_EXPOSED")
-        if detalles: 
-            resultados.append(format_hallazgo(url, "SERVER_INFO_EXPOSED", detalles, f"Expone la cabecera Server: {headers['server']}"))
-
-    if 'x-powered-by' in headers:
-        detalles = get_detalles_vulnerabilidad("SERVER_INFO_EXPOSED")
-        if detalles:
-            resultados.append(format_hallazgo(url, "SERVER_INFO_EXPOSED", detalles, f"Expone la cabecera X-Powered-By: {headers['x-powered-by']}"))
-            
-    # Detección de errores Verbosos
-    if response.status_code >= 500 and re.search(r'stack trace|error at line|exception in|fatal error', response.text, re.IGNORECASE):
-        detalles = get_detalles_vulnerabilidad("VERBOSE_ERRORS")
-        if detalles: resultados.append(format_hallazgo(url, "VERBOSE_ERRORS", detalles))
-
-#  ============================
-    # Cookies
-#  ============================
-
-    for k, v in response.headers.items():
-        if k.lower() == 'set-cookie':
-            # Cookie sin Secure si es HTTPS
-            if 'secure' not in v.lower() and url.startswith('https'):
-                detalles = get_detalles_vulnerabilidad("INSECURE_COOKIE_SECURE")
-                if detalles: resultados.append(format_hallazgo(url, "INSECURE_COOKIE_SECURE", detalles))
-            # Cookie sin HttpOnly
-            if 'httponly' not in v.lower():
-                detalles = get_detalles_vulnerabilidad("INSECURE_COOKIE_HTTPONLY")
-                if detalles: resultados.append(format_hallazgo(url, "INSECURE_COOKIE_HTTPONLY", detalles))
-
-
-def revisar_archivos_sensibles(base_url, resultados):
-    # Intenta acceder a URLs comunes donde se almacenan archivos que no deberian ser accesibles
+# (los chequeos están en reglas.REGLAS y se evalúan todos en una sola pasada)
+    resultados.extend(ANALIZADOR.analizar(url, response))
+
+
+def hallazgo_archivo(target_url, archivo, res):
+    # Hallazgo de un archivo sensible accesible (None si la respuesta no lo expone)
+    if res.status_code != 200:
+        return None
+    detalles = get_detalles_vulnerabilidad("EXPOSED_BACKUP_FILES")
+    if not detalles:
+        return None
+    hallazgo = format_hallazgo(target_url, "EXPOSED_BACKUP_FILES", detalles)
+    hallazgo["SEVERIDAD"] = "Informativa"
+    hallazgo["TIPO_FALLO"] = f"Archivo expuesto: {archivo}"
+    return hallazgo
 
+
+def revisar_archivos_sensibles(base_url, resultados, sesion=None):
+    # Intenta acceder a URLs comunes donde se almacenan archivos que no deberian ser accesibles
+    # (una a una; MotorEscaneo hace lo mismo en paralelo)
+    cliente = sesion or requests
     for archivo in ARCHIVOS_SENSIBLES:
         target_url = urljoin(base_url, archivo)
         try:
-            res = requests.head(target_url, timeout=5, allow_redirects=True, verify=False)
-            
-            if res.status_code == 200:
-                detalles = get_detalles_vulnerabilidad("EXPOSED_BACKUP_FILES")
-                if detalles:
-                    hallazgo = format_hallazgo(target_url, "EXPOSED_BACKUP_FILES", detalles)
-                    
-                    hallazgo["SEVERIDAD"] = "Informativa" 
-                    hallazgo["TIPO_FALLO"] = f"Archivo expuesto: {archivo}"
-                        
-                    resultados.append(hallazgo)
-                    
+            res = cliente.head(target_url, timeout=TIMEOUT_ARCHIVO, allow_redirects=True, verify=False)
+            hallazgo = hallazgo_archivo(target_url, archivo, res)
+            if hallazgo:
+                resultados.append(hallazgo)
         except requests.exceptions.RequestException:
             pass
 
+
+def normalizar_url(url):
+    url = url.strip()
+    if url and not url.startswith(('http://', 'https://')):
+        url = 'https://' + url
+    return url
+
+
+def crear_sesion(por_host=MAX_POR_HOST, max_hosts=MAX_HOSTS):
+    # Sesión compartida: reutiliza la conexión TCP/TLS de cada host en todas sus solicitudes
+    sesion = requests.Session()
+    adaptador = HTTPAdapter(pool_connections=max_hosts, pool_maxsize=por_host)
+    sesion.mount('http://', adaptador)
+    sesion.mount('https://', adaptador)
+    sesion.verify = False
+    # Sin cookies entre solicitudes: cada sitio responde como a un visitante nuevo (igual que requests.get)
+    sesion.cookies.set_policy(DefaultCookiePolicy(allowed_domains=[]))
+    return sesion
+
+
+class MotorEscaneo:
+    """
+    Escanea una lista de sitios a la vez:
+    - Una sola sesión con conexiones reutilizadas por host
+    - Límite global de solicitudes simultáneas (hilos) y límite por host
+    - Las cabeceras de cada sitio se revisan apenas llega su página y sus
+      archivos sensibles se consultan en paralelo con el resto del trabajo
+    - Con 'cache' (programador.CacheEscaneo) las páginas se piden de forma
+      condicional (ETag / Last-Modified) y los archivos con resultado vigente no se piden
+    """
+
+    def __init__(self, max_concurrencia=MAX_CONCURRENCIA, por_host=MAX_POR_HOST, sesion=None, cache=None):
+        self.max_concurrencia = max_concurrencia
+        self.por_host = por_host
+        self.sesion = sesion or crear_sesion(por_host)
+        self.cache = cache
+        self._limites = {}
+        self._candado = threading.Lock()
+
+    def _limite(self, url):
+        host = urlsplit(url).netloc.lower()
+        with self._candado:
+            if host not in self._limites:
+                self._limites[host] = threading.BoundedSemaphore(self.por_host)
+            return self._limites[host]
+
+    def _pedir(self, metodo, url, timeout, cabeceras=None):
+        # Las páginas se piden en modo stream: solo se lee el inicio del cuerpo si alguna regla lo necesita
+        with self._limite(url):
+            return self.sesion.request(metodo, url, headers=cabeceras, timeout=timeout, allow_redirects=True,
+                                       verify=False, stream=(metodo == 'GET'))
+
+    def _analizar_pagina(self, url, futuro):
+        # Devuelve (hallazgos, url final para los archivos sensibles o None si falló)
+        detalles_falla = get_detalles_vulnerabilidad("CONEXION_FALLIDA")
+        try:
+            response = futuro.result()
+        except requests.exceptions.RequestException:
+            return [format_hallazgo(url, "CONEXION_FALLIDA", detalles_falla)], None
+        try:
+            # 304: el cuerpo no cambió desde el escaneo anterior, pero las cabeceras sí pueden
+            # haber cambiado: se revisan las que reenvía el 304 sobre las guardadas y solo las
+            # reglas de cuerpo reutilizan el análisis anterior
+            if response.status_code == 304 and self.cache:
+                anterior = self.cache.pagina_sin_cambios(url)
+                if anterior:
+                    cabeceras, previos, url_final = anterior
+                    cabeceras = cabeceras | {k.lower(): v for k, v in response.headers.items()}
+                    hallazgos = ANALIZADOR.analizar(url, response, cabeceras, previos)
+                    self.cache.guardar_pagina(url, response, hallazgos, cabeceras)
+                    return hallazgos, url_final
+            if response.status_code >= 400:
+                return [format_hallazgo(url, "CONEXION_FALLIDA", detalles_falla, f"Código de estado HTTP: {response.status_code}")], None
+            hallazgos = []
+            revisar_cabeceras(url, response, hallazgos)
+            if self.cache:
+                self.cache.guardar_pagina(url, response, hallazgos)
+            return hallazgos, response.url
+        finally:
+            liberar_respuesta(response)
+
+    def escanear(self, urls):
+        """Devuelve {url normalizada: hallazgos} en el orden de la lista recibida"""
+        objetivos = list(dict.fromkeys(u for u in map(normalizar_url, urls) if u))
+        resultados = {u: [] for u in objetivos}
+        archivos = {u: [None] * len(ARCHIVOS_SENSIBLES) for u in objetivos}
+
+        with ThreadPoolExecutor(max_workers=self.max_concurrencia) as ejecutor:
+            # futuro -> (url objetivo, índice del archivo sensible o None para la página, url pedida)
+            pendientes = {}
+            for u in objetivos:
+                condicionales = self.cache.cabeceras_condicionales(u) if self.cache else None
+                pendientes[ejecutor.submit(self._pedir, 'GET', u, TIMEOUT_PAGINA, condicionales)] = (u, None, u)
+            while pendientes:
+                listos, _ = wait(pendientes, return_when=FIRST_COMPLETED)
+                for futuro in listos:
+                    url, indice, pedida = pendientes.pop(futuro)
+                    if indice is None:
+                        resultados[url], base = self._analizar_pagina(url, futuro)
+                        if base:
+                            for i, archivo in enumerate(ARCHIVOS_SENSIBLES):
+                                target_url = urljoin(base, archivo)
+                                if self.cache and self.cache.archivo_vigente(target_url):
+                                    archivos[url][i] = self.cache.archivo(target_url)
+                                    continue
+                                pendientes[ejecutor.submit(self._pedir, 'HEAD', target_url, TIMEOUT_ARCHIVO)] = (url, i, target_url)
+                    elif futuro.exception() is None:
+                        archivos[url][indice] = hallazgo_archivo(pedida, ARCHIVOS_SENSIBLES[indice], futuro.result())
+                        if self.cache:
+                            self.cache.guardar_archivo(pedida, archivos[url][indice])
+
+        # Mismo orden que el escaneo secuencial: cabeceras y luego archivos
+        for url in objetivos:
+            resultados[url] += [h for h in archivos[url] if h]
+        return resultados
+
+    def cerrar(self):
+        self.sesion.close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.cerrar()
+
+
+def escanear_webs(urls, max_concurrencia=MAX_CONCURRENCIA, por_host=MAX_POR_HOST):
+    # Escanea varios sitios en paralelo; {url: hallazgos}
+    with MotorEscaneo(max_concurrencia, por_host) as motor:
+        return motor.escanear(urls)
+
+
 def escanear_web(url_objetivo):
     # Función principal que ejecuta el escaneo de vulnerabilidades
 
-    if not url_objetivo.startswith(('http://', 'https://')):
-        url_objetivo = 'https://' + url_objetivo
-
-    resultados = []
-    
+    url_objetivo = normalizar_url(url_objetivo or "")
     if not url_objetivo:
-        return resultados
+        return []
+    return escanear_webs([url_objetivo])[url_objetivo]
 
-    try:
-        response = requests.get(url_objetivo, timeout=10, allow_redirects=True, verify=False)
-        
-        if response.status_code < 400:
-            # se recibe una respuesta de conexion
-            revisar_cabeceras(url_objetivo, response, resultados)
-            revisar_archivos_sensibles(response.url, resultados)
-        else:
-            detalles_falla = get_detalles_vulnerabilidad("CONEXION_FALLIDA")
-            return [format_hallazgo(url_objetivo, "CONEXION_FALLIDA", detalles_falla, f"Código de estado HTTP: {response.status_code}")]
 
+def leer_objetivos(ruta):
+    # Una URL por línea; se ignoran líneas vacías y comentarios (#)
+    with open(ruta, 'r', encoding='utf-8') as f:
+        return [l.strip() for l in f if l.strip() and not l.lstrip().startswith('#')]
+
+
+def main(argv=None):
+    from csv_generador import generar_csv_reporte
+
+    parser = argparse.ArgumentParser(description="Vulnescan - escaneo de varios sitios sin interfaz")
+    parser.add_argument('urls', nargs='*', help="URLs a escanear")
+    parser.add_argument('--lista', help="Archivo con una URL por línea")
+    parser.add_argument('--concurrencia', type=int, default=MAX_CONCURRENCIA, help="Solicitudes simultáneas en total")
+    parser.add_argument('--por-host', type=int, default=MAX_POR_HOST, help="Solicitudes simultáneas por host")
+    parser.add_argument('--salida', default="reportes", help="Carpeta de los reportes CSV")
+    args = parser.parse_args(argv)
+
+    urls = list(args.urls) + (leer_objetivos(args.lista) if args.lista else [])
+    if not urls:
+        parser.error("Indica al menos una URL o un archivo con --lista")
+
+    resultados = escanear_webs(urls, args.concurrencia, args.por_host)
+    fallidos = [u for u, lista in resultados.items() if lista and lista[0]['ID_VULN'] == 'CONEXION_FALLIDA']
+    hallazgos = [h for u, lista in resultados.items() if u not in fallidos for h in lista]
+    print(f"[INFO] {len(resultados)} sitios escaneados, {len(fallidos)} sin conexión, {len(hallazgos)} hallazgos.")
+    for url in fallidos:
+        print(f"[AVISO] Sin conexión: {url}")
+    return 0 if generar_csv_reporte(hallazgos, args.salida) else 1
 
-    except requests.exceptions.RequestException as e:
-        detalles_falla = get_detalles_vulnerabilidad("CONEXION_FALLIDA")
-        return [format_hallazgo(url_objetivo, "CONEXION_FALLIDA", detalles_falla)]
 
-    return resultados
\ No newline at end of file
+if __name__ == "__main__":
+    sys.exit(main())
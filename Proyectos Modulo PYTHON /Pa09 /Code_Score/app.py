@@ -7,38 +7,17 @@ from flet.matplotlib_chart import MatplotlibChart
 from matplotlib.figure import Figure
 import datetime as dt
 
-CSV_PATH = "finanzas_empresaxyz_expandido.csv"
-
+from store import LedgerStore
+from metrics import compute_derived
+from dates import smart_parse_dates as _smart_parse_dates
+from table_index import TableIndex, DISPLAY_COLUMNS
 
-def _smart_parse_dates(obj):
-    """Parsea una serie o un valor escalar intentando dayfirst=True y dayfirst=False.
-    Devuelve la versión con más valores no nulos (heurística simple).
-    """
-    try:
-        # Serie
-        if isinstance(obj, pd.Series):
-            if pd.api.types.is_datetime64_any_dtype(obj):
-                return obj
-            # intentar dayfirst=True y False
-            t1 = pd.to_datetime(obj, errors="coerce", dayfirst=True)
-            t2 = pd.to_datetime(obj, errors="coerce", dayfirst=False)
-            return t1 if t1.notna().sum() >= t2.notna().sum() else t2
-
-        # Escalar
-        for dayfirst in (True, False):
-            try:
-                val = pd.to_datetime(obj, errors="coerce", dayfirst=dayfirst)
-                if not pd.isna(val):
-                    return val
-            except Exception:
-                continue
-        return pd.NaT
-    except Exception:
-        return pd.NaT
+CSV_PATH = "finanzas_empresaxyz_expandido.csv"
 
 
 # ===================== UTILIDADES DE DATOS =====================
-def ensure_dataframe(path=CSV_PATH) -> pd.DataFrame:
+def read_csv_dataframe(path=CSV_PATH) -> pd.DataFrame:
+    """Lee un CSV (importación) normalizando fechas/numéricos y calculando las derivadas."""
     if not os.path.exists(path):
         cols = [
             "id", "fecha", "mes", "ingresos", "gastos_fijos", "gastos_variables",
@@ -89,52 +68,64 @@ def ensure_dataframe(path=CSV_PATH) -> pd.DataFrame:
             df[c] = pd.to_numeric(df[c], errors="coerce")
 
     # Derivadas
-    if "gastos_fijos" in df.columns and "gastos_variables" in df.columns:
-        df["gastos_totales"] = df["gastos_fijos"].fillna(0) + df["gastos_variables"].fillna(0)
-    else:
-        df["gastos_totales"] = np.nan
+    compute_derived(df)
 
-    if "ingresos" in df.columns:
-        ingresos_safe = df["ingresos"].fillna(0).replace(0, 1e-9)
-        df["margen_ganancia"] = (df["ingresos"].fillna(0) - df["gastos_totales"].fillna(0)) / ingresos_safe
-    else:
-        df["margen_ganancia"] = np.nan
+    if "fecha" in df.columns:
+        df.sort_values("fecha", inplace=True)
 
-    if "activos_corrientes" in df.columns and "pasivos_corrientes" in df.columns:
-        pasivos_safe = df["pasivos_corrientes"].fillna(0).replace(0, 1e-9)
-        df["liquidez_corriente"] = df["activos_corrientes"].fillna(0) / pasivos_safe
-    else:
-        df["liquidez_corriente"] = np.nan
+    return df
 
-    def classify_by_profit(row):
-        """Clasifica el riesgo según la ganancia absoluta: ingresos - gastos_totales.
-        rentabilidad > 0 => BAJO, < 0 => ALTO, == 0 o datos faltantes => MEDIO
-        """
-        try:
-            ingresos = row.get("ingresos", np.nan)
-            gastos_tot = row.get("gastos_totales", np.nan)
-            if pd.isna(ingresos) or pd.isna(gastos_tot):
-                return "MEDIO"
-            profit = ingresos - gastos_tot
-            if profit > 0:
-                return "BAJO"
-            if profit < 0:
-                return "ALTO"
-            return "MEDIO"
-        except Exception:
-            return "MEDIO"
 
-    df["riesgo"] = df.apply(classify_by_profit, axis=1)
+# ===================== ALMACÉN (SQLite) =====================
+# Los registros viven en <csv>.sqlite3 (ver store.py); el CSV es sólo importación/exportación.
+_STORES = {}
 
-    if "fecha" in df.columns:
-        df.sort_values("fecha", inplace=True)
 
-    return df
+def db_path(path=CSV_PATH) -> str:
+    return os.path.splitext(path)[0] + ".sqlite3"
 
 
-def append_row(row: dict, path=CSV_PATH):
-    df = ensure_dataframe(path)
+def get_store(path=CSV_PATH) -> LedgerStore:
+    """Almacén asociado al CSV. El CSV se (re)importa sólo si cambió desde la última
+    importación/exportación (primera ejecución o edición externa) y la base no tiene
+    escrituras posteriores; si las tiene, no se reimporta (ver csv_conflict)."""
+    store = _open_store(path)
+    if os.path.exists(path) and store.csv_changed(path) and not store.unexported_changes():
+        import_csv(path)
+    return store
+
+
+def _open_store(path):
+    store = _STORES.get(path)
+    if store is None:
+        store = _STORES[path] = LedgerStore(db_path(path))
+    return store
+
+
+def import_csv(path=CSV_PATH):
+    """Reemplaza la base con el contenido del CSV (las filas que no estén en él pasan a 'eliminados')."""
+    store = _open_store(path)
+    store.replace_all(read_csv_dataframe(path))
+    store.mark_csv(path)
+
 
+def csv_conflict(path=CSV_PATH) -> bool:
+    """True si el CSV cambió por fuera pero la base tiene altas/ediciones/bajas que no están en él."""
+    store = get_store(path)
+    return os.path.exists(path) and store.csv_changed(path) and store.unexported_changes()
+
+
+CSV_CONFLICT_MESSAGE = (
+    f"{CSV_PATH} cambió fuera de la app pero la base tiene cambios que no están en el CSV; "
+    "no se reimportó. Usa 'Importar CSV' para reemplazar los datos o 'Normalizar CSV' para reescribirlo."
+)
+
+
+def ensure_dataframe(path=CSV_PATH) -> pd.DataFrame:
+    return get_store(path).load()
+
+
+def append_row(row: dict, path=CSV_PATH):
     fecha = _smart_parse_dates(row.get("fecha"))
     if pd.isna(fecha):
         raise ValueError("Fecha inválida.")
@@ -192,20 +183,11 @@ def append_row(row: dict, path=CSV_PATH):
         "liquidez_corriente",
         "riesgo",
     ]
-    row_df = pd.DataFrame([{c: row.get(c, np.nan) for c in expected_cols}])
-
-    # asignar id nuevo
-    max_id = int(df["id"].max()) if "id" in df.columns and not df.empty else 0
-    row_df["id"] = max_id + 1
+    new_row = {c: row.get(c, np.nan) for c in expected_cols}
 
-    full = pd.concat([df.reindex(columns=expected_cols, fill_value=np.nan), row_df], ignore_index=True)
-    # reordenar columnas colocando id primero si está presente en df original
-    if "id" in full.columns:
-        cols_order = [c for c in full.columns if c != "id"]
-        cols_order = ["id"] + cols_order
-        full = full.reindex(columns=cols_order)
-
-    full.to_csv(path, index=False)
+    # asignar id nuevo (max(id) + 1) y guardar sólo esta fila
+    new_row["id"] = None
+    get_store(path).insert(new_row)
 
 
 def normalize_csv(path=CSV_PATH):
@@ -232,29 +214,10 @@ def normalize_csv(path=CSV_PATH):
         if col in df.columns:
             df[col] = pd.to_numeric(df[col], errors="coerce")
 
-    # recalcular derivadas
-    if "gastos_fijos" in df.columns and "gastos_variables" in df.columns:
-        df["gastos_totales"] = df["gastos_fijos"].fillna(0) + df["gastos_variables"].fillna(0)
-    if "ingresos" in df.columns:
-        ingresos_safe = df["ingresos"].fillna(0).replace(0, 1e-9)
-        df["margen_ganancia"] = (df["ingresos"].fillna(0) - df["gastos_totales"].fillna(0)) / ingresos_safe
-    if "activos_corrientes" in df.columns and "pasivos_corrientes" in df.columns:
-        pasivos_safe = df["pasivos_corrientes"].fillna(0).replace(0, 1e-9)
-        df["liquidez_corriente"] = df["activos_corrientes"].fillna(0) / pasivos_safe
-
-    # recalcular riesgo
-    def _clas(r):
-        try:
-            ing = r.get("ingresos", pd.NA)
-            g = r.get("gastos_totales", pd.NA)
-            if pd.isna(ing) or pd.isna(g):
-                return "MEDIO"
-            p = ing - g
-            return "BAJO" if p > 0 else ("ALTO" if p < 0 else "MEDIO")
-        except Exception:
-            return "MEDIO"
-
-    df["riesgo"] = df.apply(_clas, axis=1)
+    # recalcular derivadas y riesgo
+    compute_derived(df)
+    store = get_store(path)
+    store.replace_all(df)
     # guardar en ISO para fecha y mes
     if "fecha" in df.columns:
         try:
@@ -267,10 +230,11 @@ def normalize_csv(path=CSV_PATH):
         except Exception:
             pass
 
-    # backup y escritura
+    # backup y exportación del CSV normalizado
     if os.path.exists(path):
         shutil.copy2(path, path + ".bak_normalize")
     df.to_csv(path, index=False)
+    store.mark_csv(path)
 
 
 # ===================== GRÁFICOS =====================
@@ -412,14 +376,10 @@ def main(page: ft.Page):
     def delete_by_id(target_id: int):
         try:
             print(f"delete_by_id called for id={target_id}")
-            df_current = ensure_dataframe()
-            if "id" in df_current.columns and target_id in df_current["id"].values:
-                # backup antes de sobrescribir
-                bak = CSV_PATH + ".bak"
-                shutil.copy2(CSV_PATH, bak)
-                df_current = df_current[df_current["id"] != target_id]
-                df_current.to_csv(CSV_PATH, index=False)
-                snackbar.content = ft.Text(f"Registro eliminado. Backup: {bak}")
+            store = get_store()
+            # la fila eliminada queda respaldada en la tabla 'eliminados'
+            if store.delete([target_id]):
+                snackbar.content = ft.Text(f"Registro eliminado. Respaldo: tabla 'eliminados' de {store.path}")
                 snackbar.open = True
                 refresh_all()
                 # garantizar actualización de conclusiones y mostrar confirmación
@@ -481,7 +441,8 @@ def main(page: ft.Page):
     def update_by_id(target_id: int, new_values: dict):
         try:
             print(f"update_by_id called for id={target_id} with values={new_values}")
-            df_current = ensure_dataframe()
+            store = get_store()
+            df_current = store.get([target_id])
             mask = df_current["id"] == target_id
             if not mask.any():
                 snackbar.content = ft.Text("Registro no encontrado para actualizar.")
@@ -522,42 +483,10 @@ def main(page: ft.Page):
                     df_current.loc[mask, col] = pd.to_numeric(df_current.loc[mask, col], errors="coerce")
 
             # recalcular campos derivados
-            if "gastos_fijos" in df_current.columns and "gastos_variables" in df_current.columns:
-                df_current.loc[mask, "gastos_totales"] = df_current.loc[mask, "gastos_fijos"].fillna(0) + df_current.loc[mask, "gastos_variables"].fillna(0)
-            else:
-                df_current.loc[mask, "gastos_totales"] = np.nan
-
-            if "ingresos" in df_current.columns:
-                ingresos_safe = df_current.loc[mask, "ingresos"].fillna(0).replace(0, 1e-9)
-                df_current.loc[mask, "margen_ganancia"] = (df_current.loc[mask, "ingresos"].fillna(0) - df_current.loc[mask, "gastos_totales"].fillna(0)) / ingresos_safe
-            else:
-                df_current.loc[mask, "margen_ganancia"] = np.nan
+            compute_derived(df_current, mask)
 
-            if "activos_corrientes" in df_current.columns and "pasivos_corrientes" in df_current.columns:
-                pasivos_safe = df_current.loc[mask, "pasivos_corrientes"].fillna(0).replace(0, 1e-9)
-                df_current.loc[mask, "liquidez_corriente"] = df_current.loc[mask, "activos_corrientes"].fillna(0) / pasivos_safe
-            else:
-                df_current.loc[mask, "liquidez_corriente"] = np.nan
-
-            def clasifica_row_by_profit(r):
-                try:
-                    ingresos_val = r.get("ingresos", np.nan)
-                    gastos_val = r.get("gastos_totales", np.nan)
-                    if pd.isna(ingresos_val) or pd.isna(gastos_val):
-                        return "MEDIO"
-                    profit = ingresos_val - gastos_val
-                    if profit > 0:
-                        return "BAJO"
-                    if profit < 0:
-                        return "ALTO"
-                    return "MEDIO"
-                except Exception:
-                    return "MEDIO"
-
-            df_current.loc[mask, "riesgo"] = df_current.loc[mask].apply(clasifica_row_by_profit, axis=1)
-
-            # Guardar y refrescar
-            df_current.to_csv(CSV_PATH, index=False)
+            # Guardar (sólo la fila editada) y refrescar
+            store.update_frame(df_current[mask])
             snackbar.content = ft.Text("Registro actualizado.")
             snackbar.open = True
             refresh_all()
@@ -586,14 +515,11 @@ def main(page: ft.Page):
                 snackbar.open = True
                 page.update()
                 return
-            # Eliminación inmediata con backup
-            bak = CSV_PATH + ".bak"
-            shutil.copy2(CSV_PATH, bak)
-            df_current = ensure_dataframe()
-            df_current = df_current[~df_current["id"].isin(list(selected_ids))]
-            df_current.to_csv(CSV_PATH, index=False)
+            # Eliminación inmediata (respaldo en la tabla 'eliminados')
+            store = get_store()
+            store.delete(selected_ids)
             selected_ids.clear()
-            snackbar.content = ft.Text(f"Registros eliminados. Backup: {bak}")
+            snackbar.content = ft.Text(f"Registros eliminados. Respaldo: tabla 'eliminados' de {store.path}")
             snackbar.open = True
             refresh_all()
             # garantizar actualización de conclusiones y mostrar confirmación
@@ -615,7 +541,7 @@ def main(page: ft.Page):
                 return
             # volcar los datos del registro seleccionado en los campos de captura para editar
             target = next(iter(selected_ids))
-            df_current = ensure_dataframe()
+            df_current = get_store().get([target])
             if target not in df_current["id"].values:
                 snackbar.content = ft.Text("Registro no encontrado para editar.")
                 snackbar.open = True
@@ -641,7 +567,7 @@ def main(page: ft.Page):
 
     def open_edit_dialog(target_id: int):
         try:
-            df_current = ensure_dataframe()
+            df_current = get_store().get([target_id])
             if target_id not in df_current["id"].values:
                 snackbar.content = ft.Text("Registro no encontrado para editar.")
                 snackbar.open = True
@@ -690,77 +616,23 @@ def main(page: ft.Page):
             snackbar.open = True
             page.update()
 
-    def build_table(dfi: pd.DataFrame) -> ft.Column:
-        # mostrar columnas con nombres cortos; mapear a las columnas reales del DataFrame
-        cols = [
-            "id",
-            "fecha",
-            "mes",
-            "ingresos",
-            "gastos_F",
-            "gastos_V",
-            "gastos_T",
-            "ventas",
-            "activos",
-            "pasivos",
-            "margen_gan",
-            "liquidez",
-            "riesgo",
-        ]
-
-        mapping = {
-            "id": "id",
-            "fecha": "fecha",
-            "mes": "mes",
-            "ingresos": "ingresos",
-            "gastos_F": "gastos_fijos",
-            "gastos_V": "gastos_variables",
-            "gastos_T": "gastos_totales",
-            "ventas": "ventas",
-            "activos": "activos_corrientes",
-            "pasivos": "pasivos_corrientes",
-            "margen_gan": "margen_ganancia",
-            "liquidez": "liquidez_corriente",
-            "riesgo": "riesgo",
-        }
-
-        # construir DataFrame de visualización con columnas cortas (si la columna real existe, copiarla)
-        display_df = pd.DataFrame()
-        for disp in cols:
-            real = mapping.get(disp, disp)
-            if real in dfi.columns:
-                display_df[disp] = dfi[real]
-            else:
-                display_df[disp] = np.nan
-
-        # asegurar tipo fecha en la columna de visualización para orden correcto
-        if "fecha" in display_df.columns:
-            display_df["fecha"] = _smart_parse_dates(display_df["fecha"]) if "fecha" in display_df.columns else pd.NaT
-        if "mes" in display_df.columns:
-            display_df["mes"] = _smart_parse_dates(display_df["mes"]) if "mes" in display_df.columns else pd.NaT
+    # orden y texto de búsqueda de la tabla; se recalculan sólo tras una escritura
+    table_index = TableIndex()
 
-        # usar display_df para las operaciones posteriores
-        dfi = display_df.copy()
+    def build_table(dfi: pd.DataFrame) -> ft.Column:
+        # mostrar columnas con nombres cortos (ver table_index.DISPLAY_COLUMNS)
+        cols = list(DISPLAY_COLUMNS)
+        table_index.refresh(dfi, get_store().version())
 
         def fmt(v):
             if isinstance(v, float):
                 return f"{v:.2f}"
             return str(v)
 
-        # Aplicar búsqueda simple sobre stringified row
-        if table_page["query"]:
-            q = table_page["query"].lower()
-            mask = dfi.apply(lambda r: r.astype(str).str.lower().str.contains(q).any(), axis=1)
-            filtered = dfi[mask]
-        else:
-            filtered = dfi
-
-        # orden y paginación
-        filtered = filtered.sort_values("fecha", ascending=False)
-        total = len(filtered)
+        # búsqueda (texto literal, sin distinguir mayúsculas) y paginación sobre el índice
+        page_slice, total = table_index.page(table_page["query"], table_page["page"], table_page["page_size"])
         start = table_page["page"] * table_page["page_size"]
         end = start + table_page["page_size"]
-        page_slice = filtered.iloc[start:end]
 
         rows = []
         for _, r in page_slice.iterrows():
@@ -783,17 +655,17 @@ def main(page: ft.Page):
         def on_search(e):
             table_page["query"] = e.control.value or ""
             table_page["page"] = 0
-            refresh_all()
+            refresh_table()
 
         def prev_page(e):
             if table_page["page"] > 0:
                 table_page["page"] -= 1
-                refresh_all()
+                refresh_table()
 
         def next_page(e):
             if end < total:
                 table_page["page"] += 1
-                refresh_all()
+                refresh_table()
 
         pager = ft.Row([
             ft.ElevatedButton("Anterior", on_click=prev_page),
@@ -904,6 +776,14 @@ def main(page: ft.Page):
             page.update()
 
     # --- Eventos ---
+    def refresh_table():
+        # sólo la tabla (búsqueda / cambio de página): no rehace gráficos ni conclusiones
+        table_container.content = build_table(df)
+        try:
+            table_container.update()
+        except Exception:
+            pass
+
     def refresh_all():
         nonlocal df, table_container, chart1, chart2, chart3, chart4, conclusiones_view
         df = ensure_dataframe()
@@ -1000,6 +880,10 @@ def main(page: ft.Page):
                 update_by_id(tid, new_vals)
                 edit_target_id["id"] = None
             refresh_all()
+            if csv_conflict():
+                snackbar.content = ft.Text(CSV_CONFLICT_MESSAGE)
+                snackbar.open = True
+                page.update()
         except Exception as ex:
             snackbar.content = ft.Text(f"Error al recargar/guardar: {ex}")
             snackbar.open = True
@@ -1077,6 +961,8 @@ def main(page: ft.Page):
                 shutil.copy2(CSV_PATH, bak)
             # normalizar columnas esperadas antes de guardar: mantenemos todas las columnas del CSV importado
             df_new.to_csv(CSV_PATH, index=False)
+            # importación explícita: reemplaza la base aunque tenga cambios sin exportar
+            import_csv(CSV_PATH)
             snackbar.content = ft.Text(f"CSV importado correctamente. Backup: {CSV_PATH}.bak")
             snackbar.open = True
             refresh_all()
@@ -1194,6 +1080,10 @@ def main(page: ft.Page):
     )
 
     page.add(tabs, snackbar)
+    if csv_conflict():
+        snackbar.content = ft.Text(CSV_CONFLICT_MESSAGE)
+        snackbar.open = True
+        page.update()
 
 
 if __name__ == "__main__":
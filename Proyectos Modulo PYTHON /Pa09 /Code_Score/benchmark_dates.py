@@ -0,0 +1,75 @@
+"""Parser de fechas anterior (dos pasadas dayfirst=True/False) frente a dates.smart_parse_dates.
+
+Columna de N textos con formatos mezclados (ISO mayoritario, dd/mm/YYYY, fecha y hora,
+valores inválidos y vacíos). Se mide:
+- anterior: parsear la columna dos veces y quedarse con la de más valores válidos
+- nuevo (frío): inferir formato + format= + reintento sólo de las filas fallidas
+- nuevo (memo): la misma columna otra vez (resultado memorizado por hash del contenido)
+
+    python benchmark_dates.py --filas 1000000 --repeticiones 3
+"""
+import time
+import argparse
+
+import numpy as np
+import pandas as pd
+
+import dates
+
+
+def old_smart_parse_dates(obj):
+    # implementación anterior de app._smart_parse_dates (rama Serie)
+    t1 = pd.to_datetime(obj, errors="coerce", dayfirst=True)
+    t2 = pd.to_datetime(obj, errors="coerce", dayfirst=False)
+    return t1 if t1.notna().sum() >= t2.notna().sum() else t2
+
+
+def mixed_dates(n, seed=0) -> pd.Series:
+    rng = np.random.default_rng(seed)
+    base = pd.Timestamp("2015-01-01") + pd.to_timedelta(rng.integers(0, 3650, n), unit="D")
+    kind = rng.choice(4, size=n, p=[0.80, 0.12, 0.06, 0.02])
+    iso = base.strftime("%Y-%m-%d").to_numpy(dtype=object)
+    values = iso.copy()
+    values[kind == 1] = base[kind == 1].strftime("%d/%m/%Y")
+    values[kind == 2] = base[kind == 2].strftime("%Y-%m-%d %H:%M:%S")
+    values[kind == 3] = rng.choice(["", "sin fecha", None], size=(kind == 3).sum())
+    return pd.Series(values, dtype=object, name="fecha")
+
+
+def _best(fn, reps):
+    tiempos = []
+    for _ in range(reps):
+        inicio = time.perf_counter()
+        result = fn()
+        tiempos.append(time.perf_counter() - inicio)
+    return min(tiempos), result
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Benchmark del parser de fechas")
+    parser.add_argument("--filas", type=int, default=1_000_000)
+    parser.add_argument("--repeticiones", type=int, default=3)
+    args = parser.parse_args(argv)
+
+    s = mixed_dates(args.filas)
+
+    def frio():
+        dates.clear_cache()
+        return dates.smart_parse_dates(s)
+
+    t_old, r_old = _best(lambda: old_smart_parse_dates(s), args.repeticiones)
+    t_new, r_new = _best(frio, args.repeticiones)
+    t_memo, r_memo = _best(lambda: dates.smart_parse_dates(s), args.repeticiones)
+
+    print(f"{args.filas} textos de fecha (formatos mezclados)")
+    print(f"{'variante':<14}{'segundos':>10}{'válidas':>12}")
+    for nombre, t, r in (("anterior", t_old, r_old), ("nuevo (frío)", t_new, r_new), ("nuevo (memo)", t_memo, r_memo)):
+        print(f"{nombre:<14}{t:>10.3f}{int(r.notna().sum()):>12}")
+
+    # donde el anterior parseaba, el nuevo da la misma fecha
+    both = r_old.notna()
+    print("coinciden en las filas que ya parseaba el anterior:", bool((r_old[both] == r_new[both]).all()))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,130 @@
+"""Latencia por operación del almacén SQLite (store.LedgerStore) frente a reescribir el CSV.
+
+Genera libros de distintos tamaños y mide insert / update / delete de una fila:
+- almacen: una transacción que toca sólo la fila (clave primaria id)
+- csv: leer todo el CSV, modificar, copiar .bak y volver a escribirlo (flujo anterior)
+
+    python benchmark_store.py --filas 10000 50000 200000 --ops 200 --ops-csv 3
+"""
+import os
+import time
+import shutil
+import argparse
+import tempfile
+
+import numpy as np
+import pandas as pd
+
+from store import LedgerStore, COLUMNS
+
+
+def synthetic_ledger(n, seed=0) -> pd.DataFrame:
+    rng = np.random.default_rng(seed)
+    fecha = pd.Timestamp("2015-01-01") + pd.to_timedelta(rng.integers(0, 3650, n), unit="D")
+    df = pd.DataFrame({
+        "id": np.arange(1, n + 1),
+        "fecha": fecha,
+        "mes": fecha.to_period("M").to_timestamp(),
+        "ingresos": rng.integers(0, 15000, n),
+        "gastos_fijos": rng.integers(0, 6000, n),
+        "gastos_variables": rng.integers(0, 4000, n),
+        "ventas": rng.integers(0, 300, n),
+        "activos_corrientes": rng.integers(0, 30000, n),
+        "pasivos_corrientes": rng.integers(0, 20000, n),
+    })
+    df["gastos_totales"] = df["gastos_fijos"] + df["gastos_variables"]
+    df["margen_ganancia"] = (df["ingresos"] - df["gastos_totales"]) / df["ingresos"].replace(0, 1e-9)
+    df["liquidez_corriente"] = df["activos_corrientes"] / df["pasivos_corrientes"].replace(0, 1e-9)
+    profit = df["ingresos"] - df["gastos_totales"]
+    df["riesgo"] = np.select([profit > 0, profit < 0], ["BAJO", "ALTO"], "MEDIO")
+    return df[COLUMNS]
+
+
+def _timed(fn, reps):
+    tiempos = []
+    for i in range(reps):
+        inicio = time.perf_counter()
+        fn(i)
+        tiempos.append((time.perf_counter() - inicio) * 1000)
+    return tiempos
+
+
+def bench_store(df, carpeta, ops, seed=1):
+    store = LedgerStore(os.path.join(carpeta, "bench.sqlite3"))
+    store.replace_all(df)
+    rng = np.random.default_rng(seed)
+    nueva = df.iloc[0].to_dict()
+    ids = rng.choice(df["id"].to_numpy(), size=2 * ops, replace=False)
+
+    def insertar(i):
+        store.insert(dict(nueva, id=None))
+
+    def actualizar(i):
+        fila = store.get([ids[i]])
+        fila["ingresos"] += 1
+        store.update_frame(fila)
+
+    def eliminar(i):
+        store.delete([ids[ops + i]])
+
+    return {"insert": _timed(insertar, ops), "update": _timed(actualizar, ops), "delete": _timed(eliminar, ops)}
+
+
+def bench_csv(df, carpeta, ops, seed=1):
+    ruta = os.path.join(carpeta, "bench.csv")
+    df.to_csv(ruta, index=False)
+    rng = np.random.default_rng(seed)
+    ids = rng.choice(df["id"].to_numpy(), size=2 * ops, replace=False)
+
+    def reescribir(cambio):
+        actual = pd.read_csv(ruta, parse_dates=["fecha", "mes"])
+        shutil.copy2(ruta, ruta + ".bak")
+        cambio(actual).to_csv(ruta, index=False)
+
+    def insertar(i):
+        reescribir(lambda d: pd.concat([d, d.iloc[[0]].assign(id=d["id"].max() + 1)], ignore_index=True))
+
+    def actualizar(i):
+        def cambio(d):
+            d.loc[d["id"] == ids[i], "ingresos"] += 1
+            return d
+        reescribir(cambio)
+
+    def eliminar(i):
+        reescribir(lambda d: d[d["id"] != ids[ops + i]])
+
+    return {"insert": _timed(insertar, ops), "update": _timed(actualizar, ops), "delete": _timed(eliminar, ops)}
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Benchmark del almacén por id vs reescritura del CSV")
+    parser.add_argument("--filas", type=int, nargs="+", default=[10_000, 50_000, 200_000])
+    parser.add_argument("--ops", type=int, default=200, help="operaciones por tipo en el almacén")
+    parser.add_argument("--ops-csv", type=int, default=3, help="operaciones por tipo reescribiendo el CSV (0 = omitir)")
+    args = parser.parse_args(argv)
+
+    resultados = []
+    for n in args.filas:
+        df = synthetic_ledger(n)
+        with tempfile.TemporaryDirectory() as carpeta:
+            motores = [("almacen", bench_store(df, carpeta, args.ops))]
+            if args.ops_csv:
+                motores.append(("csv", bench_csv(df, carpeta, args.ops_csv)))
+        for motor, tiempos in motores:
+            for op, t in tiempos.items():
+                resultados.append({
+                    "filas": n, "motor": motor, "operacion": op,
+                    "mediana_ms": np.median(t), "p95_ms": np.percentile(t, 95),
+                })
+        print(f"{n} filas listas")
+
+    tabla = pd.DataFrame(resultados).pivot_table(
+        index=["motor", "operacion"], columns="filas", values="mediana_ms"
+    )
+    with pd.option_context("display.float_format", "{:.2f}".format, "display.width", 120):
+        print("\nMediana por operación (ms):")
+        print(tabla)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,78 @@
+"""Cambio de página y búsqueda de la tabla: cálculo anterior frente a table_index.TableIndex.
+
+Mide sólo la parte de datos de build_table (la construcción de los controles de Flet es
+la misma para las dos variantes: una página de 'page_size' filas).
+- anterior: armar la vista, parsear fechas, buscar con apply(axis=1) y ordenar todo en cada página
+- índice: reconstrucción tras una escritura, y luego páginas/búsquedas sobre lo precalculado
+
+    python benchmark_table.py --filas 500000 --paginas 50
+"""
+import time
+import argparse
+
+import numpy as np
+
+from benchmark_store import synthetic_ledger
+from table_index import TableIndex, display_frame
+
+
+def old_page(dfi, query, page, page_size):
+    # implementación anterior de build_table (parte de datos)
+    dfi = display_frame(dfi)
+    if query:
+        q = query.lower()
+        mask = dfi.apply(lambda r: r.astype(str).str.lower().str.contains(q).any(), axis=1)
+        dfi = dfi[mask]
+    filtered = dfi.sort_values("fecha", ascending=False)
+    start = page * page_size
+    return filtered.iloc[start:start + page_size], len(filtered)
+
+
+def _ms(fn):
+    inicio = time.perf_counter()
+    fn()
+    return (time.perf_counter() - inicio) * 1000
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Benchmark de paginación y búsqueda de la tabla")
+    parser.add_argument("--filas", type=int, default=500_000)
+    parser.add_argument("--paginas", type=int, default=50, help="cambios de página medidos")
+    parser.add_argument("--page-size", type=int, default=10)
+    parser.add_argument("--filas-busqueda-anterior", type=int, default=20_000,
+                        help="filas para medir la búsqueda anterior (apply por fila es muy lento)")
+    args = parser.parse_args(argv)
+
+    df = synthetic_ledger(args.filas)
+    ps = args.page_size
+    resultados = []
+
+    resultados.append(("anterior: página sin búsqueda", args.filas, _ms(lambda: old_page(df, "", 1, ps))))
+    chico = df.iloc[:args.filas_busqueda_anterior]
+    resultados.append(("anterior: página con búsqueda 'alto'", len(chico), _ms(lambda: old_page(chico, "alto", 0, ps))))
+
+    index = TableIndex()
+    resultados.append(("índice: reconstrucción (tras escribir)", args.filas, _ms(lambda: index.refresh(df, 1))))
+
+    def turn_pages(query):
+        tiempos = []
+        for i in range(args.paginas):
+            page = i if i < args.paginas // 2 else args.paginas - i  # siguiente ... anterior
+            tiempos.append(_ms(lambda: (index.refresh(df, 1), index.page(query, page, ps))))
+        return np.median(tiempos), np.max(tiempos)
+
+    mediana, maximo = turn_pages("")
+    resultados.append(("índice: anterior/siguiente (mediana)", args.filas, mediana))
+    resultados.append(("índice: anterior/siguiente (máximo)", args.filas, maximo))
+    for q in ("a", "al", "alt", "alto"):
+        resultados.append((f"índice: escribir '{q}'", args.filas, _ms(lambda: index.page(q, 0, ps))))
+    mediana, maximo = turn_pages("alto")
+    resultados.append(("índice: páginas con 'alto' (mediana)", args.filas, mediana))
+    resultados.append(("índice: páginas con 'alto' (máximo)", args.filas, maximo))
+
+    for nombre, filas, ms in resultados:
+        print(f"{nombre:<42}{filas:>9} filas {ms:>10.2f} ms")
+
+
+if __name__ == "__main__":
+    main()
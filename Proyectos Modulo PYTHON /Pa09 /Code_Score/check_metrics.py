@@ -0,0 +1,177 @@
+"""Comprueba que metrics.compute_derived da exactamente lo mismo que los cálculos fila a fila
+que había en read_csv_dataframe, normalize_csv y update_by_id (copiados abajo como referencia).
+
+Genera DataFrames aleatorios con NaN, ceros, negativos, columnas faltantes y máscaras parciales.
+
+    python check_metrics.py --casos 500 --filas 200 --seed 0
+"""
+import argparse
+
+import numpy as np
+import pandas as pd
+
+from metrics import compute_derived
+
+INPUTS = ["ingresos", "gastos_fijos", "gastos_variables", "ventas", "activos_corrientes", "pasivos_corrientes"]
+
+
+# ---------- Referencias (implementación anterior) ----------
+def ref_read_csv(df):
+    if "gastos_fijos" in df.columns and "gastos_variables" in df.columns:
+        df["gastos_totales"] = df["gastos_fijos"].fillna(0) + df["gastos_variables"].fillna(0)
+    else:
+        df["gastos_totales"] = np.nan
+
+    if "ingresos" in df.columns:
+        ingresos_safe = df["ingresos"].fillna(0).replace(0, 1e-9)
+        df["margen_ganancia"] = (df["ingresos"].fillna(0) - df["gastos_totales"].fillna(0)) / ingresos_safe
+    else:
+        df["margen_ganancia"] = np.nan
+
+    if "activos_corrientes" in df.columns and "pasivos_corrientes" in df.columns:
+        pasivos_safe = df["pasivos_corrientes"].fillna(0).replace(0, 1e-9)
+        df["liquidez_corriente"] = df["activos_corrientes"].fillna(0) / pasivos_safe
+    else:
+        df["liquidez_corriente"] = np.nan
+
+    def classify_by_profit(row):
+        try:
+            ingresos = row.get("ingresos", np.nan)
+            gastos_tot = row.get("gastos_totales", np.nan)
+            if pd.isna(ingresos) or pd.isna(gastos_tot):
+                return "MEDIO"
+            profit = ingresos - gastos_tot
+            if profit > 0:
+                return "BAJO"
+            if profit < 0:
+                return "ALTO"
+            return "MEDIO"
+        except Exception:
+            return "MEDIO"
+
+    df["riesgo"] = df.apply(classify_by_profit, axis=1)
+    return df
+
+
+def ref_normalize(df):
+    if "gastos_fijos" in df.columns and "gastos_variables" in df.columns:
+        df["gastos_totales"] = df["gastos_fijos"].fillna(0) + df["gastos_variables"].fillna(0)
+    if "ingresos" in df.columns:
+        ingresos_safe = df["ingresos"].fillna(0).replace(0, 1e-9)
+        df["margen_ganancia"] = (df["ingresos"].fillna(0) - df["gastos_totales"].fillna(0)) / ingresos_safe
+    if "activos_corrientes" in df.columns and "pasivos_corrientes" in df.columns:
+        pasivos_safe = df["pasivos_corrientes"].fillna(0).replace(0, 1e-9)
+        df["liquidez_corriente"] = df["activos_corrientes"].fillna(0) / pasivos_safe
+
+    def _clas(r):
+        try:
+            ing = r.get("ingresos", pd.NA)
+            g = r.get("gastos_totales", pd.NA)
+            if pd.isna(ing) or pd.isna(g):
+                return "MEDIO"
+            p = ing - g
+            return "BAJO" if p > 0 else ("ALTO" if p < 0 else "MEDIO")
+        except Exception:
+            return "MEDIO"
+
+    df["riesgo"] = df.apply(_clas, axis=1)
+    return df
+
+
+def ref_update(df_current, mask):
+    if "gastos_fijos" in df_current.columns and "gastos_variables" in df_current.columns:
+        df_current.loc[mask, "gastos_totales"] = df_current.loc[mask, "gastos_fijos"].fillna(0) + df_current.loc[mask, "gastos_variables"].fillna(0)
+    else:
+        df_current.loc[mask, "gastos_totales"] = np.nan
+
+    if "ingresos" in df_current.columns:
+        ingresos_safe = df_current.loc[mask, "ingresos"].fillna(0).replace(0, 1e-9)
+        df_current.loc[mask, "margen_ganancia"] = (df_current.loc[mask, "ingresos"].fillna(0) - df_current.loc[mask, "gastos_totales"].fillna(0)) / ingresos_safe
+    else:
+        df_current.loc[mask, "margen_ganancia"] = np.nan
+
+    if "activos_corrientes" in df_current.columns and "pasivos_corrientes" in df_current.columns:
+        pasivos_safe = df_current.loc[mask, "pasivos_corrientes"].fillna(0).replace(0, 1e-9)
+        df_current.loc[mask, "liquidez_corriente"] = df_current.loc[mask, "activos_corrientes"].fillna(0) / pasivos_safe
+    else:
+        df_current.loc[mask, "liquidez_corriente"] = np.nan
+
+    def clasifica_row_by_profit(r):
+        try:
+            ingresos_val = r.get("ingresos", np.nan)
+            gastos_val = r.get("gastos_totales", np.nan)
+            if pd.isna(ingresos_val) or pd.isna(gastos_val):
+                return "MEDIO"
+            profit = ingresos_val - gastos_val
+            if profit > 0:
+                return "BAJO"
+            if profit < 0:
+                return "ALTO"
+            return "MEDIO"
+        except Exception:
+            return "MEDIO"
+
+    df_current.loc[mask, "riesgo"] = df_current.loc[mask].apply(clasifica_row_by_profit, axis=1)
+    return df_current
+
+
+# ---------- Datos aleatorios ----------
+def random_frame(rng, filas):
+    n = int(rng.integers(1, filas + 1))
+    df = pd.DataFrame({"id": np.arange(1, n + 1)})
+    for c in INPUTS:
+        if rng.random() < 0.1:
+            continue  # columna faltante
+        v = rng.choice([0, 1, 50, 1000, -20, 7], size=n) * rng.integers(1, 4, size=n)
+        if rng.random() < 0.5:
+            # flotantes con NaN y ceros
+            v = v.astype(float) + rng.choice([0.0, 0.5, 0.25], size=n)
+            v[rng.random(n) < 0.2] = np.nan
+        df[c] = v
+    if rng.random() < 0.3 and "ingresos" in df.columns and "gastos_fijos" in df.columns:
+        # ganancia exactamente 0 en algunas filas
+        zero = rng.random(n) < 0.3
+        df["gastos_fijos"] = df["gastos_fijos"].astype(df["ingresos"].dtype if df["gastos_fijos"].dtype.kind == "i" else float)
+        df.loc[zero, "gastos_fijos"] = df.loc[zero, "ingresos"]
+        if "gastos_variables" in df.columns:
+            df.loc[zero, "gastos_variables"] = 0
+    return df
+
+
+def _mask(rng, df):
+    kind = rng.integers(0, 3)
+    if kind == 0:
+        return df["id"] == int(rng.integers(1, len(df) + 1))  # como update_by_id: una fila
+    if kind == 1:
+        return pd.Series(rng.random(len(df)) < 0.5, index=df.index)
+    return pd.Series(True, index=df.index)
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Equivalencia de compute_derived con los cálculos anteriores")
+    parser.add_argument("--casos", type=int, default=500)
+    parser.add_argument("--filas", type=int, default=200)
+    parser.add_argument("--seed", type=int, default=0)
+    args = parser.parse_args(argv)
+
+    rng = np.random.default_rng(args.seed)
+    for caso in range(args.casos):
+        base = random_frame(rng, args.filas)
+        pd.testing.assert_frame_equal(compute_derived(base.copy()), ref_read_csv(base.copy()))
+
+        # normalize_csv recibe siempre las columnas derivadas ya existentes (las del almacén)
+        if all(c in base.columns for c in INPUTS):
+            previo = ref_read_csv(base.copy())
+            pd.testing.assert_frame_equal(compute_derived(previo.copy()), ref_normalize(previo.copy()))
+
+            mask = _mask(rng, previo)
+            editado = previo.copy()
+            editado.loc[mask, "ingresos"] = editado.loc[mask, "ingresos"] * 2 - 5
+            pd.testing.assert_frame_equal(
+                compute_derived(editado.copy(), mask), ref_update(editado.copy(), mask)
+            )
+    print(f"OK: {args.casos} casos idénticos (seed={args.seed})")
+
+
+if __name__ == "__main__":
+    main()
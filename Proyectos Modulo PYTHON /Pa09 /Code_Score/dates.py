@@ -0,0 +1,117 @@
+import hashlib
+import warnings
+from collections import OrderedDict
+
+import pandas as pd
+
+try:
+    from pandas.tseries.api import guess_datetime_format
+except ImportError:  # pandas < 2.2
+    from pandas._libs.tslibs.parsing import guess_datetime_format
+
+SAMPLE_SIZE = 1000     # valores (no nulos) usados para inferir el formato de una columna
+MAX_CANDIDATES = 20    # valores distintos de la muestra de los que se adivina un formato
+CACHE_SIZE = 16        # columnas parseadas que se recuerdan (por hash del contenido)
+
+_CACHE = OrderedDict()
+
+
+def infer_date_format(sample):
+    """Formato strftime que parsea más valores de la muestra (None si ninguno sirve).
+    Los candidatos se adivinan con dayfirst=True y False; ante empate gana dayfirst=True.
+    """
+    strings = pd.Series([v for v in sample if isinstance(v, str) and v.strip()], dtype=object)
+    candidates = []
+    with warnings.catch_warnings():
+        # el aviso de "dayfirst no coincide" es justamente lo que se está probando
+        warnings.simplefilter("ignore", UserWarning)
+        for value in pd.unique(strings)[:MAX_CANDIDATES]:
+            for dayfirst in (True, False):
+                fmt = guess_datetime_format(value, dayfirst=dayfirst)
+                if fmt and fmt not in candidates:
+                    candidates.append(fmt)
+
+    best, best_count = None, 0
+    for fmt in candidates:
+        count = pd.to_datetime(strings, format=fmt, errors="coerce").notna().sum()
+        if count > best_count:
+            best, best_count = fmt, count
+    return best
+
+
+def _content_key(s: pd.Series):
+    try:
+        hashes = pd.util.hash_pandas_object(s, index=False).to_numpy()
+    except TypeError:
+        return None
+    return str(s.dtype), len(s), hashlib.blake2b(hashes.tobytes(), digest_size=16).hexdigest()
+
+
+def _parse_series(s: pd.Series) -> pd.Series:
+    if pd.api.types.is_datetime64_any_dtype(s):
+        return s
+    if not (pd.api.types.is_object_dtype(s) or pd.api.types.is_string_dtype(s)):
+        return pd.to_datetime(s, errors="coerce")
+
+    key = _content_key(s)
+    if key is not None and key in _CACHE:
+        _CACHE.move_to_end(key)
+        return pd.Series(_CACHE[key].copy(), index=s.index, name=s.name)
+
+    # 1) inferir el formato una sola vez con una muestra repartida por toda la columna
+    values = s.to_numpy(dtype=object)
+    present = values[pd.notna(values)]
+    step = max(1, len(present) // SAMPLE_SIZE)
+    fmt = infer_date_format(present[::step][:SAMPLE_SIZE])
+
+    # 2) parsear toda la columna con ese formato explícito
+    if fmt:
+        parsed = pd.to_datetime(s, format=fmt, errors="coerce")
+    else:
+        parsed = pd.Series(pd.NaT, index=s.index, dtype="datetime64[ns]", name=s.name)
+
+    # 3) sólo las filas que fallaron se parsean elemento a elemento
+    failed = parsed.isna() & s.notna()
+    if failed.any():
+        # el orden día/mes del formato sólo sirve si tiene los dos; si no, día primero (como en los escalares)
+        dayfirst = True
+        if fmt and "%d" in fmt and "%m" in fmt:
+            dayfirst = fmt.find("%d") < fmt.find("%m")
+        try:
+            parsed[failed] = pd.to_datetime(s[failed], format="mixed", dayfirst=dayfirst, errors="coerce")
+        except (ValueError, TypeError):
+            pass
+
+    if key is not None:
+        _CACHE[key] = parsed.to_numpy().copy()
+        if len(_CACHE) > CACHE_SIZE:
+            _CACHE.popitem(last=False)
+    return parsed
+
+
+def smart_parse_dates(obj):
+    """Parsea una serie o un valor escalar de fechas.
+
+    Serie: se infiere el formato una vez (muestra de la columna), se parsea con format=
+    y sólo las filas que no coinciden se intentan una por una. El resultado se memoriza
+    por hash del contenido, así volver a parsear la misma columna no cuesta nada.
+    Escalar: se intenta dayfirst=True y luego dayfirst=False.
+    """
+    try:
+        if isinstance(obj, pd.Series):
+            return _parse_series(obj)
+
+        for dayfirst in (True, False):
+            try:
+                val = pd.to_datetime(obj, errors="coerce", dayfirst=dayfirst)
+                if not pd.isna(val):
+                    return val
+            except Exception:
+                continue
+        return pd.NaT
+    except Exception:
+        return pd.NaT
+
+
+def clear_cache():
+    _CACHE.clear()
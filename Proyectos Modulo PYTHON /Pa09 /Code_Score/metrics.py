@@ -0,0 +1,64 @@
+import numpy as np
+import pandas as pd
+
+DERIVED_COLUMNS = ["gastos_totales", "margen_ganancia", "liquidez_corriente", "riesgo"]
+
+
+def _values(df, col):
+    # faltantes como 0 (mismo dtype que la columna)
+    return df[col].fillna(0).to_numpy()
+
+
+def compute_derived(df: pd.DataFrame, mask=None) -> pd.DataFrame:
+    """Recalcula las columnas derivadas (en el mismo DataFrame) con aritmética de numpy.
+
+    - gastos_totales = gastos_fijos + gastos_variables (faltantes como 0)
+    - margen_ganancia = (ingresos - gastos_totales) / ingresos (ingresos 0 -> 1e-9)
+    - liquidez_corriente = activos_corrientes / pasivos_corrientes (pasivos 0 -> 1e-9)
+    - riesgo por ganancia absoluta: > 0 BAJO, < 0 ALTO, == 0 o datos faltantes MEDIO
+    Si falta alguna columna de entrada la derivada queda en NaN. Con 'mask' sólo se
+    recalculan (y escriben) esas filas.
+    """
+    sub = df if mask is None else df.loc[mask]
+    n = len(sub)
+    cols = sub.columns
+
+    if "gastos_fijos" in cols and "gastos_variables" in cols:
+        gastos = _values(sub, "gastos_fijos") + _values(sub, "gastos_variables")
+        gastos_cero = gastos
+    else:
+        gastos = np.full(n, np.nan)
+        gastos_cero = np.zeros(n)
+
+    if "ingresos" in cols:
+        ingresos = _values(sub, "ingresos")
+        margen = (ingresos - gastos_cero) / np.where(ingresos == 0, 1e-9, ingresos)
+    else:
+        margen = np.full(n, np.nan)
+
+    if "activos_corrientes" in cols and "pasivos_corrientes" in cols:
+        pasivos = _values(sub, "pasivos_corrientes")
+        liquidez = _values(sub, "activos_corrientes") / np.where(pasivos == 0, 1e-9, pasivos)
+    else:
+        liquidez = np.full(n, np.nan)
+
+    # riesgo: NaN en ingresos/gastos deja ambas comparaciones en False -> MEDIO
+    if "ingresos" in cols:
+        ingresos_raw = pd.to_numeric(sub["ingresos"], errors="coerce").to_numpy(dtype=float)
+    else:
+        ingresos_raw = np.full(n, np.nan)
+    profit = ingresos_raw - np.asarray(gastos, dtype=float)
+    riesgo = np.select([profit > 0, profit < 0], ["BAJO", "ALTO"], "MEDIO").astype(object)
+
+    values = {
+        "gastos_totales": gastos,
+        "margen_ganancia": margen,
+        "liquidez_corriente": liquidez,
+        "riesgo": riesgo,
+    }
+    for col, arr in values.items():
+        if mask is None:
+            df[col] = arr
+        else:
+            df.loc[mask, col] = arr
+    return df
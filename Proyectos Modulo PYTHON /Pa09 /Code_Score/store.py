@@ -0,0 +1,264 @@
+import os
+import sqlite3
+import datetime as dt
+
+import numpy as np
+import pandas as pd
+
+# Columnas guardadas (las derivadas quedan materializadas junto a los datos capturados)
+COLUMNS = [
+    "id",
+    "fecha",
+    "mes",
+    "ingresos",
+    "gastos_fijos",
+    "gastos_variables",
+    "ventas",
+    "activos_corrientes",
+    "pasivos_corrientes",
+    "gastos_totales",
+    "margen_ganancia",
+    "liquidez_corriente",
+    "riesgo",
+]
+DATE_COLUMNS = ("fecha", "mes")
+DATE_FORMAT = "%Y-%m-%d %H:%M:%S"
+
+_TYPES = {
+    "id": "INTEGER PRIMARY KEY",
+    "fecha": "TEXT",
+    "mes": "TEXT",
+    "gastos_totales": "REAL",
+    "margen_ganancia": "REAL",
+    "liquidez_corriente": "REAL",
+    "riesgo": "TEXT",
+}
+# NUMERIC: los montos enteros vuelven como enteros (igual que al leer el CSV)
+_COLUMN_DEFS = ",\n    ".join(f"{c} {_TYPES.get(c, 'NUMERIC')}" for c in COLUMNS)
+
+SCHEMA = f"""
+CREATE TABLE IF NOT EXISTS registros (
+    {_COLUMN_DEFS}
+);
+CREATE INDEX IF NOT EXISTS idx_registros_fecha ON registros(fecha);
+CREATE TABLE IF NOT EXISTS eliminados (
+    {_COLUMN_DEFS.replace(" PRIMARY KEY", "")},
+    eliminado_en TEXT
+);
+CREATE TABLE IF NOT EXISTS meta (
+    clave TEXT PRIMARY KEY,
+    valor TEXT
+);
+INSERT OR IGNORE INTO meta VALUES ('version', '0');
+"""
+
+
+def _to_sql(value):
+    """Convierte un valor de pandas/numpy a un tipo que acepte sqlite3 (NaN/NaT -> NULL)."""
+    if value is None:
+        return None
+    if isinstance(value, (pd.Timestamp, dt.datetime, dt.date, np.datetime64)):
+        ts = pd.Timestamp(value)
+        return None if pd.isna(ts) else ts.strftime(DATE_FORMAT)
+    if isinstance(value, np.generic):
+        value = value.item()
+    if isinstance(value, float) and np.isnan(value):
+        return None
+    if value is pd.NA or value is pd.NaT:
+        return None
+    return value
+
+
+class LedgerStore:
+    """Registros financieros en SQLite (modo WAL) indexados por id.
+
+    Insertar, actualizar o eliminar toca una sola fila (búsqueda por clave primaria)
+    en lugar de reescribir todo el CSV; el CSV queda como formato de importación/exportación.
+    Las filas eliminadas (o que desaparecen al reimportar) se copian a la tabla
+    'eliminados' como respaldo.
+    """
+
+    def __init__(self, path):
+        self.path = path
+        self._ready = False
+        self._cache = (None, None)  # (versión, DataFrame completo)
+
+    def _connect(self):
+        conn = sqlite3.connect(self.path, timeout=30)
+        if not self._ready:
+            conn.execute("PRAGMA journal_mode=WAL")
+            conn.executescript(SCHEMA)
+            self._ready = True
+        conn.execute("PRAGMA synchronous=NORMAL")
+        return conn
+
+    def _bump(self, conn):
+        conn.execute("UPDATE meta SET valor = CAST(valor AS INTEGER) + 1 WHERE clave = 'version'")
+
+    def version(self) -> int:
+        """Contador de escrituras: cambia con cada insert/update/delete/importación."""
+        conn = self._connect()
+        try:
+            return int(conn.execute("SELECT valor FROM meta WHERE clave = 'version'").fetchone()[0])
+        finally:
+            conn.close()
+
+    # ---------- Lectura ----------
+    def _frame(self, conn, where="", params=()):
+        df = pd.read_sql_query(
+            f"SELECT {', '.join(COLUMNS)} FROM registros {where} ORDER BY fecha IS NULL, fecha, id",
+            conn,
+            params=params,
+        )
+        for c in DATE_COLUMNS:
+            df[c] = pd.to_datetime(df[c], format=DATE_FORMAT)
+        return df
+
+    def load(self) -> pd.DataFrame:
+        """Todos los registros ordenados por fecha (se reutiliza mientras no haya escrituras)."""
+        conn = self._connect()
+        try:
+            version = int(conn.execute("SELECT valor FROM meta WHERE clave = 'version'").fetchone()[0])
+            if self._cache[0] != version:
+                self._cache = (version, self._frame(conn))
+        finally:
+            conn.close()
+        return self._cache[1].copy()
+
+    def get(self, ids) -> pd.DataFrame:
+        """Sólo las filas con esos ids."""
+        ids = [int(i) for i in ids]
+        conn = self._connect()
+        try:
+            return self._frame(conn, f"WHERE id IN ({', '.join('?' * len(ids))})", ids)
+        finally:
+            conn.close()
+
+    def max_id(self) -> int:
+        conn = self._connect()
+        try:
+            return conn.execute("SELECT COALESCE(MAX(id), 0) FROM registros").fetchone()[0]
+        finally:
+            conn.close()
+
+    # ---------- Escritura ----------
+    def insert(self, row: dict) -> int:
+        """Agrega una fila; si no trae id se asigna max(id) + 1. Devuelve el id."""
+        values = [_to_sql(row.get(c)) for c in COLUMNS]
+        conn = self._connect()
+        try:
+            with conn:
+                if values[0] is None:
+                    values[0] = conn.execute("SELECT COALESCE(MAX(id), 0) + 1 FROM registros").fetchone()[0]
+                conn.execute(
+                    f"INSERT INTO registros ({', '.join(COLUMNS)}) VALUES ({', '.join('?' * len(COLUMNS))})",
+                    values,
+                )
+                self._bump(conn)
+            return values[0]
+        finally:
+            conn.close()
+
+    def update_frame(self, df: pd.DataFrame) -> int:
+        """Reescribe (por id) las filas del DataFrame. Devuelve cuántas se actualizaron."""
+        cols = [c for c in COLUMNS[1:] if c in df.columns]
+        rows = [
+            [_to_sql(v) for v in r[cols]] + [int(r["id"])]
+            for _, r in df.iterrows()
+        ]
+        conn = self._connect()
+        try:
+            with conn:
+                cur = conn.executemany(
+                    f"UPDATE registros SET {', '.join(f'{c} = ?' for c in cols)} WHERE id = ?", rows
+                )
+                self._bump(conn)
+            return cur.rowcount
+        finally:
+            conn.close()
+
+    def delete(self, ids) -> int:
+        """Elimina por id (copiando antes las filas a 'eliminados'). Devuelve cuántas se eliminaron."""
+        stamp = dt.datetime.now().strftime(DATE_FORMAT)
+        ids = [int(i) for i in ids]
+        conn = self._connect()
+        try:
+            with conn:
+                conn.executemany(
+                    f"INSERT INTO eliminados SELECT {', '.join(COLUMNS)}, ? FROM registros WHERE id = ?",
+                    [(stamp, i) for i in ids],
+                )
+                cur = conn.executemany("DELETE FROM registros WHERE id = ?", [(i,) for i in ids])
+                if cur.rowcount:
+                    self._bump(conn)
+            return cur.rowcount
+        finally:
+            conn.close()
+
+    def replace_all(self, df: pd.DataFrame):
+        """Reemplaza todos los registros (importación o normalización completa).
+        Las filas cuyo id no está en el DataFrame nuevo se copian antes a 'eliminados'."""
+        df = df.reindex(columns=COLUMNS)
+        df["id"] = pd.to_numeric(df["id"], errors="coerce")
+        missing = df["id"].isna() | df["id"].duplicated()
+        if missing.any():
+            # filas sin id (o con id repetido): numerar a continuación del mayor id
+            start = int(df["id"].max()) if df["id"].notna().any() else 0
+            df.loc[missing, "id"] = np.arange(start + 1, start + 1 + missing.sum())
+        df["id"] = df["id"].astype(np.int64)
+        rows = [[_to_sql(v) for v in r] for r in df.itertuples(index=False, name=None)]
+        stamp = dt.datetime.now().strftime(DATE_FORMAT)
+        conn = self._connect()
+        try:
+            with conn:
+                conn.execute("CREATE TEMP TABLE IF NOT EXISTS nuevos (id INTEGER PRIMARY KEY)")
+                conn.execute("DELETE FROM nuevos")
+                conn.executemany("INSERT INTO nuevos VALUES (?)", [(r[0],) for r in rows])
+                conn.execute(
+                    f"INSERT INTO eliminados SELECT {', '.join(COLUMNS)}, ? FROM registros "
+                    "WHERE id NOT IN (SELECT id FROM nuevos)",
+                    (stamp,),
+                )
+                conn.execute("DELETE FROM registros")
+                conn.executemany(
+                    f"INSERT INTO registros ({', '.join(COLUMNS)}) VALUES ({', '.join('?' * len(COLUMNS))})",
+                    rows,
+                )
+                self._bump(conn)
+        finally:
+            conn.close()
+
+    # ---------- Sincronización con el CSV ----------
+    @staticmethod
+    def _signature(csv_path):
+        info = os.stat(csv_path)
+        return f"{info.st_mtime_ns}:{info.st_size}"
+
+    def csv_changed(self, csv_path) -> bool:
+        """True si el CSV cambió (o nunca se importó) desde la última importación/exportación."""
+        conn = self._connect()
+        try:
+            row = conn.execute("SELECT valor FROM meta WHERE clave = 'csv'").fetchone()
+        finally:
+            conn.close()
+        return row is None or row[0] != self._signature(csv_path)
+
+    def unexported_changes(self) -> bool:
+        """True si hubo escrituras después de la última importación/exportación del CSV
+        (reimportarlo las perdería). Una base nueva, sin escrituras, no tiene cambios."""
+        conn = self._connect()
+        try:
+            meta = dict(conn.execute("SELECT clave, valor FROM meta WHERE clave IN ('version', 'csv_version')"))
+        finally:
+            conn.close()
+        return meta.get("csv_version", "0") != meta["version"]
+
+    def mark_csv(self, csv_path):
+        """Registra que el CSV y la base coinciden (firma del archivo y versión actual)."""
+        conn = self._connect()
+        try:
+            with conn:
+                conn.execute("INSERT OR REPLACE INTO meta VALUES ('csv', ?)", (self._signature(csv_path),))
+                conn.execute("INSERT OR REPLACE INTO meta SELECT 'csv_version', valor FROM meta WHERE clave = 'version'")
+        finally:
+            conn.close()
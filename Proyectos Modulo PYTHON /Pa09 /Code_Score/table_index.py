@@ -0,0 +1,111 @@
+from collections import OrderedDict
+
+import numpy as np
+import pandas as pd
+
+from dates import smart_parse_dates
+
+# Columnas de la tabla: nombre corto visible -> columna real del DataFrame
+DISPLAY_COLUMNS = {
+    "id": "id",
+    "fecha": "fecha",
+    "mes": "mes",
+    "ingresos": "ingresos",
+    "gastos_F": "gastos_fijos",
+    "gastos_V": "gastos_variables",
+    "gastos_T": "gastos_totales",
+    "ventas": "ventas",
+    "activos": "activos_corrientes",
+    "pasivos": "pasivos_corrientes",
+    "margen_gan": "margen_ganancia",
+    "liquidez": "liquidez_corriente",
+    "riesgo": "riesgo",
+}
+QUERY_CACHE_SIZE = 32
+_SEPARATOR = "\n"  # el TextField de búsqueda es de una línea: ninguna consulta lo contiene
+
+
+def _cell_text(s: pd.Series) -> np.ndarray:
+    # mismo texto que str(valor) en cada celda (Timestamp -> 'YYYY-mm-dd HH:MM:SS', NaN -> 'nan')
+    if pd.api.types.is_datetime64_any_dtype(s):
+        # pocas fechas distintas: se formatea cada una una sola vez
+        codes, uniques = pd.factorize(s)
+        texts = np.append(np.asarray(uniques.strftime("%Y-%m-%d %H:%M:%S"), dtype=object), "NaT")
+        return texts[codes]  # código -1 (NaT) -> último elemento
+    return s.astype(str).to_numpy(dtype=object)
+
+
+def display_frame(dfi: pd.DataFrame) -> pd.DataFrame:
+    """DataFrame de visualización con columnas cortas (NaN si la columna real no existe)."""
+    display_df = pd.DataFrame(index=dfi.index)
+    for disp, real in DISPLAY_COLUMNS.items():
+        display_df[disp] = dfi[real] if real in dfi.columns else np.nan
+    # asegurar tipo fecha en la columna de visualización para orden correcto
+    display_df["fecha"] = smart_parse_dates(display_df["fecha"])
+    display_df["mes"] = smart_parse_dates(display_df["mes"])
+    return display_df
+
+
+class TableIndex:
+    """Orden y búsqueda precalculados para la tabla paginada.
+
+    Se reconstruye sólo cuando cambia la clave (versión del almacén, es decir, tras
+    una escritura): el DataFrame ordenado por fecha y, con la primera búsqueda, un
+    texto en minúsculas por fila.
+    Buscar devuelve posiciones dentro del orden (memorizadas por consulta) y cambiar
+    de página sólo toma una porción de ellas.
+    """
+
+    def __init__(self):
+        self._key = None
+        self._sorted = None   # DataFrame de visualización ordenado por fecha descendente
+        self._text = None     # texto de búsqueda (minúsculas) en el mismo orden
+        self._queries = OrderedDict()
+
+    def refresh(self, dfi: pd.DataFrame, key):
+        if key is not None and key == self._key:
+            return
+        display_df = display_frame(dfi)
+        # fecha descendente; a igual fecha, primero la fila cargada después (id mayor)
+        self._sorted = display_df.iloc[::-1].sort_values("fecha", ascending=False, kind="stable")
+        self._text = None
+        self._queries.clear()
+        self._key = key
+
+    def _search_text(self) -> np.ndarray:
+        if self._text is None:
+            columns = [_cell_text(self._sorted[c]) for c in self._sorted.columns]
+            self._text = np.array([_SEPARATOR.join(cells).lower() for cells in zip(*columns)], dtype=object)
+        return self._text
+
+    def search(self, query: str) -> np.ndarray:
+        """Posiciones (en el orden de la tabla) de las filas que contienen 'query'."""
+        q = (query or "").lower()
+        if not q:
+            return np.arange(len(self._sorted))
+        if q in self._queries:
+            self._queries.move_to_end(q)
+            return self._queries[q]
+
+        # si una consulta ya resuelta está contenida en esta (p. ej. al seguir escribiendo),
+        # sólo hace falta revisar sus resultados
+        text = self._search_text()
+        candidates = None
+        for previous, hits in self._queries.items():
+            if previous in q and (candidates is None or len(hits) < len(candidates)):
+                candidates = hits
+        if candidates is None:
+            candidates = np.arange(len(text))
+        found = pd.Series(text[candidates]).str.contains(q, regex=False).to_numpy(dtype=bool)
+        hits = candidates[found]
+
+        self._queries[q] = hits
+        if len(self._queries) > QUERY_CACHE_SIZE:
+            self._queries.popitem(last=False)
+        return hits
+
+    def page(self, query: str, page: int, page_size: int):
+        """(filas de la página, total de filas que cumplen la búsqueda)."""
+        hits = self.search(query)
+        start = page * page_size
+        return self._sorted.iloc[hits[start:start + page_size]], len(hits)
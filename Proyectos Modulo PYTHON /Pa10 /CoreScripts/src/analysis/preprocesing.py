@@ -9,6 +9,7 @@ matplotlib.use('TkAgg')
 import matplotlib.pyplot as plt
 from matplotlib.backends.backend_tkagg import FigureCanvasTkAgg
 from matplotlib.figure import Figure
+from pipeline import preprocesar_dataset
 
 class PreprocessingFrame(ctk.CTkFrame):
     def __init__(self, master, df=None):
@@ -317,146 +318,7 @@ class PreprocessingFrame(ctk.CTkFrame):
         self.log("=" * 50)
         
         try:
-            # 1. Renombrar columnas al español
-            self.log("\n1️⃣ Renombrando columnas al español...")
-            nuevo_nombres = {
-                'age': 'Edad',
-                'sex': 'Sexo',
-                'cp': 'Tipo_Dolor_Pecho',
-                'trestbps': 'Presion_Arterial_Reposo',
-                'chol': 'Colesterol',
-                'fbs': 'Glucemia_Ayunas_Mayor_120',
-                'restecg': 'Electrocardiograma_Reposo',
-                'thalach': 'Frecuencia_Cardiaca_Maxima',
-                'exang': 'Dolor_Inducido_Ejercicio',
-                'oldpeak': 'DepresionST_Ejercicio',
-                'slope': 'PendienteST_Ejercicio',
-                'ca': 'Vasos_Principales_Color_Fluor',
-                'thal': 'Talasemia',
-                'target': 'Enfermedad_Cardiaca'
-            }
-            df = self.df.rename(columns=nuevo_nombres)
-            self.log(f"   ✓ {len(nuevo_nombres)} columnas renombradas")
-            
-            # 2. Winsorización con método IQR
-            self.log("\n2️⃣ Aplicando winsorización (método IQR) a outliers...")
-            cols_outliers = ['Colesterol', 'Presion_Arterial_Reposo', 'DepresionST_Ejercicio']
-            
-            def winsorizar_iqr(df_temp, columna, factor=1.5):
-                Q1 = df_temp[columna].quantile(0.25)
-                Q3 = df_temp[columna].quantile(0.75)
-                IQR = Q3 - Q1
-                limite_inferior = Q1 - (factor * IQR)
-                limite_superior = Q3 + (factor * IQR)
-                valores_antes = df_temp[columna].copy()
-                df_temp[columna] = np.where(df_temp[columna] < limite_inferior, limite_inferior, df_temp[columna])
-                df_temp[columna] = np.where(df_temp[columna] > limite_superior, limite_superior, df_temp[columna])
-                outliers_modificados = (valores_antes != df_temp[columna]).sum()
-                return df_temp, outliers_modificados
-            
-            df_winsorized = df.copy()
-            for col in cols_outliers:
-                if col in df_winsorized.columns:
-                    media_antes = df_winsorized[col].mean()
-                    df_winsorized, n_outliers = winsorizar_iqr(df_winsorized, col)
-                    media_despues = df_winsorized[col].mean()
-                    self.log(f"   ✓ {col}:")
-                    self.log(f"     - Media antes: {media_antes:.2f} → después: {media_despues:.2f}")
-                    self.log(f"     - Outliers winzorizados: {n_outliers}")
-            
-            df = df_winsorized
-            
-            # 3. DATASET CUANTITATIVO (para modelos ML)
-            self.log("\n3️⃣ Creando Dataset Cuantitativo (numérico)...")
-            
-            # Convertir columnas categóricas a tipo category
-            cols_nominal = [
-                'Tipo_Dolor_Pecho', 
-                'Electrocardiograma_Reposo', 
-                'PendienteST_Ejercicio', 
-                'Talasemia'
-            ]
-            
-            df_cuant = df.copy()
-            for col in cols_nominal:
-                if col in df_cuant.columns:
-                    df_cuant[col] = df_cuant[col].astype('category')
-            
-            # Crear variables dummy
-            self.df_cuantitativo = pd.get_dummies(df_cuant, columns=cols_nominal, drop_first=True)
-            self.log(f"   ✓ Variables dummy creadas para {len(cols_nominal)} columnas")
-            self.log(f"   ✓ Dataset cuantitativo: {self.df_cuantitativo.shape[0]} filas × {self.df_cuantitativo.shape[1]} columnas")
-            
-            # Mostrar columnas generadas
-            nuevas_cols = set(self.df_cuantitativo.columns) - set(df.columns)
-            self.log(f"   ✓ Nuevas columnas dummy: {len(nuevas_cols)}")
-            
-            # 4. DATASET DESCRIPTIVO (texto legible)
-            self.log("\n4️⃣ Creando Dataset Descriptivo (cualitativo)...")
-            
-            # Mapeos para convertir a texto descriptivo
-            mapa_dolor = {
-                0: 'Asintomático', 
-                1: 'Angina Típica', 
-                2: 'Angina Atípica', 
-                3: 'Dolor No Anginal'
-            }
-            
-            mapa_ecg = {
-                0: 'Normal', 
-                1: 'Anormalidad Onda ST-T', 
-                2: 'Hipertrofia Ventricular'
-            }
-            
-            mapa_pendiente = {
-                0: 'Ascendente', 
-                1: 'Plana', 
-                2: 'Descendente'
-            }
-            
-            mapa_talasemia = {
-                1: 'Normal', 
-                2: 'Defecto Fijo', 
-                3: 'Defecto Reversible'
-            }
-            
-            df_descriptivo = df.copy()
-            
-            # Aplicar mapeos
-            if 'Tipo_Dolor_Pecho' in df_descriptivo.columns:
-                df_descriptivo['Tipo_Dolor_Pecho'] = df_descriptivo['Tipo_Dolor_Pecho'].map(mapa_dolor)
-                self.log("   ✓ Tipo_Dolor_Pecho convertido a texto")
-            
-            if 'Electrocardiograma_Reposo' in df_descriptivo.columns:
-                df_descriptivo['Electrocardiograma_Reposo'] = df_descriptivo['Electrocardiograma_Reposo'].map(mapa_ecg)
-                self.log("   ✓ Electrocardiograma_Reposo convertido a texto")
-            
-            if 'PendienteST_Ejercicio' in df_descriptivo.columns:
-                df_descriptivo['PendienteST_Ejercicio'] = df_descriptivo['PendienteST_Ejercicio'].map(mapa_pendiente)
-                self.log("   ✓ PendienteST_Ejercicio convertido a texto")
-            
-            if 'Talasemia' in df_descriptivo.columns:
-                df_descriptivo['Talasemia'] = df_descriptivo['Talasemia'].map(mapa_talasemia)
-                self.log("   ✓ Talasemia convertido a texto")
-            
-            if 'Sexo' in df_descriptivo.columns:
-                df_descriptivo['Sexo'] = df_descriptivo['Sexo'].map({0: 'M', 1: 'H'})
-                self.log("   ✓ Sexo convertido a M/H")
-            
-            if 'Dolor_Inducido_Ejercicio' in df_descriptivo.columns:
-                df_descriptivo['Dolor_Inducido_Ejercicio'] = df_descriptivo['Dolor_Inducido_Ejercicio'].map({0: 'No', 1: 'Sí'})
-                self.log("   ✓ Dolor_Inducido_Ejercicio convertido a No/Sí")
-            
-            if 'Enfermedad_Cardiaca' in df_descriptivo.columns:
-                df_descriptivo['Enfermedad_Cardiaca'] = df_descriptivo['Enfermedad_Cardiaca'].map({0: 'No', 1: 'Sí'})
-                self.log("   ✓ Enfermedad_Cardiaca convertido a No/Sí")
-            
-            if 'Glucemia_Ayunas_Mayor_120' in df_descriptivo.columns:
-                df_descriptivo['Glucemia_Ayunas_Mayor_120'] = df_descriptivo['Glucemia_Ayunas_Mayor_120'].map({0: 'No', 1: 'Sí'})
-                self.log("   ✓ Glucemia_Ayunas_Mayor_120 convertido a No/Sí")
-            
-            self.df_descriptivo = df_descriptivo
-            self.log(f"   ✓ Dataset descriptivo: {self.df_descriptivo.shape[0]} filas × {self.df_descriptivo.shape[1]} columnas")
+            self.df_cuantitativo, self.df_descriptivo = preprocesar_dataset(self.df, log=self.log)
             
             # Activar botones
             self.btn_boxplot_proc.configure(state="normal", fg_color="#0078D7")
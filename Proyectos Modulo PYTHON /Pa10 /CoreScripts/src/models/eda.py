@@ -9,11 +9,8 @@ import matplotlib.pyplot as plt
 import seaborn as sns
 from matplotlib.backends.backend_tkagg import FigureCanvasTkAgg
 from matplotlib.figure import Figure
-from sklearn.preprocessing import StandardScaler
-from sklearn.cluster import KMeans
-from sklearn.decomposition import PCA
-from sklearn.metrics import silhouette_score
 import os
+from pipeline import analizar_correlacion, analizar_clustering
 
 class EDAFrame(ctk.CTkFrame):
     def __init__(self, master, df_cuant=None, df_desc=None):
@@ -266,18 +263,15 @@ class EDAFrame(ctk.CTkFrame):
             df_cuant = pd.read_csv('dataset_cuantitativo.csv')
             self.log(f"✓ Cargado: {df_cuant.shape[0]} filas × {df_cuant.shape[1]} columnas")
             
-            # Calcular matriz de correlación
-            correlation_matrix = df_cuant.corr()
-            
+            # Correlaciones con variable objetivo
+            correlaciones_target = analizar_correlacion(df_cuant)
+
             # Verificar si existe la columna objetivo
-            if 'Enfermedad_Cardiaca' not in df_cuant.columns:
+            if correlaciones_target is None:
                 self.log("\n⚠️ No se encontró la columna 'Enfermedad_Cardiaca'")
                 messagebox.showwarning("Advertencia", "No se encontró la variable objetivo")
                 return
             
-            # Correlaciones con variable objetivo
-            correlaciones_target = correlation_matrix['Enfermedad_Cardiaca'].sort_values(ascending=False)
-            
             self.log("\n📊 Correlaciones con Enfermedad_Cardiaca:")
             self.log("-" * 60)
             
@@ -368,54 +362,28 @@ class EDAFrame(ctk.CTkFrame):
             df_cuant = pd.read_csv('dataset_cuantitativo.csv')
             self.log(f"✓ Cargado: {df_cuant.shape[0]} filas × {df_cuant.shape[1]} columnas")
             
-            # Preparar datos
-            X = df_cuant.drop('Enfermedad_Cardiaca', axis=1)
-            
-            self.log(f"\n📊 Variables utilizadas: {X.shape[1]}")
-            self.log(f"📊 Observaciones: {X.shape[0]}")
-            
-            # Normalizar datos
-            self.log("\n🔧 Normalizando datos...")
-            scaler = StandardScaler()
-            X_scaled = scaler.fit_transform(X)
-            
-            # Determinar K óptimo
+            self.log(f"\n📊 Variables utilizadas: {df_cuant.shape[1] - 1}")
+            self.log(f"📊 Observaciones: {df_cuant.shape[0]}")
+
+            # Normalizar datos y determinar K óptimo
             self.log("\n🎯 Evaluando número óptimo de clusters...")
             self.log("-" * 60)
-            
-            inertias = []
-            silhouette_scores = []
-            K_range = range(2, 11)
-            
-            for k in K_range:
-                kmeans = KMeans(n_clusters=k, random_state=42, n_init=10)
-                kmeans.fit(X_scaled)
-                inertias.append(kmeans.inertia_)
-                sil_score = silhouette_score(X_scaled, kmeans.labels_)
-                silhouette_scores.append(sil_score)
-                self.log(f"K={k}: Inercia={kmeans.inertia_:.2f}, Silueta={sil_score:.3f}")
-            
+
+            resultado = analizar_clustering(df_cuant, log=self.log)
+
             # K óptimo
-            self.k_optimo = K_range[np.argmax(silhouette_scores)]
+            self.k_optimo = resultado['k_optimo']
+            self.clusters = resultado['clusters']
             self.log(f"\n⭐ K óptimo sugerido: {self.k_optimo}")
-            self.log(f"   Mejor índice de Silueta: {max(silhouette_scores):.3f}")
-            
-            # Aplicar K-Means final
-            self.log(f"\n🔄 Aplicando K-Means con K={self.k_optimo}...")
-            kmeans_final = KMeans(n_clusters=self.k_optimo, random_state=42, n_init=10)
-            self.clusters = kmeans_final.fit_predict(X_scaled)
-            
+            self.log(f"   Mejor índice de Silueta: {max(resultado['silhouette_scores']):.3f}")
+
             # Añadir clusters al dataframe
             df_temp = df_cuant.copy()
             df_temp['Cluster'] = self.clusters
-            
+
             # PCA para visualización
-            self.log("\n📉 Reducción dimensional con PCA...")
-            pca = PCA(n_components=2)
-            X_pca = pca.fit_transform(X_scaled)
-            
-            var_exp1 = pca.explained_variance_ratio_[0] * 100
-            var_exp2 = pca.explained_variance_ratio_[1] * 100
+            var_exp1 = resultado['varianza_explicada'][0] * 100
+            var_exp2 = resultado['varianza_explicada'][1] * 100
             
             self.log(f"   PC1 explica: {var_exp1:.2f}%")
             self.log(f"   PC2 explica: {var_exp2:.2f}%")
@@ -543,8 +511,7 @@ class EDAFrame(ctk.CTkFrame):
             
             # Exportar correlaciones
             if 'Enfermedad_Cardiaca' in df_cuant.columns:
-                correlation_matrix = df_cuant.corr()
-                correlaciones_target = correlation_matrix['Enfermedad_Cardiaca'].sort_values(ascending=False)
+                correlaciones_target = analizar_correlacion(df_cuant)
                 correlaciones_target.to_csv('analisis_correlaciones.csv', header=['Correlacion'])
                 archivos_exportados.append('analisis_correlaciones.csv')
                 self.log("\n💾 Correlaciones exportadas: analisis_correlaciones.csv")
@@ -7,13 +7,11 @@ import matplotlib.pyplot as plt
 import seaborn as sns
 from matplotlib.backends.backend_tkagg import FigureCanvasTkAgg
 from matplotlib.figure import Figure
-from sklearn.preprocessing import StandardScaler
-from sklearn.model_selection import train_test_split
-from sklearn.ensemble import RandomForestClassifier
-from sklearn.metrics import classification_report, confusion_matrix, roc_auc_score, roc_curve
+from sklearn.metrics import roc_curve
 import joblib
 import os
 from datetime import datetime
+from pipeline import preparar_datos_modelo, entrenar_modelo
 
 # Intentar importar reportlab para PDF
 try:
@@ -555,80 +553,11 @@ class ModelosFrame(ctk.CTkFrame):
             except:
                 df = pd.read_csv(archivo, sep='\t')
 
-        df.columns = df.columns.str.strip().str.replace(' ', '_')
-
-        # Mapeos
-        map_sino = {'Sí': 1, 'Si': 1, 'YES': 1, 'Yes': 1, True: 1,
-                    'No': 0, 'NO': 0, False: 0, 1: 1, 0: 0}
-
-        if 'Sexo' in df.columns:
-            df['Sexo_Num'] = df['Sexo'].map({'H': 1, 'M': 0, 'Male': 1, 'Female': 0})
-        if 'Enfermedad_Cardiaca' in df.columns:
-            df['Enfermedad_Num'] = df['Enfermedad_Cardiaca'].map(map_sino)
-        if 'Dolor_Inducido_Ejercicio' in df.columns:
-            df['Dolor_Ejercicio_Num'] = df['Dolor_Inducido_Ejercicio'].map(map_sino)
-
-        for col in df.columns:
-            if df[col].dtype == object and df[col].isin(map_sino.keys()).any():
-                df[col] = df[col].map(map_sino)
-
-        return df
+        return preparar_datos_modelo(df)
     
     def crear_modelo_predictivo(self, df):
         """Entrena Random Forest"""
-        feature_cols = [
-            'Edad', 'Sexo_Num', 'Presion_Arterial_Reposo', 'Colesterol',
-            'Glucemia_Ayunas_Mayor_120', 'Frecuencia_Cardiaca_Maxima',
-            'Dolor_Ejercicio_Num', 'DepresionST_Ejercicio',
-            'Vasos_Principales_Color_Fluor'
-        ]
-
-        feature_cols = [col for col in feature_cols if col in df.columns]
-
-        X = df[feature_cols].apply(pd.to_numeric, errors='coerce').fillna(df[feature_cols].median())
-        y = df['Enfermedad_Num']
-
-        X_train, X_test, y_train, y_test = train_test_split(
-            X, y, test_size=0.2, random_state=42, stratify=y)
-
-        scaler = StandardScaler()
-        X_train_scaled = scaler.fit_transform(X_train)
-        X_test_scaled = scaler.transform(X_test)
-
-        modelo = RandomForestClassifier(n_estimators=100, random_state=42, max_depth=10)
-        modelo.fit(X_train_scaled, y_train)
-
-        y_pred = modelo.predict(X_test_scaled)
-        y_pred_proba = modelo.predict_proba(X_test_scaled)[:, 1]
-
-        # Métricas
-        report = classification_report(y_test, y_pred, target_names=['Sin Enfermedad', 'Con Enfermedad'], output_dict=True)
-        auc = roc_auc_score(y_test, y_pred_proba)
-        cm = confusion_matrix(y_test, y_pred)
-        
-        # Importancias
-        importancias = pd.DataFrame({
-            'Factor': feature_cols,
-            'Importancia': modelo.feature_importances_
-        }).sort_values('Importancia', ascending=False)
-
-        # Guardar modelo
-        os.makedirs('modelos', exist_ok=True)
-        joblib.dump(modelo, 'modelos/modelo_rf.joblib')
-        joblib.dump(scaler, 'modelos/scaler.joblib')
-        joblib.dump(feature_cols, 'modelos/feature_cols.joblib')
-
-        return {
-            'modelo': modelo,
-            'scaler': scaler,
-            'feature_cols': feature_cols,
-            'report': report,
-            'auc': auc,
-            'cm': cm,
-            'importancias': importancias,
-            'y_test': y_test,
-            'y_pred_proba': y_pred_proba
-        }
+        return entrenar_modelo(df, dir_modelos='modelos')
     
     def mostrar_resultados_entrenamiento(self, resultados):
         """Muestra resultados del entrenamiento"""
@@ -0,0 +1,479 @@
+# Ejecución sin interfaz (modo batch) del pipeline de Heart Risk System
+#
+# Ejecuta las mismas etapas que la aplicación gráfica
+# (carga → preprocesamiento → EDA → modelo → visualización) como funciones
+# puras, manteniendo los DataFrames en memoria entre etapas y sin importar Tk.
+#
+# Uso:
+#   python src/pipeline.py --input src/data/Heart_disease_cleveland_new.csv --output reportes/
+import os
+import sys
+import json
+import time
+import argparse
+import pandas as pd
+import numpy as np
+from sklearn.preprocessing import StandardScaler
+from sklearn.model_selection import train_test_split
+from sklearn.ensemble import RandomForestClassifier
+from sklearn.cluster import KMeans
+from sklearn.decomposition import PCA
+from sklearn.metrics import classification_report, confusion_matrix, roc_auc_score, silhouette_score
+import joblib
+
+NUEVOS_NOMBRES = {
+    'age': 'Edad',
+    'sex': 'Sexo',
+    'cp': 'Tipo_Dolor_Pecho',
+    'trestbps': 'Presion_Arterial_Reposo',
+    'chol': 'Colesterol',
+    'fbs': 'Glucemia_Ayunas_Mayor_120',
+    'restecg': 'Electrocardiograma_Reposo',
+    'thalach': 'Frecuencia_Cardiaca_Maxima',
+    'exang': 'Dolor_Inducido_Ejercicio',
+    'oldpeak': 'DepresionST_Ejercicio',
+    'slope': 'PendienteST_Ejercicio',
+    'ca': 'Vasos_Principales_Color_Fluor',
+    'thal': 'Talasemia',
+    'target': 'Enfermedad_Cardiaca'
+}
+
+COLS_OUTLIERS = ['Colesterol', 'Presion_Arterial_Reposo', 'DepresionST_Ejercicio']
+
+COLS_NOMINAL = [
+    'Tipo_Dolor_Pecho',
+    'Electrocardiograma_Reposo',
+    'PendienteST_Ejercicio',
+    'Talasemia'
+]
+
+MAPAS_DESCRIPTIVOS = {
+    'Tipo_Dolor_Pecho': {
+        0: 'Asintomático',
+        1: 'Angina Típica',
+        2: 'Angina Atípica',
+        3: 'Dolor No Anginal'
+    },
+    'Electrocardiograma_Reposo': {
+        0: 'Normal',
+        1: 'Anormalidad Onda ST-T',
+        2: 'Hipertrofia Ventricular'
+    },
+    'PendienteST_Ejercicio': {
+        0: 'Ascendente',
+        1: 'Plana',
+        2: 'Descendente'
+    },
+    'Talasemia': {
+        1: 'Normal',
+        2: 'Defecto Fijo',
+        3: 'Defecto Reversible'
+    },
+    'Sexo': {0: 'M', 1: 'H'},
+    'Dolor_Inducido_Ejercicio': {0: 'No', 1: 'Sí'},
+    'Enfermedad_Cardiaca': {0: 'No', 1: 'Sí'},
+    'Glucemia_Ayunas_Mayor_120': {0: 'No', 1: 'Sí'}
+}
+
+MAPA_SINO = {'Sí': 1, 'Si': 1, 'YES': 1, 'Yes': 1, True: 1,
+             'No': 0, 'NO': 0, False: 0, 1: 1, 0: 0}
+
+FEATURE_COLS = [
+    'Edad', 'Sexo_Num', 'Presion_Arterial_Reposo', 'Colesterol',
+    'Glucemia_Ayunas_Mayor_120', 'Frecuencia_Cardiaca_Maxima',
+    'Dolor_Ejercicio_Num', 'DepresionST_Ejercicio',
+    'Vasos_Principales_Color_Fluor'
+]
+
+VARS_CLUSTER = [
+    'Edad', 'Presion_Arterial_Reposo', 'Colesterol',
+    'Frecuencia_Cardiaca_Maxima', 'DepresionST_Ejercicio'
+]
+
+OBJETIVO = 'Enfermedad_Cardiaca'
+
+
+def _sin_log(mensaje):
+    pass
+
+
+# ============================================================
+# ETAPA 1: CARGA
+# ============================================================
+
+def cargar_dataset(ruta):
+    """Carga el CSV de entrada del pipeline"""
+    return pd.read_csv(ruta)
+
+
+# ============================================================
+# ETAPA 2: PREPROCESAMIENTO
+# ============================================================
+
+def winsorizar_iqr(df, columna, factor=1.5):
+    """Recorta los outliers de una columna a los límites IQR (modifica df)"""
+    Q1 = df[columna].quantile(0.25)
+    Q3 = df[columna].quantile(0.75)
+    IQR = Q3 - Q1
+    limite_inferior = Q1 - (factor * IQR)
+    limite_superior = Q3 + (factor * IQR)
+    valores_antes = df[columna].to_numpy()
+    df[columna] = np.clip(valores_antes, limite_inferior, limite_superior)
+    outliers_modificados = int((valores_antes != df[columna].to_numpy()).sum())
+    return df, outliers_modificados
+
+
+def preprocesar_dataset(df, log=None):
+    """Genera los datasets cuantitativo (dummies) y descriptivo (texto) a partir del original"""
+    log = log or _sin_log
+
+    # 1. Renombrar columnas al español
+    log("\n1️⃣ Renombrando columnas al español...")
+    df = df.rename(columns=NUEVOS_NOMBRES)
+    log(f"   ✓ {len(NUEVOS_NOMBRES)} columnas renombradas")
+
+    # 2. Winsorización con método IQR
+    log("\n2️⃣ Aplicando winsorización (método IQR) a outliers...")
+    for col in COLS_OUTLIERS:
+        if col in df.columns:
+            media_antes = df[col].mean()
+            df, n_outliers = winsorizar_iqr(df, col)
+            media_despues = df[col].mean()
+            log(f"   ✓ {col}:")
+            log(f"     - Media antes: {media_antes:.2f} → después: {media_despues:.2f}")
+            log(f"     - Outliers winzorizados: {n_outliers}")
+
+    # 3. Dataset cuantitativo (para modelos ML)
+    log("\n3️⃣ Creando Dataset Cuantitativo (numérico)...")
+    cols_nominal = [c for c in COLS_NOMINAL if c in df.columns]
+    df_cuant = df.copy()
+    for col in cols_nominal:
+        df_cuant[col] = df_cuant[col].astype('category')
+    df_cuant = pd.get_dummies(df_cuant, columns=cols_nominal, drop_first=True)
+    log(f"   ✓ Variables dummy creadas para {len(cols_nominal)} columnas")
+    log(f"   ✓ Dataset cuantitativo: {df_cuant.shape[0]} filas × {df_cuant.shape[1]} columnas")
+    nuevas_cols = set(df_cuant.columns) - set(df.columns)
+    log(f"   ✓ Nuevas columnas dummy: {len(nuevas_cols)}")
+
+    # 4. Dataset descriptivo (texto legible)
+    log("\n4️⃣ Creando Dataset Descriptivo (cualitativo)...")
+    df_desc = df.copy()
+    for col, mapa in MAPAS_DESCRIPTIVOS.items():
+        if col in df_desc.columns:
+            df_desc[col] = df_desc[col].map(mapa)
+            log(f"   ✓ {col} convertido a texto")
+    log(f"   ✓ Dataset descriptivo: {df_desc.shape[0]} filas × {df_desc.shape[1]} columnas")
+
+    return df_cuant, df_desc
+
+
+# ============================================================
+# ETAPA 3: EDA
+# ============================================================
+
+def analizar_correlacion(df_cuant, objetivo=OBJETIVO):
+    """Correlaciones de todas las variables con la variable objetivo (ordenadas)"""
+    if objetivo not in df_cuant.columns:
+        return None
+    correlation_matrix = df_cuant.corr()
+    return correlation_matrix[objetivo].sort_values(ascending=False)
+
+
+def analizar_clustering(df_cuant, k_range=range(2, 11), log=None):
+    """K-Means con K elegido por índice de silueta, más PCA 2D para visualización"""
+    log = log or _sin_log
+
+    X = df_cuant.drop(OBJETIVO, axis=1)
+    X_scaled = StandardScaler().fit_transform(X)
+
+    inertias = []
+    silhouette_scores = []
+    for k in k_range:
+        kmeans = KMeans(n_clusters=k, random_state=42, n_init=10)
+        kmeans.fit(X_scaled)
+        inertias.append(kmeans.inertia_)
+        sil_score = silhouette_score(X_scaled, kmeans.labels_)
+        silhouette_scores.append(sil_score)
+        log(f"K={k}: Inercia={kmeans.inertia_:.2f}, Silueta={sil_score:.3f}")
+
+    k_optimo = k_range[int(np.argmax(silhouette_scores))]
+    kmeans_final = KMeans(n_clusters=k_optimo, random_state=42, n_init=10)
+    clusters = kmeans_final.fit_predict(X_scaled)
+
+    pca = PCA(n_components=2)
+    X_pca = pca.fit_transform(X_scaled)
+
+    return {
+        'k_optimo': k_optimo,
+        'clusters': clusters,
+        'inertias': inertias,
+        'silhouette_scores': silhouette_scores,
+        'X_pca': X_pca,
+        'varianza_explicada': pca.explained_variance_ratio_,
+    }
+
+
+def perfil_clusters(df_cuant, clusters):
+    """Tamaño, prevalencia y medias de las variables clave por cluster"""
+    df_temp = df_cuant.assign(Cluster=clusters)
+    cols = [c for c in VARS_CLUSTER + ['Dolor_Inducido_Ejercicio', 'Glucemia_Ayunas_Mayor_120', OBJETIVO]
+            if c in df_temp.columns]
+    perfil = df_temp.groupby('Cluster')[cols].mean()
+    perfil.insert(0, 'Pacientes', df_temp.groupby('Cluster').size())
+    return perfil
+
+
+# ============================================================
+# ETAPA 4: MODELO PREDICTIVO
+# ============================================================
+
+def preparar_datos_modelo(df):
+    """Convierte el dataset descriptivo en columnas numéricas para el modelo"""
+    df = df.copy()
+    df.columns = df.columns.str.strip().str.replace(' ', '_')
+
+    if 'Sexo' in df.columns:
+        df['Sexo_Num'] = df['Sexo'].map({'H': 1, 'M': 0, 'Male': 1, 'Female': 0})
+    if 'Enfermedad_Cardiaca' in df.columns:
+        df['Enfermedad_Num'] = df['Enfermedad_Cardiaca'].map(MAPA_SINO)
+    if 'Dolor_Inducido_Ejercicio' in df.columns:
+        df['Dolor_Ejercicio_Num'] = df['Dolor_Inducido_Ejercicio'].map(MAPA_SINO)
+
+    for col in df.columns:
+        if df[col].dtype == object and df[col].isin(MAPA_SINO.keys()).any():
+            df[col] = df[col].map(MAPA_SINO)
+
+    return df
+
+
+def entrenar_modelo(df, dir_modelos='modelos'):
+    """Entrena el Random Forest y, si dir_modelos no es None, guarda modelo/scaler/columnas"""
+    feature_cols = [col for col in FEATURE_COLS if col in df.columns]
+
+    X = df[feature_cols].apply(pd.to_numeric, errors='coerce').fillna(df[feature_cols].median())
+    y = df['Enfermedad_Num']
+
+    X_train, X_test, y_train, y_test = train_test_split(
+        X, y, test_size=0.2, random_state=42, stratify=y)
+
+    scaler = StandardScaler()
+    X_train_scaled = scaler.fit_transform(X_train)
+    X_test_scaled = scaler.transform(X_test)
+
+    modelo = RandomForestClassifier(n_estimators=100, random_state=42, max_depth=10)
+    modelo.fit(X_train_scaled, y_train)
+
+    y_pred = modelo.predict(X_test_scaled)
+    y_pred_proba = modelo.predict_proba(X_test_scaled)[:, 1]
+
+    # Métricas
+    report = classification_report(y_test, y_pred, target_names=['Sin Enfermedad', 'Con Enfermedad'], output_dict=True)
+    auc = roc_auc_score(y_test, y_pred_proba)
+    cm = confusion_matrix(y_test, y_pred)
+
+    # Importancias
+    importancias = pd.DataFrame({
+        'Factor': feature_cols,
+        'Importancia': modelo.feature_importances_
+    }).sort_values('Importancia', ascending=False)
+
+    # Guardar modelo
+    if dir_modelos is not None:
+        os.makedirs(dir_modelos, exist_ok=True)
+        joblib.dump(modelo, os.path.join(dir_modelos, 'modelo_rf.joblib'))
+        joblib.dump(scaler, os.path.join(dir_modelos, 'scaler.joblib'))
+        joblib.dump(feature_cols, os.path.join(dir_modelos, 'feature_cols.joblib'))
+
+    return {
+        'modelo': modelo,
+        'scaler': scaler,
+        'feature_cols': feature_cols,
+        'report': report,
+        'auc': auc,
+        'cm': cm,
+        'importancias': importancias,
+        'y_test': y_test,
+        'y_pred_proba': y_pred_proba
+    }
+
+
+# ============================================================
+# ETAPA 5: VISUALIZACIÓN (sin interfaz, backend Agg)
+# ============================================================
+
+def _estilo_ejes(ax, titulo):
+    ax.set_title(titulo, color='white', fontsize=12, fontweight='bold')
+    ax.set_facecolor('#1e1e1e')
+    ax.tick_params(colors='white')
+    ax.spines['bottom'].set_color('white')
+    ax.spines['left'].set_color('white')
+    ax.spines['top'].set_visible(False)
+    ax.spines['right'].set_visible(False)
+
+
+def _guardar_figura(fig, ruta):
+    from matplotlib.backends.backend_agg import FigureCanvasAgg
+    FigureCanvasAgg(fig)
+    fig.tight_layout()
+    fig.savefig(ruta, facecolor=fig.get_facecolor(), dpi=100)
+    return ruta
+
+
+def renderizar_graficos(df_original, df_cuant, correlaciones, destino):
+    """Genera en PNG los gráficos de la vista de visualización y de correlación del EDA"""
+    from matplotlib.figure import Figure
+    import seaborn as sns
+
+    os.makedirs(destino, exist_ok=True)
+    archivos = []
+
+    # Distribuciones
+    fig = Figure(figsize=(12, 8), facecolor='#2b2b2b')
+    cols = [c for c in ['age', 'trestbps', 'chol', 'thalach', 'oldpeak'] if c in df_original.columns]
+    if not cols:
+        cols = list(df_original.select_dtypes(include=[np.number]).columns[:6])
+    n_cols = max(1, min(3, len(cols)))
+    n_rows = max(1, (len(cols) + n_cols - 1) // n_cols)
+    for i, col in enumerate(cols[:6], 1):
+        ax = fig.add_subplot(n_rows, n_cols, i)
+        ax.hist(df_original[col].dropna(), bins=30, color='#0078D7', edgecolor='white', alpha=0.7)
+        _estilo_ejes(ax, col)
+    archivos.append(_guardar_figura(fig, os.path.join(destino, 'distribuciones.png')))
+
+    # Matriz de correlación (primeras 15 columnas numéricas)
+    numeric_df = df_cuant.select_dtypes(include=[np.number])
+    if len(numeric_df.columns) > 15:
+        numeric_df = numeric_df.iloc[:, :15]
+    fig = Figure(figsize=(12, 10), facecolor='#2b2b2b')
+    ax = fig.add_subplot(111)
+    sns.heatmap(numeric_df.corr(), annot=True, fmt='.2f', cmap='coolwarm', center=0,
+                square=True, linewidths=1, cbar_kws={"shrink": 0.8}, ax=ax, annot_kws={'size': 8})
+    ax.set_title('Correlación entre Variables', color='white', fontsize=14, fontweight='bold', pad=20)
+    ax.tick_params(colors='white')
+    archivos.append(_guardar_figura(fig, os.path.join(destino, 'matriz_correlacion.png')))
+
+    # Correlaciones con la variable objetivo (top 16)
+    if correlaciones is not None:
+        correlaciones_sorted = correlaciones.drop(OBJETIVO).sort_values()
+        top = pd.concat([correlaciones_sorted.head(8), correlaciones_sorted.tail(8)])
+        top = top[~top.index.duplicated()].sort_values()
+        fig = Figure(figsize=(9, 7), facecolor='#2b2b2b')
+        ax = fig.add_subplot(111)
+        colors = ['#FF4444' if x < 0 else '#00AA00' for x in top]
+        y_pos = np.arange(len(top))
+        ax.barh(y_pos, top.values, color=colors, alpha=0.85, edgecolor='white', linewidth=1.5)
+        ax.set_yticks(y_pos)
+        ax.set_yticklabels(top.index, fontsize=9)
+        ax.axvline(x=0, color='white', linestyle='-', linewidth=2)
+        _estilo_ejes(ax, 'Correlaciones con Enfermedad Cardíaca')
+        archivos.append(_guardar_figura(fig, os.path.join(destino, 'correlaciones_objetivo.png')))
+
+    # Variable objetivo
+    target_col = next((c for c in ['target', 'num', 'disease'] if c in df_original.columns), None)
+    if target_col is not None:
+        counts = df_original[target_col].value_counts()
+        fig = Figure(figsize=(6, 5), facecolor='#2b2b2b')
+        ax = fig.add_subplot(111)
+        ax.bar(counts.index.astype(str), counts.values,
+               color=['#00AA00', '#FF4444'][:len(counts)], alpha=0.7, edgecolor='white')
+        _estilo_ejes(ax, 'Distribución de Casos')
+        archivos.append(_guardar_figura(fig, os.path.join(destino, 'analisis_target.png')))
+
+    return archivos
+
+
+# ============================================================
+# ORQUESTACIÓN
+# ============================================================
+
+def ejecutar_pipeline(ruta_entrada, dir_salida='reportes', dir_modelos='modelos',
+                      guardar_csv=False, graficos=True, k_range=range(2, 11), log=print):
+    """Ejecuta todas las etapas en un solo proceso y devuelve resultados y tiempos por etapa"""
+    log = log or _sin_log
+    os.makedirs(dir_salida, exist_ok=True)
+    tiempos = {}
+    resultados = {}
+
+    def etapa(nombre, funcion, *args, **kwargs):
+        inicio = time.perf_counter()
+        valor = funcion(*args, **kwargs)
+        tiempos[nombre] = time.perf_counter() - inicio
+        log(f"⏱️ {nombre}: {tiempos[nombre]:.3f} s")
+        return valor
+
+    df_original = etapa('carga', cargar_dataset, ruta_entrada)
+    df_cuant, df_desc = etapa('preprocesamiento', preprocesar_dataset, df_original)
+
+    if guardar_csv:
+        etapa('guardar_csv', _guardar_intermedios, df_cuant, df_desc, dir_salida)
+
+    correlaciones = etapa('eda_correlacion', analizar_correlacion, df_cuant)
+    if correlaciones is not None:
+        resultados['correlaciones'] = correlaciones
+        correlaciones.to_csv(os.path.join(dir_salida, 'analisis_correlaciones.csv'), header=['Correlacion'])
+
+    if OBJETIVO in df_cuant.columns:
+        clustering = etapa('eda_clustering', analizar_clustering, df_cuant, k_range)
+        resultados['clustering'] = clustering
+        resultados['perfil_clusters'] = perfil_clusters(df_cuant, clustering['clusters'])
+        resultados['perfil_clusters'].to_csv(os.path.join(dir_salida, 'perfil_clusters.csv'))
+
+        df_modelo = etapa('preparar_modelo', preparar_datos_modelo, df_desc)
+        modelo = etapa('entrenamiento', entrenar_modelo, df_modelo, dir_modelos)
+        resultados['modelo'] = modelo
+        log(f"   AUC: {modelo['auc']:.3f}  |  Accuracy: {modelo['report']['accuracy']:.3f}")
+
+    if graficos:
+        resultados['graficos'] = etapa('visualizacion', renderizar_graficos,
+                                       df_original, df_cuant, correlaciones,
+                                       os.path.join(dir_salida, 'graficos'))
+
+    tiempos['total'] = sum(tiempos.values())
+    with open(os.path.join(dir_salida, 'tiempos_pipeline.json'), 'w', encoding='utf-8') as f:
+        json.dump(tiempos, f, indent=2)
+
+    resultados['tiempos'] = tiempos
+    resultados['df_cuantitativo'] = df_cuant
+    resultados['df_descriptivo'] = df_desc
+    return resultados
+
+
+def _guardar_intermedios(df_cuant, df_desc, dir_salida):
+    df_cuant.to_csv(os.path.join(dir_salida, 'dataset_cuantitativo.csv'), index=False, encoding='utf-8')
+    df_desc.to_csv(os.path.join(dir_salida, 'dataset_descriptivo.csv'), index=False, encoding='utf-8')
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Heart Risk System - pipeline sin interfaz")
+    parser.add_argument('--input', required=True, help="CSV de entrada (formato Cleveland)")
+    parser.add_argument('--output', default='reportes', help="Carpeta de salida para resultados")
+    parser.add_argument('--modelos', default='modelos', help="Carpeta donde guardar el modelo entrenado")
+    parser.add_argument('--guardar-csv', action='store_true', help="Guardar también los datasets intermedios")
+    parser.add_argument('--sin-graficos', action='store_true', help="Omitir la etapa de visualización")
+    args = parser.parse_args(argv)
+
+    import matplotlib
+    matplotlib.use('Agg')
+
+    try:
+        resultados = ejecutar_pipeline(
+            args.input,
+            dir_salida=args.output,
+            dir_modelos=args.modelos,
+            guardar_csv=args.guardar_csv,
+            graficos=not args.sin_graficos
+        )
+    except Exception as e:
+        print(f"❌ Error en el pipeline: {e}")
+        return 1
+
+    print("\n" + "=" * 50)
+    print("⏱️ TIEMPOS POR ETAPA")
+    print("=" * 50)
+    for nombre, segundos in resultados['tiempos'].items():
+        print(f"  {nombre:20s}: {segundos:8.3f} s")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
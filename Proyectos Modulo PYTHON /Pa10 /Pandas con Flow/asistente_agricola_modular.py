@@ -65,6 +65,14 @@ class AsistenteAgricola:
         
         # Actualizar clima inicial
         self.root.after(1000, self.clima_manager.actualizar_interfaz_clima)
+        
+        # Cerrar la ventana detiene también los hilos del clima
+        self.root.protocol("WM_DELETE_WINDOW", self.salir)
+    
+    def salir(self):
+        """Detiene los servicios en segundo plano y cierra la aplicación"""
+        self.clima_manager.cerrar()
+        self.root.destroy()
     
     def _inicializar_managers(self):
         """Inicializa todos los managers del sistema"""
@@ -72,7 +80,10 @@ class AsistenteAgricola:
         self.datos_manager = DatosManager()
         
         # Manager de gráficos  
-        self.graficos_manager = GraficosManager(self.datos_manager.df)
+        self.graficos_manager = GraficosManager(
+            self.datos_manager.df,
+            similitud=self.datos_manager.similitud
+        )
         
         # Manager de clima
         self.clima_manager = ClimaManager(
@@ -99,7 +110,7 @@ class AsistenteAgricola:
         menu_archivo.add_command(label="Recargar Dataset", command=self._recargar_dataset)
         menu_archivo.add_command(label="Exportar Datos Completos", command=self._exportar_datos)
         menu_archivo.add_separator()
-        menu_archivo.add_command(label="Salir", command=self.root.quit)
+        menu_archivo.add_command(label="Salir", command=self.salir)
         
         # Menú Cultivos
         menu_cultivos = tk.Menu(menubar, tearoff=0)
@@ -404,6 +415,14 @@ def main():
             print("   Asegúrese de que el archivo está en la misma carpeta que el programa")
             return
         
+        # Modo sin ventana: exportar todos los gráficos a PNG y salir
+        if len(sys.argv) > 1 and sys.argv[1] == "--exportar-graficos":
+            from modulos.graficos import exportar_lote_graficos
+            destino = sys.argv[2] if len(sys.argv) > 2 else "graficos_exportados"
+            archivos = exportar_lote_graficos(DatosManager().df, destino)
+            print(f"{len(archivos)} gráficos guardados en: {destino}")
+            return
+        
         root = tk.Tk()
         
         try:
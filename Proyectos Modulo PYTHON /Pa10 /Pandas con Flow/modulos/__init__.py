@@ -5,10 +5,16 @@ from .datos import DatosManager
 from .graficos import GraficosManager
 from .clima import ClimaManager
 from .interfaz import InterfazManager
+from .similitud import SimilitudCultivos
+from .consultas import ConsultaCultivos
+from .servicio_clima import ServicioClima
 
 __all__ = [
     'DatosManager',
     'GraficosManager', 
     'ClimaManager',
-    'InterfazManager'
+    'InterfazManager',
+    'SimilitudCultivos',
+    'ConsultaCultivos',
+    'ServicioClima'
 ]
\ No newline at end of file
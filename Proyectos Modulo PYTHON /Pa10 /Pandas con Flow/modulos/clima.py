@@ -1,15 +1,16 @@
-import requests
 import json
 import os
+import queue
 import tkinter as tk
 from tkinter import messagebox, scrolledtext
 from datetime import datetime
+from .servicio_clima import ServicioClima, BackendOpenWeather, BackendGrabado
 
 
 class ClimaManager:
     """Clase para manejar todas las funciones relacionadas con el clima"""
     
-    def __init__(self, api_key=None, ubicacion_actual='Panama City', barra_estado=None):
+    def __init__(self, api_key=None, ubicacion_actual='Panama City', barra_estado=None, backend=None, ttl=600):
         self.api_key = api_key or os.getenv('OPENWEATHER_API_KEY', '')
         self.ubicacion_actual = ubicacion_actual
         self.barra_estado = barra_estado
@@ -17,6 +18,22 @@ class ClimaManager:
         # Configuración de la API
         self.base_url = "http://api.openweathermap.org/data/2.5/weather"
         
+        # Backend de datos: API real, o respuestas grabadas si CLIMA_FIXTURE apunta a un JSON
+        grabador = None
+        if backend is None:
+            fixture = os.getenv('CLIMA_FIXTURE', '')
+            if fixture:
+                backend = BackendGrabado(fixture)
+            else:
+                backend = BackendOpenWeather(lambda: self.api_key, self.base_url)
+                if os.getenv('CLIMA_GRABACION', ''):
+                    grabador = BackendGrabado(os.getenv('CLIMA_GRABACION'))
+        self.servicio = ServicioClima(backend, ttl=ttl, grabador=grabador)
+        
+        # Resultados de los hilos de consulta pendientes de mostrar en Tk
+        self._cola_ui = queue.Queue()
+        self._widget_ui = None
+        
         # Elementos de interfaz para clima
         self.label_ubicacion = None
         self.label_temperatura = None
@@ -29,6 +46,47 @@ class ClimaManager:
         self.label_temperatura = label_temperatura  
         self.label_humedad = label_humedad
         self.label_clima_desc = label_clima_desc
+        
+        # Renovar el clima en segundo plano antes de que venza la caché
+        self._iniciar_cola_ui(label_ubicacion)
+        self.servicio.iniciar_refresco(
+            lambda: [] if self._falta_api_key() else [self.ubicacion_actual],
+            lambda ubicacion, clima: self._publicar(self._mostrar_clima, clima)
+        )
+    
+    def cerrar(self):
+        """Detiene el refresco en segundo plano y los hilos del servicio"""
+        self.servicio.detener()
+    
+    def _falta_api_key(self):
+        return getattr(self.servicio.backend, 'requiere_api_key', False) and not self.api_key
+    
+    def _iniciar_cola_ui(self, widget):
+        """Empieza a revisar periódicamente (desde Tk) los resultados de los hilos"""
+        if self._widget_ui is None and widget is not None:
+            self._widget_ui = widget
+            widget.after(200, self._procesar_cola_ui)
+    
+    def _publicar(self, funcion, *args):
+        """Encola una actualización de interfaz; se ejecutará en el hilo de Tk"""
+        self._cola_ui.put((funcion, args))
+    
+    def _procesar_cola_ui(self):
+        while True:
+            try:
+                funcion, args = self._cola_ui.get_nowait()
+            except queue.Empty:
+                break
+            try:
+                funcion(*args)
+            except tk.TclError:
+                pass  # La ventana destino se cerró antes de recibir el resultado
+            except Exception as e:
+                print(f"Error actualizando interfaz clima: {e}")
+        try:
+            self._widget_ui.after(200, self._procesar_cola_ui)
+        except tk.TclError:
+            self._widget_ui = None  # La ventana principal se cerró
     
     def configurar_api(self, root):
         """Permite configurar la API key de OpenWeatherMap"""
@@ -47,6 +105,7 @@ class ClimaManager:
             nueva_api = entrada_api.get().strip()
             if nueva_api:
                 self.api_key = nueva_api
+                self.servicio.invalidar()
                 try:
                     with open('.env', 'w') as f:
                         f.write(f'OPENWEATHER_API_KEY={nueva_api}\n')
@@ -85,6 +144,7 @@ class ClimaManager:
                 self.ubicacion_actual = nueva_ubicacion
                 if self.label_ubicacion:
                     self.label_ubicacion.config(text=f"Ubicación: {nueva_ubicacion}")
+                self.actualizar_interfaz_clima()
                 messagebox.showinfo("Éxito", f"Ubicación cambiada a: {nueva_ubicacion}")
                 ventana_ubicacion.destroy()
                 if self.barra_estado:
@@ -95,57 +155,39 @@ class ClimaManager:
         tk.Button(ventana_ubicacion, text="Cambiar", command=guardar_ubicacion,
                  bg="blue", fg="white", font=("Arial", 12)).pack(pady=10)
     
-    def obtener_clima_actual(self):
-        """Obtiene información del clima actual desde la API"""
-        if not self.api_key:
+    def obtener_clima_actual(self, ubicacion=None):
+        """Obtiene información del clima actual (bloqueante; la interfaz usa solicitar_clima)"""
+        if self._falta_api_key():
             if self.barra_estado:
                 self.barra_estado.config(text="Configure la API key primero")
             return None
         
-        try:
-            # Parámetros para la API
-            params = {
-                'q': self.ubicacion_actual,
-                'appid': self.api_key,
-                'units': 'metric',
-                'lang': 'es'
-            }
-            
-            # Realizar solicitud
-            response = requests.get(self.base_url, params=params, timeout=10)
-            
-            if response.status_code == 200:
-                data = response.json()
-                
-                clima_info = {
-                    'temperatura': data['main']['temp'],
-                    'humedad': data['main']['humidity'],
-                    'descripcion': data['weather'][0]['description'],
-                    'sensacion': data['main']['feels_like'],
-                    'presion': data['main']['pressure'],
-                    'viento': data['wind']['speed'] if 'wind' in data else 0,
-                    'ubicacion': data['name'],
-                    'pais': data['sys']['country']
-                }
-                
-                return clima_info
-                
-            else:
-                print(f"Error en API: {response.status_code}")
-                return None
-                
-        except requests.exceptions.RequestException as e:
-            print(f"Error de conexión: {e}")
-            return None
-        except Exception as e:
-            print(f"Error procesando clima: {e}")
-            return None
+        return self.servicio.obtener(ubicacion or self.ubicacion_actual)
+    
+    def solicitar_clima(self, ubicacion, al_recibir, widget):
+        """Pide el clima en segundo plano y llama a al_recibir(clima) en el hilo de Tk"""
+        self._iniciar_cola_ui(widget)
+        self.servicio.solicitar(ubicacion, callback=lambda clima: self._publicar(al_recibir, clima))
     
     def actualizar_interfaz_clima(self):
-        """Actualiza la interfaz con información del clima actual"""
+        """Actualiza la interfaz con información del clima actual (sin bloquear la ventana)"""
+        if self._falta_api_key():
+            if self.barra_estado:
+                self.barra_estado.config(text="Configure la API key primero")
+            self._mostrar_clima(None)
+            return
+        
+        widget = self.label_ubicacion or self.barra_estado
+        if widget is None:
+            return
+        
+        if self.barra_estado and self.servicio.leer_cache(self.ubicacion_actual) is None:
+            self.barra_estado.config(text="Actualizando clima...")
+        self.solicitar_clima(self.ubicacion_actual, self._mostrar_clima, widget)
+    
+    def _mostrar_clima(self, clima):
+        """Muestra en los labels el clima recibido (se ejecuta en el hilo de Tk)"""
         try:
-            clima = self.obtener_clima_actual()
-            
             if clima and all([self.label_ubicacion, self.label_temperatura, 
                             self.label_humedad, self.label_clima_desc]):
                 
@@ -169,7 +211,7 @@ class ClimaManager:
                 if self.label_clima_desc:
                     self.label_clima_desc.config(text="Condiciones: Sin conexión")
                 
-                if self.barra_estado:
+                if self.barra_estado and not self._falta_api_key():
                     self.barra_estado.config(text="Error al obtener clima")
                 
                 return None
@@ -182,7 +224,7 @@ class ClimaManager:
     
     def verificar_clima_cultivo(self, cultivo_actual, root):
         """Verifica si el clima actual es adecuado para el cultivo seleccionado"""
-        if cultivo_actual is None or not self.api_key:
+        if cultivo_actual is None or self._falta_api_key():
             messagebox.showwarning("Advertencia", "Seleccione un cultivo y configure la API")
             return
         
@@ -193,14 +235,18 @@ class ClimaManager:
         texto_clima = scrolledtext.ScrolledText(ventana_clima, font=("Arial", 10))
         texto_clima.pack(fill=tk.BOTH, expand=True, padx=10, pady=10)
         
-        # Obtener clima actual
-        clima = self.obtener_clima_actual()
+        texto_clima.insert(tk.END, "Consultando clima actual...")
+        
+        def mostrar_analisis(clima):
+            texto_clima.delete(1.0, tk.END)
+            if clima:
+                analisis = self._analizar_compatibilidad_clima(cultivo_actual, clima)
+                texto_clima.insert(tk.END, analisis)
+            else:
+                texto_clima.insert(tk.END, "No se pudo obtener información del clima actual.\nVerifique su conexión a internet y la configuración de la API.")
         
-        if clima:
-            analisis = self._analizar_compatibilidad_clima(cultivo_actual, clima)
-            texto_clima.insert(tk.END, analisis)
-        else:
-            texto_clima.insert(tk.END, "No se pudo obtener información del clima actual.\nVerifique su conexión a internet y la configuración de la API.")
+        # Obtener clima actual en segundo plano
+        self.solicitar_clima(self.ubicacion_actual, mostrar_analisis, root)
     
     def _analizar_compatibilidad_clima(self, cultivo, clima):
         """Analiza la compatibilidad entre el clima actual y las necesidades del cultivo"""
@@ -306,16 +352,16 @@ para decisiones de cultivo importantes.
                 messagebox.showwarning("Advertencia", "Ingrese el nombre de una ciudad")
                 return
             
-            # Temporalmente cambiar ubicación
-            ubicacion_original = self.ubicacion_actual
-            self.ubicacion_actual = ciudad
-            
-            clima = self.obtener_clima_actual()
-            
-            # Restaurar ubicación original
-            self.ubicacion_actual = ubicacion_original
+            if self._falta_api_key():
+                messagebox.showwarning("Advertencia", "Configure la API key primero")
+                return
             
             resultado_texto.delete(1.0, tk.END)
+            resultado_texto.insert(tk.END, f"Consultando clima de {ciudad}...")
+            self.solicitar_clima(ciudad, lambda clima: mostrar_resultado(ciudad, clima), root)
+        
+        def mostrar_resultado(ciudad, clima):
+            resultado_texto.delete(1.0, tk.END)
             
             if clima:
                 info_clima = f"""
@@ -0,0 +1,107 @@
+import numpy as np
+import pandas as pd
+
+
+class ConsultaCultivos:
+    """Clase con índices sobre el dataset para responder búsquedas sin recorrer todas las filas"""
+
+    def __init__(self, df):
+        self.actualizar(df)
+
+    # ------------------------------------------------------------
+    # Construcción de índices
+    # ------------------------------------------------------------
+
+    @staticmethod
+    def normalizar(texto):
+        """Clave de búsqueda: sin espacios en los extremos y en minúsculas"""
+        return str(texto).strip().lower()
+
+    @classmethod
+    def _indexar_texto(cls, serie):
+        """Crea un índice hash {valor normalizado: posiciones ordenadas}"""
+        claves = serie.astype(str).str.strip().str.lower().reset_index(drop=True)
+        return {clave: np.asarray(pos, dtype=np.int64) for clave, pos in claves.groupby(claves).indices.items()}
+
+    def actualizar(self, df):
+        """Reconstruye los índices (llamar cada vez que se recarga el dataset)"""
+        self.df = df if df is not None else pd.DataFrame()
+        self.total = len(self.df)
+
+        if self.df.empty or 'cultivo' not in self.df.columns:
+            self.por_nombre = {}
+            self.por_temporada = {}
+            self.por_lluvia = {}
+            self._rendimientos = np.empty(0)
+            self._posiciones_rendimiento = np.empty(0, dtype=np.int64)
+            return
+
+        # Si hay nombres repetidos se conserva la primera aparición, como antes
+        self.por_nombre = {clave: int(pos[0]) for clave, pos in self._indexar_texto(self.df['cultivo']).items()}
+        self.por_temporada = self._indexar_texto(self.df['temporada_siembra'])
+        self.por_lluvia = self._indexar_texto(self.df['lluvia'])
+
+        # Índice ordenado de rendimientos para consultas por rango (sin los NaN)
+        rendimientos = self.df['rendimiento_numerico'].to_numpy(dtype=float)
+        validos = np.flatnonzero(~np.isnan(rendimientos))
+        orden = np.argsort(rendimientos[validos], kind='stable')
+        self._rendimientos = rendimientos[validos][orden]
+        self._posiciones_rendimiento = validos[orden]
+
+    # ------------------------------------------------------------
+    # Consultas
+    # ------------------------------------------------------------
+
+    def _rango_rendimiento(self, minimo=None, maximo=None):
+        inicio = 0 if minimo is None else np.searchsorted(self._rendimientos, minimo, side='left')
+        fin = len(self._rendimientos) if maximo is None else np.searchsorted(self._rendimientos, maximo, side='right')
+        return np.sort(self._posiciones_rendimiento[inicio:fin])
+
+    def posiciones(self, nombre=None, temporada=None, lluvia=None, min_rendimiento=None, max_rendimiento=None):
+        """Devuelve las posiciones de las filas que cumplen todos los criterios indicados
+
+        Cada criterio se resuelve con su índice y el resultado es la
+        intersección de los conjuntos, empezando por el más pequeño.
+        Devuelve None si no se indicó ningún criterio.
+        """
+        vacio = np.empty(0, dtype=np.int64)
+        conjuntos = []
+
+        if nombre:
+            pos = self.por_nombre.get(self.normalizar(nombre))
+            conjuntos.append(vacio if pos is None else np.array([pos], dtype=np.int64))
+        if temporada:
+            conjuntos.append(self.por_temporada.get(self.normalizar(temporada), vacio))
+        if lluvia:
+            conjuntos.append(self.por_lluvia.get(self.normalizar(lluvia), vacio))
+        if min_rendimiento is not None or max_rendimiento is not None:
+            conjuntos.append(self._rango_rendimiento(min_rendimiento, max_rendimiento))
+
+        if not conjuntos:
+            return None
+
+        conjuntos.sort(key=len)
+        resultado = conjuntos[0]
+        for conjunto in conjuntos[1:]:
+            if len(resultado) == 0:
+                break
+            resultado = np.intersect1d(resultado, conjunto, assume_unique=True)
+        return resultado
+
+    def consultar(self, **criterios):
+        """Filtra el dataset combinando criterios (temporada, lluvia, rango de rendimiento...)
+
+        Sin criterios devuelve el DataFrame original; en otro caso solo se
+        toman las filas seleccionadas, sin copiar el dataset completo.
+        """
+        posiciones = self.posiciones(**criterios)
+        if posiciones is None:
+            return self.df
+        return self.df.iloc[posiciones]
+
+    def buscar(self, nombre):
+        """Devuelve la fila del cultivo (sin distinguir mayúsculas) o None"""
+        if not nombre:
+            return None
+        pos = self.por_nombre.get(self.normalizar(nombre))
+        return None if pos is None else self.df.iloc[pos]
@@ -4,20 +4,102 @@ import tkinter as tk
 from tkinter import messagebox, scrolledtext, ttk
 from datetime import datetime
 import os
+import pickle
+import re
+from .similitud import SimilitudCultivos
+from .consultas import ConsultaCultivos
 
 
 class DatosManager:
     """Clase para manejar todas las operaciones de datos"""
     
-    def __init__(self, archivo_csv="dataset_cultivos_panama.csv", barra_estado=None):
+    # Columnas numéricas que cargar_dataset agrega a partir de los textos del CSV
+    COLUMNAS_DERIVADAS = ['rendimiento_numerico', 'cosecha_min', 'cosecha_max',
+                          'temperatura_min', 'temperatura_max']
+    ORDEN_LLUVIA = ['Baja', 'Media', 'Alta']
+    
+    # Cambiar al modificar preparar_modelo para invalidar las cachés existentes
+    VERSION_MODELO = 1
+    
+    def __init__(self, archivo_csv="dataset_cultivos_panama.csv", barra_estado=None, usar_cache=True):
         self.archivo_csv = archivo_csv
         self.barra_estado = barra_estado
+        self.usar_cache = usar_cache
         self.df = self.cargar_dataset()
+        self.consultas = ConsultaCultivos(self.df)
+        self.similitud = SimilitudCultivos(self.df)
+    
+    @classmethod
+    def preparar_modelo(cls, df):
+        """Convierte los textos del CSV en columnas tipadas (una sola vez por carga)
+        
+        Agrega rendimiento_numerico ('3.8 t/ha' -> 3.8), cosecha_min/cosecha_max en
+        meses ('4-5 meses' -> 4, 5; '2-3 años' -> 24, 36) y temperatura_min/temperatura_max
+        ('20-30 °C' -> 20, 30). Temporada y lluvia pasan a ser categóricas.
+        """
+        df = df.copy()
+        
+        df['rendimiento_numerico'] = pd.to_numeric(
+            df['rendimiento_promedio'].astype(str).str.extract(r'^\s*(\d+(?:\.\d+)?)', expand=False),
+            errors='coerce')
+        
+        cosecha = df['tiempo_cosecha'].astype(str).str.extract(
+            r'^\s*(\d+)(?:\s*-\s*(\d+))?\s*(mes|a[ñn]o)?', flags=re.IGNORECASE)
+        factor = np.where(cosecha[2].fillna('').str.lower().str.startswith('a'), 12, 1)
+        minimo = pd.to_numeric(cosecha[0], errors='coerce')
+        maximo = pd.to_numeric(cosecha[1], errors='coerce').fillna(minimo)
+        df['cosecha_min'] = (minimo * factor).astype('Int64')
+        df['cosecha_max'] = (maximo * factor).astype('Int64')
+        
+        temperatura = df['temperatura_ideal'].astype(str).str.extract(
+            r'^\s*(\d+(?:\.\d+)?)(?:\s*-\s*(\d+(?:\.\d+)?))?')
+        df['temperatura_min'] = pd.to_numeric(temperatura[0], errors='coerce')
+        df['temperatura_max'] = pd.to_numeric(temperatura[1], errors='coerce').fillna(df['temperatura_min'])
+        
+        df['temporada_siembra'] = df['temporada_siembra'].astype('category')
+        presentes = set(df['lluvia'].dropna().astype(str))
+        niveles = [n for n in cls.ORDEN_LLUVIA if n in presentes] + sorted(presentes - set(cls.ORDEN_LLUVIA))
+        df['lluvia'] = pd.Categorical(df['lluvia'], categories=niveles, ordered=True)
+        
+        return df
+    
+    def _ruta_cache(self):
+        return os.path.splitext(self.archivo_csv)[0] + ".cache.pkl"
+    
+    def _firma_csv(self):
+        """Identifica la versión del CSV (si cambia, la caché deja de ser válida)"""
+        info = os.stat(self.archivo_csv)
+        return (info.st_mtime_ns, info.st_size, self.VERSION_MODELO)
+    
+    def _leer_cache(self):
+        """Devuelve el modelo guardado si corresponde al CSV actual, o None"""
+        if not self.usar_cache:
+            return None
+        try:
+            with open(self._ruta_cache(), 'rb') as f:
+                contenido = pickle.load(f)
+            if contenido.get('firma') == self._firma_csv():
+                return contenido['df']
+        except Exception:
+            pass
+        return None
+    
+    def _guardar_cache(self, df):
+        if not self.usar_cache:
+            return
+        try:
+            with open(self._ruta_cache(), 'wb') as f:
+                pickle.dump({'firma': self._firma_csv(), 'df': df}, f, protocol=pickle.HIGHEST_PROTOCOL)
+        except Exception as e:
+            print(f"No se pudo guardar la caché del dataset: {e}")
     
     def cargar_dataset(self):
-        """Carga el dataset de cultivos desde el CSV"""
+        """Carga el dataset de cultivos (desde la caché binaria si sigue vigente)"""
         try:
-            df = pd.read_csv(self.archivo_csv)
+            df = self._leer_cache()
+            if df is None:
+                df = self.preparar_modelo(pd.read_csv(self.archivo_csv))
+                self._guardar_cache(df)
             print(f"Dataset cargado: {len(df)} cultivos disponibles")
             if self.barra_estado:
                 self.barra_estado.config(text=f"Dataset cargado: {len(df)} cultivos")
@@ -31,6 +113,8 @@ class DatosManager:
     def recargar_dataset(self):
         """Recarga el dataset desde el archivo"""
         self.df = self.cargar_dataset()
+        self.consultas.actualizar(self.df)
+        self.similitud.actualizar(self.df)
         return self.df
     
     def buscar_cultivo(self, nombre_cultivo):
@@ -38,13 +122,8 @@ class DatosManager:
         if not nombre_cultivo:
             return None
         
-        # Buscar en el dataframe (case insensitive)
-        resultado = self.df[self.df['cultivo'].str.lower() == nombre_cultivo.lower()]
-        
-        if not resultado.empty:
-            return resultado.iloc[0]
-        else:
-            return None
+        # Búsqueda en el índice de nombres (case insensitive)
+        return self.consultas.buscar(nombre_cultivo)
     
     def obtener_lista_cultivos(self):
         """Obtiene la lista completa de cultivos disponibles"""
@@ -54,67 +133,36 @@ class DatosManager:
     
     def filtrar_por_temporada(self, temporada):
         """Filtra cultivos por temporada de siembra"""
-        if not temporada:
-            return self.df
-        
-        return self.df[self.df['temporada_siembra'].str.lower() == temporada.lower()]
+        return self.consultas.consultar(temporada=temporada)
     
     def filtrar_por_lluvia(self, nivel_lluvia):
         """Filtra cultivos por nivel de lluvia requerido"""
-        if not nivel_lluvia:
-            return self.df
-        
-        return self.df[self.df['lluvia'].str.lower() == nivel_lluvia.lower()]
+        return self.consultas.consultar(lluvia=nivel_lluvia)
     
     def filtrar_por_rendimiento(self, min_rendimiento=None, max_rendimiento=None):
         """Filtra cultivos por rango de rendimiento"""
-        df_filtrado = self.df.copy()
-        
-        # Agregar columna numérica de rendimiento si no existe
-        if 'rendimiento_numerico' not in df_filtrado.columns:
-            df_filtrado['rendimiento_numerico'] = df_filtrado['rendimiento_promedio'].apply(
-                lambda x: self._extraer_valor_numerico(x)
-            )
-        
-        if min_rendimiento is not None:
-            df_filtrado = df_filtrado[df_filtrado['rendimiento_numerico'] >= min_rendimiento]
-        
-        if max_rendimiento is not None:
-            df_filtrado = df_filtrado[df_filtrado['rendimiento_numerico'] <= max_rendimiento]
-        
-        return df_filtrado
+        return self.consultas.consultar(min_rendimiento=min_rendimiento, max_rendimiento=max_rendimiento)
     
-    def _extraer_valor_numerico(self, texto):
-        """Extrae el valor numérico de un texto (ej: '25.0 t/ha' -> 25.0)"""
-        try:
-            return float(str(texto).split()[0])
-        except:
-            return 0.0
+    def filtrar(self, temporada=None, lluvia=None, min_rendimiento=None, max_rendimiento=None):
+        """Filtra cultivos combinando criterios (ej: temporada Y lluvia Y rango de rendimiento)"""
+        return self.consultas.consultar(temporada=temporada, lluvia=lluvia,
+                                        min_rendimiento=min_rendimiento, max_rendimiento=max_rendimiento)
     
     def obtener_estadisticas_generales(self):
         """Calcula estadísticas generales del dataset"""
         try:
-            # Preparar datos numéricos
-            rendimientos = []
-            tiempos = []
-            
-            for _, fila in self.df.iterrows():
-                try:
-                    rend = self._extraer_valor_numerico(fila['rendimiento_promedio'])
-                    tiempo = int(fila['tiempo_cosecha'].split('-')[0])
-                    rendimientos.append(rend)
-                    tiempos.append(tiempo)
-                except:
-                    continue
+            # Columnas ya tipadas por cargar_dataset
+            rendimientos = self.df['rendimiento_numerico'].dropna()
+            tiempos = self.df['cosecha_min'].dropna()
             
             stats = {
                 'total_cultivos': len(self.df),
-                'rendimiento_promedio': np.mean(rendimientos) if rendimientos else 0,
-                'rendimiento_max': np.max(rendimientos) if rendimientos else 0,
-                'rendimiento_min': np.min(rendimientos) if rendimientos else 0,
-                'tiempo_promedio': np.mean(tiempos) if tiempos else 0,
-                'tiempo_max': np.max(tiempos) if tiempos else 0,
-                'tiempo_min': np.min(tiempos) if tiempos else 0,
+                'rendimiento_promedio': rendimientos.mean() if len(rendimientos) else 0,
+                'rendimiento_max': rendimientos.max() if len(rendimientos) else 0,
+                'rendimiento_min': rendimientos.min() if len(rendimientos) else 0,
+                'tiempo_promedio': tiempos.mean() if len(tiempos) else 0,
+                'tiempo_max': int(tiempos.max()) if len(tiempos) else 0,
+                'tiempo_min': int(tiempos.min()) if len(tiempos) else 0,
             }
             
             # Estadísticas por categorías
@@ -153,8 +201,8 @@ class DatosManager:
         combo_lluvia.set("Todas")
         combo_lluvia.grid(row=0, column=3, padx=5, pady=5)
         
-        # Crear Treeview para mostrar datos
-        columnas = list(self.df.columns)
+        # Crear Treeview para mostrar datos (solo las columnas originales del CSV)
+        columnas = [col for col in self.df.columns if col not in self.COLUMNAS_DERIVADAS]
         tree = ttk.Treeview(frame_principal, columns=columnas, show="headings", height=20)
         
         # Configurar columnas
@@ -178,15 +226,12 @@ class DatosManager:
                 tree.delete(item)
             
             # Aplicar filtros
-            df_filtrado = self.df.copy()
-            
             temporada_sel = combo_temporada.get()
-            if temporada_sel != "Todas":
-                df_filtrado = df_filtrado[df_filtrado['temporada_siembra'] == temporada_sel]
-            
             lluvia_sel = combo_lluvia.get()
-            if lluvia_sel != "Todas":
-                df_filtrado = df_filtrado[df_filtrado['lluvia'] == lluvia_sel]
+            df_filtrado = self.filtrar(
+                temporada=temporada_sel if temporada_sel != "Todas" else None,
+                lluvia=lluvia_sel if lluvia_sel != "Todas" else None
+            )[columnas]
             
             # Agregar datos filtrados
             for _, fila in df_filtrado.iterrows():
@@ -310,9 +355,7 @@ TIEMPOS DE COSECHA:
         texto_analisis.pack(fill=tk.BOTH, expand=True, padx=10, pady=10)
         
         # Generar análisis detallado por nivel de lluvia
-        df = self.df.copy()
-        df['rendimiento_numerico'] = df['rendimiento_promedio'].apply(self._extraer_valor_numerico)
-        df['tiempo_numerico'] = df['tiempo_cosecha'].apply(lambda x: int(x.split('-')[0]) if '-' in str(x) else 0)
+        df = self.df.assign(tiempo_numerico=self.df['cosecha_min'])
         
         analisis_detallado = f"""
 ANÁLISIS DETALLADO POR NIVEL DE LLUVIA
@@ -510,50 +553,5 @@ CULTIVOS DE COSECHA RÁPIDA (≤ 4 meses):
         if not cultivo_referencia:
             return []
         
-        similares = []
-        ref_fila = None
-        
-        # Encontrar el cultivo de referencia
-        for _, fila in self.df.iterrows():
-            if fila['cultivo'] == cultivo_referencia:
-                ref_fila = fila
-                break
-        
-        if ref_fila is None:
-            return []
-        
-        # Buscar similares
-        for _, fila in self.df.iterrows():
-            if fila['cultivo'] == cultivo_referencia:
-                continue
-            
-            puntuacion = 0
-            
-            # Misma temporada de siembra
-            if fila['temporada_siembra'] == ref_fila['temporada_siembra']:
-                puntuacion += 3
-            
-            # Mismo nivel de lluvia
-            if fila['lluvia'] == ref_fila['lluvia']:
-                puntuacion += 2
-            
-            # Temperatura similar
-            if fila['temperatura_ideal'] == ref_fila['temperatura_ideal']:
-                puntuacion += 2
-            
-            # Rendimiento similar (±20%)
-            try:
-                rend_ref = self._extraer_valor_numerico(ref_fila['rendimiento_promedio'])
-                rend_actual = self._extraer_valor_numerico(fila['rendimiento_promedio'])
-                
-                if abs(rend_ref - rend_actual) / rend_ref <= 0.2:
-                    puntuacion += 1
-            except:
-                pass
-            
-            if puntuacion >= 3:  # Al menos 3 puntos de similitud
-                similares.append((fila['cultivo'], puntuacion))
-        
-        # Ordenar por puntuación
-        similares.sort(key=lambda x: x[1], reverse=True)
-        return [cultivo for cultivo, _ in similares[:5]]  # Top 5
\ No newline at end of file
+        similares = self.similitud.vecinos(cultivo_referencia, k=5, minimo=3)
+        return [cultivo for cultivo, _, _ in similares]  # Top 5
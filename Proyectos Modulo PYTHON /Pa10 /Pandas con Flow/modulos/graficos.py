@@ -2,18 +2,131 @@ import tkinter as tk
 from tkinter import messagebox, scrolledtext
 import matplotlib.pyplot as plt
 from matplotlib.backends.backend_tkagg import FigureCanvasTkAgg as FigureCanvasTk, NavigationToolbar2Tk
+from matplotlib.backends.backend_agg import FigureCanvasAgg
 from matplotlib.figure import Figure
 import pandas as pd
 import numpy as np
+from collections import OrderedDict
+from concurrent.futures import ProcessPoolExecutor
 from datetime import datetime
+import hashlib
+import os
+import re
+import threading
+from .similitud import SimilitudCultivos
 
 
 class GraficosManager:
     """Clase para manejar todos los gráficos del sistema"""
     
-    def __init__(self, df, barra_estado=None):
+    # Tipos de gráfico que se pueden generar como figura (también para la exportación por lotes)
+    TIPOS_CULTIVO = ['rendimiento_comparativo', 'info_cultivo', 'tiempo_cosecha', 'cultivos_similares', 'completo']
+    TIPOS_RENDIMIENTO = ['top_rendimientos', 'por_temporadas', 'lluvia_scatter', 'histograma', 'box_plot', 'todos']
+    
+    # Máximo de figuras guardadas en memoria (se descartan las usadas hace más tiempo)
+    MAX_FIGURAS = 24
+    
+    def __init__(self, df, barra_estado=None, similitud=None):
+        self._figuras = OrderedDict()
+        self.version_datos = None
         self.df = df
         self.barra_estado = barra_estado
+        # Motor de similitud compartido con DatosManager (se actualiza al recargar)
+        self.similitud = similitud if similitud is not None else SimilitudCultivos(df)
+    
+    @property
+    def df(self):
+        return self._df
+    
+    @df.setter
+    def df(self, df):
+        """Al asignar otro dataset se descartan los datos preparados y las figuras anteriores"""
+        self._df = df
+        version = self.calcular_version(df)
+        if version != self.version_datos:
+            self.version_datos = version
+            self._df_rend = None
+            self._figuras.clear()
+    
+    @staticmethod
+    def calcular_version(df):
+        """Huella del contenido del dataset: cambia si cambia cualquier valor"""
+        if df is None or df.empty:
+            return "vacio"
+        huella = pd.util.hash_pandas_object(df, index=False).to_numpy()
+        return hashlib.sha1(huella.tobytes()).hexdigest()[:12]
+    
+    # ------------------------------------------------------------
+    # Caché de figuras
+    # ------------------------------------------------------------
+    
+    @staticmethod
+    def _figura_en_pantalla(fig):
+        """Indica si la figura está mostrándose en una ventana abierta"""
+        try:
+            return isinstance(fig.canvas, FigureCanvasTk) and bool(fig.canvas.get_tk_widget().winfo_exists())
+        except tk.TclError:
+            return False
+    
+    def _figura_memorizada(self, clave, construir):
+        """Devuelve la figura guardada para (tipo, cultivo, versión del dataset) o la construye"""
+        clave = clave + (self.version_datos,)
+        fig = self._figuras.get(clave)
+        if fig is not None:
+            if not self._figura_en_pantalla(fig):
+                self._figuras.move_to_end(clave)
+                return fig
+            # Ya está abierta en otra ventana: una figura no puede estar en dos canvas
+            return construir()
+        
+        fig = construir()
+        self._figuras[clave] = fig
+        while len(self._figuras) > self.MAX_FIGURAS:
+            self._figuras.popitem(last=False)
+        return fig
+    
+    def figura_cultivo(self, tipo_grafico, cultivo_actual, memorizar=True):
+        """Figura de un gráfico del cultivo (tipos en TIPOS_CULTIVO)"""
+        if not memorizar:
+            return self._construir_figura_cultivo(tipo_grafico, cultivo_actual)
+        return self._figura_memorizada((tipo_grafico, cultivo_actual['cultivo']),
+                                       lambda: self._construir_figura_cultivo(tipo_grafico, cultivo_actual))
+    
+    def figura_rendimientos(self, tipo_grafico, memorizar=True):
+        """Figura de un gráfico general de rendimientos (tipos en TIPOS_RENDIMIENTO)"""
+        if not memorizar:
+            return self._construir_figura_rendimientos(tipo_grafico)
+        return self._figura_memorizada((tipo_grafico, None),
+                                       lambda: self._construir_figura_rendimientos(tipo_grafico))
+    
+    def _construir_figura_cultivo(self, tipo_grafico, cultivo_actual):
+        if tipo_grafico == "completo":
+            return self._figura_completa_cultivo(cultivo_actual)
+        
+        constructores = {
+            "rendimiento_comparativo": self.crear_grafico_rendimiento_comparativo,
+            "info_cultivo": self.crear_grafico_info_cultivo,
+            "tiempo_cosecha": self.crear_grafico_tiempo_cosecha,
+            "cultivos_similares": self.crear_grafico_cultivos_similares
+        }
+        
+        fig = Figure(figsize=(10, 8), dpi=100)
+        ax = fig.add_subplot(111)
+        if tipo_grafico in constructores:
+            constructores[tipo_grafico](ax, cultivo_actual)
+        fig.tight_layout(pad=2.0)
+        return fig
+    
+    def _construir_figura_rendimientos(self, tipo_grafico):
+        constructores = {
+            "top_rendimientos": self._figura_top_rendimientos,
+            "por_temporadas": self._figura_por_temporadas,
+            "lluvia_scatter": self._figura_lluvia_scatter,
+            "histograma": self._figura_histograma,
+            "box_plot": self._figura_box_plot,
+            "todos": self._figura_todos_rendimientos
+        }
+        return constructores[tipo_grafico](self._preparar_df_rend())
     
     def mostrar_grafico_cultivo(self, cultivo_actual, root):
         """Muestra selector de gráficos específicos del cultivo seleccionado"""
@@ -96,32 +209,25 @@ class GraficosManager:
             ventana_grafico = tk.Toplevel(ventana_padre)
             ventana_grafico.grab_set()
             
-            # Crear figura
-            fig = Figure(figsize=(10, 8), dpi=100)
-            ax = fig.add_subplot(111)
-            
-            # Generar gráfico según tipo
+            # Configurar ventana según tipo
             if tipo_grafico == "rendimiento_comparativo":
                 ventana_grafico.title(f"Comparación de Rendimiento - {cultivo_actual['cultivo']}")
                 ventana_grafico.geometry("900x700")
-                self.crear_grafico_rendimiento_comparativo(ax, cultivo_actual)
                 
             elif tipo_grafico == "info_cultivo":
                 ventana_grafico.title(f"Información - {cultivo_actual['cultivo']}")
                 ventana_grafico.geometry("800x600")
-                self.crear_grafico_info_cultivo(ax, cultivo_actual)
                 
             elif tipo_grafico == "tiempo_cosecha":
                 ventana_grafico.title(f"Tiempo de Cosecha - {cultivo_actual['cultivo']}")
                 ventana_grafico.geometry("800x600")
-                self.crear_grafico_tiempo_cosecha(ax, cultivo_actual)
                 
             elif tipo_grafico == "cultivos_similares":
                 ventana_grafico.title(f"Cultivos Similares - {cultivo_actual['cultivo']}")
                 ventana_grafico.geometry("800x600")
-                self.crear_grafico_cultivos_similares(ax, cultivo_actual)
             
-            fig.tight_layout(pad=2.0)
+            # Figura del gráfico (reutilizada si ya se generó con el mismo dataset)
+            fig = self.figura_cultivo(tipo_grafico, cultivo_actual)
             
             # Mostrar canvas
             canvas = FigureCanvasTk(fig, ventana_grafico)
@@ -169,40 +275,8 @@ class GraficosManager:
             tk.Label(frame_controles, text=f"Análisis Completo: {cultivo_actual['cultivo']}", 
                     font=("Arial", 16, "bold")).pack()
             
-            # Crear figura con subplots
-            fig = Figure(figsize=(14, 10), dpi=100)
-            
-            try:
-                # Subplot 1: Comparacion de rendimiento
-                ax1 = fig.add_subplot(221)
-                self.crear_grafico_rendimiento_comparativo(ax1, cultivo_actual)
-                
-                # Subplot 2: Información del cultivo
-                ax2 = fig.add_subplot(222)
-                self.crear_grafico_info_cultivo(ax2, cultivo_actual)
-                
-                # Subplot 3: Tiempo de cosecha vs otros cultivos
-                ax3 = fig.add_subplot(223)
-                self.crear_grafico_tiempo_cosecha(ax3, cultivo_actual)
-                
-                # Subplot 4: Cultivos similares
-                ax4 = fig.add_subplot(224)
-                self.crear_grafico_cultivos_similares(ax4, cultivo_actual)
-                
-                fig.suptitle(f'Análisis Completo - {cultivo_actual["cultivo"]}', 
-                            fontsize=16, fontweight='bold')
-                # Ajustar espaciado para evitar superposición
-                fig.tight_layout(rect=[0, 0.03, 1, 0.95], pad=4.0, h_pad=5.0, w_pad=4.0)
-                fig.subplots_adjust(hspace=0.6, wspace=0.4, 
-                                  top=0.90, bottom=0.12, left=0.08, right=0.96)
-                
-            except Exception as subplot_error:
-                print(f"Error en subplots: {subplot_error}")
-                ax = fig.add_subplot(111)
-                ax.text(0.5, 0.5, f'Error al generar análisis\nCultivo: {cultivo_actual["cultivo"]}', 
-                       ha='center', va='center', fontsize=14, transform=ax.transAxes)
-                ax.set_title('Error en Análisis', fontweight='bold')
-                fig.tight_layout(pad=2.0)
+            # Figura con los cuatro análisis (reutilizada si ya se generó)
+            fig = self.figura_cultivo("completo", cultivo_actual)
             
             # Crear canvas y mostrar
             canvas = FigureCanvasTk(fig, ventana_todos)
@@ -237,31 +311,56 @@ class GraficosManager:
             if self.barra_estado:
                 self.barra_estado.config(text="Error al generar análisis completo")
     
+    def _figura_completa_cultivo(self, cultivo_actual):
+        """Figura 2x2 con todos los análisis del cultivo"""
+        fig = Figure(figsize=(14, 10), dpi=100)
+        
+        try:
+            # Subplot 1: Comparacion de rendimiento
+            ax1 = fig.add_subplot(221)
+            self.crear_grafico_rendimiento_comparativo(ax1, cultivo_actual)
+            
+            # Subplot 2: Información del cultivo
+            ax2 = fig.add_subplot(222)
+            self.crear_grafico_info_cultivo(ax2, cultivo_actual)
+            
+            # Subplot 3: Tiempo de cosecha vs otros cultivos
+            ax3 = fig.add_subplot(223)
+            self.crear_grafico_tiempo_cosecha(ax3, cultivo_actual)
+            
+            # Subplot 4: Cultivos similares
+            ax4 = fig.add_subplot(224)
+            self.crear_grafico_cultivos_similares(ax4, cultivo_actual)
+            
+            fig.suptitle(f'Análisis Completo - {cultivo_actual["cultivo"]}', 
+                        fontsize=16, fontweight='bold')
+            # Ajustar espaciado para evitar superposición
+            fig.tight_layout(rect=[0, 0.03, 1, 0.95], pad=4.0, h_pad=5.0, w_pad=4.0)
+            fig.subplots_adjust(hspace=0.6, wspace=0.4, 
+                              top=0.90, bottom=0.12, left=0.08, right=0.96)
+            
+        except Exception as subplot_error:
+            print(f"Error en subplots: {subplot_error}")
+            ax = fig.add_subplot(111)
+            ax.text(0.5, 0.5, f'Error al generar análisis\nCultivo: {cultivo_actual["cultivo"]}', 
+                   ha='center', va='center', fontsize=14, transform=ax.transAxes)
+            ax.set_title('Error en Análisis', fontweight='bold')
+            fig.tight_layout(pad=2.0)
+        
+        return fig
+    
     def crear_grafico_rendimiento_comparativo(self, ax, cultivo_actual):
         """Crea grafico comparativo de rendimientos centrado en el cultivo seleccionado"""
         try:
-            # Obtener rendimiento del cultivo actual
-            cultivo_actual_rend = float(cultivo_actual['rendimiento_promedio'].split()[0])
-            
             # Preparar datos de todos los cultivos
-            rendimientos = []
-            nombres = []
-            
-            for _, fila in self.df.iterrows():
-                try:
-                    valor = float(fila['rendimiento_promedio'].split()[0])
-                    rendimientos.append(valor)
-                    nombres.append(fila['cultivo'])
-                except:
-                    continue
-            
-            if not rendimientos:
+            df_rend = self._preparar_df_rend()
+            
+            if df_rend.empty:
                 ax.text(0.5, 0.5, 'No hay datos de rendimiento disponibles', 
                        ha='center', va='center', transform=ax.transAxes)
                 return
             
-            # Crear DataFrame y obtener Top 10 + cultivo actual
-            df_rend = pd.DataFrame({'cultivo': nombres, 'rendimiento': rendimientos})
+            # Obtener Top 10 + cultivo actual
             top_10 = df_rend.nlargest(10, 'rendimiento')
             
             # Asegurar que el cultivo actual esté incluido
@@ -332,24 +431,17 @@ REND: {cultivo_actual['rendimiento_promedio']}"""
             
             # Calcular estadísticas comparativas
             try:
-                rend_actual = float(cultivo_actual['rendimiento_promedio'].split()[0])
-                tiempo_actual = int(cultivo_actual['tiempo_cosecha'].split('-')[0])
+                rend_actual = float(cultivo_actual['rendimiento_numerico'])
+                tiempo_actual = int(cultivo_actual['cosecha_min'])
                 
-                # Estadísticas comparativas
-                all_rend = []
-                all_tiempo = []
-                for _, fila in self.df.iterrows():
-                    try:
-                        r = float(fila['rendimiento_promedio'].split()[0])
-                        t = int(fila['tiempo_cosecha'].split('-')[0])
-                        all_rend.append(r)
-                        all_tiempo.append(t)
-                    except:
-                        continue
+                # Estadísticas comparativas (cultivos con rendimiento y tiempo conocidos)
+                validos = self.df[['rendimiento_numerico', 'cosecha_min']].dropna()
+                all_rend = validos['rendimiento_numerico']
+                all_tiempo = validos['cosecha_min']
                 
-                if all_rend:
-                    percentil_rend = (sum(1 for r in all_rend if r < rend_actual) / len(all_rend)) * 100
-                    percentil_tiempo = (sum(1 for t in all_tiempo if t > tiempo_actual) / len(all_tiempo)) * 100
+                if len(all_rend):
+                    percentil_rend = (all_rend < rend_actual).mean() * 100
+                    percentil_tiempo = (all_tiempo > tiempo_actual).mean() * 100
                     
                     stats_text = f"""COMPARATIVO:
 Superior al {percentil_rend:.0f}%
@@ -378,24 +470,13 @@ Actual: {rend_actual:.1f} t/ha"""
         """Crea grafico de comparación de tiempos de cosecha"""
         try:
             # Obtener tiempo del cultivo actual
-            tiempo_actual = int(cultivo_actual['tiempo_cosecha'].split('-')[0])
+            tiempo_actual = int(cultivo_actual['cosecha_min'])
             
             # Categorizar cultivos por velocidad
-            rapidos = []  # <= 4 meses
-            medios = []   # 5-8 meses
-            lentos = []   # >= 9 meses
-            
-            for _, fila in self.df.iterrows():
-                try:
-                    tiempo = int(fila['tiempo_cosecha'].split('-')[0])
-                    if tiempo <= 4:
-                        rapidos.append(fila['cultivo'])
-                    elif tiempo <= 8:
-                        medios.append(fila['cultivo'])
-                    else:
-                        lentos.append(fila['cultivo'])
-                except:
-                    continue
+            tiempos = self.df['cosecha_min'].dropna()
+            rapidos = tiempos[tiempos <= 4]                      # <= 4 meses
+            medios = tiempos[(tiempos > 4) & (tiempos <= 8)]     # 5-8 meses
+            lentos = tiempos[tiempos > 8]                        # >= 9 meses
             
             # Determinar categoría del cultivo actual
             categoria_actual = "Rápidos" if tiempo_actual <= 4 else ("Medios" if tiempo_actual <= 8 else "Lentos")
@@ -437,52 +518,17 @@ Actual: {rend_actual:.1f} t/ha"""
     def crear_grafico_cultivos_similares(self, ax, cultivo_actual):
         """Crea grafico de cultivos alternativos"""
         try:
-            # Encontrar cultivos similares
-            similares_score = []
-            
-            for _, fila in self.df.iterrows():
-                if fila['cultivo'] == cultivo_actual['cultivo']:
-                    continue
-                
-                score = 0
-                nombre = fila['cultivo']
-                
-                # Puntuación por temporada (3 puntos)
-                if fila['temporada_siembra'] == cultivo_actual['temporada_siembra']:
-                    score += 3
-                
-                # Puntuación por lluvia (2 puntos)
-                if fila['lluvia'] == cultivo_actual['lluvia']:
-                    score += 2
-                
-                # Puntuación por temperatura (2 puntos)
-                if fila['temperatura_ideal'] == cultivo_actual['temperatura_ideal']:
-                    score += 2
-                
-                # Puntuación por rendimiento similar (1 punto)
-                try:
-                    rend_actual = float(cultivo_actual['rendimiento_promedio'].split()[0])
-                    rend_comp = float(fila['rendimiento_promedio'].split()[0])
-                    if abs(rend_actual - rend_comp) / rend_actual <= 0.3:  # ±30%
-                        score += 1
-                except:
-                    pass
-                
-                if score >= 2:  # Al menos 2 puntos de similitud
-                    try:
-                        rend = float(fila['rendimiento_promedio'].split()[0])
-                        similares_score.append((nombre, score, rend))
-                    except:
-                        pass
+            # Encontrar cultivos similares (al menos 2 puntos, con rendimiento, empates por rendimiento)
+            similares_score = self.similitud.vecinos(
+                cultivo_actual['cultivo'], k=6, minimo=2, desempate_por_rendimiento=True,
+                solo_con_rendimiento=True)
             
             if not similares_score:
                 ax.text(0.5, 0.5, f'No se encontraron cultivos similares\na {cultivo_actual["cultivo"]}', 
                        ha='center', va='center', transform=ax.transAxes)
                 return
             
-            # Ordenar y tomar los mejores 6
-            similares_score.sort(key=lambda x: (x[1], x[2]), reverse=True)
-            top_similares = similares_score[:6]
+            top_similares = similares_score
             
             nombres = [s[0] for s in top_similares]
             scores = [s[1] for s in top_similares]
@@ -534,6 +580,35 @@ Actual: {rend_actual:.1f} t/ha"""
         except Exception as e:
             messagebox.showerror("Error", f"Error al guardar: {str(e)}")
     
+    def exportar_todos_graficos(self, root, directorio="graficos_exportados"):
+        """Exporta en segundo plano todos los gráficos de todos los cultivos a PNG"""
+        resultado = {}
+        
+        def trabajo():
+            try:
+                resultado['archivos'] = exportar_lote_graficos(self.df, directorio)
+            except Exception as e:
+                resultado['error'] = e
+        
+        hilo = threading.Thread(target=trabajo, daemon=True)
+        hilo.start()
+        if self.barra_estado:
+            self.barra_estado.config(text="Exportando gráficos...")
+        
+        def revisar():
+            if hilo.is_alive():
+                root.after(500, revisar)
+                return
+            if 'error' in resultado:
+                print(f"Error en exportar_todos_graficos: {resultado['error']}")
+                messagebox.showerror("Error", f"Error al exportar gráficos: {str(resultado['error'])}")
+                return
+            messagebox.showinfo("Éxito", f"{len(resultado['archivos'])} gráficos guardados en: {directorio}")
+            if self.barra_estado:
+                self.barra_estado.config(text=f"Gráficos exportados: {directorio}")
+        
+        root.after(500, revisar)
+    
     def test_graficos_simple(self, root):
         """Test simple para verificar que matplotlib funcione"""
         try:
@@ -630,6 +705,10 @@ Actual: {rend_actual:.1f} t/ha"""
                      command=lambda: self.mostrar_todos_graficos_rendimientos(ventana_rendimientos),
                      bg="darkgreen", fg="white", font=("Arial", 12, "bold")).pack(pady=10)
             
+            tk.Button(frame_botones, text="Exportar Todos (PNG)", 
+                     command=lambda: self.exportar_todos_graficos(root),
+                     bg="green", fg="white", font=("Arial", 10)).pack(side=tk.LEFT, padx=5)
+            
             tk.Button(frame_botones, text="Cerrar", 
                      command=ventana_rendimientos.destroy,
                      bg="red", fg="white", font=("Arial", 10)).pack(side=tk.RIGHT, padx=5)
@@ -643,6 +722,14 @@ Actual: {rend_actual:.1f} t/ha"""
             if self.barra_estado:
                 self.barra_estado.config(text="Error al abrir selector de gráficos")
     
+    def _preparar_df_rend(self):
+        """Datos comunes de los gráficos de rendimiento (se preparan una vez por versión del dataset)"""
+        if self._df_rend is None:
+            df_rend = self.df[['cultivo', 'rendimiento_numerico', 'temporada_siembra', 'lluvia']].rename(
+                columns={'rendimiento_numerico': 'rendimiento', 'temporada_siembra': 'temporada'})
+            self._df_rend = df_rend.dropna(subset=['rendimiento']).reset_index(drop=True)
+        return self._df_rend
+    
     def mostrar_grafico_individual(self, tipo_grafico, ventana_padre):
         """Muestra un gráfico individual según el tipo seleccionado"""
         try:
@@ -650,58 +737,38 @@ Actual: {rend_actual:.1f} t/ha"""
             ventana_grafico.grab_set()
             
             # Preparar datos comunes
-            rendimientos = []
-            nombres = []
-            temporadas = []
-            lluvias = []
-            
-            for _, fila in self.df.iterrows():
-                try:
-                    valor = float(fila['rendimiento_promedio'].split()[0])
-                    rendimientos.append(valor)
-                    nombres.append(fila['cultivo'])
-                    temporadas.append(fila['temporada_siembra'])
-                    lluvias.append(fila['lluvia'])
-                except:
-                    continue
-            
-            if not rendimientos:
+            df_rend = self._preparar_df_rend()
+            
+            if df_rend.empty:
                 messagebox.showwarning("Sin datos", "No hay datos de rendimiento disponibles")
                 ventana_grafico.destroy()
                 return
             
-            df_rend = pd.DataFrame({
-                'cultivo': nombres, 
-                'rendimiento': rendimientos,
-                'temporada': temporadas,
-                'lluvia': lluvias
-            })
-            
             # Configurar ventana según tipo de gráfico
             if tipo_grafico == "top_rendimientos":
                 ventana_grafico.title("Top 15 Cultivos por Rendimiento")
                 ventana_grafico.geometry("900x600")
-                self._crear_grafico_top_rendimientos(ventana_grafico, df_rend)
+                self._mostrar_canvas(self.figura_rendimientos("top_rendimientos"), ventana_grafico, "Top_Rendimientos")
                 
             elif tipo_grafico == "por_temporadas":
                 ventana_grafico.title("Rendimiento Promedio por Temporada")
                 ventana_grafico.geometry("700x600")
-                self._crear_grafico_por_temporadas(ventana_grafico, df_rend)
+                self._mostrar_canvas(self.figura_rendimientos("por_temporadas"), ventana_grafico, "Por_Temporadas")
                 
             elif tipo_grafico == "lluvia_scatter":
                 ventana_grafico.title("Rendimiento vs Nivel de Lluvia")
                 ventana_grafico.geometry("800x600")
-                self._crear_grafico_lluvia_scatter(ventana_grafico, df_rend)
+                self._mostrar_canvas(self.figura_rendimientos("lluvia_scatter"), ventana_grafico, "Lluvia_Scatter")
                 
             elif tipo_grafico == "histograma":
                 ventana_grafico.title("Distribución de Rendimientos")
                 ventana_grafico.geometry("700x600")
-                self._crear_grafico_histograma(ventana_grafico, df_rend)
+                self._mostrar_canvas(self.figura_rendimientos("histograma"), ventana_grafico, "Histograma")
                 
             elif tipo_grafico == "box_plot":
                 ventana_grafico.title("Comparación por Nivel de Lluvia")
                 ventana_grafico.geometry("700x600")
-                self._crear_grafico_box_plot(ventana_grafico, df_rend)
+                self._mostrar_canvas(self.figura_rendimientos("box_plot"), ventana_grafico, "Box_Plot")
                 
             elif tipo_grafico == "estadisticas":
                 ventana_grafico.title("Estadísticas Completas")
@@ -715,7 +782,7 @@ Actual: {rend_actual:.1f} t/ha"""
             print(f"Error en mostrar_grafico_individual: {e}")
             messagebox.showerror("Error", f"Error al generar gráfico: {str(e)}")
     
-    def _crear_grafico_top_rendimientos(self, ventana, df_rend):
+    def _figura_top_rendimientos(self, df_rend):
         """Crea gráfico de top rendimientos"""
         fig = Figure(figsize=(12, 8), dpi=100)
         ax = fig.add_subplot(111)
@@ -738,14 +805,14 @@ Actual: {rend_actual:.1f} t/ha"""
                    f'{height:.1f}', ha='center', va='bottom', fontsize=9, fontweight='bold')
         
         fig.tight_layout()
-        self._mostrar_canvas(fig, ventana, "Top_Rendimientos")
+        return fig
     
-    def _crear_grafico_por_temporadas(self, ventana, df_rend):
+    def _figura_por_temporadas(self, df_rend):
         """Crea gráfico circular por temporadas"""
         fig = Figure(figsize=(10, 8), dpi=100)
         ax = fig.add_subplot(111)
         
-        temp_counts = df_rend.groupby('temporada')['rendimiento'].mean()
+        temp_counts = df_rend.groupby('temporada', observed=True)['rendimiento'].mean()
         colors = plt.cm.Set3(np.linspace(0, 1, len(temp_counts)))
         
         wedges, texts, autotexts = ax.pie(temp_counts.values, labels=temp_counts.index, 
@@ -762,9 +829,9 @@ Actual: {rend_actual:.1f} t/ha"""
         ax.legend(leyenda, loc='center left', bbox_to_anchor=(1, 0.5))
         
         fig.tight_layout()
-        self._mostrar_canvas(fig, ventana, "Por_Temporadas")
+        return fig
     
-    def _crear_grafico_lluvia_scatter(self, ventana, df_rend):
+    def _figura_lluvia_scatter(self, df_rend):
         """Crea scatter plot lluvia vs rendimiento"""
         fig = Figure(figsize=(10, 8), dpi=100)
         ax = fig.add_subplot(111)
@@ -783,7 +850,7 @@ Actual: {rend_actual:.1f} t/ha"""
         ax.grid(True, alpha=0.3)
         
         # Colorbar
-        cbar = plt.colorbar(scatter, ax=ax)
+        cbar = fig.colorbar(scatter, ax=ax)
         cbar.set_label('Rendimiento (t/ha)', fontsize=12)
         
         # Agregar línea de tendencia
@@ -793,9 +860,9 @@ Actual: {rend_actual:.1f} t/ha"""
         ax.legend()
         
         fig.tight_layout()
-        self._mostrar_canvas(fig, ventana, "Lluvia_Scatter")
+        return fig
     
-    def _crear_grafico_histograma(self, ventana, df_rend):
+    def _figura_histograma(self, df_rend):
         """Crea histograma de distribución"""
         fig = Figure(figsize=(10, 8), dpi=100)
         ax = fig.add_subplot(111)
@@ -824,9 +891,9 @@ Actual: {rend_actual:.1f} t/ha"""
                 bbox=dict(boxstyle="round,pad=0.3", facecolor="lightyellow", alpha=0.8))
         
         fig.tight_layout()
-        self._mostrar_canvas(fig, ventana, "Histograma")
+        return fig
     
-    def _crear_grafico_box_plot(self, ventana, df_rend):
+    def _figura_box_plot(self, df_rend):
         """Crea box plot por nivel de lluvia"""
         fig = Figure(figsize=(10, 8), dpi=100)
         ax = fig.add_subplot(111)
@@ -834,8 +901,9 @@ Actual: {rend_actual:.1f} t/ha"""
         lluvia_data = [df_rend[df_rend['lluvia']==nivel]['rendimiento'].tolist() 
                       for nivel in ['Baja', 'Media', 'Alta']]
         
-        box_plot = ax.boxplot(lluvia_data, labels=['Baja', 'Media', 'Alta'], 
-                             patch_artist=True, notch=True)
+        # Etiquetas con set_xticklabels: el argumento labels= ya no existe en matplotlib 3.10
+        box_plot = ax.boxplot(lluvia_data, patch_artist=True, notch=True)
+        ax.set_xticklabels(['Baja', 'Media', 'Alta'])
         
         colors = ['lightcoral', 'lightblue', 'lightgreen']
         for patch, color in zip(box_plot['boxes'], colors):
@@ -855,7 +923,7 @@ Actual: {rend_actual:.1f} t/ha"""
                    fontweight='bold', color='red', fontsize=10)
         
         fig.tight_layout()
-        self._mostrar_canvas(fig, ventana, "Box_Plot")
+        return fig
     
     def _crear_panel_estadisticas(self, ventana, df_rend):
         """Crea panel con estadísticas completas"""
@@ -968,132 +1036,98 @@ Reporte generado: {datetime.now().strftime('%d/%m/%Y %H:%M:%S')}
         except Exception as e:
             messagebox.showerror("Error", f"Error al exportar: {str(e)}")
     
-    def mostrar_todos_graficos_rendimientos(self, ventana_padre):
-        """Muestra todos los gráficos en una ventana (función original mejorada)"""
-        try:
-            ventana_todos = tk.Toplevel(ventana_padre)
-            ventana_todos.title("Todos los Análisis de Rendimientos")
-            ventana_todos.geometry("1400x900")
-            ventana_todos.grab_set()
-            
-            # Frame para controles
-            frame_controles = tk.Frame(ventana_todos)
-            frame_controles.pack(fill=tk.X, padx=10, pady=5)
-            
-            tk.Label(frame_controles, text="Análisis Completo de Rendimientos - Todos los Gráficos", 
-                    font=("Arial", 16, "bold")).pack()
+    def _figura_todos_rendimientos(self, df_rend):
+        """Figura 2x3 con todos los análisis de rendimientos"""
+        fig = Figure(figsize=(16, 11), dpi=100)
+        
+        if df_rend.empty:
+            fig.text(0.5, 0.5, 'No hay datos de rendimiento disponibles', 
+                    ha='center', va='center', fontsize=14)
+        else:
+            rendimientos = df_rend['rendimiento'].to_numpy()
+            
+            # Subplot 1: Top 15 rendimientos (gráfico de barras)
+            ax1 = fig.add_subplot(2, 3, 1)
+            top_15 = df_rend.nlargest(15, 'rendimiento')
+            colors = plt.cm.viridis(np.linspace(0, 1, len(top_15)))
+            
+            bars = ax1.bar(range(len(top_15)), top_15['rendimiento'], color=colors)
+            ax1.set_title('Top 15 Cultivos por Rendimiento', fontweight='bold', fontsize=12)
+            ax1.set_xlabel('Cultivos')
+            ax1.set_ylabel('Rendimiento (t/ha)')
+            ax1.set_xticks(range(len(top_15)))
+            ax1.set_xticklabels(top_15['cultivo'], rotation=45, ha='right', fontsize=9)
             
-            # Crear figura con múltiples subplots
-            fig = Figure(figsize=(16, 11), dpi=100)
-            
-            # Preparar datos
-            rendimientos = []
-            nombres = []
-            temporadas = []
-            lluvias = []
-            
-            for _, fila in self.df.iterrows():
-                try:
-                    valor = float(fila['rendimiento_promedio'].split()[0])
-                    rendimientos.append(valor)
-                    nombres.append(fila['cultivo'])
-                    temporadas.append(fila['temporada_siembra'])
-                    lluvias.append(fila['lluvia'])
-                except:
-                    continue
-            
-            if not rendimientos:
-                fig.text(0.5, 0.5, 'No hay datos de rendimiento disponibles', 
-                        ha='center', va='center', fontsize=14)
-            else:
-                # Subplot 1: Top 15 rendimientos (gráfico de barras)
-                ax1 = fig.add_subplot(2, 3, 1)
-                df_rend = pd.DataFrame({
-                    'cultivo': nombres, 
-                    'rendimiento': rendimientos,
-                    'temporada': temporadas,
-                    'lluvia': lluvias
-                })
-                
-                top_15 = df_rend.nlargest(15, 'rendimiento')
-                colors = plt.cm.viridis(np.linspace(0, 1, len(top_15)))
-                
-                bars = ax1.bar(range(len(top_15)), top_15['rendimiento'], color=colors)
-                ax1.set_title('Top 15 Cultivos por Rendimiento', fontweight='bold', fontsize=12)
-                ax1.set_xlabel('Cultivos')
-                ax1.set_ylabel('Rendimiento (t/ha)')
-                ax1.set_xticks(range(len(top_15)))
-                ax1.set_xticklabels(top_15['cultivo'], rotation=45, ha='right', fontsize=9)
-                
-                # Agregar valores en las barras
-                for bar, valor in zip(bars, top_15['rendimiento']):
-                    height = bar.get_height()
-                    ax1.text(bar.get_x() + bar.get_width()/2., height + 0.1,
-                            f'{height:.1f}', ha='center', va='bottom', fontsize=8)
-                
-                # Subplot 2: Distribución por temporadas (gráfico circular)
-                ax2 = fig.add_subplot(2, 3, 2)
-                temp_counts = df_rend.groupby('temporada')['rendimiento'].mean()
-                colors_pie = plt.cm.Set3(np.linspace(0, 1, len(temp_counts)))
-                
-                wedges, texts, autotexts = ax2.pie(temp_counts.values, labels=temp_counts.index, 
-                                                  autopct='%1.1f%%', colors=colors_pie, startangle=90)
-                ax2.set_title('Rendimiento Promedio por Temporada', fontweight='bold', fontsize=12)
-                
-                for autotext in autotexts:
-                    autotext.set_fontsize(9)
-                    autotext.set_color('white')
-                    autotext.set_weight('bold')
-                
-                # Subplot 3: Rendimiento vs lluvia (scatter plot)
-                ax3 = fig.add_subplot(2, 3, 3)
-                lluvia_map = {'Baja': 1, 'Media': 2, 'Alta': 3}
-                lluvia_numerica = [lluvia_map.get(l, 0) for l in df_rend['lluvia']]
-                
-                scatter = ax3.scatter(lluvia_numerica, df_rend['rendimiento'], 
-                                    c=df_rend['rendimiento'], cmap='coolwarm', 
-                                    alpha=0.7, s=60)
-                ax3.set_xlabel('Nivel de Lluvia')
-                ax3.set_ylabel('Rendimiento (t/ha)')
-                ax3.set_title('Rendimiento vs Nivel de Lluvia', fontweight='bold', fontsize=12)
-                ax3.set_xticks([1, 2, 3])
-                ax3.set_xticklabels(['Baja', 'Media', 'Alta'])
-                ax3.grid(True, alpha=0.3)
-                
-                # Colorbar para scatter plot
-                plt.colorbar(scatter, ax=ax3, label='Rendimiento (t/ha)')
-                
-                # Subplot 4: Histograma de distribución de rendimientos
-                ax4 = fig.add_subplot(2, 3, 4)
-                ax4.hist(rendimientos, bins=10, color='skyblue', alpha=0.7, edgecolor='black')
-                ax4.axvline(np.mean(rendimientos), color='red', linestyle='--', 
-                           label=f'Promedio: {np.mean(rendimientos):.1f} t/ha')
-                ax4.set_xlabel('Rendimiento (t/ha)')
-                ax4.set_ylabel('Frecuencia')
-                ax4.set_title('Distribución de Rendimientos', fontweight='bold', fontsize=12)
-                ax4.legend()
-                ax4.grid(True, alpha=0.3)
-                
-                # Subplot 5: Box plot por nivel de lluvia
-                ax5 = fig.add_subplot(2, 3, 5)
-                lluvia_data = [df_rend[df_rend['lluvia']==nivel]['rendimiento'].tolist() 
-                              for nivel in ['Baja', 'Media', 'Alta']]
-                box_plot = ax5.boxplot(lluvia_data, labels=['Baja', 'Media', 'Alta'], patch_artist=True)
-                
-                colors_box = ['lightcoral', 'lightblue', 'lightgreen']
-                for patch, color in zip(box_plot['boxes'], colors_box):
-                    patch.set_facecolor(color)
-                
-                ax5.set_xlabel('Nivel de Lluvia')
-                ax5.set_ylabel('Rendimiento (t/ha)')
-                ax5.set_title('Distribución por Nivel de Lluvia', fontweight='bold', fontsize=12)
-                ax5.grid(True, alpha=0.3)
-                
-                # Subplot 6: Estadísticas resumidas (texto)
-                ax6 = fig.add_subplot(2, 3, 6)
-                ax6.axis('off')
-                
-                stats_text = f"""ESTADÍSTICAS GENERALES
+            # Agregar valores en las barras
+            for bar, valor in zip(bars, top_15['rendimiento']):
+                height = bar.get_height()
+                ax1.text(bar.get_x() + bar.get_width()/2., height + 0.1,
+                        f'{height:.1f}', ha='center', va='bottom', fontsize=8)
+            
+            # Subplot 2: Distribución por temporadas (gráfico circular)
+            ax2 = fig.add_subplot(2, 3, 2)
+            temp_counts = df_rend.groupby('temporada', observed=True)['rendimiento'].mean()
+            colors_pie = plt.cm.Set3(np.linspace(0, 1, len(temp_counts)))
+            
+            wedges, texts, autotexts = ax2.pie(temp_counts.values, labels=temp_counts.index, 
+                                              autopct='%1.1f%%', colors=colors_pie, startangle=90)
+            ax2.set_title('Rendimiento Promedio por Temporada', fontweight='bold', fontsize=12)
+            
+            for autotext in autotexts:
+                autotext.set_fontsize(9)
+                autotext.set_color('white')
+                autotext.set_weight('bold')
+            
+            # Subplot 3: Rendimiento vs lluvia (scatter plot)
+            ax3 = fig.add_subplot(2, 3, 3)
+            lluvia_map = {'Baja': 1, 'Media': 2, 'Alta': 3}
+            lluvia_numerica = [lluvia_map.get(l, 0) for l in df_rend['lluvia']]
+            
+            scatter = ax3.scatter(lluvia_numerica, df_rend['rendimiento'], 
+                                c=df_rend['rendimiento'], cmap='coolwarm', 
+                                alpha=0.7, s=60)
+            ax3.set_xlabel('Nivel de Lluvia')
+            ax3.set_ylabel('Rendimiento (t/ha)')
+            ax3.set_title('Rendimiento vs Nivel de Lluvia', fontweight='bold', fontsize=12)
+            ax3.set_xticks([1, 2, 3])
+            ax3.set_xticklabels(['Baja', 'Media', 'Alta'])
+            ax3.grid(True, alpha=0.3)
+            
+            # Colorbar para scatter plot
+            fig.colorbar(scatter, ax=ax3, label='Rendimiento (t/ha)')
+            
+            # Subplot 4: Histograma de distribución de rendimientos
+            ax4 = fig.add_subplot(2, 3, 4)
+            ax4.hist(rendimientos, bins=10, color='skyblue', alpha=0.7, edgecolor='black')
+            ax4.axvline(np.mean(rendimientos), color='red', linestyle='--', 
+                       label=f'Promedio: {np.mean(rendimientos):.1f} t/ha')
+            ax4.set_xlabel('Rendimiento (t/ha)')
+            ax4.set_ylabel('Frecuencia')
+            ax4.set_title('Distribución de Rendimientos', fontweight='bold', fontsize=12)
+            ax4.legend()
+            ax4.grid(True, alpha=0.3)
+            
+            # Subplot 5: Box plot por nivel de lluvia
+            ax5 = fig.add_subplot(2, 3, 5)
+            lluvia_data = [df_rend[df_rend['lluvia']==nivel]['rendimiento'].tolist() 
+                          for nivel in ['Baja', 'Media', 'Alta']]
+            box_plot = ax5.boxplot(lluvia_data, patch_artist=True)
+            ax5.set_xticklabels(['Baja', 'Media', 'Alta'])
+            
+            colors_box = ['lightcoral', 'lightblue', 'lightgreen']
+            for patch, color in zip(box_plot['boxes'], colors_box):
+                patch.set_facecolor(color)
+            
+            ax5.set_xlabel('Nivel de Lluvia')
+            ax5.set_ylabel('Rendimiento (t/ha)')
+            ax5.set_title('Distribución por Nivel de Lluvia', fontweight='bold', fontsize=12)
+            ax5.grid(True, alpha=0.3)
+            
+            # Subplot 6: Estadísticas resumidas (texto)
+            ax6 = fig.add_subplot(2, 3, 6)
+            ax6.axis('off')
+            
+            stats_text = f"""ESTADÍSTICAS GENERALES
 
 Total de cultivos: {len(rendimientos)}
 Rendimiento promedio: {np.mean(rendimientos):.2f} t/ha
@@ -1108,15 +1142,35 @@ Top 3: {', '.join(top_15.head(3)['cultivo'].tolist())}
 POR TEMPORADA:
 {chr(10).join([f'{temp}: {count:.1f} t/ha promedio' for temp, count in temp_counts.items()])}
 """
-                
-                ax6.text(0.05, 0.95, stats_text, transform=ax6.transAxes, fontsize=10,
-                        verticalalignment='top', fontfamily='monospace',
-                        bbox=dict(boxstyle="round,pad=0.5", facecolor="lightyellow", alpha=0.8))
             
-            # Ajustar layout
-            fig.suptitle('Análisis Completo de Rendimientos - Cultivos de Panamá', 
-                        fontsize=18, fontweight='bold')
-            fig.tight_layout(rect=[0, 0.03, 1, 0.96], pad=3.0)
+            ax6.text(0.05, 0.95, stats_text, transform=ax6.transAxes, fontsize=10,
+                    verticalalignment='top', fontfamily='monospace',
+                    bbox=dict(boxstyle="round,pad=0.5", facecolor="lightyellow", alpha=0.8))
+        
+        # Ajustar layout
+        fig.suptitle('Análisis Completo de Rendimientos - Cultivos de Panamá', 
+                    fontsize=18, fontweight='bold')
+        fig.tight_layout(rect=[0, 0.03, 1, 0.96], pad=3.0)
+        
+        return fig
+    
+    def mostrar_todos_graficos_rendimientos(self, ventana_padre):
+        """Muestra todos los gráficos en una ventana (función original mejorada)"""
+        try:
+            ventana_todos = tk.Toplevel(ventana_padre)
+            ventana_todos.title("Todos los Análisis de Rendimientos")
+            ventana_todos.geometry("1400x900")
+            ventana_todos.grab_set()
+            
+            # Frame para controles
+            frame_controles = tk.Frame(ventana_todos)
+            frame_controles.pack(fill=tk.X, padx=10, pady=5)
+            
+            tk.Label(frame_controles, text="Análisis Completo de Rendimientos - Todos los Gráficos", 
+                    font=("Arial", 16, "bold")).pack()
+            
+            # Figura con todos los gráficos (reutilizada si ya se generó)
+            fig = self.figura_rendimientos("todos")
             
             # Crear canvas y mostrar
             canvas = FigureCanvasTk(fig, ventana_todos)
@@ -1149,4 +1203,67 @@ POR TEMPORADA:
             print(f"Error en mostrar_todos_graficos_rendimientos: {e}")
             messagebox.showerror("Error", f"Error al generar análisis completo: {str(e)}")
             if self.barra_estado:
-                self.barra_estado.config(text="Error al generar análisis completo")
\ No newline at end of file
+                self.barra_estado.config(text="Error al generar análisis completo")
+
+
+# ------------------------------------------------------------
+# Exportación por lotes (sin ventana, backend Agg)
+# ------------------------------------------------------------
+
+_GESTOR_LOTE = None
+
+
+def _iniciar_proceso_lote(df):
+    """Prepara un GraficosManager propio en cada proceso del lote"""
+    global _GESTOR_LOTE
+    import matplotlib
+    matplotlib.use('Agg')
+    _GESTOR_LOTE = GraficosManager(df)
+
+
+def _nombre_archivo(texto):
+    return re.sub(r'[^\w\-]+', '_', str(texto)).strip('_')
+
+
+def _renderizar_lote(tarea):
+    """Genera y guarda las figuras de una tarea (posición del cultivo o None, tipos, directorio, dpi)"""
+    posicion, tipos, directorio, dpi = tarea
+    gestor = _GESTOR_LOTE
+    archivos = []
+    
+    for tipo in tipos:
+        try:
+            if posicion is None:
+                fig = gestor.figura_rendimientos(tipo, memorizar=False)
+                nombre = f"rendimientos_{tipo}.png"
+            else:
+                cultivo = gestor.df.iloc[posicion]
+                fig = gestor.figura_cultivo(tipo, cultivo, memorizar=False)
+                nombre = f"{_nombre_archivo(cultivo['cultivo'])}_{tipo}.png"
+            
+            FigureCanvasAgg(fig)
+            ruta = os.path.join(directorio, nombre)
+            fig.savefig(ruta, dpi=dpi, bbox_inches='tight')
+            archivos.append(ruta)
+        except Exception as e:
+            print(f"Error exportando gráfico {tipo}: {e}")
+    
+    return archivos
+
+
+def exportar_lote_graficos(df, directorio="graficos_exportados", procesos=None, dpi=150):
+    """Guarda en PNG todos los gráficos generales y los de cada cultivo usando varios procesos
+    
+    No necesita ventana (cada proceso usa el backend Agg). Devuelve la lista de archivos creados.
+    """
+    os.makedirs(directorio, exist_ok=True)
+    
+    tareas = [(None, GraficosManager.TIPOS_RENDIMIENTO, directorio, dpi)]
+    tareas += [(i, GraficosManager.TIPOS_CULTIVO, directorio, dpi) for i in range(len(df))]
+    
+    archivos = []
+    with ProcessPoolExecutor(max_workers=procesos, initializer=_iniciar_proceso_lote,
+                             initargs=(df,)) as ejecutor:
+        for resultado in ejecutor.map(_renderizar_lote, tareas):
+            archivos.extend(resultado)
+    return archivos
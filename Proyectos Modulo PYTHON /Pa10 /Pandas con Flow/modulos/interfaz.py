@@ -387,20 +387,12 @@ ANÁLISIS COMPARATIVO:
         
         # Agregar análisis comparativo
         try:
-            rendimiento_actual = float(cultivo['rendimiento_promedio'].split()[0])
+            rendimiento_actual = float(cultivo['rendimiento_numerico'])
             
             # Comparar con otros cultivos
-            mejores = 0
-            total = 0
-            
-            for _, fila in self.datos_manager.df.iterrows():
-                try:
-                    rend = float(fila['rendimiento_promedio'].split()[0])
-                    if rend < rendimiento_actual:
-                        mejores += 1
-                    total += 1
-                except:
-                    continue
+            rendimientos = self.datos_manager.df['rendimiento_numerico'].dropna()
+            mejores = int((rendimientos < rendimiento_actual).sum())
+            total = len(rendimientos)
             
             if total > 0:
                 percentil = (mejores / total) * 100
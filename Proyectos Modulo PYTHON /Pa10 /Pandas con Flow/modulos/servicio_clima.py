@@ -0,0 +1,220 @@
+import json
+import os
+import threading
+import time
+from concurrent.futures import Future, ThreadPoolExecutor
+
+import requests
+
+
+def extraer_clima(data):
+    """Convierte la respuesta de OpenWeatherMap en el diccionario que usa la interfaz"""
+    return {
+        'temperatura': data['main']['temp'],
+        'humedad': data['main']['humidity'],
+        'descripcion': data['weather'][0]['description'],
+        'sensacion': data['main']['feels_like'],
+        'presion': data['main']['pressure'],
+        'viento': data['wind']['speed'] if 'wind' in data else 0,
+        'ubicacion': data['name'],
+        'pais': data['sys']['country']
+    }
+
+
+def normalizar_ubicacion(ubicacion):
+    return str(ubicacion).strip().lower()
+
+
+# ------------------------------------------------------------
+# Backends: de dónde salen las respuestas
+# ------------------------------------------------------------
+
+class BackendOpenWeather:
+    """Consulta la API real de OpenWeatherMap (reutiliza la conexión HTTP)"""
+
+    requiere_api_key = True
+
+    def __init__(self, obtener_api_key, base_url="http://api.openweathermap.org/data/2.5/weather", timeout=10):
+        # obtener_api_key es una función para usar siempre la clave configurada más reciente
+        self.obtener_api_key = obtener_api_key
+        self.base_url = base_url
+        self.timeout = timeout
+        self.sesion = requests.Session()
+
+    def consultar(self, ubicacion):
+        api_key = self.obtener_api_key()
+        if not api_key:
+            raise ValueError("API key no configurada")
+
+        params = {
+            'q': ubicacion,
+            'appid': api_key,
+            'units': 'metric',
+            'lang': 'es'
+        }
+        response = self.sesion.get(self.base_url, params=params, timeout=self.timeout)
+        if response.status_code != 200:
+            raise ValueError(f"Error en API: {response.status_code}")
+        return response.json()
+
+
+class BackendGrabado:
+    """Reproduce respuestas guardadas en un archivo JSON (pruebas y uso sin conexión)
+
+    El archivo tiene la forma {"panama city": {...respuesta de la API...}}.
+    """
+
+    requiere_api_key = False
+
+    def __init__(self, ruta):
+        self.ruta = ruta
+        self._lock = threading.Lock()
+        self.respuestas = {}
+        if os.path.exists(ruta):
+            with open(ruta, 'r', encoding='utf-8') as f:
+                self.respuestas = {normalizar_ubicacion(k): v for k, v in json.load(f).items()}
+
+    def consultar(self, ubicacion):
+        respuesta = self.respuestas.get(normalizar_ubicacion(ubicacion))
+        if respuesta is None:
+            raise ValueError(f"Sin respuesta grabada para: {ubicacion}")
+        return respuesta
+
+    def grabar(self, ubicacion, respuesta):
+        """Guarda una respuesta real para poder reproducirla más tarde"""
+        with self._lock:
+            self.respuestas[normalizar_ubicacion(ubicacion)] = respuesta
+            with open(self.ruta, 'w', encoding='utf-8') as f:
+                json.dump(self.respuestas, f, ensure_ascii=False, indent=2)
+
+
+# ------------------------------------------------------------
+# Servicio con caché
+# ------------------------------------------------------------
+
+class ServicioClima:
+    """Capa entre la interfaz y el backend: caché con vencimiento, solicitudes
+    agrupadas y consultas en hilos para no bloquear la ventana"""
+
+    # El refresco corre antes del vencimiento para que la caché nunca quede vencida
+    FRACCION_REFRESCO = 0.8
+
+    def __init__(self, backend, ttl=600, intervalo_minimo=1.0, grabador=None, max_hilos=2):
+        self.backend = backend
+        self.ttl = ttl                              # segundos que una respuesta se considera vigente
+        self.intervalo_minimo = intervalo_minimo    # separación mínima entre llamadas al backend
+        self.grabador = grabador
+
+        self._lock = threading.Lock()
+        self._cache = {}        # ubicación normalizada -> (instante, clima)
+        self._en_curso = {}     # ubicación normalizada -> Future de la consulta pendiente
+        self._ultima_llamada = 0.0
+        self._lock_llamadas = threading.Lock()
+        self._ejecutor = ThreadPoolExecutor(max_workers=max_hilos, thread_name_prefix="clima")
+
+        self._hilo_refresco = None
+        self._detener = threading.Event()
+
+    def leer_cache(self, ubicacion):
+        """Devuelve el clima guardado si sigue vigente, o None"""
+        with self._lock:
+            guardado = self._cache.get(normalizar_ubicacion(ubicacion))
+        if guardado and time.monotonic() - guardado[0] < self.ttl:
+            return guardado[1]
+        return None
+
+    def invalidar(self, ubicacion=None):
+        """Descarta la caché de una ubicación (o toda si no se indica)"""
+        with self._lock:
+            if ubicacion is None:
+                self._cache.clear()
+            else:
+                self._cache.pop(normalizar_ubicacion(ubicacion), None)
+
+    def solicitar(self, ubicacion, callback=None, forzar=False):
+        """Pide el clima sin bloquear y devuelve un Future
+
+        Si hay un dato vigente en caché se resuelve al instante. Si ya hay
+        una consulta en curso para la misma ubicación se reutiliza en lugar
+        de lanzar otra. El callback recibe el clima (o None si falló) y se
+        ejecuta en el hilo de la consulta: la interfaz debe pasarlo a Tk.
+        """
+        clave = normalizar_ubicacion(ubicacion)
+        clima = None if forzar else self.leer_cache(ubicacion)
+
+        if clima is not None:
+            futuro = Future()
+            futuro.set_result(clima)
+        else:
+            with self._lock:
+                futuro = self._en_curso.get(clave)
+                if futuro is None:
+                    futuro = self._ejecutor.submit(self._consultar, ubicacion, clave)
+                    self._en_curso[clave] = futuro
+
+        if callback:
+            futuro.add_done_callback(lambda f: callback(f.result()))
+        return futuro
+
+    def obtener(self, ubicacion, forzar=False):
+        """Versión bloqueante de solicitar (no usar desde el hilo de la interfaz)"""
+        return self.solicitar(ubicacion, forzar=forzar).result()
+
+    def _esperar_turno(self):
+        """Respeta el intervalo mínimo entre llamadas al backend"""
+        with self._lock_llamadas:
+            espera = self._ultima_llamada + self.intervalo_minimo - time.monotonic()
+            if espera > 0:
+                time.sleep(espera)
+            self._ultima_llamada = time.monotonic()
+
+    def _consultar(self, ubicacion, clave):
+        clima = None
+        try:
+            self._esperar_turno()
+            respuesta = self.backend.consultar(ubicacion)
+            clima = extraer_clima(respuesta)
+            if self.grabador is not None:
+                self.grabador.grabar(ubicacion, respuesta)
+        except requests.exceptions.RequestException as e:
+            print(f"Error de conexión: {e}")
+        except Exception as e:
+            print(f"Error procesando clima: {e}")
+        finally:
+            with self._lock:
+                if clima is not None:
+                    self._cache[clave] = (time.monotonic(), clima)
+                self._en_curso.pop(clave, None)
+        return clima
+
+    # ------------------------------------------------------------
+    # Refresco en segundo plano
+    # ------------------------------------------------------------
+
+    def iniciar_refresco(self, obtener_ubicaciones, al_actualizar, intervalo=None):
+        """Lanza un hilo que renueva periódicamente el clima de las ubicaciones indicadas
+
+        obtener_ubicaciones se llama en cada vuelta (así se respetan los
+        cambios de ubicación) y al_actualizar(ubicacion, clima) recibe cada
+        resultado nuevo desde el hilo de refresco. Por defecto renueva a
+        FRACCION_REFRESCO del ttl, antes de que el dato guardado venza.
+        """
+        if self._hilo_refresco is not None and self._hilo_refresco.is_alive():
+            return
+        intervalo = intervalo or self.ttl * self.FRACCION_REFRESCO
+        self._detener.clear()
+
+        def bucle():
+            while not self._detener.wait(intervalo):
+                for ubicacion in obtener_ubicaciones():
+                    clima = self.obtener(ubicacion, forzar=True)
+                    if clima is not None:
+                        al_actualizar(ubicacion, clima)
+
+        self._hilo_refresco = threading.Thread(target=bucle, name="clima-refresco", daemon=True)
+        self._hilo_refresco.start()
+
+    def detener(self):
+        """Detiene el refresco y los hilos de consulta (llamar al cerrar la aplicación)"""
+        self._detener.set()
+        self._ejecutor.shutdown(wait=False)
@@ -0,0 +1,155 @@
+import numpy as np
+import pandas as pd
+
+
+class SimilitudCultivos:
+    """Clase para calcular una sola vez la similitud entre todos los cultivos"""
+
+    # Puntos por cada característica compartida
+    PUNTOS_TEMPORADA = 3
+    PUNTOS_LLUVIA = 2
+    PUNTOS_TEMPERATURA = 2
+    PUNTOS_RENDIMIENTO = 1
+
+    # Filas por bloque al calcular la matriz (limita la memoria temporal)
+    TAMANO_BLOQUE = 512
+
+    COLUMNAS = ['temporada_siembra', 'lluvia', 'temperatura_ideal', 'rendimiento_promedio']
+
+    def __init__(self, df, tolerancia_rendimiento=0.2):
+        self.tolerancia_rendimiento = tolerancia_rendimiento
+        # Vocabularios estables entre recargas para que los códigos no cambien
+        self._vocabularios = {col: {} for col in self.COLUMNAS[:3]}
+        self.nombres = []
+        self.indice = {}
+        self.rendimientos = np.empty(0)
+        self.matriz = np.zeros((0, 0), dtype=np.int8)
+        self._codigos = np.zeros((0, 3), dtype=np.int32)
+        self._firmas = []
+        self.actualizar(df)
+
+    # ------------------------------------------------------------
+    # Construcción
+    # ------------------------------------------------------------
+
+    def _codificar(self, columna, valores):
+        """Convierte textos en códigos enteros usando el vocabulario de la columna"""
+        vocab = self._vocabularios[columna]
+        return np.array([vocab.setdefault(v, len(vocab)) for v in valores], dtype=np.int32)
+
+    @staticmethod
+    def _extraer_rendimientos(serie):
+        """Extrae el valor numérico de textos como '3.8 t/ha' (NaN si no se puede)"""
+        return pd.to_numeric(serie.astype(str).str.extract(r'^\s*([\d.]+)', expand=False),
+                             errors='coerce').to_numpy(dtype=float)
+
+    def _puntuar(self, filas, columnas):
+        """Calcula el bloque de puntuaciones filas × columnas de forma vectorizada"""
+        cod, rend = self._codigos, self.rendimientos
+        puntos = np.array([self.PUNTOS_TEMPORADA, self.PUNTOS_LLUVIA, self.PUNTOS_TEMPERATURA],
+                          dtype=np.int8)
+        iguales = cod[filas][:, None, :] == cod[columnas][None, :, :]
+        bloque = (iguales * puntos).sum(axis=2, dtype=np.int8)
+
+        # Rendimiento similar respecto al cultivo de referencia (la fila)
+        ref = rend[filas][:, None]
+        with np.errstate(invalid='ignore', divide='ignore'):
+            parecido = np.abs(ref - rend[columnas][None, :]) <= self.tolerancia_rendimiento * ref
+        parecido &= (ref > 0)
+        bloque += parecido.astype(np.int8) * self.PUNTOS_RENDIMIENTO
+        return bloque
+
+    def actualizar(self, df):
+        """Actualiza la matriz recalculando solo los cultivos nuevos o modificados"""
+        if df is None or df.empty or 'cultivo' not in df.columns:
+            self._reiniciar()
+            return
+
+        nombres = df['cultivo'].astype(str).tolist()
+        firmas = list(zip(*(df[col].astype(str).tolist() for col in self.COLUMNAS)))
+
+        # Emparejar con la versión anterior: mismo nombre y mismas características
+        anteriores = {(n, f): i for i, (n, f) in enumerate(zip(self.nombres, self._firmas))}
+        origen = np.array([anteriores.get((n, f), -1) for n, f in zip(nombres, firmas)], dtype=np.int64)
+
+        matriz_anterior = self.matriz
+        codigos = np.column_stack([
+            self._codificar(col, df[col].astype(str).tolist()) for col in self.COLUMNAS[:3]
+        ])
+
+        self.nombres = nombres
+        self._firmas = firmas
+        self.indice = {n: i for i, n in enumerate(nombres)}
+        self._codigos = codigos
+        if 'rendimiento_numerico' in df.columns:
+            # Modelo tipado de DatosManager: el rendimiento ya viene convertido
+            self.rendimientos = df['rendimiento_numerico'].to_numpy(dtype=float)
+        else:
+            self.rendimientos = self._extraer_rendimientos(df['rendimiento_promedio'])
+
+        n = len(nombres)
+        conservados = np.flatnonzero(origen >= 0)
+        cambiados = np.flatnonzero(origen < 0)
+
+        matriz = np.zeros((n, n), dtype=np.int8)
+        if len(conservados):
+            matriz[np.ix_(conservados, conservados)] = matriz_anterior[np.ix_(origen[conservados], origen[conservados])]
+        if len(cambiados):
+            todos = np.arange(n)
+            for inicio in range(0, len(cambiados), self.TAMANO_BLOQUE):
+                filas = cambiados[inicio:inicio + self.TAMANO_BLOQUE]
+                matriz[filas, :] = self._puntuar(filas, todos)
+            for inicio in range(0, len(conservados), self.TAMANO_BLOQUE):
+                filas = conservados[inicio:inicio + self.TAMANO_BLOQUE]
+                matriz[np.ix_(filas, cambiados)] = self._puntuar(filas, cambiados)
+        np.fill_diagonal(matriz, 0)
+        self.matriz = matriz
+
+    def _reiniciar(self):
+        self.nombres = []
+        self.indice = {}
+        self._firmas = []
+        self.rendimientos = np.empty(0)
+        self.matriz = np.zeros((0, 0), dtype=np.int8)
+        self._codigos = np.zeros((0, 3), dtype=np.int32)
+
+    # ------------------------------------------------------------
+    # Consultas
+    # ------------------------------------------------------------
+
+    def vecinos(self, cultivo, k=5, minimo=3, desempate_por_rendimiento=False, solo_con_rendimiento=False):
+        """Devuelve hasta k tuplas (cultivo, puntuación, rendimiento) ordenadas por similitud
+
+        Por defecto los empates conservan el orden del dataset; con
+        desempate_por_rendimiento=True gana el de mayor rendimiento.
+        Con solo_con_rendimiento=True los cultivos sin rendimiento numérico se
+        descartan antes de elegir los k mejores.
+        """
+        i = self.indice.get(cultivo)
+        if i is None:
+            return []
+
+        fila = self.matriz[i].astype(np.float64)
+        candidatos = np.flatnonzero(fila >= minimo)
+        candidatos = candidatos[candidatos != i]
+        if solo_con_rendimiento:
+            candidatos = candidatos[~np.isnan(self.rendimientos[candidatos])]
+        if len(candidatos) == 0:
+            return []
+
+        n = len(self.nombres)
+        if desempate_por_rendimiento:
+            rend = np.nan_to_num(self.rendimientos[candidatos], nan=-np.inf)
+            rango = np.argsort(np.argsort(rend, kind='stable'), kind='stable')
+            claves = fila[candidatos] + rango / (n + 1)
+        else:
+            claves = fila[candidatos] - candidatos / (n + 1)
+
+        if len(candidatos) > k:
+            parte = np.argpartition(-claves, k - 1)[:k]
+        else:
+            parte = np.arange(len(candidatos))
+        orden = parte[np.argsort(-claves[parte], kind='stable')]
+
+        return [(self.nombres[j], int(self.matriz[i, j]), float(self.rendimientos[j]))
+                for j in candidatos[orden]]
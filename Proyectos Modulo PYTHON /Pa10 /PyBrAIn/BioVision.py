@@ -1,270 +1,469 @@
 # -*- coding: utf-8 -*-
-"""BioVision_Colab_Notebook.ipynb
+"""BioVisión — Proyecto (SIC)
 
-Automatically generated by Colab.
+**Prototipo analítico** que identifica factores de riesgo de **diabetes** y su relación con la **salud ocular** usando **Python (pandas + matplotlib)**.
 
-Original file is located at
-    https://colab.research.google.com/drive/12wSddNdvvnQf6s15j5ISPHXKg8yCkSra
+Originalmente exportado desde Colab (BioVision_Colab_Notebook.ipynb); ahora es un
+módulo importable que se ejecuta completo con un solo comando y sin pantalla:
 
-# **BioVisión —  Proyecto (SIC)**
-**Prototipo analítico** que identifica factores de riesgo de **diabetes** y su relación con la **salud ocular** usando **Python (pandas + matplotlib)**.
+    python BioVision.py --input DiabetesPrediccion.csv --output resultados/
 
-> **Datasets:**  
+> **Datasets:**
 > - `DiabetesPrediccion.csv` (clínico, mixto H/M)
 
-## **Entorno y librerías**
+El CSV se lee por bloques con tipos compactos y cada bloque se resume en
+acumuladores (conteos y sumas), así que la memoria no depende del tamaño
+del archivo: sirve igual para 100 mil filas que para extractos de millones.
 """
 
 # Importar bibliotecas necesarias para el análisis de datos, visualización y modelado
-import os # Para interactuar con el sistema operativo (no se usa directamente en este fragmento, pero es común)
-import math # Funciones matemáticas (no se usa directamente en este fragmento)
+import os # Rutas de entrada y salida
+import sys # Código de salida del comando
+import time # Tiempos por etapa
+import argparse # Opciones de la línea de comandos
 import numpy as np # Para operaciones numéricas y arrays
 import pandas as pd # Para manipulación y análisis de datos (DataFrames)
-import matplotlib.pyplot as plt # Para crear visualizaciones estáticas
-import seaborn as sns # Basado en matplotlib, para visualizaciones estadísticas más atractivas
 
 # Módulos de scikit-learn para el modelo de regresión logística
 from sklearn.linear_model import LogisticRegression # Modelo lineal para clasificación
 from sklearn.preprocessing import StandardScaler # Para escalar (normalizar) las características
+from sklearn.pipeline import make_pipeline # Escalador + modelo en un solo objeto
 from sklearn.model_selection import train_test_split # Para dividir el dataset en conjuntos de entrenamiento y prueba
 from sklearn.metrics import classification_report # Para evaluar el rendimiento del modelo
 
 """
-## **Cargar datasets**"""
-
-# Cargar el dataset clínico desde un archivo CSV
-clin = pd.read_csv("DiabetesPrediccion.csv")  # DataFrame con datos clínicos
-
-# Mostrar las primeras 3 filas del DataFrame para una inspección rápida
-display(clin.head(3))
-
-"""## **Inspección rápida**"""
+## **Parámetros del análisis**
+"""
 
-# Información general del dataset
-clin.info()
+# Carpeta del módulo: el CSV por defecto se busca junto a este archivo
+RAIZ = os.path.dirname(os.path.abspath(__file__))
+RUTA_CSV = os.path.join(RAIZ, "DiabetesPrediccion.csv")
+
+# Filas por bloque al leer el CSV (controla la memoria máxima usada)
+TAMANO_BLOQUE = 250_000
+
+# Categorías conocidas (valores fuera de estas listas quedan como nulos)
+GENEROS = ['FEMALE', 'MALE', 'OTHER']
+FUMADOR = ['never', 'No Info', 'current', 'former', 'ever', 'not current']
+
+# Tipos al leer: categorías para texto, float32 para signos vitales, int8 para indicadores 0/1
+TIPOS = {
+    'gender': 'category',
+    'age': 'float32',
+    'hypertension': 'int8',
+    'heart_disease': 'int8',
+    'smoking_history': pd.CategoricalDtype(FUMADOR),
+    'bmi': 'float32',
+    'HbA1c_level': 'float32',
+    'blood_glucose_level': 'float32',
+    'diabetes': 'int8',
+}
+
+# Variables de la matriz de correlaciones y del modelo
+NUM_COLS = ['age', 'bmi', 'HbA1c_level', 'blood_glucose_level', 'hypertension', 'heart_disease', 'diabetes']
+PREDICTORAS = ['age', 'bmi', 'HbA1c_level', 'blood_glucose_level', 'hypertension', 'heart_disease']
+
+# Grupos etarios: ≤30, 31–40, 41–50, 51–60, 61–70, 70+
+BINS = [0, 30, 40, 50, 60, 70, 110]
+LABELS = ['≤30', '31–40', '41–50', '51–60', '61–70', '>70']
+
+# Histograma de glucosa (reemplaza al KDE sobre todas las filas)
+BORDES_GLUCOSA = np.arange(0, 402, 2)
+ETIQUETAS_DIABETES = ['Sin diabetes', 'Con diabetes']
 
-# Resumen estadístico de las variables numéricas
-display(clin.describe().T)
+"""
+## **Carga por bloques y limpieza**
+- Estandarizar **edad** y **sexo**.
+- Asegurar `diabetes` (0/1) y numéricos válidos (`bmi`, `HbA1c_level`, `blood_glucose_level`).
+- Filtrar edades fuera de rango razonable (0–110).
+"""
 
-# Porcentaje de valores nulos
-print("Valores nulos por columna (%):")
-print(clin.isna().mean().round(3) * 100)
+def _normalizar_genero(serie):
+    # Se normalizan las categorías (pocas) en lugar de cada fila: upper/strip sobre 'Female', 'Male', ...
+    normalizadas = serie.cat.categories.str.upper().str.strip()
+    mapa = pd.Index(GENEROS).get_indexer(normalizadas)
+    codigos = serie.cat.codes.to_numpy()
+    return pd.Categorical.from_codes(np.where(codigos >= 0, mapa[codigos], -1), GENEROS)
+
+def limpiar_bloque(bloque):
+    """Limpia un bloque ya tipado: género normalizado, edades válidas y grupo etario."""
+    bloque = bloque[(bloque['age'] > 0) & (bloque['age'] <= 110)].copy()
+    bloque['gender'] = _normalizar_genero(bloque['gender'])
+    bloque['age_bin'] = pd.cut(bloque['age'], bins=BINS, labels=LABELS, right=True)
+    return bloque
+
+def leer_bloques(ruta=RUTA_CSV, tamano_bloque=TAMANO_BLOQUE, columnas=None):
+    """
+    Recorre el CSV en bloques tipados y limpios (generador).
+    Devuelve tuplas (bloque_limpio, filas_leídas, nulos_por_columna) para poder
+    informar también sobre los datos crudos.
+    """
+    usecols = None if columnas is None else list(dict.fromkeys(list(columnas) + ['age', 'gender']))
+    tipos = TIPOS if usecols is None else {c: t for c, t in TIPOS.items() if c in usecols}
+    for bloque in pd.read_csv(ruta, dtype=tipos, usecols=usecols, chunksize=tamano_bloque):
+        yield limpiar_bloque(bloque), len(bloque), bloque.isna().sum()
+
+def cargar_datos(ruta=RUTA_CSV, columnas=None, tamano_bloque=TAMANO_BLOQUE):
+    """DataFrame limpio completo (solo 'columnas' si se indican) con los tipos compactos."""
+    partes = [bloque if columnas is None else bloque[list(columnas)]
+              for bloque, _, _ in leer_bloques(ruta, tamano_bloque, columnas)]
+    return pd.concat(partes, ignore_index=True)
 
 """
-## **Limpieza y normalización**
-- Estandarizar **edad** y **sexo** en ambos datasets.  
-- En ocular: crear `has_retinopathy = D` (0/1).  
-- En clínico: asegurar `diabetes` (0/1), y numéricos válidos (`bmi`, `HbA1c_level`, `blood_glucose_level`).
-- Filtrar edades fuera de rango razonable (0–110).
+## **Agregación en una sola pasada**
+Cada bloque suma a conteos fijos (grupo etario × sexo, sexo, diabetes) y a las
+sumas de la matriz de correlaciones. Los resultados se arman una sola vez al
+final y quedan guardados hasta que llegue otro bloque.
 """
 
-# Creamos una copia del dataset original para trabajar
-data = clin.copy()
+class ResumenClinico:
+    """Acumuladores del análisis descriptivo (tamaño fijo, independiente del número de filas)."""
+
+    def __init__(self):
+        k, e, g = len(NUM_COLS), len(LABELS), len(GENEROS)
+        self.filas_leidas = 0
+        self.filas = 0
+        self.nulos = pd.Series(dtype='int64')
+        self.muestra = None
+        # Prevalencia por grupo etario × sexo
+        self.conteo_edad_genero = np.zeros((e, g))
+        self.casos_edad_genero = np.zeros((e, g))
+        # Hipertensión y cardiopatía por sexo
+        self.conteo_genero = np.zeros(g)
+        self.hipertension_genero = np.zeros(g)
+        self.cardiopatia_genero = np.zeros(g)
+        # IMC por grupo etario × diabetes
+        self.conteo_imc = np.zeros((e, 2))
+        self.suma_imc = np.zeros((e, 2))
+        # Correlaciones: por cada par, filas donde ambos existen, sumas, cuadrados y productos
+        self.n = np.zeros((k, k))
+        self.sx = np.zeros((k, k))
+        self.sxx = np.zeros((k, k))
+        self.sxy = np.zeros((k, k))
+        self.minimo = np.full(k, np.inf)
+        self.maximo = np.full(k, -np.inf)
+        # Histograma de glucosa por condición
+        self.glucosa = np.zeros((2, len(BORDES_GLUCOSA) - 1))
+        self._resultados = None
+
+    def agregar(self, bloque, filas_leidas=None, nulos=None):
+        """Suma un bloque limpio (salida de limpiar_bloque) a los acumuladores."""
+        self._resultados = None
+        self.filas_leidas += len(bloque) if filas_leidas is None else filas_leidas
+        if nulos is not None:
+            self.nulos = self.nulos.add(nulos, fill_value=0)
+        if self.muestra is None:
+            self.muestra = bloque.head(5)
+        self.filas += len(bloque)
+        if bloque.empty:
+            return
+
+        e, g = len(LABELS), len(GENEROS)
+        edad = bloque['age_bin'].cat.codes.to_numpy()
+        genero = bloque['gender'].cat.codes.to_numpy()
+        diabetes = bloque['diabetes'].to_numpy()
+
+        # Conteos por combinación de códigos (un bincount en lugar de un groupby por bloque)
+        validos = (edad >= 0) & (genero >= 0)
+        celda = edad[validos] * g + genero[validos]
+        self.conteo_edad_genero += np.bincount(celda, minlength=e * g).reshape(e, g)
+        self.casos_edad_genero += np.bincount(celda, weights=diabetes[validos], minlength=e * g).reshape(e, g)
+
+        con_genero = genero >= 0
+        self.conteo_genero += np.bincount(genero[con_genero], minlength=g)
+        self.hipertension_genero += np.bincount(genero[con_genero], weights=bloque['hypertension'].to_numpy()[con_genero], minlength=g)
+        self.cardiopatia_genero += np.bincount(genero[con_genero], weights=bloque['heart_disease'].to_numpy()[con_genero], minlength=g)
+
+        imc = bloque['bmi'].to_numpy(dtype=np.float64)
+        con_imc = (edad >= 0) & ~np.isnan(imc)
+        celda = edad[con_imc] * 2 + diabetes[con_imc]
+        self.conteo_imc += np.bincount(celda, minlength=e * 2).reshape(e, 2)
+        self.suma_imc += np.bincount(celda, weights=imc[con_imc], minlength=e * 2).reshape(e, 2)
+
+        x = bloque[NUM_COLS].to_numpy(dtype=np.float64)
+        presentes = ~np.isnan(x)
+        v = np.where(presentes, x, 0.0)
+        m = presentes.astype(np.float64)
+        self.n += m.T @ m
+        self.sx += v.T @ m
+        self.sxx += (v * v).T @ m
+        self.sxy += v.T @ v
+        self.minimo = np.fmin(self.minimo, np.nanmin(np.where(presentes, x, np.inf), axis=0))
+        self.maximo = np.fmax(self.maximo, np.nanmax(np.where(presentes, x, -np.inf), axis=0))
+
+        glucosa = np.clip(bloque['blood_glucose_level'].to_numpy(dtype=np.float64), BORDES_GLUCOSA[0], BORDES_GLUCOSA[-1] - 1e-9)
+        for d in (0, 1):
+            seleccion = (diabetes == d) & ~np.isnan(glucosa)
+            self.glucosa[d] += np.histogram(glucosa[seleccion], bins=BORDES_GLUCOSA)[0]
+
+    def agregar_bloques(self, bloques):
+        for bloque, filas_leidas, nulos in bloques:
+            self.agregar(bloque, filas_leidas, nulos)
+        return self
+
+    # ---------- Resultados (se arman una vez y quedan guardados) ----------
+    def resultados(self):
+        if self._resultados is None:
+            self._resultados = self._armar_resultados()
+        return self._resultados
+
+    def _armar_resultados(self):
+        with np.errstate(divide='ignore', invalid='ignore'):
+            tasa = self.casos_edad_genero / self.conteo_edad_genero
+            media = np.diag(self.sx) / np.diag(self.n)
+            var = (np.diag(self.sxx) - np.diag(self.n) * media ** 2) / (np.diag(self.n) - 1)
+            cov = self.n * self.sxy - self.sx * self.sx.T
+            corr = cov / np.sqrt((self.n * self.sxx - self.sx ** 2) * (self.n * self.sxx.T - self.sx.T ** 2))
+            imc = self.suma_imc / self.conteo_imc
+            proporciones = np.stack([self.hipertension_genero, self.cardiopatia_genero], axis=1) / self.conteo_genero[:, None]
+            densidad = self.glucosa / (self.glucosa.sum(axis=1, keepdims=True) * np.diff(BORDES_GLUCOSA))
+
+        # Tabla larga edad × sexo (mismas columnas que age_sex_grp del notebook)
+        edad_idx, genero_idx = np.nonzero(self.conteo_edad_genero)
+        prevalencia = pd.DataFrame({
+            'age_bin': pd.Categorical(np.array(LABELS)[edad_idx], categories=LABELS, ordered=True),
+            'gender': np.array(GENEROS)[genero_idx],
+            'count': self.conteo_edad_genero[edad_idx, genero_idx].astype(int),
+            'sum': self.casos_edad_genero[edad_idx, genero_idx].astype(int),
+            'rate_diabetes': tasa[edad_idx, genero_idx],
+        })
+
+        corr = pd.DataFrame(np.clip(corr, -1, 1), index=NUM_COLS, columns=NUM_COLS)
+        np.fill_diagonal(corr.values, 1.0)
+
+        edad_idx, cond_idx = np.nonzero(self.conteo_imc)
+        imc_edad = pd.DataFrame({
+            'age_bin': pd.Categorical(np.array(LABELS)[edad_idx], categories=LABELS, ordered=True),
+            'diabetes_label': np.array(ETIQUETAS_DIABETES)[cond_idx],
+            'bmi': imc[edad_idx, cond_idx],
+        })
+
+        resumen = pd.DataFrame({
+            'count': np.diag(self.n).astype(int),
+            'mean': media,
+            'std': np.sqrt(var),
+            'min': self.minimo,
+            'max': self.maximo,
+        }, index=NUM_COLS)
+
+        con_datos = self.conteo_genero > 0
+        return {
+            'filas_leidas': self.filas_leidas,
+            'filas': self.filas,
+            'muestra': self.muestra,
+            'nulos_pct': (self.nulos / max(self.filas_leidas, 1) * 100).round(3),
+            'resumen': resumen,
+            'prevalencia': prevalencia,
+            'pivot': prevalencia.pivot(index='age_bin', columns='gender', values='rate_diabetes'),
+            'correlaciones': corr,
+            'corr_diabetes': corr['diabetes'].sort_values(ascending=False),
+            'proporciones_genero': pd.DataFrame(proporciones[con_datos], index=np.array(GENEROS)[con_datos],
+                                                columns=['hypertension', 'heart_disease']),
+            'imc_edad': imc_edad,
+            'glucosa': pd.DataFrame(densidad.T, index=(BORDES_GLUCOSA[:-1] + BORDES_GLUCOSA[1:]) / 2,
+                                    columns=ETIQUETAS_DIABETES),
+        }
+
+# Resultados ya calculados por archivo: (ruta, fecha de modificación, tamaño) -> ResumenClinico
+_RESUMENES = {}
+
+def analizar_csv(ruta=RUTA_CSV, tamano_bloque=TAMANO_BLOQUE):
+    """Resultados del análisis descriptivo; si el archivo no cambió se reutiliza la pasada anterior."""
+    info = os.stat(ruta)
+    clave = (os.path.abspath(ruta), info.st_mtime_ns, info.st_size)
+    if clave not in _RESUMENES:
+        _RESUMENES[clave] = ResumenClinico().agregar_bloques(leer_bloques(ruta, tamano_bloque))
+    return _RESUMENES[clave].resultados()
 
-# Normalizamos el texto en la columna 'gender' (género)
-data['gender'] = data['gender'].str.upper().str.strip()
+"""
+## **Modelo de regresión logística**
+Solo se cargan las columnas del modelo (float32 / int8). Para comparar varios
+modelos con validación cruzada ver benchmark_modelos.py.
+"""
 
-# Convertimos columnas a numéricas, tratando errores como NaN
-for col in ['age','bmi','HbA1c_level','blood_glucose_level']:
-    data[col] = pd.to_numeric(data[col], errors='coerce')
+def entrenar_modelo(ruta=RUTA_CSV, tamano_bloque=TAMANO_BLOQUE):
+    """Separa 70/30 y entrena escalador + regresión logística. Devuelve (pipeline, coeficientes, reporte)."""
+    data = cargar_datos(ruta, PREDICTORAS + ['diabetes'], tamano_bloque)
+    X = data[PREDICTORAS]
+    y = data['diabetes']
 
-# Filtramos filas donde la edad está fuera de un rango razonable (0 a 110 años)
-data = data[(data['age']>0) & (data['age']<=110)]
+    X_train, X_test, y_train, y_test = train_test_split(X, y, test_size=0.3, random_state=42)
 
-# Renombramos la columna 'diabetes' a 'has_diabetes' y la convertimos a entero (0 o 1)
-data['has_diabetes'] = data['diabetes'].astype(int)
+    # El escalador se ajusta solo con el entrenamiento (queda dentro del pipeline)
+    model = make_pipeline(StandardScaler(), LogisticRegression())
+    model.fit(X_train, y_train)
 
-# Imprimimos las dimensiones del dataset limpio
-print("Dataset limpio:", data.shape)
-# Mostramos las primeras filas del dataset limpio
-display(data.head())
+    # Coeficientes del modelo entrenado: importancia de cada variable en la predicción
+    coefs = pd.DataFrame({'Variable': PREDICTORAS, 'Coeficiente': model[-1].coef_[0]})
+    reporte = classification_report(y_test, model.predict(X_test))
+    return model, coefs.sort_values('Coeficiente', ascending=False), reporte
 
 """
-## **Binning de edad y agregación (agrupacion)**
-Creamos grupos etarios: `≤30, 31–40, 41–50, 51–60, 61–70, 70+` y calculamos **prevalencias** por **edad × sexo**.
-
+## **Visualizaciones (renderizado sin pantalla)**
+Cada gráfico recibe un eje y los resultados ya agregados; se dibujan sobre
+`Figure` (sin pyplot, nada queda abierto) y se guardan como PNG.
 """
 
-# Definimos los rangos para agrupar las edades
-bins = [0, 30, 40, 50, 60, 70, 110]
-# Definimos las etiquetas para cada rango de edad
-labels = ['≤30', '31–40', '41–50', '51–60', '61–70', '>70']
-# Creamos una nueva columna 'age_bin' que contiene el grupo de edad al que pertenece cada individuo
-data['age_bin'] = pd.cut(data['age'], bins=bins, labels=labels, right=True)
-
-# Agrupamos los datos por grupo de edad y género
-age_sex_grp = (
-    data.groupby(['age_bin','gender'])
-      # Calculamos el número total de individuos en cada grupo ('count')
-      .agg(count=('age','size'),
-           # Calculamos la suma de casos de diabetes en cada grupo ('sum')
-           sum=('diabetes','sum'))
-      # Calculamos la tasa de diabetes (proporción de casos) por grupo
-      .assign(rate_diabetes=lambda x: x['sum']/x['count'])
-      # Reseteamos el índice para que 'age_bin' y 'gender' vuelvan a ser columnas
-      .reset_index()
-)
-
-"""## **Creación de grupos de edad y análisis de prevalencia**
-En esta sección, agruparemos a los individuos por rangos de edad definidos para analizar la prevalencia de diabetes dentro de cada grupo, separando los resultados por género. Esto nos permitirá identificar patrones en la distribución de la diabetes según la edad y el sexo.
-
-Creamos los siguientes grupos etarios: `≤30, 31–40, 41–50, 51–60, 61–70, 70+`. Luego, calcularemos la proporción de casos de diabetes por cada combinación de grupo de edad y género.
-
-## **Visualizaciones clave**
-A continuación, generaremos gráficos para visualizar las relaciones entre diferentes variables y la prevalencia de diabetes.
-
-1. **Tasa de Diabetes por Grupo de Edad y Género:** Este gráfico de barras mostrará cómo varía la proporción de personas con diabetes a través de los diferentes grupos de edad, diferenciando entre hombres y mujeres. Esto nos ayudará a entender el impacto de la edad y el género en el riesgo de diabetes.
-
-## **Visualizaciones base**  
-1. Diabetes por edad (M/F).
+def _barras_prevalencia(ax, res):
+    res['pivot'].plot(kind='bar', ax=ax)
+    ax.set_title('Tasa de Diabetes por Grupo de Edad y Género')
+    ax.set_ylabel('Proporción de casos de diabetes')
+    ax.set_xlabel('Grupo de Edad')
+    ax.legend(title='Género')
+    ax.grid(axis='y', alpha=0.3)
+
+def _proporcion_genero(columna, titulo):
+    def dibujar(ax, res):
+        proporciones = res['proporciones_genero'][columna]
+        ax.bar(proporciones.index, proporciones.values, color='#4C72B0')
+        ax.set_title(titulo)
+        ax.set_ylabel('Proporción')
+    return dibujar
+
+def _matriz_correlaciones(ax, res):
+    import seaborn as sns
+    sns.heatmap(res['correlaciones'], annot=True, fmt='.2f', cmap='coolwarm', square=True, ax=ax)
+    ax.set_title('Matriz de correlaciones clínicas')
+
+def _imc_edad(ax, res):
+    import seaborn as sns
+    sns.barplot(data=res['imc_edad'], x='age_bin', y='bmi', hue='diabetes_label', errorbar=None, ax=ax)
+    ax.set_title("IMC promedio por grupo de edad y condición de diabetes")
+    ax.set_xlabel("Grupo de edad")
+    ax.set_ylabel("IMC promedio")
+    ax.legend(title="Condición")
+
+def _densidad_glucosa(ax, res):
+    # Histograma normalizado y suavizado (equivalente al KDE sin guardar las filas)
+    nucleo = np.exp(-0.5 * (np.arange(-6, 7) / 2.0) ** 2)
+    nucleo /= nucleo.sum()
+    colores = {"Sin diabetes": "#1f77b4", "Con diabetes": "#ff7f0e"}
+    for etiqueta in ETIQUETAS_DIABETES:
+        densidad = np.convolve(res['glucosa'][etiqueta].fillna(0).to_numpy(), nucleo, mode='same')
+        ax.plot(res['glucosa'].index, densidad, color=colores[etiqueta], linewidth=2, label=etiqueta)
+        ax.fill_between(res['glucosa'].index, densidad, color=colores[etiqueta], alpha=0.35)
+    con_datos = res['glucosa'].index[(res['glucosa'].fillna(0) > 0).any(axis=1)]
+    if len(con_datos):
+        ax.set_xlim(con_datos.min() - 20, con_datos.max() + 20)
+    ax.set_title("Distribución del nivel de glucosa (Curva de densidad)", fontsize=12)
+    ax.set_xlabel("Nivel de glucosa (mg/dL)", fontsize=11)
+    ax.set_ylabel("Densidad de frecuencia", fontsize=11)
+    ax.legend(title="Condición", loc="upper right")
+    ax.grid(alpha=0.3)
+
+def _coeficientes(ax, res):
+    import seaborn as sns
+    coef_data = res['coeficientes'].sort_values('Coeficiente', ascending=True)
+    sns.barplot(data=coef_data, x='Coeficiente', y='Variable', hue='Variable', palette='coolwarm', legend=False, ax=ax)
+    ax.set_title('Importancia de las variables predictoras del riesgo de diabetes')
+    ax.set_xlabel('Peso en el modelo (Coeficiente)')
+    ax.set_ylabel('Variable')
+    ax.grid(axis='x', alpha=0.3)
+
+# nombre de archivo -> (función de dibujo, tamaño en pulgadas, resultado necesario)
+GRAFICOS = {
+    'prevalencia_edad_genero': (_barras_prevalencia, (8, 5), None),
+    'hipertension_genero': (_proporcion_genero('hypertension', 'Proporción de hipertensos por género'), (6.4, 4.8), None),
+    'cardiopatia_genero': (_proporcion_genero('heart_disease', 'Proporción de cardiopatías por género'), (6.4, 4.8), None),
+    'correlaciones': (_matriz_correlaciones, (8, 6), None),
+    'imc_edad_diabetes': (_imc_edad, (8, 5), None),
+    'densidad_glucosa': (_densidad_glucosa, (8, 5), None),
+    'coeficientes_modelo': (_coeficientes, (7, 4.5), 'coeficientes'),
+}
+
+def renderizar_reporte(res, carpeta, dpi=110, graficos=None):
+    """Dibuja los gráficos indicados (por defecto, todos los que tienen datos) como PNG en 'carpeta'. Devuelve las rutas."""
+    from matplotlib.figure import Figure
+    os.makedirs(carpeta, exist_ok=True)
+    if graficos is None:
+        graficos = [n for n, (_, _, necesario) in GRAFICOS.items() if necesario is None or necesario in res]
+    rutas = []
+    for nombre in graficos:
+        funcion, tamano, _ = GRAFICOS[nombre]
+        fig = Figure(figsize=tamano, dpi=dpi)
+        funcion(fig.add_subplot(), res)
+        fig.tight_layout()
+        ruta = os.path.join(carpeta, f"{nombre}.png")
+        fig.savefig(ruta, dpi=dpi)
+        rutas.append(ruta)
+    return rutas
+
+def exportar_tablas(res, carpeta):
+    """Guarda las tablas clave (prevalencias, correlaciones, IMC, resumen) como CSV."""
+    os.makedirs(carpeta, exist_ok=True)
+    tablas = {
+        'prevalencia_edad_genero.csv': res['prevalencia'],
+        'correlaciones.csv': res['correlaciones'],
+        'imc_edad_diabetes.csv': res['imc_edad'],
+        'resumen_estadistico.csv': res['resumen'],
+    }
+    for nombre, tabla in tablas.items():
+        tabla.to_csv(os.path.join(carpeta, nombre), index=nombre in ('correlaciones.csv', 'resumen_estadistico.csv'), encoding='utf-8')
+    return [os.path.join(carpeta, n) for n in tablas]
+
+"""
+## **Reporte completo (un solo comando)**
 """
 
-# Creamos una tabla pivote para preparar los datos para la visualización
-# El índice son los grupos de edad, las columnas son los géneros y los valores son las tasas de diabetes
-pivot = age_sex_grp.pivot(index='age_bin', columns='gender', values='rate_diabetes')
-
-# Creamos un gráfico de barras a partir de la tabla pivote
-pivot.plot(kind='bar', figsize=(8,5))
-
-# Configuramos el título y las etiquetas de los ejes
-plt.title('Tasa de Diabetes por Grupo de Edad y Género')
-plt.ylabel('Proporción de casos de diabetes')
-plt.xlabel('Grupo de Edad')
-# Mostramos la leyenda del gráfico
-plt.legend(title='Género')
-# Añadimos una cuadrícula horizontal para facilitar la lectura
-plt.grid(axis='y', alpha=0.3)
-# Ajustamos el layout para evitar que las etiquetas se solapen
-plt.tight_layout()
-# Mostramos el gráfico
-plt.show()
-
-corr = data[['age','bmi','HbA1c_level','blood_glucose_level','hypertension','heart_disease','diabetes']].corr()
-corr['diabetes'].sort_values(ascending=False)
-
-sns.barplot(x='gender', y='hypertension', data=data, estimator=lambda x: sum(x)/len(x))
-plt.title('Proporción de hipertensos por género')
-plt.ylabel('Proporción')
-plt.show()
-
-sns.barplot(x='gender', y='heart_disease', data=data, estimator=lambda x: sum(x)/len(x))
-plt.title('Proporción de cardiopatías por género')
-plt.ylabel('Proporción')
-plt.show()
-
-num_cols = ['age','bmi','HbA1c_level','blood_glucose_level','hypertension','heart_disease','diabetes']
-corr = data[num_cols].corr()
-
-plt.figure(figsize=(8,6))
-sns.heatmap(corr, annot=True, fmt='.2f', cmap='coolwarm', square=True)
-plt.title('Matriz de correlaciones clínicas')
-plt.show()
-
-pivot = age_sex_grp.pivot(index='age_bin', columns='gender', values='rate_diabetes')
-pivot.plot(kind='bar', figsize=(8,5))
-plt.title('Tasa de Diabetes por Grupo de Edad y Género')
-plt.ylabel('Proporción de casos de diabetes')
-plt.xlabel('Grupo de Edad')
-plt.legend(title='Género')
-plt.grid(axis='y', alpha=0.3)
-plt.tight_layout()
-plt.show()
-
-# Seleccionamos las variables predictoras (características) para el modelo
-X = data[['age','bmi','HbA1c_level','blood_glucose_level','hypertension','heart_disease']]
-# Seleccionamos la variable objetivo (lo que queremos predecir)
-y = data['diabetes']
-
-# Inicializamos el escalador para normalizar las características
-scaler = StandardScaler()
-# Ajustamos el escalador a los datos y transformamos las características
-X_scaled = scaler.fit_transform(X)
-
-# Dividimos los datos en conjuntos de entrenamiento y prueba (70% entrenamiento, 30% prueba)
-X_train, X_test, y_train, y_test = train_test_split(X_scaled, y, test_size=0.3, random_state=42)
-
-# Inicializamos el modelo de regresión logística
-model = LogisticRegression()
-# Entrenamos el modelo con los datos de entrenamiento
-model.fit(X_train, y_train)
-
-# Creamos un DataFrame para mostrar los coeficientes del modelo
-# Estos coeficientes indican la importancia de cada variable en la predicción
-coefs = pd.DataFrame({'Variable': X.columns, 'Coeficiente': model.coef_[0]})
-# Ordenamos los coeficientes de mayor a menor para ver qué variables tienen más peso
-display(coefs.sort_values('Coeficiente', ascending=False))
-
-col_bmi = "bmi_clipped" if "bmi_clipped" in data.columns else "bmi"
-
-# Preparamos los datos para el gráfico:
-df_age_bmi = (data
-              # Creamos una nueva columna 'diabetes_label' para poner etiquetas amigables
-              .assign(diabetes_label=lambda d: np.where(d["diabetes"].astype(int)==1, "Con diabetes", "Sin diabetes"))
-              # Agrupamos por grupo de edad y la nueva etiqueta de diabetes
-              .groupby(["age_bin","diabetes_label"], as_index=False)[col_bmi]
-              # Calculamos el promedio de IMC para cada grupo
-              .mean())
-
-# Creamos el gráfico de barras
-plt.figure(figsize=(8,5)) # Definimos el tamaño del gráfico
-sns.barplot(data=df_age_bmi, x="age_bin", y=col_bmi, hue="diabetes_label", errorbar=None) # Creamos el gráfico de barras
-plt.title("IMC promedio por grupo de edad y condición de diabetes") # Título del gráfico
-plt.xlabel("Grupo de edad") # Etiqueta del eje X
-plt.ylabel("IMC promedio") # Etiqueta del eje Y
-plt.legend(title="Condición") # Mostramos la leyenda (Con/Sin diabetes)
-plt.tight_layout() # Ajustamos el diseño para que no se solapen los elementos
-plt.show() # Mostramos el gráfico
-
-# --- Copia del DataFrame ---
-# Creamos una copia del DataFrame original para no modificar los datos brutos
-df_plot = data.copy()
-
-# Aseguramos que la columna 'diabetes' sea numérica (0 o 1) y llenamos posibles valores nulos con 0
-df_plot["diabetes"] = pd.to_numeric(df_plot["diabetes"], errors="coerce").fillna(0).astype(int)
-
-# Creamos una nueva columna 'diabetes_label' para tener etiquetas de texto más amigables
-df_plot["diabetes_label"] = np.where(df_plot["diabetes"] == 1, "Con diabetes", "Sin diabetes")
-
-# --- Gráfico de Densidad (KDE Plot) ---
-# Configuramos el tamaño de la figura para el gráfico
-plt.figure(figsize=(8,5))
-# Creamos el gráfico de densidad para la columna 'blood_glucose_level'
-sns.kdeplot(
-    data=df_plot, # Usamos el DataFrame copiado
-    x="blood_glucose_level", # Eje x: nivel de glucosa en sangre
-    hue="diabetes_label", # Diferenciamos las curvas por si tienen diabetes o no
-    fill=True, # Rellenamos el área bajo las curvas
-    common_norm=False, # Normalizamos cada curva independientemente
-    alpha=0.35, # Hacemos las áreas un poco transparentes
-    linewidth=2, # Grosor de la línea de la curva
-    palette={"Sin diabetes": "#1f77b4", "Con diabetes": "#ff7f0e"}, # Definimos los colores
-    hue_order=["Sin diabetes", "Con diabetes"] # Establecemos el orden de las etiquetas en la leyenda
-)
-
-# --- Configuraciones del Gráfico ---
-plt.title("Distribución del nivel de glucosa (Curva de densidad)", fontsize=12) # Título del gráfico
-plt.xlabel("Nivel de glucosa (mg/dL)", fontsize=11) # Etiqueta del eje x
-plt.ylabel("Densidad de frecuencia", fontsize=11) # Etiqueta del eje y
-plt.legend(title="Condición", loc="upper right") # Mostramos la leyenda con un título
-plt.grid(alpha=0.3) # Añadimos una cuadrícula semi-transparente
-plt.tight_layout() # Ajustamos el layout para que no se solapen los elementos
-plt.show() # Mostramos el gráfico
-
-# DataFrame con las variables y sus coeficientes obtenidos del modelo de regresión logística
-coef_data = pd.DataFrame({
-    'Variable': ['HbA1c_level', 'blood_glucose_level', 'age', 'bmi', 'hypertension', 'heart_disease'],
-    'Coeficiente': [2.508315, 1.364603, 1.045791, 0.589105, 0.202218, 0.151952]
-})
-
-# Ordenar las variables por su coeficiente de mayor a menor para visualizar su importancia
-coef_data = coef_data.sort_values('Coeficiente', ascending=True)
-
-# --- Creación del Gráfico de Barras Horizontales ---
-plt.figure(figsize=(7,4.5)) # Define el tamaño de la figura para el gráfico
-sns.barplot(data=coef_data, x='Coeficiente', y='Variable', palette='coolwarm') # Crea el gráfico de barras
-plt.title('Importancia de las variables predictoras del riesgo de diabetes') # Establece el título del gráfico
-plt.xlabel('Peso en el modelo (Coeficiente)') # Etiqueta el eje x
-plt.ylabel('Variable') # Etiqueta el eje y
-plt.grid(axis='x', alpha=0.3) # Añade una cuadrícula horizontal semi-transparente
-plt.tight_layout() # Ajusta el layout para evitar solapamientos
-plt.show() # Muestra el gráfico
\ No newline at end of file
+def ejecutar_reporte(ruta=RUTA_CSV, carpeta='resultados', tamano_bloque=TAMANO_BLOQUE, graficos=True, modelo=True):
+    """Análisis descriptivo + modelo + gráficos y tablas en 'carpeta'. Devuelve los resultados y tiempos."""
+    tiempos = {}
+    inicio = time.perf_counter()
+    res = dict(analizar_csv(ruta, tamano_bloque))
+    tiempos['analisis'] = time.perf_counter() - inicio
+
+    if modelo:
+        inicio = time.perf_counter()
+        res['modelo'], res['coeficientes'], res['reporte_modelo'] = entrenar_modelo(ruta, tamano_bloque)
+        tiempos['modelo'] = time.perf_counter() - inicio
+
+    inicio = time.perf_counter()
+    res['archivos'] = exportar_tablas(res, carpeta)
+    if graficos:
+        res['archivos'] += renderizar_reporte(res, carpeta)
+    tiempos['salidas'] = time.perf_counter() - inicio
+    res['tiempos'] = tiempos
+    return res
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="BioVisión - reporte de riesgo de diabetes sin interfaz")
+    parser.add_argument('--input', default=RUTA_CSV, help="CSV clínico (formato DiabetesPrediccion.csv)")
+    parser.add_argument('--output', default='resultados', help="Carpeta de salida para gráficos y tablas")
+    parser.add_argument('--bloque', type=int, default=TAMANO_BLOQUE, help="Filas por bloque al leer el CSV")
+    parser.add_argument('--sin-graficos', action='store_true', help="Omitir los gráficos")
+    parser.add_argument('--sin-modelo', action='store_true', help="Omitir la regresión logística")
+    args = parser.parse_args(argv)
+
+    import matplotlib
+    matplotlib.use('Agg')
+
+    try:
+        res = ejecutar_reporte(args.input, args.output, args.bloque,
+                               graficos=not args.sin_graficos, modelo=not args.sin_modelo)
+    except Exception as e:
+        print(f"❌ Error al generar el reporte: {e}")
+        return 1
+
+    print(res['muestra'].head(3))
+    print(f"\nDataset limpio: {res['filas']} de {res['filas_leidas']} filas")
+    print("\nValores nulos por columna (%):")
+    print(res['nulos_pct'])
+    print("\nResumen estadístico:")
+    print(res['resumen'])
+    print("\nCorrelación con diabetes:")
+    print(res['corr_diabetes'])
+    if 'coeficientes' in res:
+        print("\nCoeficientes del modelo:")
+        print(res['coeficientes'])
+        print(res['reporte_modelo'])
+    print(f"\nArchivos generados en {args.output}:")
+    for ruta in res['archivos']:
+        print(f"  {ruta}")
+    print("\nTiempos por etapa:")
+    for nombre, segundos in res['tiempos'].items():
+        print(f"  {nombre:10s}: {segundos:8.3f} s")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
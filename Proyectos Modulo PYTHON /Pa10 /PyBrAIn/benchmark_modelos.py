@@ -0,0 +1,194 @@
+# -*- coding: utf-8 -*-
+"""BioVisión — Comparación de modelos de riesgo de diabetes
+
+Validación cruzada estratificada (k folds) de varios modelos sobre las mismas
+predictoras del notebook. Cada par (modelo, fold) se entrena en paralelo en
+otro proceso y se mide: tiempo de ajuste, tiempo de predicción, memoria pico
+y AUC. El mejor pipeline (escalador + modelo) se reentrena con todos los datos
+y se guarda para reutilizarlo sin volver a entrenar.
+
+    python benchmark_modelos.py --input DiabetesPrediccion.csv --folds 5 --output modelos/
+"""
+
+import os # Rutas de salida
+import sys # Código de salida del comando
+import json # Metadatos del modelo guardado
+import time # Tiempos de ajuste y predicción
+import argparse # Opciones de la línea de comandos
+import tracemalloc # Memoria pico de cada ajuste
+import numpy as np # Para operaciones numéricas y arrays
+import pandas as pd # Tabla de resultados
+import joblib # Procesos en paralelo y guardado del pipeline
+import sklearn # Versión instalada (cambia cómo se pide la penalización L1)
+
+from sklearn.base import clone # Copia sin entrenar de cada pipeline
+from sklearn.pipeline import make_pipeline # Escalador + modelo en un solo objeto
+from sklearn.preprocessing import StandardScaler # Para escalar (normalizar) las características
+from sklearn.linear_model import LogisticRegression, SGDClassifier # Modelos lineales
+from sklearn.ensemble import HistGradientBoostingClassifier # Boosting por histogramas
+from sklearn.model_selection import StratifiedKFold # Folds con la misma proporción de diabetes
+from sklearn.metrics import roc_auc_score # Métrica de comparación
+
+from BioVision import RUTA_CSV, PREDICTORAS, TAMANO_BLOQUE, cargar_datos
+
+# (mayor, menor) de scikit-learn; desde 1.8 la penalización sale de l1_ratio y 'penalty' está obsoleto
+VERSION_SKLEARN = tuple(int(p) for p in sklearn.__version__.split('.')[:2])
+
+def _logreg_l1(**parametros):
+    """Regresión logística L1 en cualquier versión: antes de 1.8, l1_ratio sin penalty='l1' se ignora (queda L2)"""
+    if VERSION_SKLEARN >= (1, 8):
+        return LogisticRegression(l1_ratio=1.0, **parametros)
+    return LogisticRegression(penalty='l1', **parametros)
+
+"""
+## **Modelos a comparar**
+Todos llevan el mismo StandardScaler delante (el boosting no lo necesita,
+pero así cualquier pipeline guardado recibe los datos crudos).
+"""
+
+def modelos_candidatos(semilla=42):
+    """nombre -> pipeline sin entrenar"""
+    return {
+        # Regresión logística del notebook (lbfgs) y con saga (escala mejor con muchas filas)
+        'logreg_lbfgs': make_pipeline(StandardScaler(), LogisticRegression(solver='lbfgs', max_iter=1000)),
+        'logreg_saga': make_pipeline(StandardScaler(), LogisticRegression(solver='saga', max_iter=1000, tol=1e-3)),
+        # Lineales aptos para matrices dispersas: L1 (coeficientes en cero) y descenso estocástico
+        'logreg_l1_saga': make_pipeline(StandardScaler(), _logreg_l1(solver='saga', C=0.5, max_iter=1000, tol=1e-3)),
+        'sgd_log': make_pipeline(StandardScaler(), SGDClassifier(loss='log_loss', alpha=1e-4, max_iter=200,
+                                                                 tol=1e-3, random_state=semilla)),
+        # Boosting por histogramas (no lineal)
+        'hist_gb': make_pipeline(StandardScaler(), HistGradientBoostingClassifier(max_iter=200, early_stopping=False,
+                                                                                  random_state=semilla)),
+    }
+
+"""
+## **Un ajuste (se ejecuta en los procesos de trabajo)**
+"""
+
+def _puntajes(pipeline, X):
+    # AUC con probabilidades si el modelo las da; si no, con la función de decisión
+    if hasattr(pipeline, 'predict_proba'):
+        return pipeline.predict_proba(X)[:, 1]
+    return pipeline.decision_function(X)
+
+def evaluar_fold(nombre, pipeline, X, y, entrenamiento, prueba, fold):
+    """Entrena una copia del pipeline en un fold y devuelve sus métricas."""
+    pipeline = clone(pipeline)
+    tracemalloc.start()
+    inicio = time.perf_counter()
+    pipeline.fit(X[entrenamiento], y[entrenamiento])
+    tiempo_ajuste = time.perf_counter() - inicio
+    _, memoria_pico = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+
+    inicio = time.perf_counter()
+    puntajes = _puntajes(pipeline, X[prueba])
+    tiempo_prediccion = time.perf_counter() - inicio
+
+    return {
+        'modelo': nombre,
+        'fold': fold,
+        'auc': roc_auc_score(y[prueba], puntajes),
+        'ajuste_s': tiempo_ajuste,
+        'prediccion_s': tiempo_prediccion,
+        'memoria_mb': memoria_pico / 2 ** 20,
+        'filas_entrenamiento': len(entrenamiento),
+    }
+
+"""
+## **Comparación completa**
+"""
+
+def comparar_modelos(X, y, modelos=None, folds=5, procesos=-1, semilla=42):
+    """
+    Validación cruzada en paralelo de todos los modelos (un trabajo por modelo y fold).
+    Devuelve (resumen por modelo ordenado por AUC, detalle por fold).
+    """
+    modelos = modelos or modelos_candidatos(semilla)
+    X = np.ascontiguousarray(X, dtype=np.float32)
+    y = np.asarray(y, dtype=np.int8)
+    particion = list(StratifiedKFold(n_splits=folds, shuffle=True, random_state=semilla).split(X, y))
+
+    # X se comparte con los procesos por memoria mapeada (joblib) en lugar de copiarse en cada trabajo
+    trabajos = (joblib.delayed(evaluar_fold)(nombre, pipeline, X, y, entrenamiento, prueba, i)
+                for nombre, pipeline in modelos.items()
+                for i, (entrenamiento, prueba) in enumerate(particion))
+    detalle = pd.DataFrame(joblib.Parallel(n_jobs=procesos, max_nbytes='1M')(trabajos))
+
+    resumen = (detalle.groupby('modelo')
+               .agg(auc_media=('auc', 'mean'), auc_std=('auc', 'std'),
+                    ajuste_s=('ajuste_s', 'mean'), prediccion_s=('prediccion_s', 'mean'),
+                    memoria_mb=('memoria_mb', 'max'), folds=('fold', 'size'))
+               .sort_values('auc_media', ascending=False))
+    return resumen, detalle
+
+def guardar_mejor_modelo(nombre, pipeline, X, y, resumen, carpeta):
+    """Reentrena el mejor pipeline con todos los datos y lo guarda junto con sus metadatos."""
+    os.makedirs(carpeta, exist_ok=True)
+    pipeline = clone(pipeline).fit(np.asarray(X, dtype=np.float32), np.asarray(y))
+    ruta = os.path.join(carpeta, 'mejor_modelo.joblib')
+    joblib.dump(pipeline, ruta)
+    metadatos = {
+        'modelo': nombre,
+        'predictoras': PREDICTORAS,
+        'auc_cv': float(resumen.loc[nombre, 'auc_media']),
+        'folds': int(resumen.loc[nombre, 'folds']),
+        'filas': int(len(y)),
+        'fecha': time.strftime('%Y-%m-%d %H:%M:%S'),
+    }
+    with open(os.path.join(carpeta, 'mejor_modelo.json'), 'w', encoding='utf-8') as f:
+        json.dump(metadatos, f, indent=2, ensure_ascii=False)
+    return ruta, pipeline
+
+def cargar_mejor_modelo(carpeta='modelos'):
+    """Pipeline guardado (escalador + modelo) listo para predict_proba sobre las PREDICTORAS crudas."""
+    return joblib.load(os.path.join(carpeta, 'mejor_modelo.joblib'))
+
+def coeficientes(pipeline, columnas=PREDICTORAS):
+    """Coeficientes del modelo lineal de un pipeline (None si el modelo no es lineal)."""
+    modelo = pipeline[-1]
+    if not hasattr(modelo, 'coef_'):
+        return None
+    return (pd.DataFrame({'Variable': columnas, 'Coeficiente': np.ravel(modelo.coef_)})
+            .sort_values('Coeficiente', ascending=False))
+
+def ejecutar_benchmark(ruta=RUTA_CSV, carpeta='modelos', folds=5, procesos=-1, muestra=None, semilla=42):
+    datos = cargar_datos(ruta, PREDICTORAS + ['diabetes'], TAMANO_BLOQUE)
+    if muestra and muestra < len(datos):
+        datos = datos.sample(muestra, random_state=semilla)
+    X, y = datos[PREDICTORAS].to_numpy(), datos['diabetes'].to_numpy()
+
+    modelos = modelos_candidatos(semilla)
+    resumen, detalle = comparar_modelos(X, y, modelos, folds, procesos, semilla)
+    mejor = resumen.index[0]
+    ruta_modelo, pipeline = guardar_mejor_modelo(mejor, modelos[mejor], X, y, resumen, carpeta)
+    resumen.to_csv(os.path.join(carpeta, 'resultados_benchmark.csv'), encoding='utf-8')
+    detalle.to_csv(os.path.join(carpeta, 'resultados_benchmark_folds.csv'), index=False, encoding='utf-8')
+    return {'resumen': resumen, 'detalle': detalle, 'mejor': mejor, 'ruta_modelo': ruta_modelo, 'pipeline': pipeline}
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="BioVisión - comparación de modelos con validación cruzada")
+    parser.add_argument('--input', default=RUTA_CSV, help="CSV clínico (formato DiabetesPrediccion.csv)")
+    parser.add_argument('--output', default='modelos', help="Carpeta para el mejor modelo y la tabla de resultados")
+    parser.add_argument('--folds', type=int, default=5, help="Cantidad de folds de la validación cruzada")
+    parser.add_argument('--procesos', type=int, default=-1, help="Procesos en paralelo (-1 = todos los núcleos)")
+    parser.add_argument('--muestra', type=int, default=None, help="Usar solo N filas al azar (pruebas rápidas)")
+    args = parser.parse_args(argv)
+
+    try:
+        res = ejecutar_benchmark(args.input, args.output, args.folds, args.procesos, args.muestra)
+    except Exception as e:
+        print(f"❌ Error en la comparación de modelos: {e}")
+        return 1
+
+    with pd.option_context('display.float_format', '{:.4f}'.format, 'display.width', 120):
+        print(res['resumen'])
+    print(f"\n🏆 Mejor modelo: {res['mejor']} → {res['ruta_modelo']}")
+    coefs = coeficientes(res['pipeline'])
+    if coefs is not None:
+        print(coefs)
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -3,8 +3,19 @@ from datetime import datetime
 from data_logger import DataLogger
 
 class TaskManager:
+    """Administra las tareas sobre la DB local.
+
+    El progreso/estatus de cada tarea se guarda ya calculado y solo se
+    recalcula cuando cambian sus subtareas. Los cambios quedan pendientes
+    en memoria hasta llamar a flush(), que los escribe todos juntos
+    (la interfaz lo hace una vez por acción) y devuelve qué tareas cambiaron.
+    """
+
     def __init__(self):
         self.db = DB()  # Base de datos local JSON
+        self._pending = {}  # uid -> tarea modificada que aún no se escribió en la DB
+        self._changed = set()  # uids creados, modificados o eliminados desde el último flush()
+        self._normalize_all()
 
     # --------------------------
     # Helpers internos
@@ -23,9 +34,55 @@ class TaskManager:
             task["estatus"] = int(task.get("estatus", 1))
         return task
 
-    def export_to_csv(self, path="carpeta_data/data_analitica.csv"):
+    def _normalize_all(self):
+        """Revisa una sola vez al cargar que el progreso guardado coincida con las subtareas"""
+        for task in self.db.getAll():
+            if task.get("subtareas"):
+                checked = self._recalc_progress_and_status(dict(task))  # copia superficial: solo cambian progreso/estatus
+                if (checked["progreso"], checked["estatus"]) != (task.get("progreso"), task.get("estatus")):
+                    self._pending[task["uid"]] = checked
+        self.flush()
+
+    def _stage(self, task):
+        """Marca la tarea como modificada; se escribe en el próximo flush()"""
+        self._pending[task["uid"]] = task
+        self._changed.add(task["uid"])
+        return task
+
+    def flush(self):
+        """Escribe en la DB todas las tareas pendientes en una sola escritura.
+
+        Devuelve los uids de las tareas creadas, modificadas o eliminadas
+        desde el flush anterior (la interfaz actualiza solo esas filas).
+        """
+        changed, self._changed = self._changed, set()
+        if not self._pending:
+            return changed
+        pending, self._pending = self._pending, {}
+        with self.db.batch():
+            for uid, task in pending.items():
+                index = self.db.indexOf(uid)
+                if index is not None:  # pudo eliminarse antes del flush
+                    self.db.update(index, task)
+        return changed
+
+    def export_to_csv(self, path="carpeta_data/data_analitica.csv", subtasks_path="carpeta_data/data_subtareas.csv"):
+        """Exporta las tareas y, en una segunda tabla, sus subtareas (relacionadas por uid)"""
+        self.flush()
         logger = DataLogger(path)
-        logger.save_tasks(self.list_tasks())
+        return logger.save_tasks(self.iter_tasks(), subtasks_path=subtasks_path)
+
+    def iter_tasks(self, batch_size=1000):
+        """Recorre las tareas guardadas de una en una, leyendo la DB por bloques"""
+        for batch in self.iter_batches(batch_size):
+            yield from batch
+
+    def iter_batches(self, batch_size=1000):
+        """Bloques de tareas (incluye los cambios aún no escritos)"""
+        for batch in self.db.iterBatches(batch_size):
+            if self._pending:
+                batch = [self._pending.get(t["uid"], t) for t in batch]
+            yield batch
 
     # --------------------------
     # CRUD de tareas principales
@@ -39,13 +96,20 @@ class TaskManager:
             "fecha de creación": datetime.now().isoformat(),
             "subtareas": []                              # NUEVO: lista de subtareas
         }
-        return self.db.insert(task)
+        task = self.db.insert(task)
+        self._changed.add(task["uid"])
+        return task
 
     def get_task(self, index):
         try:
-            return self.db.get(index)
+            task = self.db.get(index)
         except IndexError:
             return None
+        return self._pending.get(task["uid"], task)
+
+    def get_task_by_uid(self, uid):
+        """La tarea con ese uid (con sus cambios pendientes) o None si no existe"""
+        return self._pending.get(uid) or self.db.getByUid(uid)
 
     def update_task(self, index, name=None, status=None, progress=None):
         task = self.get_task(index)
@@ -72,24 +136,28 @@ class TaskManager:
             elif task["estatus"] == 0 and task["progreso"] < 100:
                 task["estatus"] = 1
 
-        self.db.update(index, task)
-        return task
+        return self._stage(task)
 
     def delete_task(self, index):
         try:
+            task = self.db.get(index)
             self.db.delete(index)
         except IndexError:
-            pass
+            return
+        self._pending.pop(task["uid"], None)
+        self._changed.add(task["uid"])
+
+    def clear_tasks(self):
+        self._pending.clear()
+        self._changed.update(self.db.uids())
+        self.db.clear()
 
     def list_tasks(self):
-        """Devuelve todas las tareas, recalculando progreso/estatus si tienen subtareas."""
+        """Devuelve todas las tareas con su progreso/estatus ya calculado (sin leer ni escribir el archivo)."""
         tasks = self.db.getAll()
-        for i, t in enumerate(tasks):
-            recalculated = self._recalc_progress_and_status(t)
-            if recalculated != t:
-                self.db.update(i, recalculated)
-        # devolver fresco desde DB
-        return self.db.getAll()
+        if self._pending:
+            tasks = [self._pending.get(t["uid"], t) for t in tasks]
+        return tasks
 
     # --------------------------
     # Subtareas
@@ -99,10 +167,13 @@ class TaskManager:
         if not task:
             return None
         task.setdefault("subtareas", [])
-        task["subtareas"].append({"nombre": name, "estatus": 1})  # 1 = pendiente
-        task = self._recalc_progress_and_status(task)
-        self.db.update(index, task)
-        return task
+        task["subtareas"].append({
+            "nombre": name,
+            "estatus": 1,                                # 1 = pendiente
+            "fecha de creación": datetime.now().isoformat(),
+            "fecha de completado": None
+        })
+        return self._stage(self._recalc_progress_and_status(task))
 
     def set_subtask_status(self, index, sub_index, completed: bool):
         task = self.get_task(index)
@@ -111,9 +182,9 @@ class TaskManager:
         subs = task.get("subtareas", [])
         if 0 <= sub_index < len(subs):
             subs[sub_index]["estatus"] = 0 if completed else 1
-            task = self._recalc_progress_and_status(task)
-            self.db.update(index, task)
-            return task
+            # Fecha de cierre para el burn-down de analitica_tareas
+            subs[sub_index]["fecha de completado"] = datetime.now().isoformat() if completed else None
+            return self._stage(self._recalc_progress_and_status(task))
         return None
 
     def delete_subtask(self, index, sub_index):
@@ -123,7 +194,5 @@ class TaskManager:
         subs = task.get("subtareas", [])
         if 0 <= sub_index < len(subs):
             del subs[sub_index]
-            task = self._recalc_progress_and_status(task)
-            self.db.update(index, task)
-            return task
+            return self._stage(self._recalc_progress_and_status(task))
         return None
@@ -0,0 +1,162 @@
+import numpy as np
+import pandas as pd
+
+
+class TaskAnalytics:
+    """Métricas de productividad calculadas por bloques de tareas.
+
+    Cada bloque se convierte en columnas (pandas) y se suma a acumulados
+    pequeños: por creador, por día y por rango de antigüedad. Así el
+    historial completo nunca se tiene en memoria como tabla.
+
+    - creator_stats(): tareas, completadas y tasa de cumplimiento por creador
+    - burndown(): subtareas creadas/completadas por día y las que quedan abiertas
+    - age_distribution(): antigüedad de las tareas pendientes y completadas
+    """
+
+    AGE_BINS = [0, 1, 3, 7, 14, 30, 90, np.inf]  # días
+    AGE_LABELS = ["< 1 día", "1-3 días", "3-7 días", "1-2 semanas", "2-4 semanas", "1-3 meses", "> 3 meses"]
+
+    def __init__(self, now=None):
+        self.now = pd.Timestamp(now) if now is not None else pd.Timestamp.now()
+        self.reset()
+
+    def reset(self):
+        self.tasks = 0
+        self.batches = 0
+        self._creators = pd.DataFrame(columns=["total", "completadas", "progreso"], dtype="int64")
+        self._created = pd.Series(dtype="int64")    # día -> subtareas creadas
+        self._closed = pd.Series(dtype="int64")     # día -> subtareas completadas
+        self._age_pending = np.zeros(len(self.AGE_LABELS), dtype=np.int64)
+        self._age_done = np.zeros(len(self.AGE_LABELS), dtype=np.int64)
+
+    # --------------------------
+    # Acumulación
+    # --------------------------
+    @staticmethod
+    def _to_datetime(values):
+        return pd.to_datetime(pd.Series(values, dtype="object"), errors="coerce", format="ISO8601")
+
+    @staticmethod
+    def _count_by_day(dates):
+        return dates.dropna().dt.normalize().value_counts()
+
+    def consume(self, batch):
+        """Suma un bloque de tareas (lista de diccionarios) a los acumulados"""
+        if not batch:
+            return self
+
+        frame = pd.DataFrame({
+            "creador": [t.get("creado por", "") for t in batch],
+            "completadas": [t.get("estatus", 1) == 0 for t in batch],
+            "progreso": [int(t.get("progreso", 0)) for t in batch],
+            "fecha": self._to_datetime([t.get("fecha de creación") for t in batch]),
+        })
+        frame["total"] = 1
+
+        # Cumplimiento por creador
+        by_creator = frame.groupby("creador")[["total", "completadas", "progreso"]].sum()
+        self._creators = self._creators.add(by_creator, fill_value=0).astype("int64")
+
+        # Antigüedad (en días) separada por estado
+        age = ((self.now - frame["fecha"]).dt.total_seconds() / 86400).to_numpy()
+        done = frame["completadas"].to_numpy()
+        valid = ~np.isnan(age)
+        self._age_pending += np.histogram(age[valid & ~done], bins=self.AGE_BINS)[0]
+        self._age_done += np.histogram(age[valid & done], bins=self.AGE_BINS)[0]
+
+        # Burn-down de subtareas. Las subtareas antiguas no tienen fechas propias:
+        # se usa la fecha de la tarea (y la misma como cierre si ya estaban completadas)
+        created, closed = [], []
+        for task in batch:
+            task_date = task.get("fecha de creación")
+            for sub in task.get("subtareas", []):
+                created.append(sub.get("fecha de creación") or task_date)
+                if sub.get("estatus", 1) == 0:
+                    closed.append(sub.get("fecha de completado") or sub.get("fecha de creación") or task_date)
+        if created:
+            self._created = self._created.add(self._count_by_day(self._to_datetime(created)), fill_value=0)
+        if closed:
+            self._closed = self._closed.add(self._count_by_day(self._to_datetime(closed)), fill_value=0)
+
+        self.tasks += len(batch)
+        self.batches += 1
+        return self
+
+    def run(self, batches):
+        """Consume todos los bloques de un iterable (por ejemplo TaskManager.iter_batches())"""
+        for batch in batches:
+            self.consume(batch)
+        return self
+
+    @classmethod
+    def from_manager(cls, task_manager, batch_size=1000):
+        return cls().run(task_manager.iter_batches(batch_size))
+
+    # --------------------------
+    # Resultados
+    # --------------------------
+    def creator_stats(self):
+        stats = self._creators.copy()
+        if stats.empty:
+            return stats.assign(tasa=pd.Series(dtype=float), progreso_promedio=pd.Series(dtype=float))
+        stats["tasa"] = (stats["completadas"] / stats["total"] * 100).round(1)
+        stats["progreso_promedio"] = (stats["progreso"] / stats["total"]).round(1)
+        stats.index.name = "creado por"
+        return stats.drop(columns="progreso").sort_values(["total", "tasa"], ascending=False)
+
+    def burndown(self):
+        days = self._created.index.union(self._closed.index).sort_values()
+        frame = pd.DataFrame({
+            "creadas": self._created.reindex(days, fill_value=0),
+            "completadas": self._closed.reindex(days, fill_value=0),
+        }).astype("int64")
+        frame["abiertas"] = frame["creadas"].cumsum() - frame["completadas"].cumsum()
+        frame.index.name = "fecha"
+        return frame
+
+    def age_distribution(self):
+        return pd.DataFrame({"pendientes": self._age_pending, "completadas": self._age_done},
+                            index=pd.Index(self.AGE_LABELS, name="antigüedad"))
+
+    def summary(self):
+        total = int(self._creators["total"].sum()) if not self._creators.empty else 0
+        completed = int(self._creators["completadas"].sum()) if not self._creators.empty else 0
+        return {"total": total, "completadas": completed, "pendientes": total - completed}
+
+    # --------------------------
+    # Gráfico
+    # --------------------------
+    def draw(self, fig):
+        """Dibuja el tablero en una Figure de matplotlib (sirve embebida en Tk o para guardar en PNG)"""
+        fig.clear()
+        axes = fig.subplots(2, 2)
+        ax_state, ax_creators, ax_burn, ax_age = axes.ravel()
+
+        info = self.summary()
+        if info["total"]:
+            ax_state.pie([info["completadas"], info["pendientes"]], labels=["Completadas", "Pendientes"],
+                         autopct="%1.1f%%", startangle=90, colors=["green", "red"])
+        ax_state.set_title(f"Estado de las Tareas ({info['total']})")
+
+        stats = self.creator_stats().head(10)
+        ax_creators.barh(stats.index.astype(str)[::-1], stats["tasa"].to_numpy()[::-1], color="steelblue")
+        ax_creators.set_xlim(0, 100)
+        ax_creators.set_title("Cumplimiento por creador (%)")
+
+        burn = self.burndown()
+        if not burn.empty:
+            ax_burn.step(burn.index, burn["abiertas"], where="post", color="darkorange")
+            ax_burn.tick_params(axis="x", labelrotation=30, labelsize=8)
+        ax_burn.set_title("Subtareas abiertas (burn-down)")
+
+        ages = self.age_distribution()
+        x = np.arange(len(ages))
+        ax_age.bar(x - 0.2, ages["pendientes"], width=0.4, label="Pendientes", color="red")
+        ax_age.bar(x + 0.2, ages["completadas"], width=0.4, label="Completadas", color="green")
+        ax_age.set_xticks(x, ages.index, rotation=30, fontsize=8)
+        ax_age.set_title("Antigüedad de las tareas")
+        ax_age.legend(fontsize=8)
+
+        fig.tight_layout()
+        return fig
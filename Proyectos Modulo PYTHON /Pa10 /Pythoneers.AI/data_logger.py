@@ -2,22 +2,48 @@ import csv
 import os
 
 class DataLogger:
+    TASK_HEADERS = ["uid", "nombre de la tarea", "estatus", "progreso", "creado por", "fecha de creación",
+                    "subtareas", "subtareas completadas"]
+    SUBTASK_HEADERS = ["uid tarea", "indice", "nombre", "estatus", "fecha de creación", "fecha de completado"]
+
     def __init__(self, file_path):
         self.file_path = file_path
         os.makedirs(os.path.dirname(file_path), exist_ok=True)
 
-    def save_tasks(self, tasks):
-        """Guardar lista de tareas en CSV"""
-        if not tasks:
-            return
-
-        headers = ["uid", "nombre de la tarea", "estatus", "progreso", "creado por", "fecha de creación"]
+    def save_tasks(self, tasks, subtasks_path=None):
+        """Guardar tareas en CSV escribiendo fila por fila (acepta listas o generadores)
 
+        Si se indica subtasks_path, las subtareas se guardan en una segunda
+        tabla con una fila por subtarea, unida a la tarea por su uid.
+        Devuelve la cantidad de tareas escritas.
+        """
+        sub_file = None
+        written = 0
         with open(self.file_path, mode="w", newline="", encoding="utf-8") as f:
-            writer = csv.DictWriter(f, fieldnames=headers)
+            writer = csv.DictWriter(f, fieldnames=self.TASK_HEADERS, extrasaction="ignore")
             writer.writeheader()
-            for i, task in enumerate(tasks):
-                # Añadir uid automáticamente si no existe
-                row = {key: task.get(key, "") for key in headers}
-                row["uid"] = i
-                writer.writerow(row)
+            if subtasks_path:
+                os.makedirs(os.path.dirname(subtasks_path) or ".", exist_ok=True)
+                sub_file = open(subtasks_path, mode="w", newline="", encoding="utf-8")
+                sub_writer = csv.writer(sub_file)
+                sub_writer.writerow(self.SUBTASK_HEADERS)
+            try:
+                for i, task in enumerate(tasks):
+                    subtareas = task.get("subtareas", [])
+                    row = {key: task.get(key, "") for key in self.TASK_HEADERS}
+                    # Añadir uid automáticamente si no existe
+                    row["uid"] = task.get("uid", i)
+                    row["subtareas"] = len(subtareas)
+                    row["subtareas completadas"] = sum(1 for s in subtareas if s.get("estatus", 1) == 0)
+                    writer.writerow(row)
+                    if sub_file:
+                        sub_writer.writerows(
+                            (row["uid"], j, s.get("nombre", ""), s.get("estatus", 1),
+                             s.get("fecha de creación") or "", s.get("fecha de completado") or "")
+                            for j, s in enumerate(subtareas)
+                        )
+                    written += 1
+            finally:
+                if sub_file:
+                    sub_file.close()
+        return written
@@ -1,10 +1,70 @@
 import tkinter as tk
 from tkinter import ttk, messagebox, simpledialog
+import time
 from adm_tareas import TaskManager
+from analitica_tareas import TaskAnalytics
 import pandas as pd
-import matplotlib.pyplot as plt
+from matplotlib.figure import Figure
 from matplotlib.backends.backend_tkagg import FigureCanvasTkAgg
 
+class TaskDashboard:
+    """Ventana con el tablero de analítica embebido.
+
+    Las tareas se procesan por bloques con root.after, así la ventana
+    principal sigue respondiendo y el gráfico se va actualizando mientras
+    se leen (a lo sumo cada REDRAW_INTERVAL segundos).
+    """
+
+    REDRAW_INTERVAL = 0.3
+
+    def __init__(self, parent, task_manager, batch_size=500):
+        self.task_manager = task_manager
+        self.batch_size = batch_size
+        self._batches = None
+
+        self.window = tk.Toplevel(parent)
+        self.window.title("Analítica de Tareas")
+        self.window.geometry("900x680")
+
+        self.figure = Figure(figsize=(9, 6))
+        self.canvas = FigureCanvasTkAgg(self.figure, master=self.window)
+        self.canvas.get_tk_widget().pack(fill=tk.BOTH, expand=True)
+
+        bottom = ttk.Frame(self.window, padding="6")
+        bottom.pack(fill=tk.X)
+        self.status_label = ttk.Label(bottom, text="")
+        self.status_label.pack(side=tk.LEFT)
+        ttk.Button(bottom, text="Actualizar", command=self.refresh).pack(side=tk.RIGHT)
+
+        self.refresh()
+
+    def is_open(self):
+        return bool(self.window.winfo_exists())
+
+    def refresh(self):
+        """Vuelve a calcular todo desde el inicio (cancela un recorrido en curso)"""
+        self.analytics = TaskAnalytics()
+        self._batches = self.task_manager.iter_batches(self.batch_size)
+        self._last_draw = 0.0
+        self.status_label.config(text="Calculando...")
+        self._step(self._batches)
+
+    def _step(self, batches):
+        if batches is not self._batches or not self.is_open():
+            return  # se pidió otra actualización o se cerró la ventana
+        batch = next(batches, None)
+        if batch is not None:
+            self.analytics.consume(batch)
+        finished = batch is None
+        if finished or time.monotonic() - self._last_draw >= self.REDRAW_INTERVAL:
+            self.analytics.draw(self.figure)
+            self.canvas.draw_idle()
+            self._last_draw = time.monotonic()
+            self.status_label.config(text=f"{'Listo' if finished else 'Procesando'}: {self.analytics.tasks} tareas")
+        if not finished:
+            self.window.after(1, self._step, batches)
+
+
 class TaskManagerGUI:
     def __init__(self, root):
         self.root = root
@@ -14,12 +74,15 @@ class TaskManagerGUI:
 
         # Inicializar el TaskManager
         self.task_manager = TaskManager()
+        self._completed = set()  # uids de las filas mostradas como completadas (para el contador)
+        self.dashboard = None
+        self.root.protocol("WM_DELETE_WINDOW", self.on_close)
 
         # Configurar la interfaz
         self.setup_ui()
 
         # Cargar las tareas existentes
-        self.refresh_task_list()
+        self.load_task_list()
 
     def setup_ui(self):
         # Frame principal
@@ -45,7 +108,7 @@ class TaskManagerGUI:
         ttk.Button(button_frame, text="Actualizar Tarea", command=self.update_task_dialog).grid(row=1, column=0, pady=5, sticky=tk.W)
         ttk.Button(button_frame, text="Eliminar Tarea", command=self.delete_task).grid(row=2, column=0, pady=5, sticky=tk.W)
         ttk.Button(button_frame, text="Limpiar Todas", command=self.clear_all_tasks).grid(row=3, column=0, pady=5, sticky=tk.W)
-        ttk.Button(button_frame, text="Actualizar Lista", command=self.refresh_task_list).grid(row=4, column=0, pady=5, sticky=tk.W)
+        ttk.Button(button_frame, text="Actualizar Lista", command=self.load_task_list).grid(row=4, column=0, pady=5, sticky=tk.W)
         ttk.Button(button_frame, text="Subtareas", command=self.manage_subtasks_dialog).grid(row=5, column=0, pady=5, sticky=tk.W)
         ttk.Button(button_frame, text="Ver Gráfico", command=self.show_task_graph).grid(row=6, column=0, pady=5, sticky=tk.W)
         ttk.Button(button_frame, text="Exportar CSV", command=self.export_csv).grid(row=7, column=0, pady=5, sticky=tk.W)
@@ -56,12 +119,11 @@ class TaskManagerGUI:
         list_frame.rowconfigure(0, weight=1)
 
         # Treeview para mostrar las tareas
-        columns = ("Índice", "Nombre", "Estado", "Progreso", "Creado por", "Fecha")
+        columns = ("Nombre", "Estado", "Progreso", "Creado por", "Fecha")
         self.task_tree = ttk.Treeview(list_frame, columns=columns, show="headings", height=15)
 
 
         # Configurar las columnas
-        self.task_tree.heading("Índice", text="Índice")
         self.task_tree.heading("Nombre", text="Nombre de la Tarea")
         self.task_tree.heading("Estado", text="Estado")
         self.task_tree.heading("Progreso", text="Progreso (%)")
@@ -69,7 +131,6 @@ class TaskManagerGUI:
         self.task_tree.heading("Fecha", text="Fecha de Creación")
 
         # Configurar el ancho de las columnas
-        self.task_tree.column("Índice", width=60, minwidth=50)
         self.task_tree.column("Nombre", width=260, minwidth=150)
         self.task_tree.column("Estado", width=110, minwidth=80)
         self.task_tree.column("Progreso", width=110, minwidth=80)
@@ -92,43 +153,69 @@ class TaskManagerGUI:
         self.info_label = ttk.Label(info_frame, text="Seleccione una tarea para ver más opciones", font=("Arial", 10))
         self.info_label.grid(row=0, column=0, sticky=tk.W)
 
-    def refresh_task_list(self):
-        """Actualizar la lista de tareas en el Treeview"""
-        # Limpiar el Treeview
-        for item in self.task_tree.get_children():
-            self.task_tree.delete(item)
-
-        # Obtener las tareas
-        tasks = self.task_manager.list_tasks()
-
-        # Agregar las tareas al Treeview
-        for index, task in enumerate(tasks):
-            estado_texto = "Completada" if task["estatus"] == 0 else "Pendiente"
-            fecha_formateada = task["fecha de creación"][:19].replace("T", " ")
-
-            self.task_tree.insert("", "end", values=(
-                index,
-                task["nombre de la tarea"],
-                estado_texto,
-                f"{task['progreso']}%",
-                task["creado por"],
-                fecha_formateada
-            ))
-
-        # Actualizar el contador
-        total_tasks = len(tasks)
-        completed_tasks = sum(1 for task in tasks if task["estatus"] == 0)
+    @staticmethod
+    def _task_row(task):
+        estado_texto = "Completada" if task["estatus"] == 0 else "Pendiente"
+        fecha_formateada = task["fecha de creación"][:19].replace("T", " ")
+        return (
+            task["nombre de la tarea"],
+            estado_texto,
+            f"{task['progreso']}%",
+            task["creado por"],
+            fecha_formateada
+        )
+
+    def _show_task(self, task):
+        """Inserta o actualiza la fila de la tarea (el id de la fila es su uid)"""
+        uid = task["uid"]
+        values = self._task_row(task)
+        if self.task_tree.exists(uid):
+            self.task_tree.item(uid, values=values)
+        else:
+            self.task_tree.insert("", "end", iid=uid, values=values)  # las tareas nuevas van al final, como en la DB
+        if task["estatus"] == 0:
+            self._completed.add(uid)
+        else:
+            self._completed.discard(uid)
+
+    def _update_counter(self):
+        total_tasks = len(self.task_manager.db)
+        completed_tasks = len(self._completed)
         self.info_label.config(text=f"Total: {total_tasks} tareas | Completadas: {completed_tasks} | Pendientes: {total_tasks - completed_tasks}")
 
+    def load_task_list(self):
+        """Vuelve a cargar todas las filas del Treeview desde la DB"""
+        self.task_manager.flush()
+        self.task_tree.delete(*self.task_tree.get_children())
+        self._completed.clear()
+        for task in self.task_manager.list_tasks():
+            self._show_task(task)
+        self._update_counter()
+
+    def refresh_task_list(self):
+        """Actualizar la lista de tareas en el Treeview
+
+        Primero se guardan los cambios pendientes (una escritura por acción);
+        flush() devuelve los uids que cambiaron y solo esas filas se
+        insertan, modifican o eliminan.
+        """
+        for uid in self.task_manager.flush():
+            task = self.task_manager.get_task_by_uid(uid)
+            if task is not None:
+                self._show_task(task)
+            elif self.task_tree.exists(uid):
+                self.task_tree.delete(uid)
+                self._completed.discard(uid)
+        self._update_counter()
+
     def get_selected_task_index(self):
-        """Obtener el índice de la tarea seleccionada"""
+        """Obtener el índice (posición en la DB) de la tarea seleccionada"""
         selection = self.task_tree.selection()
         if not selection:
             messagebox.showwarning("Advertencia", "Por favor seleccione una tarea.")
             return None
 
-        item = self.task_tree.item(selection[0])
-        return int(item['values'][0])
+        return self.task_manager.db.indexOf(selection[0])
 
     def create_task_dialog(self):
         """Diálogo para crear una nueva tarea"""
@@ -298,35 +385,22 @@ class TaskManagerGUI:
     def export_csv(self):
         try:
             self.task_manager.export_to_csv()
-            messagebox.showinfo("Éxito", "CSV generado correctamente en 'carpeta_data/data_analitica.csv'.")
+            messagebox.showinfo("Éxito", "CSV generado correctamente en 'carpeta_data/data_analitica.csv'\n"
+                                         "(subtareas en 'carpeta_data/data_subtareas.csv').")
         except Exception as e:
             messagebox.showerror("Error", f"No se pudo generar el CSV:\n{str(e)}")
 
     def show_task_graph(self):
-        try:
-            tasks = self.task_manager.list_tasks()
-            completed = sum(1 for task in tasks if task["estatus"] == 0)
-            pending = sum(1 for task in tasks if task["estatus"] == 1)
-
-            if completed + pending == 0:
-                messagebox.showinfo("Información", "No hay tareas para graficar.")
-                return
-
-            # Crear figura
-            fig, ax = plt.subplots(figsize=(5, 5))
-            ax.pie(
-                [completed, pending],
-                labels=["Completadas", "Pendientes"],
-                autopct="%1.1f%%",
-                startangle=90,
-                colors=["green", "red"]
-            )
-            ax.set_title("Estado de las Tareas")
-
-            # Mostrar la gráfica en una ventana independiente
-            plt.show()
-        except FileNotFoundError:
-            messagebox.showerror("Error", "Primero genere el CSV con 'Exportar CSV'.")
+        """Abrir (o actualizar) el tablero de analítica embebido"""
+        if not len(self.task_manager.db):
+            messagebox.showinfo("Información", "No hay tareas para graficar.")
+            return
+        self.task_manager.flush()
+        if self.dashboard is not None and self.dashboard.is_open():
+            self.dashboard.window.lift()
+            self.dashboard.refresh()
+        else:
+            self.dashboard = TaskDashboard(self.root, self.task_manager)
 
     def delete_task(self):
         """Eliminar la tarea seleccionada"""
@@ -353,18 +427,18 @@ class TaskManagerGUI:
 
     def clear_all_tasks(self):
         """Limpiar todas las tareas"""
-        tasks = self.task_manager.list_tasks()
-        if not tasks:
+        total_tasks = len(self.task_manager.db)
+        if not total_tasks:
             messagebox.showinfo("Información", "No hay tareas para eliminar.")
             return
 
         result = messagebox.askyesno(
             "Confirmar eliminación",
-            f"¿Está seguro de que desea eliminar TODAS las tareas ({len(tasks)} tareas)?\n\nEsta acción no se puede deshacer."
+            f"¿Está seguro de que desea eliminar TODAS las tareas ({total_tasks} tareas)?\n\nEsta acción no se puede deshacer."
         )
 
         if result:
-            self.task_manager.db.clear()
+            self.task_manager.clear_tasks()
             messagebox.showinfo("Éxito", "Todas las tareas han sido eliminadas.")
             self.refresh_task_list()
 
@@ -457,6 +531,14 @@ class TaskManagerGUI:
 
         refresh()
 
+    def on_close(self):
+        """Guardar lo pendiente y compactar la DB antes de cerrar"""
+        try:
+            self.task_manager.flush()
+            self.task_manager.db.close()
+        finally:
+            self.root.destroy()
+
 
 def main():
     root = tk.Tk()
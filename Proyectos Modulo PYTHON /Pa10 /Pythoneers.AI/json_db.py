@@ -1,12 +1,27 @@
 import os
 import json
+from contextlib import contextmanager
+from copy import deepcopy
 from uuid import uuid4
 
 class DB:
+    """Base de datos local en memoria con persistencia incremental.
+
+    - local_db.json: foto completa de la base (se reescribe solo al compactar)
+    - local_db.journal.jsonl: un cambio por línea (insert/update/delete/clear)
+
+    Cada escritura agrega una línea al journal (O(1)) y las lecturas se
+    responden desde memoria. Cuando el journal crece más que la propia base
+    se compacta: se reescribe local_db.json y se vacía el journal.
+    """
+
+    SNAPSHOT = 'local_db.json'
+    JOURNAL = 'local_db.journal.jsonl'
+    COMPACT_MIN_OPS = 500 # mínimo de cambios en el journal antes de compactar
 
     def _getLocalDB(self):
         try:
-            db_file = open(os.path.join(self._dbPath, 'local_db.json'), 'r', encoding='utf8') # Abrir archivo en modo lectura
+            db_file = open(os.path.join(self._dbPath, self.SNAPSHOT), 'r', encoding='utf8') # Abrir archivo en modo lectura
             data = json.load(db_file)
             db_file.close()
             return data
@@ -14,13 +29,92 @@ class DB:
             return None
 
     def _updateLocalDB(self):
+        """Reescribe la foto completa de forma atómica (archivo temporal + reemplazo)"""
         try:
-            db_file = open(os.path.join(self._dbPath, 'local_db.json'), 'w', encoding='utf8') # Crear o abrir archivo en modo escritura
-            json.dump(self._db, db_file, indent=4)
-            db_file.close()
+            path = os.path.join(self._dbPath, self.SNAPSHOT)
+            tmp_path = path + '.tmp'
+            with open(tmp_path, 'w', encoding='utf8') as db_file: # Crear o abrir archivo en modo escritura
+                json.dump(self._db, db_file, indent=4)
+            os.replace(tmp_path, path)
         except Exception as e:
             raise Exception(f"Error al actualizar la base de datos: {str(e)}")
 
+    def _replayJournal(self):
+        """Aplica sobre la foto los cambios pendientes del journal.
+
+        Repetir un cambio no altera el resultado (insert de un uid existente
+        o delete de uno inexistente se ignoran), así que no importa si el
+        programa se cerró a mitad de una compactación.
+        """
+        path = os.path.join(self._dbPath, self.JOURNAL)
+        if not os.path.exists(path):
+            return 0
+
+        positions = {element['uid']: i for i, element in enumerate(self._db)}
+        ops = 0
+        with open(path, 'r', encoding='utf8') as journal:
+            for line in journal:
+                try:
+                    entry = json.loads(line)
+                except ValueError:
+                    continue # línea incompleta (por ejemplo, si se cerró el programa a mitad de escritura)
+                op = entry.get('op')
+                if op == 'insert':
+                    if entry['data']['uid'] not in positions:
+                        positions[entry['data']['uid']] = len(self._db)
+                        self._db.append(entry['data'])
+                elif op == 'update':
+                    i = positions.pop(entry['uid'], None)
+                    if i is not None:
+                        self._db[i] = entry['data']
+                        positions[entry['data']['uid']] = i
+                elif op == 'delete':
+                    i = positions.pop(entry['uid'], None)
+                    if i is not None:
+                        self._db[i] = None # se elimina al final para no desplazar posiciones
+                elif op == 'clear':
+                    self._db = []
+                    positions = {}
+                ops += 1
+
+        self._db = [element for element in self._db if element is not None]
+        return ops
+
+    def _log(self, entry):
+        """Agrega un cambio al journal y compacta si ya es demasiado largo"""
+        line = json.dumps(entry, ensure_ascii=False) + '\n'
+        if self._batchDepth:
+            self._batchLines.append(line) # se escribe todo junto al terminar el batch
+            return
+        self._write([line])
+
+    def _write(self, lines):
+        try:
+            self._journal.write(''.join(lines))
+            self._journal.flush()
+        except Exception as e:
+            raise Exception(f"Error al actualizar la base de datos: {str(e)}")
+        self._journalOps += len(lines)
+        if self._journalOps > max(self.COMPACT_MIN_OPS, len(self._db)):
+            self.compact()
+
+    @contextmanager
+    def batch(self):
+        """Agrupa varios cambios en una sola escritura al journal
+
+        with db.batch():
+            db.update(0, ...)
+            db.update(5, ...)
+        """
+        self._batchDepth += 1
+        try:
+            yield self
+        finally:
+            self._batchDepth -= 1
+            if self._batchDepth == 0 and self._batchLines:
+                lines, self._batchLines = self._batchLines, []
+                self._write(lines)
+
     def __init__(self):
         self._dbPath = os.path.dirname(os.path.abspath(__file__)) # obtener la ruta del archivo actual
 
@@ -31,37 +125,104 @@ class DB:
             self._db = []
             self._updateLocalDB()
 
+        self._journalOps = self._replayJournal()
+        # Índice por uid; el de posiciones se reconstruye solo cuando un delete lo invalida
+        self._byUid = {element['uid']: element for element in self._db if 'uid' in element}
+        self._positions = None
+        self._batchDepth = 0
+        self._batchLines = []
+        self._journal = open(os.path.join(self._dbPath, self.JOURNAL), 'a', encoding='utf8')
+
+    def compact(self):
+        """Escribe la foto completa y vacía el journal"""
+        self._updateLocalDB()
+        self._journal.close()
+        self._journal = open(os.path.join(self._dbPath, self.JOURNAL), 'w', encoding='utf8')
+        self._journalOps = 0
+
+    def close(self):
+        if self._journalOps:
+            self.compact()
+        self._journal.close()
+
     def insert(self, element): # insertar un nuevo elemento (diccionario)
         if (isinstance(element, dict)):
-            data = {'uid': str(uuid4())} | element
+            # se guarda una copia: los cambios a la base solo entran por update (y quedan en el journal)
+            data = {'uid': str(uuid4())} | deepcopy(element)
             self._db.append(data)
-            self._updateLocalDB()
-            return data
+            self._byUid[data['uid']] = data
+            if self._positions is not None:
+                self._positions[data['uid']] = len(self._db) - 1
+            self._log({'op': 'insert', 'data': data})
+            return deepcopy(data)
         else:
             raise TypeError("Solo se permiten diccionarios para el método insert")
 
     def get(self, index):
-        db = self._getLocalDB()
-        return db[index]
+        return deepcopy(self._db[index])
+
+    def getByUid(self, uid):
+        element = self._byUid.get(uid)
+        return deepcopy(element) if element is not None else None
+
+    def indexOf(self, uid):
+        """Posición actual del elemento con ese uid (None si no existe)"""
+        if self._positions is None:
+            self._positions = {element['uid']: i for i, element in enumerate(self._db)}
+        return self._positions.get(uid)
 
     def getAll(self):
-        db = self._getLocalDB()
-        return db
+        """Devuelve una copia superficial de cada elemento, para leer.
+
+        Cambiar sus claves no altera la base, pero las listas/diccionarios
+        anidados se comparten: para modificar un elemento usar get o getByUid
+        (copia completa) y luego update.
+        """
+        return [dict(element) for element in self._db]
+
+    def iterBatches(self, size=1000):
+        """Recorre la base en bloques de `size` elementos.
+
+        Se toma una foto de la lista al empezar, así un delete a mitad del
+        recorrido no desplaza los bloques siguientes. Cada bloque son copias
+        superficiales, igual que getAll.
+        """
+        elements = list(self._db)
+        for start in range(0, len(elements), size):
+            yield [dict(element) for element in elements[start:start + size]]
 
     def update(self, index, data):
+        old = self._db[index]
+        data = deepcopy(data) # el llamador puede seguir modificando su diccionario sin pasar por el journal
+        if 'uid' not in data:
+            data = {'uid': old['uid']} | data
         self._db[index] = data
-        self._updateLocalDB()
+        del self._byUid[old['uid']]
+        self._byUid[data['uid']] = data
+        if self._positions is not None:
+            self._positions.pop(old['uid'], None)
+            self._positions[data['uid']] = index
+        self._log({'op': 'update', 'uid': old['uid'], 'data': data})
 
     def delete(self, index):
+        old = self._db[index]
         del self._db[index]
-        self._updateLocalDB()
-    
+        self._byUid.pop(old['uid'], None)
+        self._positions = None # las posiciones siguientes se desplazaron
+        self._log({'op': 'delete', 'uid': old['uid']})
+
+    def uids(self):
+        """uids de todos los elementos (sin copiar los elementos)"""
+        return list(self._byUid)
+
     def clear(self):
         self._db = []
-        self._updateLocalDB()
-    
+        self._byUid = {}
+        self._positions = None
+        self._log({'op': 'clear'})
+
     def __str__(self):
         return str(self._db)
-    
+
     def __len__(self):
         return int(len(self._db))
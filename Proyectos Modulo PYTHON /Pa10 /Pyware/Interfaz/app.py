@@ -9,6 +9,7 @@ if RAIZ not in sys.path:
 from Interfaz.state import set_usuario_actual, get_usuario_actual, ruta_usuarios_json
 from Interfaz.menu import construir_menu
 from Interfaz.tab_registro import mostrar_registro_diario
+from Interfaz.galeria import RENDERIZADOR
 
 # --- Usuarios predeterminados ---
 USUARIOS_PREDETERMINADOS = {
@@ -43,6 +44,12 @@ def abrir_ventana_principal():
     ventana.geometry("1100x650")
     ventana.configure(bg="white")
 
+    def al_cerrar():
+        # los procesos que renderizan los gráficos no deben sobrevivir a la ventana
+        RENDERIZADOR.cerrar()
+        ventana.destroy()
+    ventana.protocol("WM_DELETE_WINDOW", al_cerrar)
+
     encabezado = tk.Frame(ventana, height=50, bg="dark violet")
     encabezado.pack(side="top", fill="x")
 
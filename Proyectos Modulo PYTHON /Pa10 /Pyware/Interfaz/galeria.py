@@ -0,0 +1,72 @@
+
+import os
+import tkinter as tk
+
+from analysis.graficos import RenderizadorGraficos, graficos_disponibles, tamano_pixeles
+from .state import ruta_datos
+
+# PNG ya generados de todos los reportes (clave: hash de los datos + id del gráfico)
+RENDERIZADOR = RenderizadorGraficos(os.path.join(ruta_datos, "graficos_cache"))
+
+class GaleriaGraficos:
+    """
+    Muestra los gráficos de un reporte dentro de un marco con scroll.
+    Todos se piden al renderizador al abrir la pestaña (se dibujan en otros
+    procesos) y cada imagen se carga en Tk solo cuando entra en la vista.
+    """
+
+    MARGEN = 400        # píxeles antes/después de la vista en los que ya se carga la imagen
+    INTERVALO_MS = 150
+
+    def __init__(self, canvas, marco, clave, df, matriz, info_t, corr_sf, textos):
+        self.canvas = canvas
+        self._items = []
+        for gid in graficos_disponibles(df, matriz):
+            titulo, comentario = textos.get(gid, ("", None))
+            self._items.append(self._crear_item(marco, gid, titulo, comentario,
+                                                RENDERIZADOR.solicitar(clave, gid, df, matriz, info_t, corr_sf)))
+        self._revisar()
+
+    def _crear_item(self, marco, gid, titulo, comentario, futuro):
+        caja = tk.Frame(marco, bg="white"); caja.pack(fill="x", padx=20, pady=15)
+        if titulo:
+            tk.Label(caja, text=titulo, font=("Arial", 13, "bold"), fg="#1976D2", bg="white").pack(anchor="w", pady=(0,8))
+
+        # Espacio reservado con el tamaño final para que el scroll no salte al cargar
+        ancho, alto = tamano_pixeles(gid)
+        lugar = tk.Frame(caja, bg="#FAFAFA", width=ancho, height=alto)
+        lugar.pack(anchor="w"); lugar.pack_propagate(False)
+        etiqueta = tk.Label(lugar, text="Generando gráfico...", font=("Arial", 10), fg="gray", bg="#FAFAFA")
+        etiqueta.pack(expand=True, fill="both")
+
+        if comentario:
+            tk.Label(caja, text=comentario, font=("Arial", 10), bg="white", fg="#555", wraplength=900, justify="left")\
+              .pack(anchor="w", pady=(6,0))
+        return {'caja': caja, 'etiqueta': etiqueta, 'futuro': futuro, 'imagen': None}
+
+    def _visible(self, item):
+        arriba = self.canvas.canvasy(0)
+        abajo = arriba + self.canvas.winfo_height()
+        y = item['caja'].winfo_y()
+        return y < abajo + self.MARGEN and y + item['caja'].winfo_height() > arriba - self.MARGEN
+
+    def _revisar(self):
+        if not self.canvas.winfo_exists():
+            return  # se cambió de pestaña
+        pendientes = False
+        for item in self._items:
+            if item['imagen'] is not None:
+                continue
+            futuro = item['futuro']
+            if not futuro.done() or not self._visible(item):
+                pendientes = True
+                continue
+            error = futuro.exception()
+            if error is not None:
+                item['etiqueta'].config(text=f"No se pudo generar el gráfico: {error}", fg="red")
+                item['imagen'] = False
+                continue
+            item['imagen'] = tk.PhotoImage(file=futuro.result())
+            item['etiqueta'].config(image=item['imagen'], text="")
+        if pendientes:
+            self.canvas.after(self.INTERVALO_MS, self._revisar)
@@ -1,8 +1,9 @@
 
 import tkinter as tk
 from tkinter import ttk, messagebox
-import datetime, os, csv
+import datetime
 from .state import ruta_csv_actual
+from analysis.incremental import ALMACEN
 
 def obtener_fecha_actual_espanol():
     ahora = datetime.datetime.now()
@@ -148,15 +149,8 @@ def mostrar_registro_diario(panel_contenedor: tk.Frame):
         ]
         nombre_archivo = ruta_csv_actual()
         try:
-            existe = os.path.exists(nombre_archivo)
-            with open(nombre_archivo, 'a', newline='', encoding='utf-8') as f:
-                escritor = csv.writer(f)
-                if not existe:
-                    escritor.writerow([
-                        'fecha','clima','temperatura_C','actividad_fisica','sueño','dieta_tipo',
-                        'rigidez_score','dolor_score','inflamacion_score','fatiga_score','estado_animo'
-                    ])
-                escritor.writerow(nueva_fila)
+            # Guarda la fila y actualiza las estadísticas del usuario sin releer el CSV
+            ALMACEN.agregar_registro(nombre_archivo, nueva_fila)
 
             # Datos de feedback
             datos_fb = {
@@ -4,9 +4,11 @@ import tkinter as tk
 from tkinter import ttk
 import pandas as pd
 from .state import ruta_csv_actual
-from analysis.stats import cargar_y_procesar_csv
+from analysis.incremental import ALMACEN
+from analysis.stats import NOMBRES_VARIABLES
+from analysis.desfases import DESFASES, senales
 
-def _bloque_promedios(df, parent):
+def _bloque_promedios(promedios, parent):
     """Bloque de barras simples con los promedios de síntomas."""
     tk.Label(parent, text=" Promedios de Síntomas (General)",
              font=("Arial", 14, "bold"), fg="#1976D2", bg="white").pack(pady=(10, 10))
@@ -18,7 +20,7 @@ def _bloque_promedios(df, parent):
     alto     = 150  
 
     for s, n, c in zip(sintomas, nombres, colores):
-        promedio = df[s].mean() if s in df.columns else float('nan')
+        promedio = promedios.get(s, float('nan'))
         base = tk.Frame(cont, bg="white"); base.pack(side="left", padx=18, anchor='s')
         tk.Label(base, text=n, font=("Arial", 11, "bold"), bg="white").pack()
         barra_cont = tk.Frame(base, bg="#E0E0E0", width=60, height=alto)
@@ -52,26 +54,31 @@ def mostrar_analisis_estadistico(panel_contenedor: tk.Frame):
                  font=("Arial", 14), fg="gray", bg="white", justify="center").pack(expand=True, pady=50)
         return
 
-    # Procesamiento y métricas
-    res = cargar_y_procesar_csv(nombre_archivo)
-    if res is None:
+    # Métricas desde el estado incremental del usuario (no se relee el CSV)
+    try:
+        estadisticas = ALMACEN.obtener(nombre_archivo)
+    except Exception:
+        estadisticas = None
+    if estadisticas is None or estadisticas.total == 0:
         tk.Label(marco,
                  text="Error al procesar los datos.\nVerifica que el archivo contenga información válida.",
                  font=("Arial", 14), fg="red", bg="white", justify="center").pack(expand=True, pady=50)
         return
 
-    df, _, matriz, resultado_t_clima, corr_sueno_fatiga = res
+    matriz = estadisticas.matriz_correlacion()
+    resultado_t_clima = estadisticas.t_clima()
+    corr_sueno_fatiga = estadisticas.corr_sueno_fatiga()
 
     # Tarjeta de resumen (total y periodo)
     info = tk.Frame(marco, bg="#F0F0F0", padx=20, pady=15)
     info.pack(fill="x", padx=20, pady=10)
-    tk.Label(info, text=f" Total de registros: {len(df)}", font=("Arial", 12, "bold"), bg="#F0F0F0").pack(anchor="w")
-    if 'fecha' in df.columns:
-        tk.Label(info, text=f" Período: {df['fecha'].min().strftime('%d/%m/%Y')} - {df['fecha'].max().strftime('%d/%m/%Y')}",
+    tk.Label(info, text=f" Total de registros: {estadisticas.total}", font=("Arial", 12, "bold"), bg="#F0F0F0").pack(anchor="w")
+    if estadisticas.desde is not None:
+        tk.Label(info, text=f" Período: {estadisticas.desde.strftime('%d/%m/%Y')} - {estadisticas.hasta.strftime('%d/%m/%Y')}",
                  font=("Arial", 12), bg="#F0F0F0").pack(anchor="w")
 
     
-    _bloque_promedios(df, marco)
+    _bloque_promedios(estadisticas.promedios(), marco)
 
     # Correlaciones con el dolor
     tk.Label(marco, text="🔗 Correlaciones con el Dolor",
@@ -80,13 +87,7 @@ def mostrar_analisis_estadistico(panel_contenedor: tk.Frame):
 
     if 'dolor_score' in matriz.columns:
         correlaciones = matriz['dolor_score'].sort_values(ascending=False)
-        nombres = {
-            'rigidez_score': 'Rigidez Matutina', 'inflamacion_score': 'Inflamación',
-            'fatiga_score': 'Fatiga', 'clima_adverso': 'Clima Adverso (Lluvia/Humedad)',
-            'sueno_score': 'Calidad del Sueño', 'dieta_score': 'Dieta Antiinflamatoria',
-            'actividad_fisica': 'Actividad Física', 'temperatura_C': 'Temperatura',
-            'ISA': 'Índice General de Síntomas', 'estado_animo_score': 'Estado de Ánimo'
-        }
+        nombres = NOMBRES_VARIABLES
         variables = ['rigidez_score','inflamacion_score','fatiga_score','clima_adverso',
                      'sueno_score','dieta_score','actividad_fisica','temperatura_C',
                      'estado_animo_score','ISA']
@@ -114,3 +115,53 @@ def mostrar_analisis_estadistico(panel_contenedor: tk.Frame):
              font=("Arial", 12), bg="white").pack(pady=5)
     tk.Label(marco, text=f"🛌 Sueño (día anterior) vs Fatiga (hoy): r = {corr_sueno_fatiga:.3f}.",
              font=("Arial", 12), bg="white").pack(pady=5)
+
+    # Desfases y tendencias (se recalculan solo si cambió el CSV)
+    desfases, error = DESFASES.intentar(nombre_archivo)
+    if error:
+        tk.Label(marco, text=error, font=("Arial", 11), fg="red", bg="white").pack(pady=(20, 10))
+        return
+    _bloque_desfases(desfases, marco)
+    _bloque_tendencias(desfases, marco)
+
+def _bloque_desfases(desfases, parent):
+    """Hábitos cuyo valor de hace 1 a 14 días más se relaciona con los síntomas de hoy."""
+    tk.Label(parent, text="⏳ Hábitos que anticipan síntomas (1 a 14 días)",
+             font=("Arial", 14, "bold"), fg="#1976D2", bg="white").pack(pady=(20, 10))
+    cont = tk.Frame(parent, bg="white", padx=20); cont.pack(fill="x", padx=20)
+
+    tabla = senales(desfases)
+    if tabla.empty:
+        tk.Label(cont, text="Aún no hay suficientes días registrados para buscar desfases.",
+                 font=("Arial", 11), fg="gray", bg="white").pack(anchor="w")
+        return
+    for fila_senal in tabla.itertuples():
+        fila = tk.Frame(cont, bg="white"); fila.pack(fill="x", pady=3)
+        dias = "día" if fila_senal.desfase == 1 else "días"
+        texto = (f"• {NOMBRES_VARIABLES.get(fila_senal.origen, fila_senal.origen)} → "
+                 f"{NOMBRES_VARIABLES.get(fila_senal.destino, fila_senal.destino)} "
+                 f"({fila_senal.desfase} {dias} después):")
+        tk.Label(fila, text=texto, font=("Arial", 11), bg="white", width=55, anchor="w").pack(side="left")
+        tk.Label(fila, text=f"{fila_senal.r:.3f}  (n = {fila_senal.n})",
+                 font=("Arial", 11, "bold"), bg="white").pack(side="left")
+
+def _bloque_tendencias(desfases, parent):
+    """Media móvil de la última semana frente a la del último mes."""
+    corta, larga = (desfases['medias_moviles'][w] for w in sorted(desfases['medias_moviles']))
+    if corta.empty:
+        return
+    tk.Label(parent, text="📈 Tendencia reciente (promedio 7 días vs 30 días)",
+             font=("Arial", 14, "bold"), fg="#1976D2", bg="white").pack(pady=(20, 10))
+    cont = tk.Frame(parent, bg="white", padx=20); cont.pack(fill="x", padx=20, pady=(0, 20))
+    for s in ['dolor_score', 'fatiga_score', 'rigidez_score', 'inflamacion_score']:
+        if s not in corta.columns:
+            continue
+        semana, mes = corta[s].iloc[-1], larga[s].iloc[-1]
+        if pd.isna(semana) or pd.isna(mes):
+            continue
+        color = "#D32F2F" if semana > mes + 0.25 else ("#388E3C" if semana < mes - 0.25 else "#555")
+        fila = tk.Frame(cont, bg="white"); fila.pack(fill="x", pady=3)
+        tk.Label(fila, text=f"• {NOMBRES_VARIABLES[s]}:", font=("Arial", 11),
+                 bg="white", width=35, anchor="w").pack(side="left")
+        tk.Label(fila, text=f"{semana:.2f} (7 d) vs {mes:.2f} (30 d)",
+                 font=("Arial", 11, "bold"), fg=color, bg="white").pack(side="left")
@@ -4,6 +4,7 @@ import tkinter as tk
 from tkinter import ttk
 import pandas as pd
 from .state import ruta_csv_actual
+from data.almacen import cargar_registros
 
 def mostrar_visualizaciones(panel_contenedor: tk.Frame):
     for w in panel_contenedor.winfo_children():
@@ -20,9 +21,7 @@ def mostrar_visualizaciones(panel_contenedor: tk.Frame):
         return
 
     try:
-        df = pd.read_csv(nombre_archivo)
-        if 'fecha' in df.columns:
-            df['fecha'] = pd.to_datetime(df['fecha'])
+        df = cargar_registros(nombre_archivo)
 
         canvas = tk.Canvas(panel_contenedor, bg="white")
         scrollbar = ttk.Scrollbar(panel_contenedor, orient="vertical", command=canvas.yview)
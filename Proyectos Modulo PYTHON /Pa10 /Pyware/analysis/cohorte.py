@@ -0,0 +1,137 @@
+
+import glob
+import os
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+import pandas as pd
+from analysis.stats import welch_desde_momentos, COLUMNAS_CORR, SINTOMAS
+from data.almacen import cargar_registros
+
+SUFIJO = "_registros.csv"
+
+def _firma(ruta):
+    info = os.stat(ruta)
+    return (info.st_mtime_ns, info.st_size)
+
+def _correlacion_lag1(df):
+    """Sueño(T-1) vs Fatiga(T) por usuario (el desfase nunca cruza de un usuario a otro)"""
+    pares = pd.DataFrame({
+        'usuario': df['usuario'],
+        'x': df.groupby('usuario', sort=False)['sueno_score'].shift(1),
+        'y': df['fatiga_score']
+    }).dropna()
+    if pares.empty:
+        return pd.Series(dtype=float), 0.0
+    por_usuario = pares.groupby('usuario')[['x', 'y']].corr().xs('x', level=1)['y']
+    return por_usuario, float(pares['x'].corr(pares['y']))
+
+def _welch_por_grupo(df, grupo):
+    """Prueba t del dolor (clima adverso vs normal) para cada valor de 'grupo'"""
+    momentos = df.groupby([grupo, 'clima_adverso'])['dolor_score'].agg(['count', 'mean', 'var']).unstack('clima_adverso')
+    def col(nombre, adverso):
+        return momentos[(nombre, adverso)] if (nombre, adverso) in momentos.columns else pd.Series(0.0, index=momentos.index)
+    t_stat, p_val = welch_desde_momentos(col('count', 1).fillna(0), col('mean', 1), col('var', 1),
+                                         col('count', 0).fillna(0), col('mean', 0), col('var', 0))
+    return pd.DataFrame({'t_stat': t_stat, 'p_val': p_val}, index=momentos.index)
+
+
+class AnalisisCohorte:
+    """
+    Analiza juntos todos los archivos <usuario>_registros.csv de una carpeta:
+    - Carga en paralelo y guarda cada archivo ya limpio (se relee solo si cambia su fecha o tamaño)
+    - Estadísticas por usuario y de toda la cohorte en una sola pasada con groupby
+    - Tiempos de cada etapa y errores por usuario (en lugar de devolver None)
+    """
+
+    def __init__(self, ruta_datos, max_hilos=4):
+        self.ruta_datos = ruta_datos
+        self.max_hilos = max_hilos
+        self._archivos = {}       # ruta -> (firma, df limpio)
+        self._resultado = None    # (firmas, resultado) del último análisis
+
+    def archivos(self):
+        """{usuario: ruta} de los registros que hay en la carpeta"""
+        rutas = sorted(glob.glob(os.path.join(self.ruta_datos, "*" + SUFIJO)))
+        return {os.path.basename(r)[:-len(SUFIJO)]: r for r in rutas}
+
+    def _cargar(self, usuario, ruta):
+        inicio = time.perf_counter()
+        firma = _firma(ruta)
+        guardado = self._archivos.get(ruta)
+        if guardado and guardado[0] == firma:
+            return usuario, firma, guardado[1], None, 0.0
+
+        try:
+            df = cargar_registros(ruta)
+            error = None if not df.empty else "Sin registros válidos"
+        except Exception as e:
+            df, error = None, f"{type(e).__name__}: {e}"
+        if error is None:
+            self._archivos[ruta] = (firma, df)
+        return usuario, firma, df, error, time.perf_counter() - inicio
+
+    def analizar(self, usuarios=None):
+        """
+        Devuelve un diccionario con:
+        - 'por_usuario': DataFrame con registros, período, promedios, ISA, r sueño→fatiga y t-test
+        - 'matrices': matrices de correlación por usuario (índice usuario, variable)
+        - 'global': matriz, t-test y r sueño→fatiga de todos los registros juntos
+        - 'errores': {usuario: mensaje} de los archivos que no se pudieron analizar
+        - 'tiempos': segundos de carga (total y por archivo) y de análisis
+        """
+        inicio = time.perf_counter()
+        archivos = self.archivos()
+        if usuarios is not None:
+            archivos = {u: r for u, r in archivos.items() if u in usuarios}
+
+        with ThreadPoolExecutor(max_workers=self.max_hilos) as ejecutor:
+            cargados = list(ejecutor.map(lambda par: self._cargar(*par), archivos.items()))
+
+        firmas = tuple((u, f) for u, f, _, _, _ in cargados)
+        errores = {u: e for u, _, _, e, _ in cargados if e}
+        tiempos = {'carga': time.perf_counter() - inicio,
+                   'por_archivo': {u: s for u, _, _, _, s in cargados}}
+
+        if self._resultado is not None and self._resultado[0] == firmas:
+            resultado = dict(self._resultado[1], tiempos=dict(tiempos, analisis=0.0, desde_cache=True))
+            return resultado
+
+        inicio_analisis = time.perf_counter()
+        partes = {u: df for u, _, df, e, _ in cargados if not e}
+        resultado = self._calcular(partes)
+        resultado['errores'] = errores
+        tiempos.update(analisis=time.perf_counter() - inicio_analisis, desde_cache=False)
+        resultado['tiempos'] = tiempos
+
+        self._resultado = (firmas, resultado)
+        return resultado
+
+    def _calcular(self, partes):
+        vacio = {'por_usuario': pd.DataFrame(), 'matrices': pd.DataFrame(), 'global': None}
+        if not partes:
+            return vacio
+
+        df = pd.concat(partes, names=['usuario', None]).reset_index(level=0)
+        columnas = [c for c in COLUMNAS_CORR if c in df.columns]
+        grupos = df.groupby('usuario', sort=True)
+
+        por_usuario = grupos.agg(
+            registros=('ISA', 'size'),
+            desde=('fecha', 'min'),
+            hasta=('fecha', 'max'),
+            **{c: (c, 'mean') for c in SINTOMAS + ['ISA']}
+        )
+        matrices = grupos[columnas].corr()
+
+        global_ = {'matriz': df[columnas].corr(), 'registros': len(df)}
+        if 'sueno_score' in df.columns and 'fatiga_score' in df.columns:
+            r_usuario, r_global = _correlacion_lag1(df)
+            por_usuario['corr_sueno_fatiga'] = r_usuario.reindex(por_usuario.index).fillna(0.0)
+            global_['corr_sueno_fatiga'] = r_global
+        if 'dolor_score' in df.columns:
+            por_usuario = por_usuario.join(_welch_por_grupo(df, 'usuario'))
+            general = _welch_por_grupo(df.assign(_todos=0), '_todos').iloc[0]
+            global_['t_clima'] = {'t_stat': float(general['t_stat']), 'p_val': float(general['p_val'])}
+
+        return {'por_usuario': por_usuario, 'matrices': matrices, 'global': global_}
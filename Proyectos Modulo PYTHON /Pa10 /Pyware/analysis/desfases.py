@@ -0,0 +1,182 @@
+
+import os
+
+import numpy as np
+import pandas as pd
+
+from analysis.stats import COLUMNAS_CORR, SINTOMAS
+from data.almacen import cargar_registros
+
+MAX_DESFASE = 14
+VENTANAS = (7, 30)
+MIN_PARES = 10    # pares mínimos para mostrar una correlación con desfase
+HABITOS = ['sueno_score', 'dieta_score', 'actividad_fisica', 'clima_adverso', 'temperatura_C', 'estado_animo_score']
+
+def _firma(ruta):
+    info = os.stat(ruta)
+    return (info.st_mtime_ns, info.st_size)
+
+def serie_diaria(df, variables=COLUMNAS_CORR):
+    """
+    Una fila por día calendario (promedio si hay varios registros el mismo día,
+    NaN en los días sin registro), así un desfase de l filas es de l días.
+    Sin fechas válidas se usa el orden de las filas.
+    """
+    columnas = [c for c in variables if c in df.columns]
+    datos = df[columnas].astype(float)
+    if 'fecha' not in df.columns or df['fecha'].isna().all():
+        return datos.reset_index(drop=True)
+    fechas = pd.to_datetime(df['fecha']).dt.normalize()
+    diaria = datos[fechas.notna().to_numpy()].groupby(fechas.dropna()).mean()
+    return diaria.reindex(pd.date_range(diaria.index.min(), diaria.index.max(), freq='D'))
+
+# ---------- Correlación cruzada con desfase (FFT) ----------
+
+def _correlaciones_cruzadas(columnas, pares, max_desfase):
+    """
+    Para cada par (p, q) de índices en 'columnas': c[l, i, j] = Σ_t a_p[t-l, i] · a_q[t, j]
+    con l = 0..max_desfase, todas las columnas a la vez. Una transformada por arreglo y
+    productos en frecuencia en lugar de un bucle por desfase: O(k² · n log n).
+    """
+    n = columnas[0].shape[0]
+    largo = 1 << int(2 * n - 1).bit_length()   # relleno con ceros: sin solapamiento circular
+    f = [np.fft.rfft(a.T, largo) for a in columnas]   # (columnas, frecuencias): eje contiguo
+    productos = np.stack([np.conj(f[p])[:, None, :] * f[q][None, :, :] for p, q in pares])
+    return np.moveaxis(np.fft.irfft(productos, largo)[..., :max_desfase + 1], -1, 1)
+
+def correlaciones_desfasadas(diaria, max_desfase=MAX_DESFASE):
+    """
+    Tensor r[i, j, l-1] = corr(variable i hace l días, variable j hoy) para l = 1..max_desfase,
+    con los pares donde ambos valores existen (igual que Series.shift(l).corr).
+    Devuelve (r, n) con forma (variables, variables, desfases).
+    """
+    x = diaria.to_numpy(dtype=float)
+    m = (~np.isnan(x)).astype(float)
+    v = np.where(m > 0, x, 0.0)
+    v = (v - v.sum(axis=0) / np.maximum(m.sum(axis=0), 1)) * m   # centrar reduce la cancelación numérica
+    max_desfase = max(0, min(max_desfase, len(x) - 1))
+    if len(x) == 0:
+        vacio = np.zeros((x.shape[1], x.shape[1], 0))
+        return vacio, vacio.astype(int)
+
+    n, sx, sy, sxx, syy, sxy = _correlaciones_cruzadas(
+        [m, v, v * v], [(0, 0), (1, 0), (0, 1), (2, 0), (0, 2), (1, 1)], max_desfase)
+    n = np.rint(n)
+
+    with np.errstate(divide='ignore', invalid='ignore'):
+        cov = n * sxy - sx * sy
+        var_x = n * sxx - sx * sx
+        var_y = n * syy - sy * sy
+        r = cov / np.sqrt(var_x * var_y)
+    escala = 1e-12 * np.maximum(n * np.maximum(sxx, syy), 1.0)
+    r[(n < 2) | (var_x <= escala) | (var_y <= escala)] = np.nan
+    r = np.clip(r, -1.0, 1.0)
+    # (desfase, i, j) -> (i, j, desfase), sin el desfase 0
+    return np.moveaxis(r[1:], 0, -1), np.moveaxis(n[1:], 0, -1).astype(int)
+
+# ---------- Ventanas móviles (sumas acumuladas) ----------
+
+def _suma_movil(a, ventana):
+    c = np.concatenate([np.zeros((1,) + a.shape[1:]), np.cumsum(a, axis=0)])
+    inicio = np.maximum(np.arange(1, len(a) + 1) - ventana, 0)
+    return c[1:] - c[inicio]
+
+def medias_moviles(diaria, ventana):
+    """Promedio de los últimos 'ventana' días (requiere al menos la mitad con datos)"""
+    x = diaria.to_numpy(dtype=float)
+    m = ~np.isnan(x)
+    n = _suma_movil(m.astype(float), ventana)
+    with np.errstate(divide='ignore', invalid='ignore'):
+        medias = _suma_movil(np.where(m, x, 0.0), ventana) / n
+    medias[n < max(1, ventana // 2)] = np.nan
+    return pd.DataFrame(medias, index=diaria.index, columns=diaria.columns)
+
+def correlaciones_moviles(diaria, pares, ventana):
+    """Correlación de cada par (x, y) en los últimos 'ventana' días; columnas 'x→y'"""
+    pares = [(a, b) for a, b in pares if a in diaria.columns and b in diaria.columns]
+    if not pares:
+        return pd.DataFrame(index=diaria.index)
+    x = diaria[[a for a, _ in pares]].to_numpy(dtype=float)
+    y = diaria[[b for _, b in pares]].to_numpy(dtype=float)
+    m = ~np.isnan(x) & ~np.isnan(y)
+    x, y = np.where(m, x, 0.0), np.where(m, y, 0.0)
+    n = _suma_movil(m.astype(float), ventana)
+    sx, sy = _suma_movil(x, ventana), _suma_movil(y, ventana)
+    sxx, syy, sxy = _suma_movil(x * x, ventana), _suma_movil(y * y, ventana), _suma_movil(x * y, ventana)
+    with np.errstate(divide='ignore', invalid='ignore'):
+        var_x = n * sxx - sx * sx
+        var_y = n * syy - sy * sy
+        r = (n * sxy - sx * sy) / np.sqrt(var_x * var_y)
+    r[(n < max(3, ventana // 2)) | (var_x <= 1e-9) | (var_y <= 1e-9)] = np.nan
+    return pd.DataFrame(np.clip(r, -1.0, 1.0), index=diaria.index, columns=[f"{a}→{b}" for a, b in pares])
+
+# ---------- Resultado completo ----------
+
+def analizar_desfases(df, max_desfase=MAX_DESFASE, ventanas=VENTANAS):
+    """
+    Devuelve un diccionario con:
+    - 'variables', 'desfases' (1..max_desfase)
+    - 'r', 'n': tensor de correlaciones (variables x variables x desfases) y pares usados
+    - 'medias_moviles': {ventana: DataFrame diario}
+    - 'correlaciones_moviles': {ventana: DataFrame diario de cada hábito→síntoma}
+    """
+    diaria = serie_diaria(df)
+    r, n = correlaciones_desfasadas(diaria, max_desfase)
+    pares = [(h, s) for h in HABITOS for s in SINTOMAS]
+    return {
+        'variables': list(diaria.columns),
+        'desfases': np.arange(1, r.shape[2] + 1),
+        'r': r,
+        'n': n,
+        'medias_moviles': {w: medias_moviles(diaria, w) for w in ventanas},
+        'correlaciones_moviles': {w: correlaciones_moviles(diaria, pares, w) for w in ventanas},
+    }
+
+def senales(resultado, origenes=HABITOS, destinos=SINTOMAS, k=5, min_pares=MIN_PARES):
+    """Los k pares origen→destino con la correlación desfasada más fuerte (mejor desfase de cada par)"""
+    variables = resultado['variables']
+    ii = [variables.index(v) for v in origenes if v in variables]
+    jj = [variables.index(v) for v in destinos if v in variables]
+    if not ii or not jj or resultado['r'].shape[2] == 0:
+        return pd.DataFrame(columns=['origen', 'destino', 'desfase', 'r', 'n'])
+
+    r = resultado['r'][np.ix_(ii, jj)]
+    n = resultado['n'][np.ix_(ii, jj)]
+    fuerza = np.where(n >= min_pares, np.abs(np.nan_to_num(r)), -1.0)
+    mejor = fuerza.argmax(axis=2)
+    a, b = np.indices(mejor.shape)
+    tabla = pd.DataFrame({
+        'origen': np.array(variables)[ii][a.ravel()],
+        'destino': np.array(variables)[jj][b.ravel()],
+        'desfase': resultado['desfases'][mejor.ravel()],
+        'r': r[a, b, mejor].ravel(),
+        'n': n[a, b, mejor].ravel(),
+    })
+    tabla = tabla[(tabla['n'] >= min_pares) & tabla['r'].notna()]
+    return tabla.reindex(tabla['r'].abs().sort_values(ascending=False).index).head(k).reset_index(drop=True)
+
+
+class CacheDesfases:
+    """Resultado de analizar_desfases por usuario; se recalcula solo si cambia el CSV (fecha o tamaño)"""
+
+    def __init__(self):
+        self._resultados = {}   # ruta csv -> (firma, resultado)
+
+    def obtener(self, ruta_csv):
+        firma = _firma(ruta_csv)
+        guardado = self._resultados.get(ruta_csv)
+        if guardado and guardado[0] == firma:
+            return guardado[1]
+        resultado = analizar_desfases(cargar_registros(ruta_csv))
+        self._resultados[ruta_csv] = (firma, resultado)
+        return resultado
+
+    def intentar(self, ruta_csv):
+        """(resultado, None), o (None, mensaje para la interfaz) si no se pudo calcular"""
+        try:
+            return self.obtener(ruta_csv), None
+        except Exception as e:
+            return None, f"No se pudieron calcular los desfases: {e}"
+
+
+DESFASES = CacheDesfases()
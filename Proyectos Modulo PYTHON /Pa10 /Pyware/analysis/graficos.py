@@ -0,0 +1,191 @@
+
+import glob
+import hashlib
+import io
+import os
+import multiprocessing
+from concurrent.futures import Future, ProcessPoolExecutor
+
+import numpy as np
+import pandas as pd
+
+VERSION_GRAFICOS = 1   # subir si cambia el dibujo de algún gráfico (invalida la caché)
+DPI = 80
+MAX_ARCHIVOS_CACHE = 300
+
+# ---------- Dibujo (se ejecuta en los procesos de trabajo, backend Agg) ----------
+
+def _top_corr(matriz, col, k=5):
+    if col not in matriz.columns:
+        return pd.Series(dtype=float)
+    s = matriz[col].drop(labels=[col], errors="ignore").dropna()
+    return s.reindex(s.abs().sort_values(ascending=False).head(k).index)
+
+def _heatmap(ax, df, matriz, info_t, corr_sf):
+    import seaborn as sns
+    sns.heatmap(matriz, annot=True, fmt=".2f", cmap="coolwarm", ax=ax)
+    ax.set_title("Matriz de correlación entre variables clínicas")
+
+def _dolor_clima(ax, df, matriz, info_t, corr_sf):
+    import seaborn as sns
+    sns.boxplot(x='clima_adverso', y='dolor_score', data=df, ax=ax)
+    ax.set_title(f"Dolor según el clima adverso (p-valor = {info_t.get('p_val', 1.0):.4f})")
+    ax.set_xlabel("Clima adverso (1 = Sí, 0 = No)"); ax.set_ylabel("Dolor")
+
+def _sueno_fatiga(ax, df, matriz, info_t, corr_sf):
+    x = df['sueno_score'].shift(1); y = df['fatiga_score']; mask = ~x.isna() & ~y.isna()
+    ax.scatter(x[mask], y[mask], alpha=0.7)
+    ax.set_title(f"Sueño (día anterior) vs Fatiga (hoy) · r = {corr_sf:.2f}")
+    ax.set_xlabel("Sueño (día anterior)"); ax.set_ylabel("Fatiga (hoy)")
+
+def _series(ax, df, matriz, info_t, corr_sf):
+    ax.plot(df['fecha'], df['dolor_score'], label="Dolor", linewidth=2)
+    ax.plot(df['fecha'], df['fatiga_score'], label="Fatiga", linewidth=2)
+    ax.set_title("Evolución temporal del dolor y la fatiga")
+    ax.set_xlabel("Fecha"); ax.set_ylabel("Nivel"); ax.legend()
+
+def _animo(ax, df, matriz, info_t, corr_sf):
+    import seaborn as sns
+    sns.histplot(df['estado_animo_score'], bins=10, kde=True, ax=ax)
+    ax.set_title("Distribución del estado de ánimo")
+    ax.set_xlabel("Puntaje de ánimo"); ax.set_ylabel("Frecuencia")
+
+def _dieta(ax, df, matriz, info_t, corr_sf):
+    import seaborn as sns
+    sns.barplot(x='dieta_tipo', y='dolor_score', data=df, estimator=np.mean, errorbar=None, ax=ax)
+    ax.set_title("Dolor promedio según tipo de dieta")
+    ax.set_xlabel("Tipo de dieta"); ax.set_ylabel("Promedio de dolor")
+
+def _actividad(ax, df, matriz, info_t, corr_sf):
+    import seaborn as sns
+    sns.scatterplot(x='actividad_fisica', y='dolor_score', data=df, ax=ax)
+    ax.set_title("Actividad física vs nivel de dolor")
+    ax.set_xlabel("Actividad física (0 = No, 1 = Sí)"); ax.set_ylabel("Dolor")
+
+def _top_dolor(ax, df, matriz, info_t, corr_sf):
+    import seaborn as sns
+    top = _top_corr(matriz, "dolor_score", k=5)
+    sns.barplot(x=top.values, y=top.index, palette=sns.color_palette("mako", n_colors=len(top)), ax=ax)
+    ax.set_title("Top 5 variables más correlacionadas con el dolor")
+    ax.set_xlabel("Coeficiente de correlación")
+
+def _desfases(ax, df, matriz, info_t, corr_sf):
+    import seaborn as sns
+    from analysis.desfases import HABITOS, correlaciones_desfasadas, serie_diaria
+    diaria = serie_diaria(df)
+    r, _ = correlaciones_desfasadas(diaria)
+    variables = list(diaria.columns)
+    habitos = [h for h in HABITOS if h in variables]
+    datos = pd.DataFrame(r[[variables.index(h) for h in habitos], variables.index('dolor_score')],
+                         index=habitos, columns=np.arange(1, r.shape[2] + 1))
+    sns.heatmap(datos, annot=False, cmap="coolwarm", vmin=-1, vmax=1, ax=ax)
+    ax.set_title("Correlación hábito (hace N días) → dolor (hoy)")
+    ax.set_xlabel("Desfase (días)"); ax.set_ylabel("")
+
+# id -> (función de dibujo, tamaño en pulgadas, columnas necesarias en df, columnas necesarias en la matriz)
+GRAFICOS = {
+    'heatmap':      (_heatmap,      (10, 8),    [],                                       []),
+    'dolor_clima':  (_dolor_clima,  (6.4, 5),   ['clima_adverso', 'dolor_score'],        []),
+    'sueno_fatiga': (_sueno_fatiga, (6.4, 5),   ['sueno_score', 'fatiga_score'],         []),
+    'series':       (_series,       (10, 5),    ['fecha', 'dolor_score', 'fatiga_score'], []),
+    'animo':        (_animo,        (6.4, 4.2), ['estado_animo_score'],                  []),
+    'dieta':        (_dieta,        (6.4, 4.2), ['dieta_tipo', 'dolor_score'],           []),
+    'actividad':    (_actividad,    (6.4, 5),   ['actividad_fisica', 'dolor_score'],     []),
+    'top_dolor':    (_top_dolor,    (7.2, 4),   [],                                       ['dolor_score']),
+    'desfases':     (_desfases,     (9, 4),     ['fecha', 'dolor_score'],                 []),
+}
+
+def graficos_disponibles(df, matriz):
+    """Ids de los gráficos que se pueden dibujar con estos datos (en orden)"""
+    return [gid for gid, (_, _, cols_df, cols_matriz) in GRAFICOS.items()
+            if all(c in df.columns for c in cols_df) and all(c in matriz.columns for c in cols_matriz)]
+
+def tamano_pixeles(gid, dpi=DPI):
+    ancho, alto = GRAFICOS[gid][1]
+    return int(ancho * dpi), int(alto * dpi)
+
+def _iniciar_proceso():
+    import matplotlib
+    matplotlib.use("Agg")
+
+def renderizar_png(gid, df, matriz, info_t, corr_sf, ruta, dpi=DPI):
+    """Dibuja un gráfico y lo guarda como PNG (se ejecuta fuera del hilo de Tk)"""
+    from matplotlib.figure import Figure
+    funcion, tamano, _, _ = GRAFICOS[gid]
+    fig = Figure(figsize=tamano, dpi=dpi)   # sin pyplot: nada queda registrado ni abierto
+    funcion(fig.add_subplot(), df, matriz, info_t, corr_sf)
+    fig.tight_layout()
+    buffer = io.BytesIO()
+    fig.savefig(buffer, format="png", dpi=dpi)
+    tmp = ruta + ".tmp"
+    with open(tmp, "wb") as f:
+        f.write(buffer.getvalue())
+    os.replace(tmp, ruta)
+    return ruta
+
+# ---------- Caché y procesos ----------
+
+def hash_archivo(ruta):
+    h = hashlib.sha1()
+    with open(ruta, "rb") as f:
+        for bloque in iter(lambda: f.read(1 << 16), b""):
+            h.update(bloque)
+    return h.hexdigest()[:16]
+
+def hash_dataframe(df):
+    return hashlib.sha1(pd.util.hash_pandas_object(df, index=True).to_numpy().tobytes()).hexdigest()[:16]
+
+
+class RenderizadorGraficos:
+    """
+    Genera los PNG de los reportes en procesos aparte y los guarda en disco
+    con la clave (hash de los datos, id del gráfico). Si el PNG ya existe
+    no se vuelve a dibujar.
+    """
+
+    def __init__(self, directorio, procesos=2):
+        self.directorio = directorio
+        self.procesos = procesos
+        self._ejecutor = None
+        self._en_curso = {}   # ruta png -> Future
+        os.makedirs(directorio, exist_ok=True)
+        self._limpiar_cache()
+
+    def _pool(self):
+        if self._ejecutor is None:
+            # spawn: los procesos no heredan el estado de Tk
+            self._ejecutor = ProcessPoolExecutor(max_workers=self.procesos,
+                                                 mp_context=multiprocessing.get_context("spawn"),
+                                                 initializer=_iniciar_proceso)
+        return self._ejecutor
+
+    def ruta_png(self, clave, gid):
+        return os.path.join(self.directorio, f"{clave}_{gid}_v{VERSION_GRAFICOS}.png")
+
+    def solicitar(self, clave, gid, df, matriz, info_t, corr_sf):
+        """Devuelve un Future con la ruta del PNG (ya resuelto si estaba en caché)"""
+        ruta = self.ruta_png(clave, gid)
+        if os.path.exists(ruta):
+            futuro = Future()
+            futuro.set_result(ruta)
+            return futuro
+        futuro = self._en_curso.get(ruta)
+        if futuro is None:
+            futuro = self._pool().submit(renderizar_png, gid, df, matriz, info_t, corr_sf, ruta)
+            self._en_curso[ruta] = futuro
+            futuro.add_done_callback(lambda f, r=ruta: self._en_curso.pop(r, None))
+        return futuro
+
+    def _limpiar_cache(self):
+        """Deja solo los MAX_ARCHIVOS_CACHE PNG más recientes"""
+        archivos = sorted(glob.glob(os.path.join(self.directorio, "*.png")), key=os.path.getmtime, reverse=True)
+        for ruta in archivos[MAX_ARCHIVOS_CACHE:]:
+            try:
+                os.remove(ruta)
+            except OSError:
+                pass
+
+    def cerrar(self):
+        if self._ejecutor is not None:
+            self._ejecutor.shutdown(wait=False, cancel_futures=True)
+            self._ejecutor = None
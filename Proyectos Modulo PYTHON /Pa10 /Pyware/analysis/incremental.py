@@ -0,0 +1,273 @@
+
+import json
+import os
+
+import numpy as np
+import pandas as pd
+
+from analysis.stats import (welch_desde_momentos, COLUMNAS_CORR, COLUMNAS_NUM,
+                            CLIMAS_ADVERSOS, MAPA_SUENO, MAPA_DIETA, MAPA_ANIMO, SINTOMAS)
+from data import almacen
+from data.almacen import ENCABEZADOS
+
+def _firma(ruta):
+    info = os.stat(ruta)
+    return [info.st_mtime_ns, info.st_size]
+
+def _numero(valor):
+    try:
+        return float(valor)
+    except (TypeError, ValueError):
+        return np.nan
+
+
+class EstadisticasIncrementales:
+    """
+    Sumas acumuladas de un registro para responder en O(1) lo mismo que procesar_dataframe:
+    - Por cada par de variables: cantidad, sumas, sumas de cuadrados y productos cruzados
+      (solo filas donde ambas existen, igual que DataFrame.corr)
+    - Conteo, suma y suma de cuadrados del dolor con y sin clima adverso (t-test de Welch)
+    - Sumas del par Sueño(T-1) / Fatiga(T)
+    """
+
+    VARIABLES = COLUMNAS_CORR
+
+    def __init__(self):
+        k = len(self.VARIABLES)
+        self.total = 0
+        self.desde = None
+        self.hasta = None
+        self.n = np.zeros((k, k))      # filas donde i y j existen
+        self.sx = np.zeros((k, k))     # suma de i en esas filas
+        self.sxx = np.zeros((k, k))    # suma de i² en esas filas
+        self.sxy = np.zeros((k, k))    # suma de i·j
+        self.dolor = np.zeros((2, 3))  # [normal, adverso] x [n, suma, suma²]
+        self.lag = np.zeros(6)         # n, sx, sy, sxx, syy, sxy de (sueño ayer, fatiga hoy)
+        self.ultimo_sueno = np.nan
+
+    # ---------- acumulación ----------
+    def _sumar_matriz(self, x):
+        presentes = ~np.isnan(x)
+        v = np.where(presentes, x, 0.0)
+        m = presentes.astype(float)
+        self.n += m.T @ m
+        self.sx += v.T @ m
+        self.sxx += (v * v).T @ m
+        self.sxy += v.T @ v
+
+    def _sumar_lag(self, sueno_ayer, fatiga):
+        validos = ~np.isnan(sueno_ayer) & ~np.isnan(fatiga)
+        x, y = sueno_ayer[validos], fatiga[validos]
+        self.lag += [len(x), x.sum(), y.sum(), (x * x).sum(), (y * y).sum(), (x * y).sum()]
+
+    def _sumar_fechas(self, fechas):
+        fechas = pd.to_datetime(pd.Series(fechas), errors='coerce').dropna()
+        if fechas.empty:
+            return
+        minimo, maximo = fechas.min(), fechas.max()
+        self.desde = minimo if self.desde is None else min(self.desde, minimo)
+        self.hasta = maximo if self.hasta is None else max(self.hasta, maximo)
+
+    def agregar_dataframe(self, df):
+        """Suma de una vez un DataFrame ya preparado (preparar_dataframe)"""
+        if df is None or df.empty:
+            return self
+        x = np.column_stack([
+            df[c].to_numpy(dtype=float) if c in df.columns else np.full(len(df), np.nan)
+            for c in self.VARIABLES
+        ])
+        self._sumar_matriz(x)
+
+        dolor = df['dolor_score'].to_numpy(dtype=float)
+        adverso = df['clima_adverso'].to_numpy() == 1
+        for g, filtro in enumerate((~adverso, adverso)):
+            self.dolor[g] += [filtro.sum(), dolor[filtro].sum(), (dolor[filtro] ** 2).sum()]
+
+        sueno = x[:, self.VARIABLES.index('sueno_score')]
+        fatiga = x[:, self.VARIABLES.index('fatiga_score')]
+        self._sumar_lag(np.concatenate([[self.ultimo_sueno], sueno[:-1]]), fatiga)
+        self.ultimo_sueno = sueno[-1]
+
+        self._sumar_fechas(df['fecha'])
+        self.total += len(df)
+        return self
+
+    @classmethod
+    def preparar_fila(cls, fila):
+        """Convierte una fila del CSV (dict de textos) en los valores de VARIABLES; None si no es válida"""
+        numeros = {c: _numero(fila.get(c)) for c in COLUMNAS_NUM}
+        if any(np.isnan(v) for v in numeros.values()):
+            return None  # igual que el dropna de preparar_dataframe
+        valores = dict(numeros)
+        valores['clima_adverso'] = 1.0 if fila.get('clima') in CLIMAS_ADVERSOS else 0.0
+        valores['sueno_score'] = MAPA_SUENO.get(fila.get('sueño'), np.nan)
+        valores['dieta_score'] = MAPA_DIETA.get(fila.get('dieta_tipo'), np.nan)
+        if fila.get('estado_animo_score') not in (None, ''):
+            valores['estado_animo_score'] = _numero(fila['estado_animo_score'])
+        else:
+            valores['estado_animo_score'] = MAPA_ANIMO.get(fila.get('estado_animo'), 3)
+        valores['ISA'] = sum(numeros[s] for s in SINTOMAS) / len(SINTOMAS)
+        return np.array([valores[c] for c in cls.VARIABLES], dtype=float)
+
+    def agregar(self, fila):
+        """Suma un registro nuevo (dict con los textos del CSV). Devuelve False si no es válido."""
+        x = self.preparar_fila(fila)
+        if x is None:
+            return False
+        self._sumar_matriz(x[None, :])
+        dolor = x[self.VARIABLES.index('dolor_score')]
+        g = int(x[self.VARIABLES.index('clima_adverso')] == 1)
+        self.dolor[g] += [1, dolor, dolor * dolor]
+        sueno = x[self.VARIABLES.index('sueno_score')]
+        self._sumar_lag(np.array([self.ultimo_sueno]), x[[self.VARIABLES.index('fatiga_score')]])
+        self.ultimo_sueno = sueno
+        self._sumar_fechas([fila.get('fecha')])
+        self.total += 1
+        return True
+
+    # ---------- resultados ----------
+    def matriz_correlacion(self):
+        """Igual que df_num.corr(): Pearson por pares con las filas donde ambas variables existen"""
+        with np.errstate(divide='ignore', invalid='ignore'):
+            cov = self.n * self.sxy - self.sx * self.sx.T
+            var = self.n * self.sxx - self.sx ** 2
+            var[var <= 1e-12 * np.maximum(self.n * self.sxx, 1)] = 0  # constante (salvo error de redondeo)
+            corr = cov / np.sqrt(var * var.T)
+        corr[(self.n < 2) | ~np.isfinite(corr)] = np.nan
+        corr = np.clip(corr, -1, 1)
+        presentes = np.diag(self.n) > 0
+        nombres = [v for v, p in zip(self.VARIABLES, presentes) if p]
+        return pd.DataFrame(corr[np.ix_(presentes, presentes)], index=nombres, columns=nombres)
+
+    def promedios(self):
+        diagonal = np.diag(self.n)
+        with np.errstate(divide='ignore', invalid='ignore'):
+            medias = np.diag(self.sx) / diagonal
+        return pd.Series(np.where(diagonal > 0, medias, np.nan), index=self.VARIABLES)
+
+    def t_clima(self):
+        (n0, s0, q0), (n1, s1, q1) = self.dolor
+        with np.errstate(divide='ignore', invalid='ignore'):
+            m0, m1 = s0 / n0, s1 / n1
+            v0 = (q0 - n0 * m0 ** 2) / (n0 - 1)
+            v1 = (q1 - n1 * m1 ** 2) / (n1 - 1)
+        t_stat, p_val = welch_desde_momentos(n1, m1, max(v1, 0.0), n0, m0, max(v0, 0.0))
+        return {'t_stat': float(t_stat), 'p_val': float(p_val)}
+
+    def corr_sueno_fatiga(self):
+        n, sx, sy, sxx, syy, sxy = self.lag
+        if n < 2:
+            return 0.0 if n == 0 else np.nan
+        with np.errstate(divide='ignore', invalid='ignore'):
+            var_x, var_y = n * sxx - sx * sx, n * syy - sy * sy
+            if var_x <= 1e-12 * max(n * sxx, 1) or var_y <= 1e-12 * max(n * syy, 1):
+                return np.nan
+            r = (n * sxy - sx * sy) / np.sqrt(var_x * var_y)
+        return float(np.clip(r, -1, 1)) if np.isfinite(r) else np.nan
+
+    # ---------- persistencia ----------
+    def a_dict(self):
+        return {
+            'total': self.total,
+            'desde': None if self.desde is None else self.desde.isoformat(),
+            'hasta': None if self.hasta is None else self.hasta.isoformat(),
+            'n': self.n.tolist(), 'sx': self.sx.tolist(), 'sxx': self.sxx.tolist(), 'sxy': self.sxy.tolist(),
+            'dolor': self.dolor.tolist(), 'lag': self.lag.tolist(),
+            'ultimo_sueno': None if np.isnan(self.ultimo_sueno) else float(self.ultimo_sueno),
+        }
+
+    @classmethod
+    def desde_dict(cls, datos):
+        est = cls()
+        est.total = datos['total']
+        est.desde = None if datos['desde'] is None else pd.Timestamp(datos['desde'])
+        est.hasta = None if datos['hasta'] is None else pd.Timestamp(datos['hasta'])
+        for nombre in ('n', 'sx', 'sxx', 'sxy', 'dolor', 'lag'):
+            setattr(est, nombre, np.array(datos[nombre], dtype=float))
+        est.ultimo_sueno = np.nan if datos['ultimo_sueno'] is None else datos['ultimo_sueno']
+        return est
+
+    def coincide_con(self, otra, tolerancia=1e-6):
+        """Compara con otro estado (para detectar deriva respecto de un recálculo completo)"""
+        return (self.total == otra.total
+                and all(np.allclose(getattr(self, c), getattr(otra, c), rtol=tolerancia, atol=tolerancia)
+                        for c in ('n', 'sx', 'sxx', 'sxy', 'dolor', 'lag')))
+
+
+class AlmacenEstadisticas:
+    """
+    Estado incremental de cada usuario, guardado junto a su CSV (<usuario>_registros.stats.json).
+    Cada registro nuevo actualiza las sumas sin releer el archivo; cada VALIDAR_CADA
+    registros (o si el CSV cambió por fuera) se recalcula todo y se corrige la deriva.
+    """
+
+    VALIDAR_CADA = 30
+
+    def __init__(self):
+        self._estados = {}  # ruta csv -> (firma, estado, registros desde la última validación)
+
+    @staticmethod
+    def ruta_estado(ruta_csv):
+        return os.path.splitext(ruta_csv)[0] + ".stats.json"
+
+    def recalcular(self, ruta_csv):
+        """Recorre el CSV completo y reemplaza el estado guardado"""
+        est = EstadisticasIncrementales()
+        if os.path.exists(ruta_csv):
+            est.agregar_dataframe(almacen.cargar_registros(ruta_csv))
+        self._guardar(ruta_csv, est, 0)
+        return est
+
+    def _guardar(self, ruta_csv, est, pendientes):
+        firma = _firma(ruta_csv) if os.path.exists(ruta_csv) else None
+        self._estados[ruta_csv] = (firma, est, pendientes)
+        try:
+            with open(self.ruta_estado(ruta_csv), 'w', encoding='utf-8') as f:
+                json.dump({'firma': firma, 'pendientes': pendientes, 'estado': est.a_dict()}, f)
+        except OSError as e:
+            print(f"No se pudo guardar el estado de {ruta_csv}: {e}")
+
+    def _leer(self, ruta_csv):
+        if ruta_csv in self._estados:
+            return self._estados[ruta_csv]
+        try:
+            with open(self.ruta_estado(ruta_csv), 'r', encoding='utf-8') as f:
+                datos = json.load(f)
+            return datos['firma'], EstadisticasIncrementales.desde_dict(datos['estado']), datos['pendientes']
+        except (OSError, ValueError, KeyError):
+            return None, None, 0
+
+    def obtener(self, ruta_csv):
+        """Estado vigente del usuario; si el CSV no coincide con lo guardado se recalcula"""
+        firma, est, pendientes = self._leer(ruta_csv)
+        actual = _firma(ruta_csv) if os.path.exists(ruta_csv) else None
+        if est is None or firma != actual:
+            return self.recalcular(ruta_csv)
+        self._estados[ruta_csv] = (firma, est, pendientes)
+        return est
+
+    def agregar_registro(self, ruta_csv, fila):
+        """Agrega la fila (lista en el orden de ENCABEZADOS) al CSV y actualiza el estado"""
+        est = self.obtener(ruta_csv)
+        _, _, pendientes = self._estados[ruta_csv]
+
+        almacen.agregar_registro(ruta_csv, fila)
+
+        est.agregar({c: str(v) for c, v in zip(ENCABEZADOS, fila)})
+        pendientes += 1
+        if pendientes >= self.VALIDAR_CADA:
+            self.validar(ruta_csv, est)
+        else:
+            self._guardar(ruta_csv, est, pendientes)
+        return est
+
+    def validar(self, ruta_csv, est=None):
+        """Recalcula desde el CSV y avisa si las sumas incrementales se habían desviado"""
+        est = est if est is not None else self.obtener(ruta_csv)
+        completo = self.recalcular(ruta_csv)
+        if not est.coincide_con(completo):
+            print(f"Estadísticas de {os.path.basename(ruta_csv)} corregidas tras el recálculo completo")
+        return completo
+
+
+ALMACEN = AlmacenEstadisticas()
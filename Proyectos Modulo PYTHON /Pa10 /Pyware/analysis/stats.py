@@ -1,8 +1,96 @@
 
+import numpy as np
 import pandas as pd
 from scipy.stats import ttest_ind
+from scipy.stats import t as dist_t
 
-def procesar_dataframe(df):
+COLUMNAS_NUM = [
+    'rigidez_score', 'dolor_score', 'inflamacion_score',
+    'fatiga_score', 'actividad_fisica', 'temperatura_C'
+]
+CLIMAS_ADVERSOS = ['Lluvioso', 'Húmedo']
+MAPA_SUENO = {'Horrible': 1, 'Malo': 2, 'Ok': 3, 'Bueno': 4, 'Excelente': 5}
+MAPA_DIETA = {'Inflamatoria': 0, 'Balanceada': 1, 'Antiinflamatoria': 2}
+MAPA_ANIMO = {
+    'Triste': 1, 'Frustrado': 1, 'Irritable': 2, 'Ansioso': 2,
+    'Estresado': 3, 'Neutral': 3, 'Tranquilo': 4, 'Optimista': 5, 'Feliz': 5
+}
+SINTOMAS = ['dolor_score', 'inflamacion_score', 'fatiga_score', 'rigidez_score']
+COLUMNAS_CORR = [
+    'temperatura_C', 'actividad_fisica', 'sueno_score', 'dieta_score',
+    'clima_adverso', 'rigidez_score', 'dolor_score',
+    'inflamacion_score', 'fatiga_score', 'estado_animo_score', 'ISA'
+]
+# Nombres legibles de las variables (los usan las pestañas de análisis y reportes)
+NOMBRES_VARIABLES = {
+    'rigidez_score': 'Rigidez Matutina', 'inflamacion_score': 'Inflamación',
+    'fatiga_score': 'Fatiga', 'clima_adverso': 'Clima Adverso (Lluvia/Humedad)',
+    'sueno_score': 'Calidad del Sueño', 'dieta_score': 'Dieta Antiinflamatoria',
+    'actividad_fisica': 'Actividad Física', 'temperatura_C': 'Temperatura',
+    'ISA': 'Índice General de Síntomas', 'estado_animo_score': 'Estado de Ánimo',
+    'dolor_score': 'Dolor'
+}
+
+def preparar_dataframe(df):
+    """
+    Devuelve una copia limpia del registro (no modifica el original):
+    - Variables numéricas (filas inválidas descartadas)
+    - Marcador de clima adverso
+    - Puntajes de sueño, dieta, estado de ánimo
+    - ISA (promedio de síntomas)
+    """
+    df = df.copy()
+    for c in COLUMNAS_NUM:
+        if c in df.columns:
+            df[c] = pd.to_numeric(df[c], errors='coerce')
+
+    df = df.dropna(subset=[c for c in COLUMNAS_NUM if c in df.columns])
+    if df.empty:
+        return df
+
+    df['fecha'] = pd.to_datetime(df['fecha'], errors='coerce')
+
+    # Clima adverso
+    if 'clima' in df.columns:
+        df['clima_adverso'] = df['clima'].isin(CLIMAS_ADVERSOS).astype(int)
+    else:
+        df['clima_adverso'] = 0
+
+    # Sueño a número
+    if 'sueño' in df.columns:
+        df['sueno_score'] = df['sueño'].map(MAPA_SUENO)
+
+    # Dieta a número
+    if 'dieta_tipo' in df.columns:
+        df['dieta_score'] = df['dieta_tipo'].map(MAPA_DIETA)
+
+    # Estado de ánimo a número
+    if 'estado_animo_score' not in df.columns:
+        if 'estado_animo' in df.columns:
+            df['estado_animo_score'] = df['estado_animo'].map(MAPA_ANIMO).fillna(3)
+        else:
+            df['estado_animo_score'] = 3
+
+    #promedio de síntomas
+    df['ISA'] = df[SINTOMAS].mean(axis=1)
+    return df
+
+def welch_desde_momentos(n1, m1, v1, n2, m2, v2):
+    """
+    t-test de Welch calculado con conteos, medias y varianzas (ddof=1).
+    Acepta arreglos: un resultado por grupo. Con menos de 2 datos en
+    algún lado devuelve t = 0 y p = 1, igual que procesar_dataframe.
+    """
+    n1, m1, v1, n2, m2, v2 = (np.asarray(x, dtype=float) for x in (n1, m1, v1, n2, m2, v2))
+    with np.errstate(divide='ignore', invalid='ignore'):
+        se1, se2 = v1 / n1, v2 / n2
+        t_stat = (m1 - m2) / np.sqrt(se1 + se2)
+        gl = (se1 + se2) ** 2 / (se1 ** 2 / (n1 - 1) + se2 ** 2 / (n2 - 1))
+        p_val = 2 * dist_t.sf(np.abs(t_stat), gl)
+    validos = (n1 > 1) & (n2 > 1)
+    return np.where(validos, t_stat, 0.0), np.where(validos, p_val, 1.0)
+
+def procesar_dataframe(df, preparado=False):
     """
     Limpia y calcula:
     - Variables numéricas
@@ -12,59 +100,14 @@ def procesar_dataframe(df):
     - Matriz de correlación
     - Correlación Sueño(T-1) vs Fatiga(T)
     - t-test: dolor en clima adverso vs normal
+    Con preparado=True se omite la limpieza (df ya viene de preparar_dataframe o data.almacen).
     """
     try:
-        columnas_num = [
-            'rigidez_score', 'dolor_score', 'inflamacion_score',
-            'fatiga_score', 'actividad_fisica', 'temperatura_C'
-        ]
-        for c in columnas_num:
-            if c in df.columns:
-                df[c] = pd.to_numeric(df[c], errors='coerce')
-
-        df.dropna(subset=[c for c in columnas_num if c in df.columns], inplace=True)
+        df = df.copy() if preparado else preparar_dataframe(df)
         if df.empty:
             return None
 
-        df['fecha'] = pd.to_datetime(df['fecha'], errors='coerce')
-
-        # Clima adverso
-        if 'clima' in df.columns:
-            df['clima_adverso'] = ((df['clima'] == 'Lluvioso') | (df['clima'] == 'Húmedo')).astype(int)
-        else:
-            df['clima_adverso'] = 0
-
-        # Sueño a número
-        mapa_sueno = {'Horrible': 1, 'Malo': 2, 'Ok': 3, 'Bueno': 4, 'Excelente': 5}
-        if 'sueño' in df.columns:
-            df['sueno_score'] = df['sueño'].map(mapa_sueno)
-
-        # Dieta a número
-        mapa_dieta = {'Inflamatoria': 0, 'Balanceada': 1, 'Antiinflamatoria': 2}
-        if 'dieta_tipo' in df.columns:
-            df['dieta_score'] = df['dieta_tipo'].map(mapa_dieta)
-
-        # Estado de ánimo a número 
-        if 'estado_animo_score' not in df.columns:
-            mapa_animo = {
-                'Triste': 1, 'Frustrado': 1, 'Irritable': 2, 'Ansioso': 2,
-                'Estresado': 3, 'Neutral': 3, 'Tranquilo': 4, 'Optimista': 5, 'Feliz': 5
-            }
-            if 'estado_animo' in df.columns:
-                df['estado_animo_score'] = df['estado_animo'].map(mapa_animo).fillna(3)
-            else:
-                df['estado_animo_score'] = 3
-
-        #promedio de síntomas
-        sintomas = ['dolor_score', 'inflamacion_score', 'fatiga_score', 'rigidez_score']
-        df['ISA'] = df[sintomas].mean(axis=1)
-
-        columnas_para_corr = [
-            'temperatura_C', 'actividad_fisica', 'sueno_score', 'dieta_score',
-            'clima_adverso', 'rigidez_score', 'dolor_score',
-            'inflamacion_score', 'fatiga_score', 'estado_animo_score', 'ISA'
-        ]
-        columnas_existentes = [c for c in columnas_para_corr if c in df.columns]
+        columnas_existentes = [c for c in COLUMNAS_CORR if c in df.columns]
         df_num = df[columnas_existentes]
         matriz = df_num.corr(numeric_only=True)
 
@@ -93,8 +136,9 @@ def procesar_dataframe(df):
         return None
 
 def cargar_y_procesar_csv(ruta_csv):
+    from data.almacen import cargar_registros  # import local: data.almacen usa las constantes de este módulo
     try:
-        df = pd.read_csv(ruta_csv)
-        return procesar_dataframe(df)
+        df = cargar_registros(ruta_csv)
+        return procesar_dataframe(df, preparado=True)
     except Exception:
         return None
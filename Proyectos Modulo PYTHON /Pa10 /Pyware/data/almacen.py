@@ -0,0 +1,211 @@
+# data/almacen.py
+
+"""
+Registros de cada usuario en columnas tipadas (formato binario de registros NumPy).
+
+<usuario>_registros.csv sigue siendo el archivo de intercambio: el binario
+<usuario>_registros.rec se importa de él cuando cambia por fuera y cada
+registro nuevo se agrega a los dos. Al cargar no se interpreta texto ni se
+vuelven a mapear sueño, dieta o ánimo: ya están guardados como códigos.
+"""
+
+import csv
+import json
+import os
+
+import numpy as np
+import pandas as pd
+
+from analysis.stats import COLUMNAS_NUM, CLIMAS_ADVERSOS, MAPA_SUENO, MAPA_DIETA, MAPA_ANIMO, SINTOMAS
+
+VERSION_FORMATO = 1
+
+CLIMAS = ['Soleado', 'Seco', 'Ventoso', 'Nublado', 'Lluvioso', 'Húmedo']
+SUENOS = sorted(MAPA_SUENO, key=MAPA_SUENO.get)     # código + 1 = sueno_score
+DIETAS = sorted(MAPA_DIETA, key=MAPA_DIETA.get)     # código = dieta_score
+ANIMOS = list(MAPA_ANIMO)
+PUNTAJE_ANIMO = np.array([MAPA_ANIMO[a] for a in ANIMOS], dtype=np.int8)
+
+# Una fila = 16 bytes. Textos como códigos int8 (-1 = desconocido), fecha en días desde 1970
+DTYPE_REGISTRO = np.dtype([
+    ('fecha', '<i4'),
+    ('clima', 'i1'),
+    ('temperatura_C', '<f4'),
+    ('actividad_fisica', 'i1'),
+    ('sueno', 'i1'),
+    ('dieta_tipo', 'i1'),
+    ('rigidez_score', 'i1'),
+    ('dolor_score', 'i1'),
+    ('inflamacion_score', 'i1'),
+    ('fatiga_score', 'i1'),
+    ('estado_animo', 'i1'),
+    ('estado_animo_score', 'i1'),
+])
+SIN_FECHA = np.iinfo(np.int32).min
+RANGO_I1 = np.iinfo(np.int8)
+
+ENCABEZADOS = [
+    'fecha', 'clima', 'temperatura_C', 'actividad_fisica', 'sueño', 'dieta_tipo',
+    'rigidez_score', 'dolor_score', 'inflamacion_score', 'fatiga_score', 'estado_animo'
+]
+
+# ---------- Conversión ----------
+
+def _codigos(df, columna, categorias):
+    if columna not in df.columns:
+        return np.full(len(df), -1, dtype=np.int8)
+    return pd.Categorical(df[columna], categories=categorias).codes.astype(np.int8)
+
+def _enteros_i1(columna, valores):
+    """Valida que la columna entre sin pérdida en int8 (sin decimales ni fuera de rango)"""
+    valores = np.asarray(valores, dtype=np.float64)
+    invalidos = (valores != np.round(valores)) | (valores < RANGO_I1.min) | (valores > RANGO_I1.max)
+    if invalidos.any():
+        ejemplos = ", ".join(str(v) for v in valores[invalidos][:5])
+        raise ValueError(f"'{columna}' debe ser un entero entre {RANGO_I1.min} y {RANGO_I1.max} "
+                         f"({int(invalidos.sum())} valores inválidos: {ejemplos})")
+    return valores.astype(np.int8)
+
+def desde_dataframe(df):
+    """
+    Convierte un registro de texto (como el CSV) en el arreglo tipado; descarta filas
+    incompletas. Puntajes con decimales o fuera de rango lanzan ValueError en vez de
+    truncarse al guardarlos como int8.
+    """
+    df = df.copy()
+    for c in COLUMNAS_NUM:
+        df[c] = pd.to_numeric(df[c], errors='coerce') if c in df.columns else np.nan
+    df = df.dropna(subset=COLUMNAS_NUM)
+
+    registros = np.zeros(len(df), dtype=DTYPE_REGISTRO)
+    fechas = pd.to_datetime(df['fecha'], errors='coerce') if 'fecha' in df.columns else pd.Series(pd.NaT, index=df.index)
+    dias = fechas.to_numpy(dtype='datetime64[D]').astype(np.int64)
+    registros['fecha'] = np.where(fechas.isna().to_numpy(), SIN_FECHA, dias)
+    registros['clima'] = _codigos(df, 'clima', CLIMAS)
+    registros['sueno'] = _codigos(df, 'sueño', SUENOS)
+    registros['dieta_tipo'] = _codigos(df, 'dieta_tipo', DIETAS)
+    registros['estado_animo'] = _codigos(df, 'estado_animo', ANIMOS)
+    for c in COLUMNAS_NUM:
+        valores = df[c].to_numpy()
+        registros[c] = valores if DTYPE_REGISTRO[c].kind == 'f' else _enteros_i1(c, valores)
+
+    if 'estado_animo_score' in df.columns:
+        puntajes = pd.to_numeric(df['estado_animo_score'], errors='coerce').fillna(3).to_numpy()
+        registros['estado_animo_score'] = _enteros_i1('estado_animo_score', puntajes)
+    else:
+        codigos = registros['estado_animo']
+        registros['estado_animo_score'] = np.where(codigos >= 0, PUNTAJE_ANIMO[codigos], 3)
+    return registros
+
+def a_dataframe(registros):
+    """
+    DataFrame listo para analizar (mismas columnas que preparar_dataframe) sin
+    interpretar texto: categorías desde los códigos y puntajes por aritmética.
+    """
+    fechas = registros['fecha'].astype('datetime64[D]')
+    fechas[registros['fecha'] == SIN_FECHA] = np.datetime64('NaT')
+    df = pd.DataFrame({
+        'fecha': pd.to_datetime(fechas),
+        'clima': pd.Categorical.from_codes(registros['clima'], CLIMAS),
+        'temperatura_C': np.round(registros['temperatura_C'].astype(np.float64), 2),
+        'actividad_fisica': registros['actividad_fisica'],
+        'sueño': pd.Categorical.from_codes(registros['sueno'], SUENOS),
+        'dieta_tipo': pd.Categorical.from_codes(registros['dieta_tipo'], DIETAS),
+        'rigidez_score': registros['rigidez_score'],
+        'dolor_score': registros['dolor_score'],
+        'inflamacion_score': registros['inflamacion_score'],
+        'fatiga_score': registros['fatiga_score'],
+        'estado_animo': pd.Categorical.from_codes(registros['estado_animo'], ANIMOS),
+        'estado_animo_score': registros['estado_animo_score'],
+    })
+    df['clima_adverso'] = np.isin(registros['clima'], [CLIMAS.index(c) for c in CLIMAS_ADVERSOS]).astype(int)
+    df['sueno_score'] = np.where(registros['sueno'] >= 0, registros['sueno'] + 1.0, np.nan)
+    df['dieta_score'] = np.where(registros['dieta_tipo'] >= 0, registros['dieta_tipo'].astype(float), np.nan)
+    df['ISA'] = np.mean([registros[s].astype(np.float64) for s in SINTOMAS], axis=0)
+    return df
+
+def exportar_csv(registros, ruta_csv, columnas=ENCABEZADOS):
+    """Escribe los registros como CSV de texto (el formato que usa la app y otros programas)"""
+    df = a_dataframe(registros)
+    df['fecha'] = df['fecha'].dt.strftime('%Y-%m-%d')
+    df[columnas].to_csv(ruta_csv, index=False)
+
+# ---------- Archivos por usuario ----------
+
+def ruta_binaria(ruta_csv):
+    return os.path.splitext(ruta_csv)[0] + ".rec"
+
+def _ruta_meta(ruta_csv):
+    return ruta_binaria(ruta_csv) + ".json"
+
+def _firma(ruta):
+    info = os.stat(ruta)
+    return [info.st_mtime_ns, info.st_size]
+
+def _leer_meta(ruta_csv):
+    try:
+        with open(_ruta_meta(ruta_csv), 'r', encoding='utf-8') as f:
+            return json.load(f)
+    except (OSError, ValueError):
+        return {}
+
+def _escribir_meta(ruta_csv):
+    with open(_ruta_meta(ruta_csv), 'w', encoding='utf-8') as f:
+        json.dump({'version': VERSION_FORMATO, 'firma_csv': _firma(ruta_csv)}, f)
+
+def sincronizar(ruta_csv):
+    """Reimporta el CSV al binario si cambió desde la última vez (o si no hay binario)"""
+    meta = _leer_meta(ruta_csv)
+    binario = ruta_binaria(ruta_csv)
+    if (os.path.exists(binario) and meta.get('version') == VERSION_FORMATO
+            and meta.get('firma_csv') == _firma(ruta_csv)):
+        return False
+    registros = desde_dataframe(pd.read_csv(ruta_csv))
+    tmp = binario + ".tmp"
+    registros.tofile(tmp)
+    os.replace(tmp, binario)
+    _escribir_meta(ruta_csv)
+    return True
+
+def cargar_arreglo(ruta_csv):
+    sincronizar(ruta_csv)
+    return np.fromfile(ruta_binaria(ruta_csv), dtype=DTYPE_REGISTRO)
+
+def cargar_registros(ruta_csv):
+    """DataFrame preparado del usuario leyendo el binario (importa el CSV solo si cambió)"""
+    return a_dataframe(cargar_arreglo(ruta_csv))
+
+def agregar_registro(ruta_csv, fila):
+    """Agrega una fila (lista en el orden de ENCABEZADOS) al CSV y al binario"""
+    if os.path.exists(ruta_csv):
+        sincronizar(ruta_csv)
+    # se convierte antes de escribir: una fila rechazada no llega a ninguno de los dos
+    nuevo = desde_dataframe(pd.DataFrame([fila], columns=ENCABEZADOS).astype(str))
+    existe = os.path.exists(ruta_csv)
+    with open(ruta_csv, 'a', newline='', encoding='utf-8') as f:
+        escritor = csv.writer(f)
+        if not existe:
+            escritor.writerow(ENCABEZADOS)
+        escritor.writerow(fila)
+
+    with open(ruta_binaria(ruta_csv), 'ab' if existe else 'wb') as f:
+        nuevo.tofile(f)   # una fila inválida no agrega nada, igual que el dropna al importar
+    _escribir_meta(ruta_csv)
+
+# ---------- Simulaciones ----------
+
+def simulacion_cacheada(dias, semilla=42, directorio=None):
+    """Dataset simulado ya preparado; se genera una sola vez por (dias, semilla)"""
+    from data.simulate import generar_dataset_simulado, VERSION_SIMULADOR
+
+    directorio = directorio or os.path.join(os.path.dirname(os.path.abspath(__file__)), "simulaciones")
+    os.makedirs(directorio, exist_ok=True)
+    ruta = os.path.join(directorio, f"sim_{dias}_{semilla}_v{VERSION_SIMULADOR}_{VERSION_FORMATO}.rec")
+    if os.path.exists(ruta):
+        return a_dataframe(np.fromfile(ruta, dtype=DTYPE_REGISTRO))
+
+    registros = desde_dataframe(generar_dataset_simulado(dias, semilla))
+    tmp = ruta + ".tmp"
+    registros.tofile(tmp)
+    os.replace(tmp, ruta)
+    return a_dataframe(registros)
@@ -3,7 +3,182 @@
 
 import numpy as np
 import pandas as pd
-from datetime import datetime, timedelta
+
+VERSION_SIMULADOR = 2   # subir si cambia la generación (invalida las simulaciones guardadas)
+
+# Clima de Panamá: probabilidad de cada clima según el mes (fila = mes 1..12)
+CLIMAS = np.array(['Soleado', 'Seco', 'Ventoso', 'Nublado', 'Lluvioso', 'Húmedo'], dtype=object)
+_SECA = [0.6, 0.3, 0.1, 0.0, 0.0, 0.0]
+_ABRIL = [0.5, 0.3, 0.2, 0.0, 0.0, 0.0]
+_TRANSICION = [0.3, 0.0, 0.0, 0.3, 0.2, 0.2]
+_LLUVIOSA = [0.0, 0.0, 0.0, 0.3, 0.5, 0.2]
+PROB_CLIMA_MES = np.array([
+    _SECA,                                  # mes 0 (no se usa, para indexar directo con el mes)
+    _SECA, _SECA, _SECA, _ABRIL,            # ene-abr
+    _TRANSICION,                            # may
+    _LLUVIOSA, _LLUVIOSA, _LLUVIOSA,        # jun-ago
+    _LLUVIOSA, _LLUVIOSA,                   # sep-oct
+    _TRANSICION,                            # nov
+    _SECA,                                  # dic
+])
+CLIMAS_ADVERSOS = ['Lluvioso', 'Húmedo']
+
+# Sueño con memoria: cadena de Markov sobre 1..5 (baja, se mantiene o sube; en los extremos se queda)
+OPCIONES_SUENO = np.array(['Horrible', 'Malo', 'Ok', 'Bueno', 'Excelente'], dtype=object)
+_PASOS_SUENO = {-1: 0.2, 0: 0.6, 1: 0.2}
+TRANSICION_SUENO = np.zeros((5, 5))
+for _origen in range(5):
+    for _paso, _p in _PASOS_SUENO.items():
+        TRANSICION_SUENO[_origen, min(max(_origen + _paso, 0), 4)] += _p
+
+OPCIONES_DIETA = np.array(['Inflamatoria', 'Balanceada', 'Antiinflamatoria'], dtype=object)
+
+# Estado de ánimo: 3 opciones por grupo (puntaje <= 2, == 3, >= 4)
+OPCIONES_ANIMO = np.array([
+    ['Triste', 'Frustrado', 'Irritable'],
+    ['Estresado', 'Ansioso', 'Irritable'],
+    ['Tranquilo', 'Optimista', 'Feliz'],
+], dtype=object)
+
+COLUMNAS = [
+    'fecha', 'clima', 'temperatura_C', 'actividad_fisica', 'sueño', 'dieta_tipo',
+    'rigidez_score', 'dolor_score', 'inflamacion_score', 'fatiga_score',
+    'estado_animo', 'estado_animo_score'
+]
+
+
+def _muestrear(rng, probabilidades):
+    """Elige un índice por celda; probabilidades tiene forma (..., opciones)"""
+    acumuladas = np.cumsum(probabilidades, axis=-1)
+    u = rng.random(acumuladas.shape[:-1])[..., None]
+    return np.minimum((u >= acumuladas).sum(axis=-1), probabilidades.shape[-1] - 1)
+
+
+def _cadena_sueno(rng, pacientes, dias):
+    """Sueño 1..5 de cada paciente: solo el paso de un día al siguiente es secuencial"""
+    acumuladas = np.cumsum(TRANSICION_SUENO, axis=1)
+    u = rng.random((pacientes, dias))
+    estados = np.empty((pacientes, dias), dtype=np.int64)
+    estados[:, 0] = rng.integers(1, 4, size=pacientes)  # empieza en Malo, Ok o Bueno
+    for d in range(1, dias):
+        estados[:, d] = (u[:, d, None] >= acumuladas[estados[:, d - 1]]).sum(axis=1)
+    return estados + 1
+
+
+def _brotes(rng, pacientes, dias):
+    """Brotes (3 a 5 episodios por paciente): sube, se mantiene y baja"""
+    max_brotes, max_duracion = 5, 14
+    numero = rng.integers(3, 6, size=pacientes)
+    inicio = rng.integers(0, dias - max_duracion, size=(pacientes, max_brotes))
+    duracion = rng.integers(3, max_duracion + 1, size=(pacientes, max_brotes))
+    meseta = rng.uniform(-0.3, 0.3, size=(pacientes, max_brotes, max_duracion))
+
+    desfase = np.arange(max_duracion)
+    pos = desfase / duracion[..., None]
+    perfil = np.select(
+        [pos < 0.3, pos < 0.7],
+        [(pos / 0.3) * 2, 2 + meseta],
+        2 * (1 - (pos - 0.7) / 0.3)
+    )
+    valido = (desfase < duracion[..., None]) & (np.arange(max_brotes)[:, None] < numero[:, None, None])
+
+    paciente, episodio, k = np.nonzero(valido)  # en orden: un brote posterior pisa al anterior
+    brotes = np.zeros((pacientes, dias))
+    brotes[paciente, inicio[paciente, episodio] + k] = perfil[paciente, episodio, k]
+    return brotes
+
+
+def _dolor_recurrente(base):
+    """Dolor con memoria: dolor(t) = redondeo(base(t) + 0.3 * dolor(t-1)) limitado a 0..5
+
+    Es el único término realmente recurrente (el redondeo impide usar un
+    filtro lineal), así que se recorre por días pero para todos los pacientes a la vez.
+    """
+    dolor = np.empty(base.shape, dtype=np.int64)
+    anterior = np.zeros(base.shape[0])
+    for d in range(base.shape[1]):
+        anterior = np.clip(np.rint(base[:, d] + 0.3 * anterior), 0, 5)
+        dolor[:, d] = anterior
+    return dolor
+
+
+def _simular(rng, pacientes, dias):
+    """Genera todas las variables como matrices (pacientes × días)"""
+    forma = (pacientes, dias)
+    fechas = pd.date_range('2025-01-01', periods=dias, freq='D')
+
+    # Clima y temperatura
+    clima_idx = _muestrear(rng, np.broadcast_to(PROB_CLIMA_MES[fechas.month.to_numpy()], forma + (len(CLIMAS),)))
+    clima = CLIMAS[clima_idx]
+    temperatura = rng.uniform(26, 32, size=forma)
+    clima_adverso = np.isin(clima, CLIMAS_ADVERSOS).astype(np.int64)
+
+    # Actividad física (más probabilidad entre semana)
+    prob_actividad = np.where(fechas.weekday.to_numpy() < 5, 0.7, 0.4)
+    actividad_fisica = (rng.random(forma) < prob_actividad).astype(np.int64)
+
+    sueno_num = _cadena_sueno(rng, pacientes, dias)
+    dieta_num = rng.integers(0, 3, size=forma)  # 0,1,2
+    brotes = _brotes(rng, pacientes, dias)
+
+    # Síntomas
+    base_dolor = (0.5 + brotes
+                  + clima_adverso * rng.uniform(0.3, 0.8, size=forma)
+                  + (1 - dieta_num) * 0.3
+                  - actividad_fisica * rng.uniform(0, 0.3, size=forma)
+                  + (6 - sueno_num) * 0.25
+                  + rng.normal(0, 0.2, size=forma))
+    dolor = _dolor_recurrente(base_dolor)
+
+    rigidez = np.clip(np.rint(dolor * rng.uniform(0.7, 1.0, size=forma)
+                              + brotes * 0.4
+                              + clima_adverso * rng.uniform(0.5, 1.0, size=forma)), 0, 5)
+
+    inflamacion = np.clip(np.rint(dolor * 0.6 + (1 - dieta_num) * 0.4 + brotes * 0.5
+                                  + rng.normal(0, 0.3, size=forma)), 0, 5)
+
+    fatiga = np.rint(dolor * 0.4 + (5 - sueno_num) * 0.7 + brotes * 0.3 + clima_adverso * 0.3)
+    fatiga = fatiga - actividad_fisica * 0.2
+    fatiga = np.clip(np.rint(fatiga + rng.normal(0, 0.2, size=forma)), 0, 5)
+
+    # Estado de ánimo
+    puntaje = (5 - dolor * 0.5 - fatiga * 0.3
+               + actividad_fisica * 0.4 + (sueno_num - 3) * 0.2
+               + rng.normal(0, 0.4, size=forma))
+    puntaje = np.clip(np.rint(puntaje), 1, 5).astype(np.int64)
+    grupo = np.select([puntaje <= 2, puntaje == 3], [0, 1], 2)
+    estado_animo = OPCIONES_ANIMO[grupo, rng.integers(0, 3, size=forma)]
+
+    return {
+        'fecha': np.broadcast_to(fechas.to_numpy(), forma),
+        'clima': clima,
+        'temperatura_C': np.round(temperatura, 1),
+        'actividad_fisica': actividad_fisica,
+        'sueño': OPCIONES_SUENO[sueno_num - 1],
+        'dieta_tipo': OPCIONES_DIETA[dieta_num],
+        'rigidez_score': rigidez.astype(np.int64),
+        'dolor_score': dolor,
+        'inflamacion_score': inflamacion.astype(np.int64),
+        'fatiga_score': fatiga.astype(np.int64),
+        'estado_animo': estado_animo,
+        'estado_animo_score': puntaje
+    }
+
+
+def generar_cohorte_simulada(pacientes=10, dias=180, semilla=42):
+    """
+    Genera varios pacientes a la vez (formato largo: una fila por paciente y día).
+    Mismas columnas que generar_dataset_simulado más 'paciente' (1..N).
+    """
+    if dias < 15:
+        raise ValueError("Se necesitan al menos 15 días para simular los brotes")
+    rng = np.random.default_rng(semilla)
+    columnas = _simular(rng, pacientes, dias)
+
+    df = pd.DataFrame({nombre: valores.ravel() for nombre, valores in columnas.items()}, columns=COLUMNAS)
+    df.insert(0, 'paciente', np.repeat(np.arange(1, pacientes + 1), dias))
+    return df
+
 
 def generar_dataset_simulado(dias=180, semilla=42, guardar_csv=False, ruta_csv=None):
     """
@@ -16,130 +191,7 @@ def generar_dataset_simulado(dias=180, semilla=42, guardar_csv=False, ruta_csv=N
     - Síntomas dependientes y con memoria de un día a otro
     - Estado de ánimo derivado de síntomas y hábitos
     """
-    np.random.seed(semilla)
-
-    # Fechas
-    fecha_inicio = datetime(2025, 1, 1)
-    fechas = [fecha_inicio + timedelta(days=i) for i in range(dias)]
-
-    # Clima de Panamá
-    def clima_panama(fecha):
-        mes = fecha.month
-        if mes in [12, 1, 2, 3]:
-            return np.random.choice(['Soleado', 'Seco', 'Ventoso'], p=[0.6, 0.3, 0.1])
-        elif mes == 4:
-            return np.random.choice(['Soleado', 'Seco', 'Ventoso'], p=[0.5, 0.3, 0.2])
-        elif mes in [5, 11]:
-            return np.random.choice(['Soleado', 'Nublado', 'Lluvioso', 'Húmedo'], p=[0.3, 0.3, 0.2, 0.2])
-        else:
-            return np.random.choice(['Lluvioso', 'Nublado', 'Húmedo'], p=[0.5, 0.3, 0.2])
-
-    clima = [clima_panama(f) for f in fechas]
-    temperatura = [np.random.uniform(26, 32) for _ in range(dias)]
-    clima_adverso = [1 if c in ['Lluvioso', 'Húmedo'] else 0 for c in clima]
-
-    # Actividad física 
-    actividad_fisica = []
-    for f in fechas:
-        if f.weekday() < 5:
-            actividad_fisica.append(np.random.choice([0, 1], p=[0.3, 0.7]))
-        else:
-            actividad_fisica.append(np.random.choice([0, 1], p=[0.6, 0.4]))
-
-    # Sueño con memoria
-    opciones_sueno = ['Horrible', 'Malo', 'Ok', 'Bueno', 'Excelente']
-    sueno_num = [np.random.choice([2, 3, 4])]
-    for _ in range(1, dias):
-        ayer = sueno_num[-1]
-        hoy = int(np.clip(ayer + np.random.choice([-1, 0, 1], p=[0.2, 0.6, 0.2]), 1, 5))
-        sueno_num.append(hoy)
-    sueno = [opciones_sueno[s - 1] for s in sueno_num]
-
-    # Dieta
-    opciones_dieta = ['Inflamatoria', 'Balanceada', 'Antiinflamatoria']
-    dieta_tipo = [np.random.choice(opciones_dieta) for _ in range(dias)]
-    dieta_num = [opciones_dieta.index(d) for d in dieta_tipo]  # 0,1,2
-
-    # Brotes (3 a 5 episodios)
-    numero_brotes = np.random.randint(3, 6)
-    brotes = np.zeros(dias)
-    for _ in range(numero_brotes):
-        inicio = np.random.randint(0, dias - 14)
-        duracion = np.random.randint(3, 15)
-        fin = min(inicio + duracion, dias)
-        for i in range(inicio, fin):
-            pos = (i - inicio) / float(duracion)
-            if pos < 0.3:
-                brotes[i] = (pos / 0.3) * 2
-            elif pos < 0.7:
-                brotes[i] = 2 + np.random.uniform(-0.3, 0.3)
-            else:
-                brotes[i] = 2 * (1 - (pos - 0.7) / 0.3)
-
-    # Síntomas 
-    dolor_score, rigidez_score, inflamacion_score, fatiga_score = [], [], [], []
-    for i in range(dias):
-        # Dolor base
-        dolor = 0.5 + brotes[i]
-        dolor += clima_adverso[i] * np.random.uniform(0.3, 0.8)
-
-        dolor += (1 - dieta_num[i]) * 0.3
-
-        if actividad_fisica[i] == 1:
-            dolor -= np.random.uniform(0, 0.3)
-        dolor += (6 - sueno_num[i]) * 0.25
-        if i > 0:
-            dolor += dolor_score[-1] * 0.3
-        dolor += np.random.normal(0, 0.2)
-        dolor = int(np.clip(round(dolor), 0, 5))
-        dolor_score.append(dolor)
-
-        rigidez = int(np.clip(round(dolor * np.random.uniform(0.7, 1.0) +
-                                   brotes[i] * 0.4 +
-                                   clima_adverso[i] * np.random.uniform(0.5, 1.0)), 0, 5))
-        rigidez_score.append(rigidez)
-
-        inflamacion = int(np.clip(round(
-            dolor * 0.6 + (1 - dieta_num[i]) * 0.4 + brotes[i] * 0.5 + np.random.normal(0, 0.3)
-        ), 0, 5))
-        inflamacion_score.append(inflamacion)
-
-        fatiga = round(dolor * 0.4 + (5 - sueno_num[i]) * 0.7 + brotes[i] * 0.3 + clima_adverso[i] * 0.3)
-        if actividad_fisica[i] == 1:
-            fatiga -= 0.2
-        fatiga = int(np.clip(round(fatiga + np.random.normal(0, 0.2)), 0, 5))
-        fatiga_score.append(fatiga)
-
-    # Estado de ánimo
-    estado_animo_score, estado_animo = [], []
-    for i in range(dias):
-        puntaje = 5 - dolor_score[i] * 0.5 - fatiga_score[i] * 0.3
-        puntaje += actividad_fisica[i] * 0.4 + (sueno_num[i] - 3) * 0.2
-        puntaje += np.random.normal(0, 0.4)
-        puntaje = int(np.clip(round(puntaje), 1, 5))
-        estado_animo_score.append(puntaje)
-
-        if puntaje <= 2:
-            estado_animo.append(np.random.choice(['Triste', 'Frustrado', 'Irritable']))
-        elif puntaje == 3:
-            estado_animo.append(np.random.choice(['Estresado', 'Ansioso', 'Irritable']))
-        else:
-            estado_animo.append(np.random.choice(['Tranquilo', 'Optimista', 'Feliz']))
-
-    df = pd.DataFrame({
-        'fecha': fechas,
-        'clima': clima,
-        'temperatura_C': np.round(temperatura, 1),
-        'actividad_fisica': actividad_fisica,
-        'sueño': sueno,
-        'dieta_tipo': dieta_tipo,
-        'rigidez_score': rigidez_score,
-        'dolor_score': dolor_score,
-        'inflamacion_score': inflamacion_score,
-        'fatiga_score': fatiga_score,
-        'estado_animo': estado_animo,
-        'estado_animo_score': estado_animo_score
-    })
+    df = generar_cohorte_simulada(1, dias, semilla).drop(columns='paciente')
 
     if guardar_csv:
         if ruta_csv is None: